@@ -0,0 +1,203 @@
+"""
+Test de charge du serveur ULFlix.
+
+Démarre un ServeurULFlix local (sur un port libre, avec un annuaire vide dans
+un dossier temporaire) puis simule de nombreuses sessions simultanées: la
+moitié s'inscrit, l'autre moitié s'authentifie avec un compte créé à l'avance,
+puis chacune fait quelques recherches et parcourt quelques pages. Les âges et
+les pays varient pour que les sessions consultent des vues différentes.
+À lancer depuis le dossier tp3:
+
+    python -m benchmarks.charge_serveur [nombre_de_sessions] [chemin_fichier]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from mediatheque import Mediatheque
+from serveur import PREFIXE_DE_QUESTION, ServeurULFlix
+from utilisateur import AnnuaireUtilisateur
+
+QUESTION_DE_PAGINATION = "Entrer s [page suivante]"
+# Nombre de pages suivantes demandées à chaque affichage avant de quitter la pagination.
+PAGES_SUIVANTES = 2
+MOT_DE_PASSE = "motdepasse"
+
+
+def profil(numero, pays):
+    """
+    Fonction permettant de récupérer les réponses d'inscription d'un utilisateur simulé.
+
+    Args:
+        numero (int): Le numéro de l'utilisateur simulé.
+        pays (list): Les pays des utilisateurs simulés.
+
+    Returns:
+        dict: La réponse (str) à chacune des questions d'inscription.
+    """
+    return {
+        "nom": f"client {numero}",
+        "email": f"client{numero}@charge.com",
+        "age": str(10 + numero % 50),
+        "pays": pays[numero % len(pays)],
+        "abonnement": str(1 + numero % 2),
+        "mot_de_passe": MOT_DE_PASSE,
+    }
+
+
+def scenario(numero, inscrit, pays):
+    """
+    Fonction permettant de construire les réponses successives d'une session simulée.
+
+    Args:
+        numero (int): Le numéro de l'utilisateur simulé.
+        inscrit (bool): True si l'utilisateur a déjà un compte (il s'authentifie),
+        False s'il doit s'inscrire.
+        pays (list): Les pays des utilisateurs simulés.
+
+    Returns:
+        list: Les réponses (str), dans l'ordre des questions du serveur, sauf
+        celles de la pagination (voir simuler_session).
+    """
+    reponses_d_inscription = profil(numero, pays)
+    if inscrit:
+        reponses = ["2", reponses_d_inscription["email"], MOT_DE_PASSE]
+    else:
+        reponses = ["1"] + [reponses_d_inscription[attribut] for attribut, _ in AnnuaireUtilisateur.QUESTIONS_D_INSCRIPTION]
+    return reponses + [
+        "1", ("love", "war", "the", "christmas")[numero % 4],
+        "2", "1",
+        "3", "john",
+        ("4", "5", "6")[numero % 3],
+        "8", "the irishman",
+        "9",
+        "7",
+    ]
+
+
+async def simuler_session(hote, port, reponses, latences):
+    """
+    Coroutine jouant une session: chaque réponse est envoyée dès que le serveur
+    pose la question suivante. Le temps entre l'envoi d'une réponse et la
+    question suivante est ajouté aux latences. Le nombre de pages d'un résultat
+    n'étant pas connu d'avance, la pagination est répondue à part: PAGES_SUIVANTES
+    fois s, puis q.
+
+    Args:
+        hote (str): L'adresse du serveur.
+        port (int): Le port du serveur.
+        reponses (list): Les réponses à envoyer, dans l'ordre.
+        latences (list): La liste à laquelle ajouter les latences, en secondes.
+
+    Returns:
+        int: Le nombre de questions reçues.
+    """
+    prefixe = PREFIXE_DE_QUESTION.encode("utf-8")
+    pagination = (PREFIXE_DE_QUESTION + QUESTION_DE_PAGINATION).encode("utf-8")
+    lecteur, ecrivain = await asyncio.open_connection(hote, port, limit=2 ** 20)
+    suite_des_reponses = iter(reponses)
+    nombre_de_questions = 0
+    pages_vues = 0
+    envoi = time.perf_counter()
+    try:
+        while True:
+            ligne = await lecteur.readline()
+            if not ligne:
+                break
+            if ligne.startswith(prefixe):
+                latences.append(time.perf_counter() - envoi)
+                nombre_de_questions += 1
+                if ligne.startswith(pagination):
+                    pages_vues += 1
+                    reponse = "s" if pages_vues <= PAGES_SUIVANTES else "q"
+                else:
+                    pages_vues = 0
+                    reponse = next(suite_des_reponses, None)
+                if reponse is None:
+                    raise RuntimeError(f"Question inattendue: {ligne.decode('utf-8').strip()}")
+                ecrivain.write((reponse + "\n").encode("utf-8"))
+                await ecrivain.drain()
+                envoi = time.perf_counter()
+    finally:
+        ecrivain.close()
+        await ecrivain.wait_closed()
+    return nombre_de_questions
+
+
+async def tester_la_charge(mediatheque, annuaire_utilisateur, nombre_de_sessions, pays):
+    """
+    Coroutine démarrant le serveur puis lançant toutes les sessions simulées en même temps.
+
+    Args:
+        mediatheque (Mediatheque): La médiathèque servie.
+        annuaire_utilisateur (AnnuaireUtilisateur): L'annuaire servi.
+        nombre_de_sessions (int): Le nombre de sessions simultanées.
+        pays (list): Les pays des utilisateurs simulés.
+
+    Returns:
+        tuple: La durée totale (en secondes), le nombre total de questions et les latences.
+    """
+    serveur = ServeurULFlix(mediatheque, annuaire_utilisateur)
+    serveur_tcp = await serveur.demarrer("127.0.0.1", 0)
+    hote, port = serveur_tcp.sockets[0].getsockname()[:2]
+
+    latences = []
+    debut = time.perf_counter()
+    async with serveur_tcp:
+        nombres_de_questions = await asyncio.gather(*(
+            simuler_session(hote, port, scenario(numero, numero % 2 == 0, pays), latences)
+            for numero in range(nombre_de_sessions)
+        ))
+    duree = time.perf_counter() - debut
+    return duree, sum(nombres_de_questions), latences
+
+
+def centile(valeurs_triees, pourcentage):
+    """
+    Fonction permettant de récupérer un centile d'une liste de valeurs triées.
+
+    Args:
+        valeurs_triees (list): Les valeurs, en ordre croissant.
+        pourcentage (float): Le centile voulu (entre 0 et 100).
+
+    Returns:
+        float: La valeur du centile.
+    """
+    position = min(len(valeurs_triees) - 1, int(len(valeurs_triees) * pourcentage / 100))
+    return valeurs_triees[position]
+
+
+if __name__ == "__main__":
+    nombre_de_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    chemin_fichier = sys.argv[2] if len(sys.argv) > 2 else "ulflix.txt"
+
+    mediatheque = Mediatheque(chemin_fichier)
+    # Les utilisateurs simulés viennent des pays les plus représentés, pour que leurs vues ne soient pas vides.
+    shows_par_pays = mediatheque.compter_facettes("pays")
+    pays = [nom.lower() for nom in sorted(shows_par_pays, key=shows_par_pays.get, reverse=True) if nom.strip()][:5]
+    with tempfile.TemporaryDirectory() as dossier:
+        annuaire_utilisateur = AnnuaireUtilisateur(
+            os.path.join(dossier, "utilisateurs.txt"), chargement_paresseux=True
+        )
+        # Les sessions paires s'authentifient: leur compte est créé avant le test.
+        for numero in range(0, nombre_de_sessions, 2):
+            reponses = {
+                attribut: annuaire_utilisateur.valider_reponse_d_inscription(attribut, reponse)[0]
+                for attribut, reponse in profil(numero, pays).items()
+            }
+            annuaire_utilisateur.creer_utilisateur(reponses)
+
+        duree, nombre_de_questions, latences = asyncio.run(
+            tester_la_charge(mediatheque, annuaire_utilisateur, nombre_de_sessions, pays)
+        )
+
+    latences.sort()
+    print(f"{nombre_de_sessions} sessions, {nombre_de_questions} échanges en {duree:.2f} s")
+    print(f"{nombre_de_sessions / duree:10.1f} sessions/s")
+    print(f"{nombre_de_questions / duree:10.1f} échanges/s")
+    print(f"Latence moyenne: {statistics.fmean(latences) * 1000:8.2f} ms")
+    for pourcentage in (50, 95, 99, 100):
+        print(f"Latence p{pourcentage:<3}:    {centile(latences, pourcentage) * 1000:8.2f} ms")
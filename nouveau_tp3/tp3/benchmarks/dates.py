@@ -0,0 +1,68 @@
+"""
+Mesure du coût de conversion de la colonne date_ajout.
+
+Compare datetime.strptime à convertir_date_ajout (sans puis avec mémorisation)
+sur toutes les dates du fichier de shows. À lancer depuis le dossier tp3:
+
+    python -m benchmarks.dates [chemin_fichier]
+"""
+import datetime
+import sys
+import time
+
+from show import convertir_date_ajout
+
+
+def lire_dates(chemin_fichier):
+    """
+    Fonction permettant de récupérer la colonne date_ajout d'un fichier de shows,
+    telle qu'elle est passée à la conversion lors du chargement.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+
+    Returns:
+        list: Les dates (str) de chaque show.
+    """
+    with open(chemin_fichier, encoding="utf-8") as fichier:
+        titres = fichier.readline().strip().split("|")
+        position = titres.index("date_ajout")
+        return [(ligne.split("|")[position].strip() or "January 1, 2000") for ligne in fichier]
+
+
+def mesurer(fonction, dates, repetitions=5):
+    """
+    Fonction permettant de mesurer le meilleur temps de conversion de toutes les dates.
+
+    Args:
+        fonction (callable): Fonction de conversion.
+        dates (list): Dates à convertir.
+        repetitions (int, optional): Nombre de mesures.
+
+    Returns:
+        float: Le meilleur temps, en secondes.
+    """
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for date in dates:
+            fonction(date)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+if __name__ == "__main__":
+    chemin_fichier = sys.argv[1] if len(sys.argv) > 1 else "ulflix.txt"
+    dates = lire_dates(chemin_fichier)
+
+    resultats = {
+        "strptime": mesurer(lambda date: datetime.datetime.strptime(date, "%B %d, %Y"), dates),
+        "convertir_date_ajout (sans cache)": mesurer(convertir_date_ajout.__wrapped__, dates),
+    }
+    convertir_date_ajout.cache_clear()
+    resultats["convertir_date_ajout (cache)"] = mesurer(convertir_date_ajout, dates)
+
+    print(f"{len(dates)} dates, {len(set(dates))} distinctes")
+    reference = resultats["strptime"]
+    for nom, duree in resultats.items():
+        print(f"{nom:<36s} {duree * 1000:8.2f} ms  x{reference / duree:5.1f}")
@@ -0,0 +1,154 @@
+"""
+Générateurs de fichiers synthétiques pour les mesures de performance.
+
+Le catalogue généré suit le format de ulflix.txt (mêmes colonnes, même
+séparateur) et peut compter des millions de shows: chaque valeur est tirée
+au hasard parmi celles d'un fichier modèle (par défaut ulflix.txt), ce qui
+conserve la répartition des classements, des langues, des pays, des
+catégories et la longueur des listes. Le fichier d'utilisateurs suit le
+format de ulflix-utilisateurs.txt; tous les utilisateurs ont le même mot de
+passe, MOT_DE_PASSE. À lancer depuis le dossier tp3:
+
+    python -m benchmarks.generateurs shows chemin_fichier nombre_de_shows [graine]
+    python -m benchmarks.generateurs utilisateurs chemin_fichier nombre_d_utilisateurs [graine]
+"""
+import random
+import sys
+
+from journal_utilisateurs import TAILLE_DU_TAMPON, encoder_rangee
+from utils import HacheurDeMotDePasse
+
+FICHIER_MODELE = "ulflix.txt"
+COLONNES_DE_LISTES = ("directeurs", "acteurs", "pays", "categories")
+MOT_DE_PASSE = "motdepasse"
+PAYS_DES_UTILISATEURS = ("canada", "united states", "france", "india", "japan", "mexico")
+
+
+def lire_modele(chemin_modele):
+    """
+    Fonction permettant de récupérer, pour chaque colonne d'un fichier de shows,
+    les valeurs dans lesquelles la génération puise.
+
+    Args:
+        chemin_modele (str): Le chemin du fichier de shows servant de modèle.
+
+    Returns:
+        tuple: La ligne des titres (str) et un dictionnaire donnant, par colonne,
+        la liste des valeurs du modèle. Pour une colonne de liste, ce sont les
+        éléments, et la clé "nombre_de_<colonne>" donne la longueur de chaque liste.
+        Pour titre et description, ce sont les mots, et "nombre_de_mots_<colonne>"
+        donne le nombre de mots de chaque valeur.
+    """
+    with open(chemin_modele, encoding="utf-8") as fichier:
+        ligne_des_titres = fichier.readline().strip()
+        titres = ligne_des_titres.split("|")
+        valeurs = {titre: [] for titre in titres}
+        for titre in COLONNES_DE_LISTES:
+            valeurs["nombre_de_" + titre] = []
+        for titre in ("titre", "description"):
+            valeurs["nombre_de_mots_" + titre] = []
+
+        for ligne in fichier:
+            if not ligne.strip():
+                continue
+            for titre, champ in zip(titres, ligne.rstrip("\n").split("|")):
+                if titre in COLONNES_DE_LISTES:
+                    elements = champ.split(", ") if champ else []
+                    valeurs[titre].extend(elements)
+                    valeurs["nombre_de_" + titre].append(len(elements))
+                elif titre in ("titre", "description"):
+                    mots = champ.split()
+                    valeurs[titre].extend(mots)
+                    valeurs["nombre_de_mots_" + titre].append(len(mots))
+                else:
+                    valeurs[titre].append(champ)
+    return ligne_des_titres, valeurs
+
+
+def generer_catalogue(chemin_fichier, nombre_de_shows, graine=0, chemin_modele=FICHIER_MODELE):
+    """
+    Fonction permettant d'écrire un fichier de shows synthétique.
+
+    Args:
+        chemin_fichier (str): Le chemin du fichier à écrire.
+        nombre_de_shows (int): Le nombre de shows à générer.
+        graine (int, optional): La graine du générateur aléatoire: une même
+        graine donne le même fichier.
+        chemin_modele (str, optional): Le fichier de shows dont les valeurs sont reprises.
+    """
+    ligne_des_titres, valeurs = lire_modele(chemin_modele)
+    titres = ligne_des_titres.split("|")
+    generateur = random.Random(graine)
+    choisir = generateur.choice
+    choisir_plusieurs = generateur.choices
+
+    def champ(titre, numero):
+        if titre == "show_id":
+            return f"s{numero + 1}"
+        if titre in ("titre", "description"):
+            nombre_de_mots = max(1, choisir(valeurs["nombre_de_mots_" + titre]))
+            return " ".join(choisir_plusieurs(valeurs[titre], k=nombre_de_mots))
+        if titre in COLONNES_DE_LISTES:
+            nombre = choisir(valeurs["nombre_de_" + titre])
+            # Un élément n'apparaît qu'une fois par liste, comme dans le modèle.
+            return ", ".join(dict.fromkeys(choisir_plusieurs(valeurs[titre], k=nombre)))
+        if titre == "popularite":
+            return f"{generateur.lognormvariate(2.5, 1.0):.3f}"
+        if titre == "note":
+            return f"{generateur.uniform(1.0, 9.5):.1f}"
+        return choisir(valeurs[titre])
+
+    with open(chemin_fichier, "w", encoding="utf-8", buffering=TAILLE_DU_TAMPON) as fichier:
+        fichier.write(ligne_des_titres + "\n")
+        for numero in range(nombre_de_shows):
+            fichier.write("|".join(champ(titre, numero) for titre in titres) + "\n")
+
+
+def email_synthetique(numero):
+    """
+    Fonction permettant de récupérer l'adresse email de l'utilisateur synthétique d'un numéro.
+
+    Args:
+        numero (int): Le numéro de l'utilisateur.
+
+    Returns:
+        str: Son adresse email.
+    """
+    return f"utilisateur{numero}@ulflix.com"
+
+
+def generer_utilisateurs(chemin_fichier, nombre_d_utilisateurs, graine=0):
+    """
+    Fonction permettant d'écrire un fichier d'utilisateurs synthétique. Le mot
+    de passe (MOT_DE_PASSE) est haché une seule fois, avec le réglage courant de
+    HacheurDeMotDePasse, et ce hachage est repris pour tous les utilisateurs.
+
+    Args:
+        chemin_fichier (str): Le chemin du fichier à écrire.
+        nombre_d_utilisateurs (int): Le nombre d'utilisateurs à générer.
+        graine (int, optional): La graine du générateur aléatoire.
+    """
+    generateur = random.Random(graine)
+    hash_mot_de_passe = HacheurDeMotDePasse.hacher(MOT_DE_PASSE)
+    with open(chemin_fichier, "wb", buffering=TAILLE_DU_TAMPON) as fichier:
+        for numero in range(nombre_d_utilisateurs):
+            fichier.write(encoder_rangee([
+                f"utilisateur {numero}",
+                email_synthetique(numero),
+                str(generateur.randint(8, 80)),
+                generateur.choice(PAYS_DES_UTILISATEURS),
+                str(generateur.randint(1, 2)),
+                hash_mot_de_passe,
+            ]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in ("shows", "utilisateurs"):
+        sys.exit("Usage: python -m benchmarks.generateurs shows|utilisateurs chemin_fichier nombre [graine]")
+    genre, chemin_fichier, nombre = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    graine = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    if genre == "shows":
+        generer_catalogue(chemin_fichier, nombre, graine)
+    else:
+        generer_utilisateurs(chemin_fichier, nombre, graine)
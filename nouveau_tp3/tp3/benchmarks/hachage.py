@@ -0,0 +1,75 @@
+"""
+Mesure du nombre de connexions par seconde selon l'algorithme de hachage.
+
+Pour chaque réglage de HacheurDeMotDePasse (SHA-512 historique, PBKDF2 et
+scrypt à plusieurs coûts), vérifie un lot de mots de passe un par un puis
+avec verifier_plusieurs (groupe de fils d'exécution). À lancer depuis le
+dossier tp3:
+
+    python -m benchmarks.hachage [duree_par_mesure]
+"""
+import os
+import sys
+import time
+
+from utils import HacheurDeMotDePasse
+
+# (nom, algorithme, arguments de HacheurDeMotDePasse.configurer)
+REGLAGES = (
+    ("sha512 (historique)", "sha512", {}),
+    ("pbkdf2_sha256 100 000", "pbkdf2_sha256", {"iterations_pbkdf2": 100_000}),
+    ("pbkdf2_sha256 600 000", "pbkdf2_sha256", {"iterations_pbkdf2": 600_000}),
+    ("scrypt n=2^14 r=8 p=1", "scrypt", {"couts_scrypt": (2 ** 14, 8, 1)}),
+    ("scrypt n=2^15 r=8 p=1", "scrypt", {"couts_scrypt": (2 ** 15, 8, 1)}),
+)
+
+
+def preparer_lot(duree):
+    """
+    Fonction permettant de préparer un lot de paires (hachage, mot de passe)
+    au réglage courant, assez grand pour que sa vérification un par un dure
+    environ duree secondes.
+
+    Args:
+        duree (float): La durée visée, en secondes.
+
+    Returns:
+        list: Les paires (hash_mot_de_passe, mot_de_passe_en_clair).
+    """
+    debut = time.perf_counter()
+    HacheurDeMotDePasse.verifier(HacheurDeMotDePasse.hacher("mot de passe"), "mot de passe")
+    une_verification = max(time.perf_counter() - debut, 1e-7)
+    nombre = max(4, min(100_000, int(duree / une_verification)))
+    mots_de_passe = [f"mot de passe {numero}" for numero in range(nombre)]
+    return [(HacheurDeMotDePasse.hacher(mot_de_passe), mot_de_passe) for mot_de_passe in mots_de_passe]
+
+
+def mesurer(verifier_lot, lot):
+    """
+    Fonction permettant de mesurer le nombre de vérifications par seconde d'un lot.
+
+    Args:
+        verifier_lot (callable): Fonction vérifiant toutes les paires du lot.
+        lot (list): Les paires (hash_mot_de_passe, mot_de_passe_en_clair).
+
+    Returns:
+        float: Le nombre de connexions par seconde.
+    """
+    debut = time.perf_counter()
+    resultats = verifier_lot(lot)
+    duree = time.perf_counter() - debut
+    assert all(resultats)
+    return len(lot) / duree
+
+
+if __name__ == "__main__":
+    duree = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+    print(f"{HacheurDeMotDePasse.NOMBRE_DE_FILS} fils d'exécution ({os.cpu_count()} processeurs)")
+    print(f"{'réglage':<24}{'un par un':>14}{'en parallèle':>16}  (connexions/s)")
+    for nom, algorithme, couts in REGLAGES:
+        HacheurDeMotDePasse.configurer(algorithme, **couts)
+        lot = preparer_lot(duree)
+        un_par_un = mesurer(lambda lot: [HacheurDeMotDePasse.verifier(*paire) for paire in lot], lot)
+        en_parallele = mesurer(HacheurDeMotDePasse.verifier_plusieurs, lot)
+        print(f"{nom:<24}{un_par_un:>14.1f}{en_parallele:>16.1f}")
@@ -0,0 +1,391 @@
+"""
+Suite de mesures de performance de la médiathèque et de l'annuaire.
+
+Génère un catalogue et un fichier d'utilisateurs synthétiques (voir
+benchmarks.generateurs) dans un dossier temporaire, puis mesure le
+chargement (Mediatheque.__init__, avec et sans instantané), chaque méthode
+filtrer_*, trier_ids_par_attribut, lister_valeurs_uniques_par_attribut,
+reduire_liste_des_shows, appliquer_changements et
+AnnuaireUtilisateur.authentifier. Pour chaque
+mesure: le débit (opérations par seconde), les centiles de latence et le
+pic de mémoire résidente du processus (qui ne fait que croître d'une mesure
+à l'autre). Les résultats peuvent être écrits en JSON, puis deux fichiers
+JSON comparés (par exemple avant et après un commit). À lancer depuis le
+dossier tp3:
+
+    python -m benchmarks.suite [nombre_de_shows|chemin_fichier] [nombre_d_utilisateurs] [sortie.json]
+    python -m benchmarks.suite comparer avant.json apres.json
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.charge_serveur import centile
+from benchmarks.generateurs import MOT_DE_PASSE, email_synthetique, generer_catalogue, generer_utilisateurs
+from mediatheque import Mediatheque
+from utilisateur import AnnuaireUtilisateur
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Nombre de chargements mesurés (chacun relit tout le fichier).
+REPETITIONS_DU_CHARGEMENT = 3
+RECHERCHES_DE_TEXTE = ("the", "love", "war", "a", "christmas", "zz", "house of", "e")
+RECHERCHES_DE_LISTE = {
+    "acteurs": ("john", "tom", "a", "zz"),
+    "directeurs": ("martin", "lee", "zz"),
+    "pays": ("united", "canada", "india"),
+    "categories": ("drama", "comedies", "tv", "documentaries"),
+}
+# Recherches par pertinence, avec et sans fautes de frappe.
+RECHERCHES_PAR_PERTINENCE = {
+    "titre": ("love", "chrismas", "the irishman", "harry poter", "the", "a"),
+    "acteurs": ("tom hnaks", "leonrado dicapiro", "john", "zz"),
+    "directeurs": ("martin scorsese", "spilberg", "lee"),
+}
+# Nombre de résultats demandés à chaque recherche par pertinence (une page).
+RESULTATS_PAR_RECHERCHE = 10
+# Nombre de recommandations mesurées (chacune pour trois shows tirés au hasard).
+RECOMMANDATIONS = 200
+# Nombre de deltas appliqués, et nombre de shows ajoutés, remplacés et retirés par chacun.
+DELTAS = 20
+CHANGEMENTS_PAR_DELTA = 100
+AGES = (5, 10, 13, 16, 18, 30)
+ATTRIBUTS_DE_TRI = ("popularite", "note", "date_ajout", "annee_sortie", "titre")
+ATTRIBUTS_DE_LISTE = ("directeurs", "acteurs", "pays", "categories")
+# Nombre d'authentifications mesurées.
+AUTHENTIFICATIONS = 2000
+# Un écart relatif plus grand que ce seuil est signalé par la comparaison.
+SEUIL_DE_REGRESSION = 0.10
+
+
+def pic_de_memoire_ko():
+    """
+    Fonction permettant de récupérer le pic de mémoire résidente du processus.
+
+    Returns:
+        int: Le pic en kio, ou None si la plateforme ne le fournit pas.
+    """
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS donne des octets, Linux des kio.
+    return pic // 1024 if sys.platform == "darwin" else pic
+
+
+def mesurer(nom, operations):
+    """
+    Fonction permettant de mesurer une suite d'opérations, chacune chronométrée à part.
+
+    Args:
+        nom (str): Le nom de la mesure.
+        operations (iterable): Les opérations (callable sans argument).
+        Une opération peut retourner une durée (en secondes), qui remplace
+        alors la sienne (pour exclure une préparation de la mesure).
+
+    Returns:
+        dict: Le nom, le nombre d'opérations, la durée totale (s), le débit
+        (opérations/s), les centiles de latence (ms) et le pic de mémoire (kio).
+    """
+    latences = []
+    for operation in operations:
+        debut = time.perf_counter()
+        duree = operation()
+        latences.append(duree if isinstance(duree, float) else time.perf_counter() - debut)
+
+    latences.sort()
+    duree_totale = sum(latences)
+    return {
+        "nom": nom,
+        "operations": len(latences),
+        "duree_s": duree_totale,
+        "debit_par_s": len(latences) / duree_totale if duree_totale else None,
+        "latence_ms": {
+            f"p{pourcentage}": centile(latences, pourcentage) * 1000 for pourcentage in (50, 95, 99, 100)
+        },
+        "pic_rss_ko": pic_de_memoire_ko(),
+    }
+
+
+def authentifier(annuaire_utilisateur, email):
+    """
+    Fonction permettant d'appeler AnnuaireUtilisateur.authentifier sans console:
+    les réponses aux questions sont l'adresse email puis MOT_DE_PASSE.
+
+    Args:
+        annuaire_utilisateur (AnnuaireUtilisateur): L'annuaire.
+        email (str): L'adresse email de l'utilisateur.
+
+    Returns:
+        Utilisateur: L'utilisateur authentifié.
+    """
+    with mock.patch("builtins.input", side_effect=[email, MOT_DE_PASSE]):
+        return annuaire_utilisateur.authentifier()
+
+
+def mesurer_la_mediatheque(chemin_shows):
+    """
+    Générateur mesurant le chargement et les méthodes de Mediatheque.
+
+    Args:
+        chemin_shows (str): Le chemin du fichier de shows.
+
+    Yields:
+        dict: Le résultat de chaque mesure (voir mesurer).
+    """
+    yield mesurer(
+        "Mediatheque.__init__ (sans instantané)",
+        [lambda: Mediatheque(chemin_shows, utiliser_instantane=False)] * REPETITIONS_DU_CHARGEMENT,
+    )
+    # Le premier chargement crée l'instantané; les suivants le lisent.
+    Mediatheque(chemin_shows)
+    yield mesurer(
+        "Mediatheque.__init__ (instantané)",
+        [lambda: Mediatheque(chemin_shows)] * REPETITIONS_DU_CHARGEMENT,
+    )
+
+    mediatheque = Mediatheque(chemin_shows)
+    for attribut in ("titre", "description"):
+        yield mesurer(
+            f"filtrer_ids_sur_attribut_par_inclusion_de_string ({attribut})",
+            [
+                lambda valeur=valeur: mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_string(attribut, valeur)
+                for valeur in RECHERCHES_DE_TEXTE
+            ],
+        )
+    for attribut, valeurs in RECHERCHES_DE_LISTE.items():
+        yield mesurer(
+            f"filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string ({attribut})",
+            [
+                lambda valeur=valeur: mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string(attribut, valeur)
+                for valeur in valeurs
+            ],
+        )
+    for attribut, recherches in RECHERCHES_PAR_PERTINENCE.items():
+        # La construction de l'index flou est mesurée à part, lors de la première recherche.
+        yield mesurer(f"obtenir_index_flou ({attribut})", [lambda: mediatheque.obtenir_index_flou(attribut)])
+        yield mesurer(
+            f"rechercher_par_pertinence ({attribut})",
+            [
+                lambda recherche=recherche: mediatheque.rechercher_par_pertinence(
+                    attribut, recherche, RESULTATS_PAR_RECHERCHE
+                )
+                for recherche in recherches
+            ],
+        )
+    yield mesurer("filtrer_ids_sur_age", [lambda age=age: mediatheque.filtrer_ids_sur_age(age) for age in AGES])
+
+    # Le premier appel lit les voisins précalculés, ou les calcule s'ils sont absents.
+    yield mesurer("obtenir_recommandeur", [mediatheque.obtenir_recommandeur])
+    historiques = [random.Random(graine).sample(list(mediatheque.shows), 3) for graine in range(RECOMMANDATIONS)]
+    yield mesurer(
+        "recommander_par_similarite",
+        [
+            lambda historique=historique: mediatheque.recommander_par_similarite(
+                historique, mediatheque.NOMBRE_DE_RECOMMANDATIONS
+            )
+            for historique in historiques
+        ],
+    )
+
+    identifiants = list(mediatheque.shows)
+    echantillon = random.Random(0).sample(identifiants, min(100, len(identifiants)))
+    moitie = identifiants[::2]
+    for attribut in ATTRIBUTS_DE_TRI:
+        yield mesurer(
+            f"trier_ids_par_attribut ({attribut})",
+            [
+                lambda show_ids=show_ids: mediatheque.trier_ids_par_attribut(show_ids, attribut)
+                for show_ids in (None, moitie, echantillon)
+            ],
+        )
+    yield mesurer(
+        "lister_valeurs_uniques_par_attribut",
+        [lambda attribut=attribut: mediatheque.lister_valeurs_uniques_par_attribut(attribut) for attribut in ATTRIBUTS_DE_LISTE],
+    )
+
+    def reduire():
+        # La médiathèque réduite est rechargée (depuis l'instantané) hors de la mesure.
+        a_reduire = Mediatheque(chemin_shows)
+        a_garder = identifiants[::3]
+        debut = time.perf_counter()
+        a_reduire.reduire_liste_des_shows(a_garder)
+        return time.perf_counter() - debut
+
+    yield mesurer("reduire_liste_des_shows", [reduire] * REPETITIONS_DU_CHARGEMENT)
+
+    # Chaque delta est appliqué à la médiathèque issue du précédent (ses permutations
+    # triées, index et facettes sont déjà construits): un tiers de shows ajoutés, un
+    # tiers de remplacés et un tiers de retirés.
+    generateur = random.Random(0)
+    versions = [mediatheque]
+
+    def appliquer_un_delta(numero):
+        courante = versions[-1]
+        tiers = CHANGEMENTS_PAR_DELTA // 3
+        choisis = generateur.sample(list(courante.shows), 2 * tiers)
+        changements = [(show_id, courante.shows[show_id]) for show_id in choisis[:tiers]]
+        changements += [(show_id, None) for show_id in choisis[tiers:]]
+        for position, show_id in enumerate(choisis[:CHANGEMENTS_PAR_DELTA - 2 * tiers]):
+            show = courante.shows[show_id]
+            show.identifiant = f"delta{numero}-{position}"
+            changements.append((show.identifiant, show))
+        debut = time.perf_counter()
+        versions.append(courante.appliquer_changements(changements))
+        return time.perf_counter() - debut
+
+    yield mesurer("appliquer_changements", [lambda numero=numero: appliquer_un_delta(numero) for numero in range(DELTAS)])
+
+
+def mesurer_l_annuaire(chemin_utilisateurs, nombre_d_utilisateurs):
+    """
+    Générateur mesurant le chargement de l'annuaire et l'authentification,
+    avec et sans chargement paresseux.
+
+    Args:
+        chemin_utilisateurs (str): Le chemin du fichier d'utilisateurs.
+        nombre_d_utilisateurs (int): Le nombre d'utilisateurs du fichier.
+
+    Yields:
+        dict: Le résultat de chaque mesure (voir mesurer).
+    """
+    generateur = random.Random(0)
+    emails = [email_synthetique(generateur.randrange(nombre_d_utilisateurs)) for _ in range(AUTHENTIFICATIONS)]
+    for chargement_paresseux in (False, True):
+        mode = "paresseux" if chargement_paresseux else "complet"
+        annuaires = []
+        yield mesurer(
+            f"AnnuaireUtilisateur.__init__ ({mode})",
+            [lambda: annuaires.append(AnnuaireUtilisateur(chemin_utilisateurs, chargement_paresseux=chargement_paresseux))],
+        )
+        annuaire_utilisateur = annuaires[0]
+        yield mesurer(
+            f"AnnuaireUtilisateur.authentifier ({mode})",
+            [lambda email=email: authentifier(annuaire_utilisateur, email) for email in emails],
+        )
+
+
+def version_du_code():
+    """
+    Fonction permettant de récupérer le commit courant, pour identifier les résultats.
+
+    Returns:
+        str: Le hash du commit, ou None hors d'un dépôt git.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def afficher(resultat):
+    """
+    Fonction permettant d'afficher le résultat d'une mesure sur une ligne.
+
+    Args:
+        resultat (dict): Le résultat (voir mesurer).
+    """
+    latence = resultat["latence_ms"]
+    pic = resultat["pic_rss_ko"]
+    print(
+        f"{resultat['nom']:<72}{resultat['debit_par_s']:>12.1f}/s"
+        f"{latence['p50']:>10.2f}{latence['p95']:>10.2f}{latence['p99']:>10.2f}{latence['p100']:>10.2f} ms"
+        f"{(pic or 0) / 1024:>9.0f} Mio"
+    )
+
+
+def comparer(chemin_avant, chemin_apres):
+    """
+    Fonction permettant de comparer deux fichiers de résultats: pour chaque
+    mesure présente dans les deux, l'écart relatif du débit et de la latence
+    médiane. Les écarts défavorables de plus de SEUIL_DE_REGRESSION sont signalés.
+
+    Args:
+        chemin_avant (str): Le fichier JSON de référence.
+        chemin_apres (str): Le fichier JSON à comparer.
+
+    Returns:
+        int: Le nombre de régressions signalées.
+    """
+    with open(chemin_avant, encoding="utf-8") as fichier:
+        avant = json.load(fichier)
+    with open(chemin_apres, encoding="utf-8") as fichier:
+        apres = json.load(fichier)
+    resultats_avant = {resultat["nom"]: resultat for resultat in avant["resultats"]}
+
+    print(f"{avant.get('commit')} -> {apres.get('commit')}")
+    print(f"{'mesure':<72}{'débit':>10}{'p50':>10}")
+    regressions = 0
+    for resultat in apres["resultats"]:
+        reference = resultats_avant.get(resultat["nom"])
+        if reference is None or not reference["debit_par_s"] or not resultat["debit_par_s"]:
+            continue
+        ecart_debit = resultat["debit_par_s"] / reference["debit_par_s"] - 1
+        ecart_latence = resultat["latence_ms"]["p50"] / reference["latence_ms"]["p50"] - 1 if reference["latence_ms"]["p50"] else 0.0
+        regression = ecart_debit < -SEUIL_DE_REGRESSION or ecart_latence > SEUIL_DE_REGRESSION
+        regressions += regression
+        print(f"{resultat['nom']:<72}{ecart_debit:>+10.1%}{ecart_latence:>+10.1%}{'  régression' if regression else ''}")
+    return regressions
+
+
+def executer(source_des_shows, nombre_d_utilisateurs):
+    """
+    Fonction permettant d'exécuter toute la suite.
+
+    Args:
+        source_des_shows (str): Un fichier de shows existant, ou le nombre de
+        shows du catalogue synthétique à générer.
+        nombre_d_utilisateurs (int): Le nombre d'utilisateurs à générer.
+
+    Returns:
+        dict: Les paramètres de la suite et le résultat de chaque mesure.
+    """
+    rapport = {
+        "commit": version_du_code(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "processeurs": os.cpu_count(),
+        "nombre_d_utilisateurs": nombre_d_utilisateurs,
+        "resultats": [],
+    }
+    print(f"{'mesure':<72}{'débit':>14}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'pic RSS':>16}")
+    with tempfile.TemporaryDirectory() as dossier:
+        if os.path.exists(source_des_shows):
+            chemin_shows = source_des_shows
+        else:
+            chemin_shows = os.path.join(dossier, "shows.txt")
+            generer_catalogue(chemin_shows, int(source_des_shows))
+        chemin_utilisateurs = os.path.join(dossier, "utilisateurs.txt")
+        generer_utilisateurs(chemin_utilisateurs, nombre_d_utilisateurs)
+        rapport["shows"] = source_des_shows
+
+        for resultat in (*mesurer_la_mediatheque(chemin_shows), *mesurer_l_annuaire(chemin_utilisateurs, nombre_d_utilisateurs)):
+            afficher(resultat)
+            rapport["resultats"].append(resultat)
+    return rapport
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "comparer":
+        if len(sys.argv) != 4:
+            sys.exit("Usage: python -m benchmarks.suite comparer avant.json apres.json")
+        sys.exit(1 if comparer(sys.argv[2], sys.argv[3]) else 0)
+
+    source_des_shows = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    nombre_d_utilisateurs = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    chemin_sortie = sys.argv[3] if len(sys.argv) > 3 else None
+
+    rapport = executer(source_des_shows, nombre_d_utilisateurs)
+    if chemin_sortie is not None:
+        with open(chemin_sortie, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, indent=2, ensure_ascii=False)
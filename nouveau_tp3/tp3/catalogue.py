@@ -0,0 +1,336 @@
+import array
+import collections.abc
+import datetime
+
+from show import Show
+
+
+class TableDeChaines:
+    """
+    Classe représentant une table de chaînes de caractères internées.
+
+    Chaque valeur distincte n'est stockée qu'une seule fois et est identifiée
+    par un code entier (sa position dans la table).
+
+    Une TableDeChaines est composée des attributs suivants:
+        - valeurs (list): les valeurs distinctes, dans l'ordre d'apparition.
+        - codes_par_valeur (dict): le code associé à chaque valeur.
+    """
+    def __init__(self, valeurs=()):
+        self.valeurs = list(valeurs)
+        self.codes_par_valeur = {valeur: code for code, valeur in enumerate(self.valeurs)}
+
+    def __len__(self):
+        return len(self.valeurs)
+
+    def coder(self, valeur):
+        """
+        Méthode permettant de récupérer le code d'une valeur, en l'ajoutant
+        à la table si elle n'y est pas encore.
+
+        Args:
+            valeur (str): Valeur à coder.
+
+        Returns:
+            int: Code de la valeur.
+        """
+        code = self.codes_par_valeur.get(valeur)
+        if code is None:
+            code = self.codes_par_valeur[valeur] = len(self.valeurs)
+            self.valeurs.append(valeur)
+        return code
+
+
+class ColonneDeChaines:
+    """
+    Colonne de chaînes de caractères répétitives (langue, type, classement, ...).
+    Chaque rangée ne conserve que le code de sa valeur dans une TableDeChaines.
+    """
+    def __init__(self):
+        self.table = TableDeChaines()
+        self.codes = array.array("I")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, rang):
+        return self.table.valeurs[self.codes[rang]]
+
+    def append(self, valeur):
+        self.codes.append(self.table.coder(valeur))
+
+    def tronquer(self, taille):
+        # Les valeurs ajoutées à la table restent: une valeur sans rangée n'est jamais lue.
+        del self.codes[taille:]
+
+    def extend(self, autre):
+        # Les codes de l'autre colonne sont traduits dans la table de celle-ci.
+        correspondance = [self.table.coder(valeur) for valeur in autre.table.valeurs]
+        self.codes.extend(correspondance[code] for code in autre.codes)
+
+
+class ColonneDeListes:
+    """
+    Colonne de listes de chaînes de caractères (acteurs, pays, catégories, ...).
+
+    Les codes des éléments de toutes les rangées sont mis bout à bout dans
+    un seul tableau; debuts[rang] et debuts[rang + 1] délimitent les
+    éléments de la rangée.
+    """
+    def __init__(self):
+        self.table = TableDeChaines()
+        self.debuts = array.array("Q", [0])
+        self.codes = array.array("I")
+
+    def __len__(self):
+        return len(self.debuts) - 1
+
+    def __getitem__(self, rang):
+        valeurs = self.table.valeurs
+        return [valeurs[code] for code in self.codes_de(rang)]
+
+    def codes_de(self, rang):
+        """
+        Méthode permettant de récupérer les codes des éléments d'une rangée.
+
+        Args:
+            rang (int): Rang de la rangée.
+
+        Returns:
+            array: Codes des éléments de la rangée.
+        """
+        return self.codes[self.debuts[rang]:self.debuts[rang + 1]]
+
+    def append(self, valeurs):
+        self.codes.extend(map(self.table.coder, valeurs))
+        self.debuts.append(len(self.codes))
+
+    def tronquer(self, taille):
+        del self.codes[self.debuts[taille]:]
+        del self.debuts[taille + 1:]
+
+    def extend(self, autre):
+        # Les codes de l'autre colonne sont traduits dans la table de celle-ci.
+        correspondance = [self.table.coder(valeur) for valeur in autre.table.valeurs]
+        decalage = len(self.codes)
+        self.codes.extend(correspondance[code] for code in autre.codes)
+        self.debuts.extend(debut + decalage for debut in autre.debuts[1:])
+
+
+class Catalogue:
+    """
+    Classe représentant le stockage en colonnes des shows d'une médiathèque.
+
+    Au lieu de conserver un objet Show par rangée, chaque attribut est stocké
+    dans sa propre colonne (liste, tableau array ou colonne de chaînes internées).
+    Les objets Show ne sont construits qu'à la demande par la méthode show.
+
+    Un Catalogue est composé de l'attribut suivant:
+        - colonnes (dict): la colonne de chaque attribut de Show. La colonne
+          date_ajout contient des ordinaux (datetime.date.toordinal) et la
+          colonne supplémentaire age_minimum_requis contient l'âge minimum
+          requis de chaque show.
+    """
+    ATTRIBUTS_LISTE = ("directeurs", "acteurs", "pays", "categories")
+    # Attributs numériques pouvant servir de clé de tri directement depuis leur colonne.
+    ATTRIBUTS_NUMERIQUES = ("popularite", "note", "date_ajout", "annee_sortie", "age_minimum_requis")
+
+    def __init__(self):
+        self.colonnes = {
+            "identifiant": [],
+            "titre": [],
+            "description": [],
+            "langue": ColonneDeChaines(),
+            "popularite": array.array("d"),
+            "note": array.array("d"),
+            "type": ColonneDeChaines(),
+            "directeurs": ColonneDeListes(),
+            "acteurs": ColonneDeListes(),
+            "pays": ColonneDeListes(),
+            "date_ajout": array.array("i"),
+            "annee_sortie": array.array("i"),
+            "classement": ColonneDeChaines(),
+            "duree": ColonneDeChaines(),
+            "categories": ColonneDeListes(),
+            "age_minimum_requis": array.array("B"),
+        }
+
+    def __len__(self):
+        return len(self.colonnes["identifiant"])
+
+    def ajouter(self, show):
+        """
+        Méthode permettant d'ajouter un show à la fin du catalogue.
+
+        Args:
+            show (Show): Le show à ajouter.
+
+        Returns:
+            int: Le rang du show dans le catalogue.
+
+        Raises:
+            KeyError: Si le classement du show est inconnu (voir
+            Show.age_minimum_requis). Le catalogue n'est alors pas modifié.
+        """
+        rang = len(self)
+        # Toutes les valeurs sont calculées avant de toucher aux colonnes: une
+        # valeur invalide ne laisse pas une rangée ajoutée à une partie d'entre elles.
+        valeurs = [
+            show.date_ajout.toordinal() if attribut == "date_ajout" else getattr(show, attribut)
+            for attribut in self.colonnes
+        ]
+        try:
+            for colonne, valeur in zip(self.colonnes.values(), valeurs):
+                colonne.append(valeur)
+        except Exception:
+            self.tronquer(rang)
+            raise
+        return rang
+
+    def tronquer(self, taille):
+        """
+        Méthode permettant de retirer les dernières rangées du catalogue pour
+        n'en garder que les taille premières.
+
+        Args:
+            taille (int): Le nombre de rangées gardées.
+        """
+        for colonne in self.colonnes.values():
+            if isinstance(colonne, (ColonneDeChaines, ColonneDeListes)):
+                colonne.tronquer(taille)
+            else:
+                del colonne[taille:]
+
+    def show(self, rang):
+        """
+        Méthode permettant de construire l'objet Show correspondant à une rangée.
+
+        Args:
+            rang (int): Rang du show dans le catalogue.
+
+        Returns:
+            Show: Le show situé à ce rang.
+        """
+        colonnes = self.colonnes
+        return Show(
+            colonnes["identifiant"][rang],
+            colonnes["titre"][rang],
+            colonnes["description"][rang],
+            colonnes["langue"][rang],
+            colonnes["popularite"][rang],
+            colonnes["note"][rang],
+            colonnes["type"][rang],
+            colonnes["directeurs"][rang],
+            colonnes["acteurs"][rang],
+            colonnes["pays"][rang],
+            datetime.datetime.fromordinal(colonnes["date_ajout"][rang]),
+            colonnes["annee_sortie"][rang],
+            colonnes["classement"][rang],
+            colonnes["duree"][rang],
+            colonnes["categories"][rang],
+        )
+
+    def ensembles_par_valeur(self, attribut):
+        """
+        Méthode permettant de construire, pour chaque valeur distincte d'une
+        colonne, l'ensemble de bits des rangées qui la contiennent (voir
+        ensemble_de_bits). Pour une colonne de listes, une rangée fait partie
+        de l'ensemble de chacun de ses éléments.
+
+        Args:
+            attribut (str): Attribut de la colonne (une colonne de listes, de
+            chaînes internées ou un tableau de nombres peu variés).
+
+        Returns:
+            dict: L'ensemble de bits de chaque valeur présente dans la colonne.
+        """
+        colonne = self.colonnes[attribut]
+        taille_en_octets = (len(self) + 7) // 8
+
+        if isinstance(colonne, (ColonneDeListes, ColonneDeChaines)):
+            valeurs = colonne.table.valeurs
+            octets_par_code = [bytearray(taille_en_octets) for _ in valeurs]
+            if isinstance(colonne, ColonneDeListes):
+                debuts, codes = colonne.debuts, colonne.codes
+                for rang in range(len(colonne)):
+                    position, masque = rang >> 3, 1 << (rang & 7)
+                    for code in codes[debuts[rang]:debuts[rang + 1]]:
+                        octets_par_code[code][position] |= masque
+            else:
+                for rang, code in enumerate(colonne.codes):
+                    octets_par_code[code][rang >> 3] |= 1 << (rang & 7)
+            octets_par_valeur = zip(valeurs, octets_par_code)
+        else:
+            octets_par_valeur = {}
+            for rang, valeur in enumerate(colonne):
+                octets = octets_par_valeur.get(valeur)
+                if octets is None:
+                    octets = octets_par_valeur[valeur] = bytearray(taille_en_octets)
+                octets[rang >> 3] |= 1 << (rang & 7)
+            octets_par_valeur = octets_par_valeur.items()
+
+        ensembles = {}
+        for valeur, octets in octets_par_valeur:
+            ensemble = int.from_bytes(octets, "little")
+            if ensemble:
+                ensembles[valeur] = ensemble
+        return ensembles
+
+    def etendre(self, autre):
+        """
+        Méthode permettant d'ajouter à la fin du catalogue toutes les rangées
+        d'un autre catalogue, colonne par colonne.
+
+        Args:
+            autre (Catalogue): Le catalogue dont les rangées sont ajoutées.
+        """
+        for attribut, colonne in self.colonnes.items():
+            colonne.extend(autre.colonnes[attribut])
+
+    def extraire(self, rangs):
+        """
+        Méthode permettant de construire un nouveau catalogue ne contenant
+        que les rangées passées en argument, dans cet ordre.
+
+        Args:
+            rangs (iterable): Rangs des shows à conserver.
+
+        Returns:
+            Catalogue: Le nouveau catalogue.
+        """
+        catalogue = Catalogue()
+        for rang in rangs:
+            catalogue.ajouter(self.show(rang))
+        return catalogue
+
+
+class VueShows(collections.abc.Mapping):
+    """
+    Dictionnaire en lecture (avec suppression) des shows d'un catalogue.
+
+    Les clés sont les show_ids et les valeurs sont des objets Show construits
+    à la demande à partir du catalogue. La vue conserve uniquement le rang
+    de chaque show_id.
+
+    Une VueShows est composée des attributs suivants:
+        - catalogue (Catalogue): le catalogue contenant les données des shows.
+        - rangs (dict): le rang dans le catalogue de chaque show_id de la vue.
+    """
+    def __init__(self, catalogue, rangs):
+        self.catalogue = catalogue
+        self.rangs = rangs
+
+    def __getitem__(self, show_id):
+        return self.catalogue.show(self.rangs[show_id])
+
+    def __delitem__(self, show_id):
+        del self.rangs[show_id]
+
+    def __contains__(self, show_id):
+        return show_id in self.rangs
+
+    def __iter__(self):
+        return iter(self.rangs)
+
+    def __len__(self):
+        return len(self.rangs)
@@ -0,0 +1,112 @@
+import concurrent.futures
+import io
+import os
+
+from catalogue import Catalogue
+from show import Show
+
+
+def decouper_en_morceaux(chemin_fichier, nombre_de_morceaux):
+    """
+    Fonction permettant de découper un fichier de shows en plages d'octets
+    qui commencent et finissent sur une fin de ligne. La ligne des titres
+    ne fait partie d'aucune plage.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+        nombre_de_morceaux (int): Nombre de plages souhaité.
+
+    Returns:
+        tuple: La ligne des titres et la liste des plages (debut, fin), dans l'ordre du fichier.
+    """
+    taille = os.path.getsize(chemin_fichier)
+    with open(chemin_fichier, "rb") as fichier:
+        ligne_des_titres = fichier.readline().decode("utf-8").strip()
+        debut = fichier.tell()
+        plages = []
+        for i in range(1, nombre_de_morceaux + 1):
+            if i == nombre_de_morceaux:
+                fin = taille
+            else:
+                # On avance jusqu'à la fin de la ligne entamée par la limite théorique.
+                fichier.seek(max(debut, debut + (taille - debut) * i // nombre_de_morceaux))
+                fichier.readline()
+                fin = fichier.tell()
+            if fin > debut:
+                plages.append((debut, fin))
+                debut = fin
+    return ligne_des_titres, plages
+
+
+def analyser_morceau(chemin_fichier, debut, fin, ligne_des_titres, filtre=None):
+    """
+    Fonction exécutée par les processus de travail: elle analyse une plage
+    d'octets d'un fichier de shows et retourne son contenu sous forme compacte.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+        debut (int): Position du premier octet de la plage.
+        fin (int): Position suivant le dernier octet de la plage.
+        ligne_des_titres (str): La première ligne du fichier.
+        filtre (FiltreDAcces, optional): Filtre à appliquer pendant la lecture.
+
+    Returns:
+        tuple: Le Catalogue des lignes acceptées, la liste des show_ids de toutes
+        les lignes de la plage et un bytearray indiquant pour chaque ligne si
+        elle a été acceptée par le filtre.
+    """
+    with open(chemin_fichier, "rb") as fichier:
+        fichier.seek(debut)
+        octets = fichier.read(fin - debut)
+
+    catalogue = Catalogue()
+    identifiants = []
+    acceptees = bytearray()
+    # TextIOWrapper découpe les lignes exactement comme open() en mode texte.
+    for ligne in io.TextIOWrapper(io.BytesIO(octets), encoding="utf-8"):
+        champs = Show.decouper_ligne(ligne.strip(), ligne_des_titres)
+        identifiants.append(champs["show_id"])
+        if filtre is None or filtre.accepte_champs(champs):
+            catalogue.ajouter(Show.creer_show_via_champs(champs))
+            acceptees.append(1)
+        else:
+            acceptees.append(0)
+    return catalogue, identifiants, acceptees
+
+
+def analyser_fichier_en_parallele(chemin_fichier, processus, filtre=None):
+    """
+    Fonction permettant d'analyser un fichier de shows avec plusieurs processus.
+    Chaque processus analyse une plage du fichier; les catalogues obtenus sont
+    ensuite mis bout à bout dans l'ordre du fichier.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+        processus (int): Nombre de processus de travail.
+        filtre (FiltreDAcces, optional): Filtre à appliquer pendant la lecture.
+
+    Returns:
+        tuple: Le Catalogue de toutes les lignes acceptées et la liste des
+        (show_id, rang) de chaque ligne du fichier, dans l'ordre, où rang
+        vaut None pour une ligne refusée par le filtre.
+    """
+    ligne_des_titres, plages = decouper_en_morceaux(chemin_fichier, processus)
+
+    catalogue = Catalogue()
+    rangees = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processus) as executeur:
+        futurs = [
+            executeur.submit(analyser_morceau, chemin_fichier, debut, fin, ligne_des_titres, filtre)
+            for debut, fin in plages
+        ]
+        for futur in futurs:
+            morceau, identifiants, acceptees = futur.result()
+            rang = len(catalogue)
+            catalogue.etendre(morceau)
+            for show_id, acceptee in zip(identifiants, acceptees):
+                if acceptee:
+                    rangees.append((show_id, rang))
+                    rang += 1
+                else:
+                    rangees.append((show_id, None))
+    return catalogue, rangees
@@ -0,0 +1,56 @@
+# Un ensemble de rangs est représenté par un entier Python: le bit numéro rang vaut 1 si le
+# rang fait partie de l'ensemble. L'intersection, l'union et la différence de deux ensembles
+# sont alors les opérations &, | et & ~ sur les entiers, exécutées en C sur des mots entiers,
+# et le nombre d'éléments est int.bit_count.
+
+# Positions des bits à 1 de chaque octet, pour parcourir un ensemble octet par octet.
+POSITIONS_PAR_OCTET = [tuple(position for position in range(8) if octet >> position & 1) for octet in range(256)]
+
+
+def ensemble_depuis_rangs(rangs, taille):
+    """
+    Fonction permettant de construire un ensemble de bits à partir de rangs.
+
+    Args:
+        rangs (iterable): Les rangs de l'ensemble (entiers positifs inférieurs à taille).
+        taille (int): Le nombre de rangs possibles.
+
+    Returns:
+        int: L'ensemble de bits.
+    """
+    octets = bytearray((taille + 7) // 8)
+    for rang in rangs:
+        octets[rang >> 3] |= 1 << (rang & 7)
+    return int.from_bytes(octets, "little")
+
+
+def ensemble_complet(taille):
+    """
+    Fonction permettant de construire l'ensemble de tous les rangs de 0 à taille - 1.
+
+    Args:
+        taille (int): Le nombre de rangs.
+
+    Returns:
+        int: L'ensemble de bits.
+    """
+    return (1 << taille) - 1
+
+
+def rangs_de(ensemble):
+    """
+    Générateur parcourant les rangs d'un ensemble de bits, dans l'ordre croissant.
+
+    Args:
+        ensemble (int): L'ensemble de bits.
+
+    Yields:
+        int: Les rangs de l'ensemble.
+    """
+    octets = ensemble.to_bytes((ensemble.bit_length() + 7) // 8, "little")
+    positions_par_octet = POSITIONS_PAR_OCTET
+    for numero, octet in enumerate(octets):
+        if octet:
+            debut = numero << 3
+            for position in positions_par_octet[octet]:
+                yield debut + position
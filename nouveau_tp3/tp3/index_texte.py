@@ -0,0 +1,109 @@
+class IndexTexte:
+    """
+    Classe représentant un index inversé de n-grammes de caractères.
+
+    L'index permet de retrouver rapidement les documents dont le texte contient
+    une sous-chaîne donnée. La recherche est insensible à la casse et retourne
+    exactement les mêmes documents qu'un test valeur.lower() in texte.lower():
+    les n-grammes de la valeur recherchée servent uniquement à réduire la liste
+    des candidats (intersection des listes d'occurrences), puis chaque candidat
+    est vérifié.
+
+    Les textes ne sont pas copiés: l'index garde une référence à la liste des
+    textes en minuscules qu'on lui donne (par exemple les valeurs normalisées
+    d'une médiathèque, voir Mediatheque.obtenir_valeurs_normalisees), et
+    chaque document est identifié par sa position dans cette liste.
+
+    Un IndexTexte est composé des attributs suivants:
+        - textes (list): le texte en minuscules de chaque document, partagé
+          avec l'appelant. Seuls les taille premiers sont indexés.
+        - taille (int): le nombre de documents indexés.
+        - occurrences (dict): pour chaque n-gramme, l'ensemble des positions
+          des documents qui le contiennent.
+    """
+    TAILLE_NGRAMME = 3
+
+    def __init__(self, textes):
+        """
+        Construit l'index de tous les textes passés en argument.
+
+        Args:
+            textes (list): Le texte en minuscules de chaque document. La liste
+            n'est pas copiée: les textes qui y sont ajoutés ensuite sont
+            indexés par indexer.
+        """
+        self.textes = textes
+        self.taille = 0
+        self.occurrences = {}
+        self.indexer()
+
+    def __len__(self):
+        """
+        Retourne le nombre de documents indexés.
+        """
+        return self.taille
+
+    @classmethod
+    def extraire_ngrammes(cls, texte):
+        """
+        Méthode permettant de récupérer les n-grammes distincts d'un texte.
+
+        Args:
+            texte (str): Texte à découper.
+
+        Returns:
+            set: Ensemble des n-grammes du texte.
+        """
+        n = cls.TAILLE_NGRAMME
+        return {texte[i:i + n] for i in range(len(texte) - n + 1)}
+
+    def indexer(self):
+        """
+        Méthode permettant d'indexer les textes ajoutés à la fin de la liste
+        des textes depuis le dernier appel.
+        """
+        occurrences = self.occurrences
+        for position in range(self.taille, len(self.textes)):
+            for ngramme in self.extraire_ngrammes(self.textes[position]):
+                positions = occurrences.get(ngramme)
+                if positions is None:
+                    occurrences[ngramme] = {position}
+                else:
+                    positions.add(position)
+        self.taille = len(self.textes)
+
+    def rechercher(self, valeur):
+        """
+        Méthode permettant de récupérer les identifiants des documents dont
+        le texte contient la valeur passée en argument.
+        La recherche est insensible à la casse.
+
+        Args:
+            valeur (str): Sous-chaîne recherchée.
+
+        Returns:
+            list: Positions des documents trouvés, dans l'ordre.
+        """
+        val = valeur.lower()
+        if len(val) < self.TAILLE_NGRAMME:
+            # La requête est trop courte pour être découpée: on vérifie tous les documents.
+            positions = range(self.taille)
+        else:
+            listes_d_occurrences = []
+            for ngramme in self.extraire_ngrammes(val):
+                occurrences = self.occurrences.get(ngramme)
+                if occurrences is None:
+                    return []
+                listes_d_occurrences.append(occurrences)
+
+            # On commence par la liste la plus courte pour garder les intersections petites.
+            listes_d_occurrences.sort(key=len)
+            candidats = listes_d_occurrences[0]
+            for occurrences in listes_d_occurrences[1:]:
+                candidats = candidats & occurrences
+                if not candidats:
+                    return []
+            positions = sorted(candidats)
+
+        textes = self.textes
+        return [position for position in positions if val in textes[position]]
@@ -0,0 +1,282 @@
+import mmap
+import os
+import threading
+import zlib
+
+from journal_utilisateurs import decoder_ligne, est_une_ligne_complete, est_une_rangee_valide, lire_lignes
+
+# L'index d'un fichier d'utilisateurs est écrit à côté de celui-ci. Il associe chaque
+# adresse email à la position (en octets) de la ligne de l'utilisateur dans le fichier,
+# ce qui permet de charger un seul utilisateur sans lire tout le fichier.
+#
+# Format (texte UTF-8):
+#   - première ligne: la version du format (VERSION_DU_FORMAT), puis l'empreinte du fichier
+#     d'utilisateurs indexé (voir empreinte_du_fichier), cinq entiers séparés par des espaces;
+#   - lignes suivantes: "email<TAB>position", triées par email (ordre des octets). L'adresse
+#     est en minuscules (voir cle_de) et seules les lignes valides sont indexées.
+# Le fichier d'utilisateurs n'est modifié que par ajout à la fin (ou remplacé par un
+# compactage, qui écrit aussi son index): les lignes ajoutées après l'indexation sont
+# relues à l'ouverture et gardées en mémoire. Tout autre changement du fichier (un autre
+# inode, une réécriture de même taille ou plus longue) est reconnu grâce à l'empreinte,
+# et l'index est alors reconstruit.
+
+EXTENSION = ".index"
+# Version du format de l'index: un index d'une autre version est reconstruit.
+VERSION_DU_FORMAT = 2
+# Nombre d'octets, juste avant la fin de la partie indexée, dont la somme de contrôle
+# permet de reconnaître un fichier auquel des lignes ont seulement été ajoutées.
+TAILLE_DE_LA_FIN_CONTROLEE = 4096
+
+
+def empreinte_du_fichier(chemin_base_de_donnees, taille):
+    """
+    Fonction permettant de calculer l'empreinte d'un fichier d'utilisateurs
+    dont les taille premiers octets sont indexés. Elle sert aussi pour le
+    fichier de shows, dont les taille premiers octets sont chargés (voir
+    Mediatheque.recharger_par_ajout).
+
+    Args:
+        chemin_base_de_donnees (str): Le chemin du fichier.
+        taille (int): Le nombre d'octets indexés, au plus la taille du fichier.
+
+    Returns:
+        tuple: La taille indexée, la date de modification (st_mtime_ns) et
+        l'inode (st_ino) du fichier, et la somme de contrôle (CRC-32) des
+        TAILLE_DE_LA_FIN_CONTROLEE octets qui précèdent la taille indexée.
+        Pour un fichier absent, quatre zéros.
+    """
+    try:
+        etat = os.stat(chemin_base_de_donnees)
+        with open(chemin_base_de_donnees, "rb") as fichier:
+            debut = max(0, taille - TAILLE_DE_LA_FIN_CONTROLEE)
+            fichier.seek(debut)
+            controle = zlib.crc32(fichier.read(taille - debut))
+    except FileNotFoundError:
+        return 0, 0, 0, 0
+    return taille, etat.st_mtime_ns, etat.st_ino, controle
+
+
+def cle_de(email):
+    """
+    Fonction permettant de calculer la clé d'une adresse email dans l'index:
+    l'adresse en minuscules, comme dans l'annuaire chargé en entier.
+
+    Args:
+        email (str): L'adresse email.
+
+    Returns:
+        bytes: La clé, encodée en UTF-8.
+    """
+    return email.lower().encode("utf-8")
+
+
+class IndexDesUtilisateurs:
+    """
+    Classe représentant l'index sur disque d'un fichier d'utilisateurs.
+
+    La recherche d'une adresse email se fait par dichotomie directement dans
+    le fichier d'index projeté en mémoire, sans le charger.
+
+    Un IndexDesUtilisateurs est composé des attributs suivants:
+        - chemin_base_de_donnees (str): le chemin du fichier d'utilisateurs.
+        - chemin_index (str): le chemin du fichier d'index.
+        - recents (dict): la position des utilisateurs ajoutés après l'écriture de l'index.
+    """
+    def __init__(self, chemin_base_de_donnees):
+        """
+        Ouvre l'index du fichier d'utilisateurs passé en argument, en le
+        (re)construisant s'il est absent ou ne correspond plus au fichier.
+
+        Args:
+            chemin_base_de_donnees (str): Le chemin du fichier d'utilisateurs.
+        """
+        self.chemin_base_de_donnees = chemin_base_de_donnees
+        self.chemin_index = chemin_base_de_donnees + EXTENSION
+        self.recents = {}
+        self.projection = None
+        self.debut_des_entrees = 0
+
+        if not self._ouvrir():
+            self.construire()
+
+    @staticmethod
+    def parcourir_emails(chemin_base_de_donnees, debut=0):
+        """
+        Générateur parcourant les lignes complètes d'un fichier d'utilisateurs
+        à partir d'une position, sans construire d'objet Utilisateur. Comme au
+        chargement complet de l'annuaire, les lignes invalides sont ignorées
+        (voir est_une_rangee_valide) et l'adresse email est mise en minuscules.
+
+        Args:
+            chemin_base_de_donnees (str): Le chemin du fichier d'utilisateurs.
+            debut (int, optional): Position (en octets) d'un début de ligne.
+
+        Yields:
+            tuple: L'adresse email (bytes) et la position de chaque ligne valide.
+        """
+        if not os.path.exists(chemin_base_de_donnees):
+            return
+        with open(chemin_base_de_donnees, "rb") as fichier:
+            for position, ligne in lire_lignes(fichier, debut):
+                champs = decoder_ligne(ligne.decode("utf-8", errors="replace"))
+                if est_une_rangee_valide(champs):
+                    yield cle_de(champs[1]), position
+
+    def construire(self):
+        """
+        Méthode permettant de (re)construire l'index à partir de tout le
+        fichier d'utilisateurs. L'écriture passe par un fichier temporaire.
+        """
+        self.fermer()
+        taille = os.path.getsize(self.chemin_base_de_donnees) if os.path.exists(self.chemin_base_de_donnees) else 0
+        positions = {}
+        for email, position in self.parcourir_emails(self.chemin_base_de_donnees):
+            # Comme pour une recherche dans la liste, le premier utilisateur d'une adresse l'emporte.
+            positions.setdefault(email, position)
+
+        self.ecrire(self.chemin_index, empreinte_du_fichier(self.chemin_base_de_donnees, taille), positions)
+
+        self.recents = {}
+        self._ouvrir()
+
+    @staticmethod
+    def ecrire(chemin_index, empreinte, positions):
+        """
+        Méthode permettant d'écrire un fichier d'index. L'écriture passe par
+        un fichier temporaire.
+
+        Args:
+            chemin_index (str): Le chemin du fichier d'index.
+            empreinte (tuple): L'empreinte du fichier d'utilisateurs indexé (voir empreinte_du_fichier).
+            positions (dict): La position (int) de la ligne de chaque adresse email (bytes).
+        """
+        # Un compactage en arrière-plan peut écrire l'index pendant qu'un autre fil le reconstruit.
+        chemin_temporaire = f"{chemin_index}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(chemin_temporaire, "wb") as fichier:
+            fichier.write(b"%d %d %d %d %d\n" % (VERSION_DU_FORMAT, *empreinte))
+            fichier.writelines(b"%s\t%d\n" % (email, positions[email]) for email in sorted(positions))
+        os.replace(chemin_temporaire, chemin_index)
+
+    def correspond_au_fichier(self, taille_indexee, date_modification, inode, controle):
+        """
+        Méthode permettant de vérifier qu'un index d'une empreinte donnée (voir
+        empreinte_du_fichier) correspond toujours au fichier d'utilisateurs:
+        c'est le même fichier (même inode) et, soit il n'a pas été modifié
+        depuis, soit il a grandi sans que la fin de la partie indexée change.
+
+        Returns:
+            bool: True si l'index peut être utilisé.
+        """
+        try:
+            etat = os.stat(self.chemin_base_de_donnees)
+        except FileNotFoundError:
+            return taille_indexee == 0
+        if etat.st_ino != inode:
+            return False
+        if etat.st_size == taille_indexee:
+            return etat.st_mtime_ns == date_modification
+        return (
+            etat.st_size > taille_indexee
+            and empreinte_du_fichier(self.chemin_base_de_donnees, taille_indexee)[3] == controle
+        )
+
+    def _ouvrir(self):
+        """
+        Méthode permettant de projeter l'index en mémoire et de relire les
+        lignes ajoutées au fichier d'utilisateurs depuis son écriture.
+
+        Returns:
+            bool: False si l'index est absent ou ne correspond plus au fichier.
+        """
+        try:
+            with open(self.chemin_index, "rb") as fichier:
+                version, taille_indexee, date_modification, inode, controle = map(int, fichier.readline().split())
+                self.debut_des_entrees = fichier.tell()
+                if version != VERSION_DU_FORMAT or not self.correspond_au_fichier(taille_indexee, date_modification, inode, controle):
+                    return False
+                if os.path.getsize(self.chemin_index) > self.debut_des_entrees:
+                    self.projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        for email, position in self.parcourir_emails(self.chemin_base_de_donnees, taille_indexee):
+            if self.chercher(email.decode("utf-8")) is None:
+                self.recents[email] = position
+        return True
+
+    def fermer(self):
+        """
+        Méthode permettant de libérer la projection en mémoire de l'index.
+        """
+        if self.projection is not None:
+            self.projection.close()
+            self.projection = None
+
+    def ajouter(self, email, position):
+        """
+        Méthode permettant d'indexer un utilisateur qui vient d'être ajouté
+        à la fin du fichier d'utilisateurs.
+
+        Args:
+            email (str): L'adresse email de l'utilisateur.
+            position (int): La position (en octets) de sa ligne dans le fichier.
+        """
+        if self.chercher(email) is None:
+            self.recents[cle_de(email)] = position
+
+    def chercher(self, email):
+        """
+        Méthode permettant de retrouver la position de la ligne d'un utilisateur.
+
+        Args:
+            email (str): L'adresse email de l'utilisateur.
+
+        Returns:
+            int: La position (en octets) de la ligne, ou None si l'adresse est inconnue.
+        """
+        cle = cle_de(email)
+        position = self.recents.get(cle)
+        if position is not None or self.projection is None:
+            return position
+
+        projection = self.projection
+        bas, haut = self.debut_des_entrees, len(projection)
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            # bas est toujours un début de ligne: on recule jusqu'au début de la ligne de milieu.
+            debut = projection.rfind(b"\n", bas, milieu) + 1 or bas
+            fin = projection.find(b"\n", debut)
+            entree, _, position = projection[debut:fin].partition(b"\t")
+            if entree == cle:
+                return int(position)
+            if entree < cle:
+                bas = fin + 1
+            else:
+                haut = debut
+        return None
+
+    def lire_ligne(self, position):
+        """
+        Méthode permettant de lire la ligne d'un utilisateur dans le fichier d'utilisateurs.
+
+        La position vient de l'index: si le fichier a été réécrit depuis (par
+        un compactage), elle peut tomber au milieu d'une ligne, voire d'un
+        caractère. Seule une ligne complète (voir est_une_ligne_complete),
+        commençant à la position, est lue.
+
+        Args:
+            position (int): La position (en octets) de la ligne.
+
+        Returns:
+            str: La ligne, sans le retour de ligne final, ou None si la position
+            n'est pas le début d'une ligne complète.
+        """
+        with open(self.chemin_base_de_donnees, "rb") as fichier:
+            if position > 0:
+                fichier.seek(position - 1)
+                if fichier.read(1) != b"\n":
+                    return None
+            ligne = fichier.readline()
+        if not est_une_ligne_complete(ligne):
+            return None
+        return ligne.decode("utf-8", errors="replace").strip()
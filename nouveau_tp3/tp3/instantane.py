@@ -0,0 +1,218 @@
+import array
+import mmap
+import os
+import struct
+import sys
+
+from catalogue import Catalogue, ColonneDeChaines, ColonneDeListes, TableDeChaines
+
+# Un instantané est une version binaire compilée d'un fichier de shows, écrite à côté
+# de celui-ci. Il contient les colonnes d'un Catalogue et est identifié par la taille
+# et la date de modification du fichier source: dès que le fichier source change,
+# l'instantané est considéré comme périmé.
+#
+# Format (petit-boutiste pour l'en-tête et la table des blocs):
+#   - en-tête: FORMAT_EN_TETE (signature, version, boutisme des tableaux,
+#     taille et date de modification du fichier source, nombre de blocs);
+#   - table des blocs: un FORMAT_BLOC par bloc (type, position, longueur, nombre d'éléments);
+#   - données des blocs.
+# Un bloc est soit un tableau array (le type est son typecode), soit une liste de
+# chaînes (type "s") encodées en UTF-8 et séparées par des retours de ligne, ce qui
+# est sans ambiguïté puisqu'aucun champ d'un fichier de shows ne peut en contenir.
+# Le premier bloc contient le nom des colonnes afin de détecter un changement de schéma.
+
+EXTENSION = ".instantane"
+SIGNATURE = b"ULFX"
+VERSION = 1
+FORMAT_EN_TETE = "<4sHBQqI"
+FORMAT_BLOC = "<cQQQ"
+TYPE_CHAINES = b"s"
+
+
+def chemin_instantane(chemin_fichier):
+    """
+    Fonction permettant de récupérer le chemin de l'instantané d'un fichier de shows.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+
+    Returns:
+        str: Le chemin de l'instantané, à côté du fichier de shows.
+    """
+    return chemin_fichier + EXTENSION
+
+
+def _blocs_de_colonne(colonne):
+    """
+    Fonction permettant de décomposer une colonne de Catalogue en blocs.
+
+    Args:
+        colonne: Colonne à décomposer.
+
+    Returns:
+        list: Les blocs (listes de chaînes ou tableaux array) de la colonne.
+    """
+    if isinstance(colonne, ColonneDeChaines):
+        return [colonne.table.valeurs, colonne.codes]
+    if isinstance(colonne, ColonneDeListes):
+        return [colonne.table.valeurs, colonne.debuts, colonne.codes]
+    return [colonne]
+
+
+def _colonne_depuis_blocs(colonne_vide, blocs):
+    """
+    Fonction inverse de _blocs_de_colonne.
+
+    Args:
+        colonne_vide: Colonne vide du type attendu (celle d'un Catalogue neuf).
+        blocs (list): Les blocs de la colonne.
+
+    Returns:
+        La colonne reconstruite.
+    """
+    if isinstance(colonne_vide, ColonneDeChaines):
+        colonne_vide.table = TableDeChaines(blocs[0])
+        colonne_vide.codes = blocs[1]
+    elif isinstance(colonne_vide, ColonneDeListes):
+        colonne_vide.table = TableDeChaines(blocs[0])
+        colonne_vide.debuts, colonne_vide.codes = blocs[1], blocs[2]
+    else:
+        colonne_vide = blocs[0]
+    return colonne_vide
+
+
+def ecrire_instantane(catalogue, chemin_fichier, stat_source):
+    """
+    Fonction permettant d'écrire l'instantané d'un catalogue à côté de son
+    fichier source. L'écriture passe par un fichier temporaire renommé à la
+    fin, un lecteur ne voit donc jamais d'instantané incomplet.
+    Les erreurs d'écriture (dossier en lecture seule, disque plein, ...)
+    sont ignorées: l'instantané n'est qu'un cache.
+
+    Args:
+        catalogue (Catalogue): Le catalogue à sauvegarder.
+        chemin_fichier (str): Le chemin menant au fichier de shows source.
+        stat_source (os.stat_result): Le résultat de os.stat sur le fichier
+            source, pris avant sa lecture.
+    """
+    blocs = [list(catalogue.colonnes)]
+    for colonne in catalogue.colonnes.values():
+        blocs.extend(_blocs_de_colonne(colonne))
+
+    donnees = []
+    for bloc in blocs:
+        if isinstance(bloc, array.array):
+            donnees.append((bloc.typecode.encode("ascii"), bloc.tobytes(), len(bloc)))
+        else:
+            donnees.append((TYPE_CHAINES, "\n".join(bloc).encode("utf-8"), len(bloc)))
+
+    position = struct.calcsize(FORMAT_EN_TETE) + len(blocs) * struct.calcsize(FORMAT_BLOC)
+    table_des_blocs = []
+    for type_bloc, octets, nombre in donnees:
+        table_des_blocs.append(struct.pack(FORMAT_BLOC, type_bloc, position, len(octets), nombre))
+        position += len(octets)
+
+    en_tete = struct.pack(
+        FORMAT_EN_TETE,
+        SIGNATURE,
+        VERSION,
+        sys.byteorder == "little",
+        stat_source.st_size,
+        stat_source.st_mtime_ns,
+        len(blocs),
+    )
+
+    chemin = chemin_instantane(chemin_fichier)
+    chemin_temporaire = f"{chemin}.{os.getpid()}.tmp"
+    try:
+        with open(chemin_temporaire, "wb") as fichier:
+            fichier.write(en_tete)
+            fichier.writelines(table_des_blocs)
+            fichier.writelines(octets for _, octets, _ in donnees)
+        os.replace(chemin_temporaire, chemin)
+    except OSError:
+        try:
+            os.remove(chemin_temporaire)
+        except OSError:
+            pass
+
+
+def lire_instantane(chemin_fichier, stat_source):
+    """
+    Fonction permettant de charger le catalogue depuis l'instantané d'un
+    fichier de shows. Le fichier est projeté en mémoire (mmap) lorsque
+    c'est possible, et les colonnes numériques sont copiées directement
+    depuis la projection, sans analyse de texte.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows source.
+        stat_source (os.stat_result): Le résultat de os.stat sur le fichier source.
+
+    Returns:
+        Catalogue: Le catalogue, ou None si l'instantané est absent, périmé ou invalide.
+    """
+    try:
+        with open(chemin_instantane(chemin_fichier), "rb") as fichier:
+            try:
+                contenu = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                contenu = fichier.read()
+            try:
+                return _decoder_instantane(contenu, stat_source)
+            finally:
+                if isinstance(contenu, mmap.mmap):
+                    contenu.close()
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def _decoder_instantane(contenu, stat_source):
+    """
+    Fonction permettant de reconstruire un catalogue depuis le contenu d'un instantané.
+
+    Args:
+        contenu (mmap ou bytes): Contenu de l'instantané.
+        stat_source (os.stat_result): Le résultat de os.stat sur le fichier source.
+
+    Returns:
+        Catalogue: Le catalogue, ou None si l'instantané est périmé ou invalide.
+    """
+    taille_en_tete = struct.calcsize(FORMAT_EN_TETE)
+    signature, version, petit_boutiste, taille, date_modification, nombre_de_blocs = struct.unpack_from(
+        FORMAT_EN_TETE, contenu
+    )
+    if (
+        signature != SIGNATURE
+        or version != VERSION
+        or bool(petit_boutiste) != (sys.byteorder == "little")
+        or taille != stat_source.st_size
+        or date_modification != stat_source.st_mtime_ns
+    ):
+        return None
+
+    blocs = []
+    for i in range(nombre_de_blocs):
+        type_bloc, position, longueur, nombre = struct.unpack_from(
+            FORMAT_BLOC, contenu, taille_en_tete + i * struct.calcsize(FORMAT_BLOC)
+        )
+        if position + longueur > len(contenu):
+            return None
+        if type_bloc == TYPE_CHAINES:
+            bloc = contenu[position:position + longueur].decode("utf-8").split("\n") if nombre else []
+        else:
+            bloc = array.array(type_bloc.decode("ascii"))
+            bloc.frombytes(contenu[position:position + longueur])
+        if len(bloc) != nombre:
+            return None
+        blocs.append(bloc)
+
+    catalogue = Catalogue()
+    if not blocs or blocs[0] != list(catalogue.colonnes):
+        return None
+
+    position = 1
+    for attribut, colonne_vide in catalogue.colonnes.items():
+        nombre = len(_blocs_de_colonne(colonne_vide))
+        catalogue.colonnes[attribut] = _colonne_depuis_blocs(colonne_vide, blocs[position:position + nombre])
+        position += nombre
+    return catalogue
@@ -0,0 +1,286 @@
+import atexit
+import bisect
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Instrumentation des chemins critiques (chargement, filtres, tris, rendu des pages,
+# vérification des mots de passe), désactivée par défaut.
+#
+#   - ULFLIX_MESURES=chemin active les compteurs et les histogrammes de durée. Ils sont
+#     écrits dans ce fichier à la fin du processus: en JSON si le chemin se termine par
+#     .json, sinon au format texte de Prometheus. L'activation est lue une seule fois, à
+#     l'import: désactivées, les fonctions chronométrées ne sont pas enveloppées du tout.
+#   - ULFLIX_PROFIL=cprofile|tracemalloc profile une session (voir profiler).
+
+VARIABLE_MESURES = "ULFLIX_MESURES"
+VARIABLE_PROFIL = "ULFLIX_PROFIL"
+PREFIXE = "ulflix_"
+# Bornes supérieures des intervalles des histogrammes de durée, en secondes.
+BORNES_DES_DUREES = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+# Nombre de lignes du rapport de tracemalloc.
+LIGNES_DU_RAPPORT_MEMOIRE = 30
+
+CHEMIN_DES_MESURES = os.environ.get(VARIABLE_MESURES) or None
+MESURES_ACTIVES = CHEMIN_DES_MESURES is not None
+
+
+class Histogramme:
+    """
+    Classe représentant la répartition des valeurs observées (des durées,
+    en secondes) dans des intervalles aux bornes fixes.
+
+    Un Histogramme est composé des attributs suivants:
+        - bornes (tuple): les bornes supérieures des intervalles, en ordre croissant.
+        - comptes (list): le nombre de valeurs de chaque intervalle, le dernier
+          recevant les valeurs plus grandes que toutes les bornes.
+        - somme (float): la somme des valeurs observées.
+        - nombre (int): le nombre de valeurs observées.
+    """
+    def __init__(self, bornes=BORNES_DES_DUREES):
+        self.bornes = bornes
+        self.comptes = [0] * (len(bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+        self._verrou = threading.Lock()
+
+    def observer(self, valeur):
+        """
+        Méthode permettant d'ajouter une valeur à l'histogramme.
+
+        Args:
+            valeur (float): La valeur observée.
+        """
+        intervalle = bisect.bisect_left(self.bornes, valeur)
+        with self._verrou:
+            self.comptes[intervalle] += 1
+            self.somme += valeur
+            self.nombre += 1
+
+
+class RegistreDeMesures:
+    """
+    Classe regroupant les compteurs et les histogrammes d'un processus.
+    Chaque mesure est identifiée par son nom et ses étiquettes (par exemple
+    l'opération chronométrée).
+
+    Un RegistreDeMesures est composé des attributs suivants:
+        - compteurs (dict): la valeur de chaque compteur, par (nom, etiquettes).
+        - histogrammes (dict): l'Histogramme de chaque mesure, par (nom, etiquettes).
+    """
+    def __init__(self):
+        self.compteurs = {}
+        self.histogrammes = {}
+        self._verrou = threading.Lock()
+
+    def compter(self, nom, etiquettes=(), valeur=1):
+        """
+        Méthode permettant d'augmenter un compteur.
+
+        Args:
+            nom (str): Le nom du compteur.
+            etiquettes (tuple, optional): Les paires (nom, valeur) des étiquettes.
+            valeur (int, optional): L'augmentation.
+        """
+        cle = (nom, etiquettes)
+        with self._verrou:
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + valeur
+
+    def histogramme(self, nom, etiquettes=()):
+        """
+        Méthode permettant de récupérer un histogramme, créé au besoin.
+
+        Args:
+            nom (str): Le nom de l'histogramme.
+            etiquettes (tuple, optional): Les paires (nom, valeur) des étiquettes.
+
+        Returns:
+            Histogramme: L'histogramme.
+        """
+        cle = (nom, etiquettes)
+        with self._verrou:
+            histogramme = self.histogrammes.get(cle)
+            if histogramme is None:
+                histogramme = self.histogrammes[cle] = Histogramme()
+        return histogramme
+
+    def exporter_json(self):
+        """
+        Méthode permettant de récupérer toutes les mesures sous une forme
+        sérialisable en JSON.
+
+        Returns:
+            dict: Les compteurs et les histogrammes, chacun avec son nom et ses étiquettes.
+        """
+        with self._verrou:
+            compteurs = sorted(self.compteurs.items())
+            histogrammes = sorted(self.histogrammes.items(), key=lambda element: element[0])
+        return {
+            "compteurs": [
+                {"nom": PREFIXE + nom, "etiquettes": dict(etiquettes), "valeur": valeur}
+                for (nom, etiquettes), valeur in compteurs
+            ],
+            "histogrammes": [
+                {
+                    "nom": PREFIXE + nom,
+                    "etiquettes": dict(etiquettes),
+                    "bornes": list(histogramme.bornes),
+                    "comptes": list(histogramme.comptes),
+                    "somme": histogramme.somme,
+                    "nombre": histogramme.nombre,
+                }
+                for (nom, etiquettes), histogramme in histogrammes
+            ],
+        }
+
+    def exporter_prometheus(self):
+        """
+        Méthode permettant de récupérer toutes les mesures au format texte de
+        Prometheus (les intervalles des histogrammes y sont cumulatifs).
+
+        Returns:
+            str: Le texte des mesures.
+        """
+        def etiqueter(etiquettes):
+            if not etiquettes:
+                return ""
+            return "{" + ",".join(f'{nom}="{valeur}"' for nom, valeur in etiquettes) + "}"
+
+        donnees = self.exporter_json()
+        lignes = []
+        types_declares = set()
+        for compteur in donnees["compteurs"]:
+            nom = compteur["nom"]
+            if nom not in types_declares:
+                types_declares.add(nom)
+                lignes.append(f"# TYPE {nom} counter")
+            lignes.append(f"{nom}{etiqueter(compteur['etiquettes'].items())} {compteur['valeur']}")
+        for histogramme in donnees["histogrammes"]:
+            nom = histogramme["nom"]
+            if nom not in types_declares:
+                types_declares.add(nom)
+                lignes.append(f"# TYPE {nom} histogram")
+            etiquettes = list(histogramme["etiquettes"].items())
+            cumul = 0
+            for borne, compte in zip([*histogramme["bornes"], "+Inf"], histogramme["comptes"]):
+                cumul += compte
+                lignes.append(f"{nom}_bucket{etiqueter(etiquettes + [('le', borne)])} {cumul}")
+            lignes.append(f"{nom}_sum{etiqueter(etiquettes)} {histogramme['somme']}")
+            lignes.append(f"{nom}_count{etiqueter(etiquettes)} {histogramme['nombre']}")
+        return "\n".join(lignes) + "\n"
+
+    def ecrire(self, chemin):
+        """
+        Méthode permettant d'écrire toutes les mesures dans un fichier, en JSON
+        si son nom se termine par .json, au format de Prometheus sinon. Le
+        fichier est remplacé d'un seul coup.
+
+        Args:
+            chemin (str): Le chemin du fichier.
+        """
+        if chemin.endswith(".json"):
+            texte = json.dumps(self.exporter_json(), indent=2, ensure_ascii=False)
+        else:
+            texte = self.exporter_prometheus()
+        chemin_temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
+            fichier.write(texte)
+        os.replace(chemin_temporaire, chemin)
+
+
+REGISTRE = RegistreDeMesures()
+if MESURES_ACTIVES:
+    atexit.register(REGISTRE.ecrire, CHEMIN_DES_MESURES)
+
+
+def compter(nom, valeur=1, **etiquettes):
+    """
+    Fonction permettant d'augmenter un compteur du registre, si les mesures sont actives.
+
+    Args:
+        nom (str): Le nom du compteur (sans le PREFIXE).
+        valeur (int, optional): L'augmentation.
+        **etiquettes: Les étiquettes du compteur.
+    """
+    if MESURES_ACTIVES:
+        REGISTRE.compter(nom, tuple(sorted(etiquettes.items())), valeur)
+
+
+def chronometrer(nom="operation_duree_secondes"):
+    """
+    Décorateur ajoutant la durée de chaque appel d'une fonction à un
+    histogramme du registre, étiqueté par le nom qualifié de la fonction (par
+    exemple Mediatheque.filtrer_ids_sur_age). Si les mesures ne sont pas
+    actives, la fonction est retournée telle quelle.
+
+    Args:
+        nom (str, optional): Le nom de l'histogramme (sans le PREFIXE).
+
+    Returns:
+        callable: Le décorateur.
+    """
+    def decorer(fonction):
+        if not MESURES_ACTIVES:
+            return fonction
+        histogramme = REGISTRE.histogramme(nom, (("operation", fonction.__qualname__),))
+
+        @functools.wraps(fonction)
+        def fonction_chronometree(*args, **kwargs):
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                histogramme.observer(time.perf_counter() - debut)
+
+        return fonction_chronometree
+    return decorer
+
+
+@contextlib.contextmanager
+def profiler(nom):
+    """
+    Gestionnaire de contexte profilant le bloc selon la variable d'environnement
+    ULFLIX_PROFIL (rien n'est fait si elle est absente):
+        - cprofile: le profil de cProfile est écrit dans profil-<nom>-<pid>.prof
+          (à lire avec pstats ou snakeviz). Seul le fil d'exécution courant est profilé;
+        - tracemalloc: les LIGNES_DU_RAPPORT_MEMOIRE lignes de code ayant alloué
+          le plus de mémoire encore utilisée à la fin du bloc, et le pic, sont
+          écrits dans profil-<nom>-<pid>.memoire.txt.
+
+    Args:
+        nom (str): Le nom du bloc profilé, repris dans le nom du fichier.
+
+    Raises:
+        ValueError: Si ULFLIX_PROFIL n'est ni cprofile, ni tracemalloc.
+    """
+    mode = os.environ.get(VARIABLE_PROFIL, "").lower()
+    prefixe = f"profil-{nom}-{os.getpid()}"
+    if not mode:
+        yield
+    elif mode == "cprofile":
+        profil = cProfile.Profile()
+        profil.enable()
+        try:
+            yield
+        finally:
+            profil.disable()
+            profil.dump_stats(prefixe + ".prof")
+    elif mode == "tracemalloc":
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            instantane = tracemalloc.take_snapshot()
+            courant, pic = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(prefixe + ".memoire.txt", "w", encoding="utf-8") as fichier:
+                fichier.write(f"Mémoire allouée: {courant / 2 ** 20:.1f} Mio (pic: {pic / 2 ** 20:.1f} Mio)\n")
+                for statistique in instantane.statistics("lineno")[:LIGNES_DU_RAPPORT_MEMOIRE]:
+                    fichier.write(f"{statistique}\n")
+    else:
+        raise ValueError(f"{VARIABLE_PROFIL} doit valoir cprofile ou tracemalloc, pas {mode!r}.")
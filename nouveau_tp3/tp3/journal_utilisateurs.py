@@ -0,0 +1,350 @@
+import contextlib
+import logging
+import os
+import threading
+
+from utils import est_une_adresse_email_valide
+
+try:
+    import fcntl
+except ImportError:  # Windows: seul le verrou entre les fils d'exécution du processus s'applique.
+    fcntl = None
+
+# Format du fichier des utilisateurs: une ligne par utilisateur, terminée par "\n", dont les
+# champs (nom, email, age, pays, abonnement, mot_de_passe) sont séparés par des virgules.
+# Dans un champ, la barre oblique inverse, la virgule, le retour de ligne et le retour de
+# chariot sont échappés (\\, \,, \n et \r): une ligne qui ne contient pas de barre oblique
+# inverse se lit donc comme avant, par un simple split.
+#
+# Une ligne est complète avec son "\n" final. Les fichiers écrits avant le journal ne
+# terminaient pas toujours leur dernière ligne: sans "\n", elle est quand même complète si
+# elle a ses six champs (voir est_une_ligne_complete), et le "\n" lui est ajouté avant la
+# prochaine écriture. Sinon, c'est une ligne qu'un arrêt brutal a laissée incomplète: elle
+# est ignorée par les lecteurs, puis effacée (et journalisée) avant la prochaine écriture.
+
+EXTENSION_VERROU = ".verrou"
+NOMBRE_DE_CHAMPS = 6
+# Taille du tampon d'écriture, en octets.
+TAILLE_DU_TAMPON = 1 << 20
+
+ECHAPPEMENTS = str.maketrans({"\\": "\\\\", ",": "\\,", "\n": "\\n", "\r": "\\r"})
+CARACTERES_ECHAPPES = {"\\": "\\", ",": ",", "n": "\n", "r": "\r"}
+
+journalisation = logging.getLogger(__name__)
+
+
+def encoder_rangee(rangee):
+    """
+    Fonction permettant de construire la ligne d'un utilisateur.
+
+    Args:
+        rangee (list): Les champs (str) de l'utilisateur.
+
+    Returns:
+        bytes: La ligne encodée en UTF-8, avec son retour de ligne.
+    """
+    return (",".join(champ.translate(ECHAPPEMENTS) for champ in rangee) + "\n").encode("utf-8")
+
+
+def decoder_ligne(ligne):
+    """
+    Fonction permettant de récupérer les champs de la ligne d'un utilisateur.
+
+    Args:
+        ligne (str): La ligne, avec ou sans son retour de ligne.
+
+    Returns:
+        list: Les champs (str) de la ligne.
+    """
+    ligne = ligne.strip()
+    if "\\" not in ligne:
+        return ligne.split(",")
+
+    champs, caracteres = [], []
+    suite = iter(ligne)
+    for caractere in suite:
+        if caractere == "\\":
+            suivant = next(suite, "")
+            caracteres.append(CARACTERES_ECHAPPES.get(suivant, "\\" + suivant))
+        elif caractere == ",":
+            champs.append("".join(caracteres))
+            caracteres = []
+        else:
+            caracteres.append(caractere)
+    champs.append("".join(caracteres))
+    return champs
+
+
+def est_une_rangee_valide(champs):
+    """
+    Fonction permettant de savoir si les champs d'une ligne décrivent un
+    utilisateur valide: six champs, une adresse email valide une fois mise en
+    minuscules, un âge entier positif et un abonnement 1 ou 2. Le chargement
+    complet de l'annuaire (voir rangees_valides_et_uniques) et son index sur
+    disque ignorent les mêmes lignes.
+
+    Args:
+        champs (list): Les champs (str) de la ligne.
+
+    Returns:
+        bool: True si la rangée est valide.
+    """
+    return (
+        len(champs) == NOMBRE_DE_CHAMPS
+        # isdigit seul accepte aussi des chiffres que int refuse (par exemple "²").
+        and champs[2].isascii()
+        and champs[2].isdigit()
+        and champs[4] in ("1", "2")
+        and est_une_adresse_email_valide(champs[1].lower())
+    )
+
+
+def est_une_ligne_complete(ligne):
+    """
+    Fonction permettant de savoir si une ligne lue d'un fichier d'utilisateurs
+    est complète: elle se termine par "\n", ou c'est une dernière ligne sans
+    "\n" (d'un fichier écrit avant le journal) dont les six champs sont
+    présents, non vides et valides (voir est_une_rangee_valide).
+
+    Args:
+        ligne (bytes): La ligne, avec son retour de ligne s'il existe.
+
+    Returns:
+        bool: True si la ligne est complète.
+    """
+    if ligne.endswith(b"\n"):
+        return True
+    try:
+        champs = decoder_ligne(ligne.decode("utf-8"))
+    except UnicodeDecodeError:
+        return False
+    return all(champs) and est_une_rangee_valide(champs)
+
+
+def lire_lignes(fichier, debut=0, fin=None):
+    """
+    Générateur parcourant les lignes complètes (voir est_une_ligne_complete)
+    et non vides d'un fichier d'utilisateurs ouvert en binaire.
+
+    Args:
+        fichier (file): Le fichier, ouvert en mode binaire.
+        debut (int, optional): Position (en octets) d'un début de ligne.
+        fin (int, optional): Position à laquelle s'arrêter. None signifie la fin du fichier.
+
+    Yields:
+        tuple: La position (en octets) et le contenu (bytes, avec son retour de
+        ligne, sauf pour une dernière ligne qui n'en a pas) de chaque ligne.
+    """
+    fichier.seek(debut)
+    position = debut
+    for ligne in fichier:
+        if fin is not None and position + len(ligne) > fin:
+            return
+        if not est_une_ligne_complete(ligne):
+            return
+        if ligne.strip():
+            yield position, ligne
+        position += len(ligne)
+
+
+class EcrivainDuJournal:
+    """
+    Classe permettant d'écrire des utilisateurs à la fin du fichier pendant
+    que le journal est ouvert en écriture (voir JournalDesUtilisateurs.ouvrir_en_ecriture).
+
+    Un EcrivainDuJournal est composé des attributs suivants:
+        - fichier (file): le fichier des utilisateurs, ouvert en ajout.
+        - position (int): la position de la prochaine ligne écrite.
+    """
+    def __init__(self, fichier, position):
+        self.fichier = fichier
+        self.position = position
+
+    def ecrire(self, rangee):
+        """
+        Méthode permettant d'écrire la ligne d'un utilisateur.
+
+        Args:
+            rangee (list): Les champs (str) de l'utilisateur.
+
+        Returns:
+            int: La position (en octets) de la ligne dans le fichier.
+        """
+        ligne = encoder_rangee(rangee)
+        self.fichier.write(ligne)
+        position = self.position
+        self.position += len(ligne)
+        return position
+
+
+class JournalDesUtilisateurs:
+    """
+    Classe représentant les écritures à la fin d'un fichier d'utilisateurs.
+
+    Les écritures sont exclusives: entre les processus grâce à un verrou sur
+    un fichier à part (qui, contrairement au fichier des utilisateurs, n'est
+    jamais remplacé par un compactage), et entre les fils d'exécution d'un
+    processus. Chaque écriture se termine par un fsync: une inscription est
+    sur le disque quand ajouter retourne.
+
+    Pour que les inscriptions simultanées restent peu coûteuses, elles sont
+    regroupées (group commit): pendant qu'un fil écrit, les lignes des autres
+    s'accumulent, et le prochain fil à écrire les écrit toutes avec un seul fsync.
+
+    Un JournalDesUtilisateurs est composé des attributs suivants:
+        - chemin_base_de_donnees (str): le chemin du fichier des utilisateurs.
+        - chemin_verrou (str): le chemin du fichier servant de verrou.
+        - nombre_de_synchronisations (int): le nombre de fsync faits par ce journal.
+    """
+    def __init__(self, chemin_base_de_donnees):
+        self.chemin_base_de_donnees = chemin_base_de_donnees
+        self.chemin_verrou = chemin_base_de_donnees + EXTENSION_VERROU
+        self.nombre_de_synchronisations = 0
+        self._verrou = threading.Lock()
+        # Regroupement des écritures: chaque ligne reçoit un numéro, et les lignes
+        # [numero_ecrit, numero_suivant) attendent dans lignes_en_attente.
+        self._condition = threading.Condition()
+        self._lignes_en_attente = []
+        self._numero_suivant = 0
+        self._numero_ecrit = 0
+        self._ecriture_en_cours = False
+        self._resultats = {}
+
+    @contextlib.contextmanager
+    def verrouiller(self):
+        """
+        Gestionnaire de contexte donnant l'exclusivité des écritures dans le
+        fichier des utilisateurs.
+        """
+        with self._verrou:
+            if fcntl is None:
+                yield
+                return
+            with open(self.chemin_verrou, "ab") as verrou:
+                fcntl.flock(verrou.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(verrou.fileno(), fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def ouvrir_en_ecriture(self):
+        """
+        Gestionnaire de contexte ouvrant le fichier des utilisateurs en ajout,
+        avec l'exclusivité des écritures. Une ligne incomplète laissée à la fin
+        du fichier est d'abord effacée. À la sortie, le tampon est vidé et le
+        fichier est synchronisé sur le disque (un seul fsync).
+
+        Yields:
+            EcrivainDuJournal: L'écrivain des nouvelles lignes.
+        """
+        with self.verrouiller():
+            with open(self.chemin_base_de_donnees, "a+b", buffering=TAILLE_DU_TAMPON) as fichier:
+                ecrivain = EcrivainDuJournal(fichier, self._reparer(fichier))
+                yield ecrivain
+                fichier.flush()
+                os.fsync(fichier.fileno())
+                self.nombre_de_synchronisations += 1
+
+    @staticmethod
+    def _reparer(fichier):
+        # Termine la dernière ligne du fichier si elle est complète sans son "\n", l'efface
+        # sinon (voir est_une_ligne_complete), et retourne la taille du fichier.
+        fichier.seek(0, os.SEEK_END)
+        taille = fichier.tell()
+        fin = taille
+        while fin > 0:
+            debut = max(0, fin - 4096)
+            fichier.seek(debut)
+            bloc = fichier.read(fin - debut)
+            if b"\n" in bloc:
+                fin = debut + bloc.rindex(b"\n") + 1
+                break
+            fin = debut
+        if fin == taille:
+            return taille
+
+        fichier.seek(fin)
+        derniere = fichier.read()
+        if est_une_ligne_complete(derniere):
+            fichier.write(b"\n")
+            return taille + 1
+        journalisation.warning(
+            "Ligne incomplète de %d octet(s) effacée à la fin de %s.", len(derniere), fichier.name
+        )
+        fichier.truncate(fin)
+        return fin
+
+    def ajouter(self, rangees):
+        """
+        Méthode permettant d'écrire quelques utilisateurs à la fin du fichier.
+        Elle retourne une fois leurs lignes sur le disque, écrites avec celles
+        des autres fils qui attendaient en même temps.
+
+        Args:
+            rangees (list): Les champs (str) de chaque utilisateur.
+
+        Returns:
+            list: La position (en octets) de la ligne de chaque utilisateur.
+        """
+        lignes = [encoder_rangee(rangee) for rangee in rangees]
+        condition = self._condition
+        with condition:
+            premier = self._numero_suivant
+            self._numero_suivant += len(lignes)
+            self._lignes_en_attente.extend(lignes)
+
+            while self._numero_ecrit < premier + len(lignes):
+                if self._ecriture_en_cours:
+                    condition.wait()
+                    continue
+
+                # Ce fil écrit toutes les lignes en attente, y compris celles des autres fils.
+                self._ecriture_en_cours = True
+                lot, self._lignes_en_attente = self._lignes_en_attente, []
+                numero = self._numero_ecrit
+                condition.release()
+                try:
+                    resultats = self._ecrire_lot(lot)
+                except BaseException as erreur:
+                    resultats = [erreur] * len(lot)
+                finally:
+                    condition.acquire()
+                self._resultats.update(zip(range(numero, numero + len(lot)), resultats))
+                self._numero_ecrit = numero + len(lot)
+                self._ecriture_en_cours = False
+                condition.notify_all()
+
+            resultats = [self._resultats.pop(numero) for numero in range(premier, premier + len(lignes))]
+
+        for resultat in resultats:
+            if isinstance(resultat, BaseException):
+                raise resultat
+        return resultats
+
+    def _ecrire_lot(self, lignes):
+        # Écrit des lignes déjà encodées et retourne leurs positions.
+        positions = []
+        with self.ouvrir_en_ecriture() as ecrivain:
+            for ligne in lignes:
+                positions.append(ecrivain.position)
+                ecrivain.fichier.write(ligne)
+                ecrivain.position += len(ligne)
+        return positions
+
+
+def synchroniser_dossier(chemin):
+    """
+    Fonction permettant de synchroniser sur le disque le dossier d'un fichier,
+    pour qu'un remplacement (os.replace) de ce fichier soit durable.
+
+    Args:
+        chemin (str): Le chemin du fichier.
+    """
+    if os.name != "posix":
+        return
+    descripteur = os.open(os.path.dirname(os.path.abspath(chemin)), os.O_RDONLY)
+    try:
+        os.fsync(descripteur)
+    finally:
+        os.close(descripteur)
@@ -1,10 +1,202 @@
-import math
+import array
+import bisect
+import collections
+import copy
+import heapq
+import itertools
+import os
+import sys
+import threading
 
+from catalogue import Catalogue, ColonneDeListes, VueShows
+from chargement_parallele import analyser_fichier_en_parallele
+from ensemble_de_bits import ensemble_depuis_rangs, rangs_de
+from index_texte import IndexTexte
+from index_utilisateurs import empreinte_du_fichier
+from instantane import ecrire_instantane, lire_instantane
+from instrumentation import chronometrer, compter
+from pagination import Paginateur
+from recherche_floue import (
+    IndexFlou,
+    classer_les_premiers_par_pertinence,
+    classer_par_pertinence,
+    normaliser_popularites,
+    parcourir_les_shows,
+    reporter_sur_les_shows,
+)
+from recommandation import Recommandeur, ecrire_voisins, lire_voisins, traits_depuis_catalogue
+from requete import AgePermis, Contient, Et, ListeContient, Non, Ou
 from show import Show
 
 
+def union_des_ensembles_contenant(ensembles_par_valeur, val):
+    """
+    Fonction permettant de réunir les ensembles de bits des valeurs qui
+    contiennent une sous-chaîne (sans tenir compte de la casse).
+
+    Args:
+        ensembles_par_valeur (dict): L'ensemble de bits de chaque valeur (str).
+        val (str): La sous-chaîne, en minuscules.
+
+    Returns:
+        int: L'union des ensembles des valeurs qui contiennent val.
+    """
+    ensemble = 0
+    for valeur, rangs in ensembles_par_valeur.items():
+        if val in valeur.lower():
+            ensemble |= rangs
+    return ensemble
+
+
+def mettre_a_jour_ordre(ordre, colonne, rangs_retires, rangs_ajoutes):
+    """
+    Fonction permettant de mettre à jour une permutation triée (voir
+    Mediatheque.obtenir_ordre_de_tri) sans la retrier: la place de chaque
+    rang retiré ou ajouté est trouvée par recherche dichotomique.
+
+    Args:
+        ordre (array): Les rangs, en ordre décroissant de la colonne et, à
+        valeur égale, en ordre croissant. Il n'est pas modifié.
+        colonne (sequence): La valeur de chaque rang.
+        rangs_retires (iterable): Les rangs à retirer, tous présents dans ordre.
+        rangs_ajoutes (iterable): Les rangs à ajouter.
+
+    Returns:
+        array: La nouvelle permutation.
+    """
+    def cle(rang):
+        return -colonne[rang], rang
+
+    ordre = array.array("I", ordre)
+    for rang in rangs_retires:
+        del ordre[bisect.bisect_left(ordre, cle(rang), key=cle)]
+    for rang in rangs_ajoutes:
+        bisect.insort(ordre, rang, key=cle)
+    return ordre
+
+
+class FiltreDAcces:
+    """
+    Classe représentant les critères d'accès d'un utilisateur aux shows:
+    la limite d'âge et, pour un abonnement régional, le pays.
+
+    Le filtre peut être évalué sur les champs bruts d'une ligne du fichier
+    (avant la construction du show) ou sur une rangée d'un Catalogue.
+
+    Un FiltreDAcces est composé des attributs suivants:
+        - age_utilisateur (int): l'âge de l'utilisateur.
+        - pays (str): le pays de l'utilisateur, ou None si tous les pays sont acceptés.
+          Comme pour filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string,
+          un show est accepté si l'un de ses pays contient cette valeur (sans
+          tenir compte de la casse).
+    """
+    def __init__(self, age_utilisateur, pays=None):
+        self.age_utilisateur = age_utilisateur
+        self.pays = None if pays is None else pays.lower()
+
+    def cle(self):
+        """
+        Méthode permettant de récupérer une clé identifiant les shows acceptés
+        par le filtre: deux filtres de même clé acceptent les mêmes shows.
+        Les âges sont regroupés par tranche, une tranche commençant à chaque
+        limite d'âge de Show.LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT.
+
+        Returns:
+            tuple: La tranche d'âge et le pays (None pour tous les pays).
+        """
+        limites = sorted(set(Show.LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT.values()))
+        return bisect.bisect_right(limites, self.age_utilisateur), self.pays
+
+    def accepte_pays(self, pays_du_show):
+        return self.pays is None or any(self.pays in pays.lower() for pays in pays_du_show)
+
+    def accepte_champs(self, champs):
+        """
+        Méthode permettant de vérifier si une ligne du fichier respecte le filtre.
+
+        Args:
+            champs (dict): Les champs bruts de la ligne (voir Show.decouper_ligne).
+
+        Returns:
+            bool: True si le show est accessible, False sinon.
+        """
+        return (
+            Show.LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT[champs["classement"]] <= self.age_utilisateur
+            and self.accepte_pays(champs["pays"].split(", "))
+        )
+
+    def accepte_rang(self, catalogue, rang):
+        """
+        Méthode permettant de vérifier si une rangée d'un catalogue respecte le filtre.
+
+        Args:
+            catalogue (Catalogue): Le catalogue.
+            rang (int): Le rang du show dans le catalogue.
+
+        Returns:
+            bool: True si le show est accessible, False sinon.
+        """
+        return (
+            catalogue.colonnes["age_minimum_requis"][rang] <= self.age_utilisateur
+            and self.accepte_pays(catalogue.colonnes["pays"][rang])
+        )
+
+    def ensemble_accepte(self, catalogue):
+        """
+        Méthode permettant de calculer d'un coup l'ensemble des rangées d'un
+        catalogue qui respectent le filtre, à partir des ensembles de bits de
+        chaque âge minimum et de chaque pays (voir Catalogue.ensembles_par_valeur):
+        seules les valeurs distinctes sont examinées, pas chaque rangée.
+
+        Args:
+            catalogue (Catalogue): Le catalogue.
+
+        Returns:
+            int: L'ensemble de bits des rangs des shows accessibles.
+        """
+        ensemble = 0
+        for age_minimum_requis, rangs in catalogue.ensembles_par_valeur("age_minimum_requis").items():
+            if age_minimum_requis <= self.age_utilisateur:
+                ensemble |= rangs
+        if self.pays is not None:
+            ensemble &= union_des_ensembles_contenant(catalogue.ensembles_par_valeur("pays"), self.pays)
+        return ensemble
+
+
 class Mediatheque:
-    def __init__(self, chemin_fichier):
+    ATTRIBUTS_INDEXES_PAR_DEFAUT = ("titre", "description")
+    # Attributs dont la version en minuscules est précalculée (une seule fois, à la première recherche).
+    ATTRIBUTS_TEXTE_NORMALISES = ("titre", "description")
+    ATTRIBUTS_LISTE_NORMALISES = ("directeurs", "acteurs", "pays", "categories")
+    # Caractère de contrôle placé devant chaque élément d'une liste normalisée.
+    # Il n'apparaît jamais dans le fichier, une sous-chaîne qui ne le contient pas
+    # ne peut donc pas chevaucher deux éléments.
+    SEPARATEUR_DE_LISTE = "\x1f"
+    # Attributs pour lesquels un ensemble de bits est construit par valeur distincte (voir obtenir_facettes).
+    ATTRIBUTS_A_FACETTES = ("categories", "pays", "age_minimum_requis")
+    # Attributs pour lesquels une recherche par pertinence, tolérante aux fautes, est offerte
+    # (voir rechercher_par_pertinence).
+    ATTRIBUTS_DE_RECHERCHE_FLOUE = ("titre", "acteurs", "directeurs")
+    # Nombre maximal de shows dont le texte affiché est conservé (voir rendre_show).
+    TAILLE_DU_CACHE_DE_RENDU = 2048
+    # Nombre de shows recommandés par défaut, et nombre maximal de recommandations
+    # conservées (voir recommander).
+    NOMBRE_DE_RECOMMANDATIONS = 10
+    TAILLE_DU_CACHE_DE_RECOMMANDATIONS = 1024
+    # Nombre maximal de vues conservées (voir vue). Le pays d'un filtre est saisi
+    # librement: sans limite, chaque pays inventé garderait sa vue en mémoire.
+    TAILLE_DU_CACHE_DE_VUES = 64
+    # Début d'une ligne de fichier de delta retirant un show (voir iterer_changements).
+    PREFIXE_DE_RETRAIT = "-"
+
+    def __init__(
+        self,
+        chemin_fichier,
+        attributs_indexes=ATTRIBUTS_INDEXES_PAR_DEFAUT,
+        utiliser_instantane=True,
+        filtre=None,
+        processus=1,
+    ):
         """
         Cette méthode permet d'initialiser une médiathue en chargeant
         en mémoire la base de données des shows.
@@ -12,9 +204,59 @@ class Mediatheque:
         Args:
             chemin_fichier (str): Le chemin menant au fichier
             contenant la médiathèque.
+            attributs_indexes (tuple, optional): Attributs de type str pour
+            lesquels un index inversé est construit (à la première recherche)
+            afin d'accélérer les recherches par inclusion. Passer un tuple vide
+            désactive l'indexation.
+            utiliser_instantane (bool, optional): Si True, le catalogue est lu
+            depuis l'instantané binaire du fichier lorsqu'il est à jour, et
+            l'instantané est (re)créé sinon.
+            filtre (FiltreDAcces, optional): Si fourni, seuls les shows respectant
+            ce filtre font partie de la médiathèque.
+            processus (int, optional): Nombre de processus utilisés pour analyser
+            le fichier lorsqu'il doit l'être. Avec 1, le fichier est analysé
+            dans le processus courant.
         """
+        self.attributs_indexes = tuple(attributs_indexes)
+        self.utiliser_instantane = utiliser_instantane
+        self.filtre = filtre
+        self.processus = processus
+        self.chemin_fichier = chemin_fichier
+        self.stat_source = None
+        self.version_du_fichier = None
         self.shows = self.charger_shows_depuis_fichier(chemin_fichier)
+        self.catalogue = self.shows.catalogue
+        # Nombre de rangées du catalogue connues de cette médiathèque (voir appliquer_changements).
+        self.taille_du_catalogue = len(self.catalogue)
+        # True si chaque rangée du catalogue est un show de la médiathèque (ni filtre, ni
+        # doublon, ni changement appliqué): les tables des colonnes de listes, jusqu'à leur
+        # taille au chargement, contiennent alors exactement les valeurs de ses shows.
+        self.couvre_tout_le_catalogue = len(self.shows) == len(self.catalogue)
+        self.tailles_des_tables = {
+            attribut: len(colonne.table)
+            for attribut, colonne in self.catalogue.colonnes.items()
+            if isinstance(colonne, ColonneDeListes)
+        }
+        # Partagé par les médiathèques dérivées de celle-ci: un seul changement à la fois (voir appliquer_changements).
+        self.verrou_des_changements = threading.Lock()
+        # Structures dérivées du catalogue, construites à la demande.
+        self.valeurs_normalisees = {}
+        self.index_textes = {}
+        self.index_flous = {}
+        self.ordres_de_tri = {}
+        self.ensemble_des_shows = None
+        self.facettes = {}
+        self.ensembles_par_age_permis = None
+        self.recommandeur = None
+        # Dernières vues de la médiathèque créées, par clé de filtre (voir vue),
+        # de la moins à la plus récemment utilisée.
+        self.vues = collections.OrderedDict()
+        # Texte affiché des derniers shows rendus, du moins au plus récemment utilisé.
+        self.rendus = collections.OrderedDict()
+        # Dernières recommandations servies, du moins au plus récemment utilisée.
+        self.recommandations = collections.OrderedDict()
 
+    @chronometrer()
     def charger_shows_depuis_fichier(self, chemin_fichier):
         """
         Cette fonction permet de lire et charger en mémoire la médiathèque.
@@ -22,25 +264,390 @@ class Mediatheque:
         d'un show et la valeur associée représente un objet Show.
         L'objet show est obtenu en se servant de la méthode de classe
         Show.creer_show_via_ligne_et_ligne_des_titres que vous devez implémenter.
-        
+
+        Les shows sont stockés en colonnes dans un Catalogue: le dictionnaire
+        retourné est une VueShows qui ne conserve que le rang de chaque show
+        et construit les objets Show à la demande. Si utiliser_instantane est
+        activé et que l'instantané du fichier est à jour, le catalogue est lu
+        depuis celui-ci sans analyser le texte.
+
+        Si la médiathèque a un filtre, seuls les shows qui le respectent sont
+        gardés. Avec l'instantané, le filtre est évalué sur les colonnes du
+        catalogue complet; sans instantané, il est appliqué pendant la lecture
+        du fichier (voir analyser_fichier) et les shows refusés ne sont jamais
+        construits ni stockés.
+
         Args:
             chemin_fichier (str): Le chemin menant au fichier contenant la médiathèque.
 
         Returns:
-            dict: Dictionnaire des shows de la médiathèque.
+            VueShows: Dictionnaire des shows de la médiathèque.
                   Les clés sont des show_ids et les valeurs sont des objets de
                   type Show.
         """
-        shows = {}
+        # La date de modification est prise avant la lecture: si le fichier change
+        # pendant l'analyse, l'instantané écrit sera considéré comme périmé, et
+        # recharger relira la fin du fichier.
+        stat_source = os.stat(chemin_fichier)
+        self.version_du_fichier = empreinte_du_fichier(chemin_fichier, stat_source.st_size)
+        if not self.utiliser_instantane:
+            return VueShows(*self.analyser_fichier(chemin_fichier, self.filtre))
+
+        self.stat_source = stat_source
+        catalogue = lire_instantane(chemin_fichier, stat_source)
+        compter("instantane_total", resultat="lu" if catalogue is not None else "reconstruit")
+        if catalogue is None:
+            # L'instantané doit contenir tout le fichier: on l'analyse donc sans filtre.
+            catalogue, _ = self.analyser_fichier(chemin_fichier)
+            ecrire_instantane(catalogue, chemin_fichier, stat_source)
+
+        identifiants = catalogue.colonnes["identifiant"]
+        if self.filtre is None:
+            rangs = {show_id: rang for rang, show_id in enumerate(identifiants)}
+        else:
+            rangs = {identifiants[rang]: rang for rang in rangs_de(self.filtre.ensemble_accepte(catalogue))}
+        return VueShows(catalogue, rangs)
+
+    def analyser_fichier(self, chemin_fichier, filtre=None):
+        """
+        Méthode permettant d'analyser un fichier de shows ligne par ligne
+        pour construire son catalogue. Le fichier n'est jamais chargé en entier
+        en mémoire, et les lignes refusées par le filtre ne sont pas converties.
+        Si la médiathèque utilise plusieurs processus, le fichier est découpé
+        en plages analysées en parallèle (voir chargement_parallele).
+
+        Comme pour un dictionnaire, un show_id répété garde les valeurs de sa
+        dernière rangée et la position de sa première. Le catalogue retourné
+        ne contient que les shows gardés, et le rang de chaque show correspond
+        à sa position.
+
+        Args:
+            chemin_fichier (str): Le chemin menant au fichier contenant la médiathèque.
+            filtre (FiltreDAcces, optional): Filtre à appliquer pendant la lecture.
+
+        Returns:
+            tuple: Le Catalogue et le dictionnaire des rangs de chaque show_id.
+        """
+        if self.processus > 1:
+            catalogue, rangees = analyser_fichier_en_parallele(chemin_fichier, self.processus, filtre)
+        else:
+            catalogue = Catalogue()
+            rangees = self._analyser_rangees(chemin_fichier, catalogue, filtre)
+
+        rangs = {}
+        # Numéro de la première ligne de chaque show_id, utile seulement avec un filtre
+        # (un show_id refusé puis accepté doit garder la position de sa première ligne).
+        premieres_lignes = {}
+        doublons = False
+
+        for numero, (show_id, rang) in enumerate(rangees):
+            if filtre is not None:
+                if show_id in premieres_lignes:
+                    doublons = True
+                else:
+                    premieres_lignes[show_id] = numero
+                if rang is None:
+                    # Comme la dernière rangée d'un show_id répété l'emporte, elle retire aussi les précédentes.
+                    rangs.pop(show_id, None)
+                    continue
+            rangs[show_id] = rang
+
+        if len(rangs) < len(catalogue) or doublons:
+            # On réordonne le catalogue pour que le rang de chaque show corresponde à sa position.
+            ordre = sorted(rangs, key=premieres_lignes.__getitem__) if filtre is not None else list(rangs)
+            catalogue = catalogue.extraire(rangs[show_id] for show_id in ordre)
+            rangs = {show_id: rang for rang, show_id in enumerate(ordre)}
+
+        return catalogue, rangs
+
+    def _analyser_rangees(self, chemin_fichier, catalogue, filtre):
+        """
+        Générateur analysant un fichier de shows dans le processus courant.
+        Chaque ligne acceptée par le filtre est ajoutée au catalogue.
+
+        Yields:
+            tuple: Le show_id de chaque ligne et son rang dans le catalogue
+            (None si la ligne est refusée par le filtre).
+        """
+        for champs in self.iterer_champs_depuis_fichier(chemin_fichier):
+            if filtre is None or filtre.accepte_champs(champs):
+                yield champs["show_id"], catalogue.ajouter(Show.creer_show_via_champs(champs))
+            else:
+                yield champs["show_id"], None
+
+    @staticmethod
+    def iterer_champs_depuis_fichier(chemin_fichier):
+        """
+        Générateur permettant de parcourir les lignes d'un fichier de shows
+        une à une, sans jamais conserver le fichier entier en mémoire.
+
+        Args:
+            chemin_fichier (str): Le chemin menant au fichier contenant la médiathèque.
 
+        Yields:
+            dict: Les champs bruts de chaque show (voir Show.decouper_ligne).
+        """
         with open(chemin_fichier, encoding="utf-8") as fichier:
-            ligne_des_titres, *lignes_des_shows = [ligne.strip() for ligne in fichier]
+            ligne_des_titres = fichier.readline().strip()
+            for ligne in fichier:
+                yield Show.decouper_ligne(ligne.strip(), ligne_des_titres)
+
+    @classmethod
+    def iterer_shows_depuis_fichier(cls, chemin_fichier, filtre=None):
+        """
+        Générateur permettant de parcourir les shows d'un fichier un à un.
+        Les lignes refusées par le filtre ne sont pas converties en Show.
+
+        Args:
+            chemin_fichier (str): Le chemin menant au fichier contenant la médiathèque.
+            filtre (FiltreDAcces, optional): Filtre à appliquer pendant la lecture.
+
+        Yields:
+            Show: Les shows du fichier respectant le filtre, dans l'ordre du fichier.
+        """
+        for champs in cls.iterer_champs_depuis_fichier(chemin_fichier):
+            if filtre is None or filtre.accepte_champs(champs):
+                yield Show.creer_show_via_champs(champs)
+
+    def normaliser_valeurs_par_attribut(self, attribut, debut=0, maximum=None):
+        """
+        Méthode permettant de précalculer la version en minuscules d'un
+        attribut de tous les shows, afin que les filtres n'aient plus à
+        le faire à chaque requête.
+
+        Pour un attribut de type liste, les éléments sont mis en minuscules
+        un par un puis concaténés, chacun précédé de SEPARATEUR_DE_LISTE.
+        La popularité, elle, est ramenée entre 0 et 1 (voir normaliser_popularites).
+
+        Args:
+            attribut (str): Attribut à normaliser.
+            debut (int, optional): Rang de la première rangée normalisée (les
+            rangées ajoutées au catalogue depuis la normalisation précédente).
+            maximum (float, optional): Pour la popularité, celle ramenée à 1.
+            Par défaut, la plus grande des rangées normalisées.
+
+        Returns:
+            list: Valeur normalisée de chaque show à partir de debut, indexée
+            par rang dans le catalogue moins debut.
+        """
+        colonne = self.catalogue.colonnes[attribut]
+        if attribut == "popularite":
+            return normaliser_popularites(itertools.islice(colonne, debut, None), maximum)
+        if attribut in self.ATTRIBUTS_LISTE_NORMALISES:
+            separateur = self.SEPARATEUR_DE_LISTE
+            return [
+                "".join(separateur + element.lower() for element in colonne[rang])
+                for rang in range(debut, len(colonne))
+            ]
+        return [texte.lower() for texte in itertools.islice(colonne, debut, None)]
+
+    def obtenir_valeurs_normalisees(self, attribut):
+        """
+        Méthode permettant de récupérer les valeurs normalisées d'un attribut,
+        en les calculant lors du premier appel.
 
-            for ligne in lignes_des_shows:
-                show = Show.creer_show_via_ligne_et_ligne_des_titres(ligne, ligne_des_titres)
-                shows[show.identifiant] = show
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_TEXTE_NORMALISES
+            ou de ATTRIBUTS_LISTE_NORMALISES.
+
+        Returns:
+            list: Valeur normalisée de chaque show, indexée par rang dans le catalogue.
+        """
+        valeurs = self.valeurs_normalisees.get(attribut)
+        if valeurs is None:
+            valeurs = self.valeurs_normalisees[attribut] = self.normaliser_valeurs_par_attribut(attribut)
+        return valeurs
 
-        return shows
+    def obtenir_index_texte(self, attribut):
+        """
+        Méthode permettant de récupérer l'index inversé d'un attribut,
+        en le construisant lors du premier appel. L'index porte sur tout le
+        catalogue, il peut donc être partagé avec les vues de la médiathèque.
+
+        Args:
+            attribut (str): Attribut faisant partie de attributs_indexes.
+
+        Returns:
+            IndexTexte: L'index inversé de l'attribut.
+        """
+        index = self.index_textes.get(attribut)
+        if index is None:
+            # L'index porte sur les valeurs normalisées, sans en garder de copie: ses
+            # documents sont donc identifiés par leur rang dans le catalogue.
+            index = self.index_textes[attribut] = IndexTexte(self.obtenir_valeurs_normalisees(attribut))
+        return index
+
+    def obtenir_index_flou(self, attribut):
+        """
+        Méthode permettant de récupérer l'index de recherche floue d'un attribut,
+        en le construisant lors du premier appel. Comme l'index inversé, il porte
+        sur tout le catalogue. Pour un titre, chaque show est un document; pour
+        une liste (acteurs, directeurs), chaque nom distinct est un document, et
+        les rangs des shows où il apparaît sont conservés à part.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+
+        Returns:
+            tuple: L'IndexFlou et, pour une liste, les rangs (array) des shows de
+            chaque nom, par code du nom (None pour un titre).
+
+        Raises:
+            KeyError: Si l'attribut ne fait pas partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+        """
+        if attribut not in self.ATTRIBUTS_DE_RECHERCHE_FLOUE:
+            raise KeyError(attribut)
+        entree = self.index_flous.get(attribut)
+        if entree is None:
+            colonne = self.catalogue.colonnes[attribut]
+            if isinstance(colonne, ColonneDeListes):
+                rangs_par_nom = [array.array("I") for _ in range(len(colonne.table))]
+                for rang in range(len(colonne)):
+                    for code in colonne.codes_de(rang):
+                        rangs_par_nom[code].append(rang)
+                # Les documents de l'index sont les noms, identifiés par leur code dans la table de la colonne.
+                entree = (IndexFlou(enumerate(colonne.table.valeurs)), rangs_par_nom)
+            else:
+                entree = (IndexFlou(enumerate(colonne)), None)
+            self.index_flous[attribut] = entree
+        return entree
+
+    def obtenir_recommandeur(self):
+        """
+        Méthode permettant de récupérer les voisins précalculés des shows du
+        catalogue (voir Recommandeur), en les calculant lors du premier appel.
+        Comme l'instantané, ils sont lus depuis le fichier des voisins lorsqu'il
+        est à jour, et ce fichier est (re)créé sinon. Sans instantané, ou après
+        appliquer_changements, le catalogue ne correspond pas exactement au
+        fichier: les voisins sont alors calculés sans être conservés.
+
+        Returns:
+            Recommandeur: Les voisins des shows du catalogue.
+        """
+        if self.recommandeur is None:
+            recommandeur = None
+            conserver = self.utiliser_instantane and self.stat_source is not None
+            if conserver:
+                recommandeur = lire_voisins(self.chemin_fichier, self.stat_source)
+            if recommandeur is None or len(recommandeur) != len(self.catalogue):
+                recommandeur = Recommandeur.construire(
+                    traits_depuis_catalogue(self.catalogue), self.catalogue.colonnes["popularite"]
+                )
+                if conserver:
+                    ecrire_voisins(recommandeur, self.chemin_fichier, self.stat_source)
+            self.recommandeur = recommandeur
+        return self.recommandeur
+
+    def obtenir_ordre_de_tri(self, attribut):
+        """
+        Méthode permettant de récupérer la permutation des shows de la
+        médiathèque triée en ordre décroissant d'un attribut numérique,
+        en la calculant lors du premier appel. Les shows de même valeur
+        sont classés selon leur position dans la médiathèque.
+
+        La permutation est mise à jour par reduire_liste_des_shows.
+
+        Args:
+            attribut (str): Attribut faisant partie de Catalogue.ATTRIBUTS_NUMERIQUES.
+
+        Returns:
+            array: Rangs des shows dans le catalogue, triés.
+        """
+        ordre = self.ordres_de_tri.get(attribut)
+        if ordre is None:
+            colonne = self.catalogue.colonnes[attribut]
+            # Les rangs sont parcourus dans l'ordre croissant et sorted est stable:
+            # à valeur égale, le plus petit rang reste devant.
+            ordre = self.ordres_de_tri[attribut] = array.array(
+                "I", sorted(self.shows.rangs.values(), key=colonne.__getitem__, reverse=True)
+            )
+        return ordre
+
+    def obtenir_facettes(self, attribut):
+        """
+        Méthode permettant de récupérer l'ensemble de bits de chaque valeur
+        distincte d'un attribut, en les construisant lors du premier appel.
+        Les ensembles portent sur tout le catalogue: ils restent valides après
+        reduire_liste_des_shows, il suffit de les croiser avec obtenir_ensemble_des_shows.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_A_FACETTES.
+
+        Returns:
+            dict: L'ensemble de bits des rangs des shows de chaque valeur.
+        """
+        facettes = self.facettes.get(attribut)
+        if facettes is None:
+            facettes = self.facettes[attribut] = self.catalogue.ensembles_par_valeur(attribut)
+        return facettes
+
+    def obtenir_ensemble_age_permis(self, age_utilisateur):
+        """
+        Méthode permettant de récupérer l'ensemble de bits des shows du
+        catalogue qu'un utilisateur de cet âge peut regarder. Un ensemble est
+        précalculé pour chaque limite d'âge de Show.LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT
+        (réunissant les shows de cette limite et des limites inférieures).
+
+        Args:
+            age_utilisateur (int): Âge de l'utilisateur.
+
+        Returns:
+            int: L'ensemble de bits des rangs des shows permis.
+        """
+        if self.ensembles_par_age_permis is None:
+            par_age = self.obtenir_facettes("age_minimum_requis")
+            limites = sorted(set(Show.LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT.values()) | set(par_age))
+            ensembles = []
+            ensemble = 0
+            for limite in limites:
+                ensemble |= par_age.get(limite, 0)
+                ensembles.append(ensemble)
+            self.ensembles_par_age_permis = limites, ensembles
+
+        limites, ensembles = self.ensembles_par_age_permis
+        position = bisect.bisect_right(limites, age_utilisateur)
+        return ensembles[position - 1] if position else 0
+
+    def ensemble_liste_contient(self, attribut, valeur):
+        """
+        Méthode permettant de calculer l'ensemble de bits des shows de la
+        médiathèque dont l'un des éléments de l'attribut contient la valeur:
+        c'est l'union des ensembles des valeurs distinctes qui la contiennent.
+
+        Args:
+            attribut (str): Attribut de type liste faisant partie de ATTRIBUTS_A_FACETTES.
+            valeur (str): Valeur de filtre.
+
+        Returns:
+            int: L'ensemble de bits.
+        """
+        ensemble = union_des_ensembles_contenant(self.obtenir_facettes(attribut), valeur.lower())
+        return ensemble & self.obtenir_ensemble_des_shows()
+
+    def compter_facettes(self, attribut, predicat=None):
+        """
+        Méthode permettant de compter les shows de chaque valeur distincte
+        d'un attribut, parmi les shows de la médiathèque respectant un prédicat.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_A_FACETTES.
+            predicat (Predicat, optional): Condition sur les shows comptés.
+            None signifie tous les shows de la médiathèque.
+
+        Returns:
+            dict: Le nombre de shows de chaque valeur (seulement celles présentes),
+            par ordre croissant des valeurs.
+        """
+        ensemble = self.obtenir_ensemble_des_shows()
+        if predicat is not None:
+            ensemble = self.evaluer_predicat(predicat, ensemble)
+        facettes = self.obtenir_facettes(attribut)
+        comptes = {}
+        for valeur in sorted(facettes):
+            nombre = (facettes[valeur] & ensemble).bit_count()
+            if nombre:
+                comptes[valeur] = nombre
+        return comptes
 
     def __len__(self):
         """
@@ -65,16 +672,328 @@ class Mediatheque:
             identifiants_a_garder (list): Liste des identifiants des shows
             à ne pas supprimer de la médiathèque.
         """
+        identifiants_a_garder = set(identifiants_a_garder)
         show_a_enlever = [show_id for show_id in self.shows if show_id not in identifiants_a_garder]
         for show_id in show_a_enlever:
             del self.shows[show_id]
 
+        if show_a_enlever:
+            self.ensemble_des_shows = None
+            self.recommandations.clear()
+            # Les vues déjà créées peuvent contenir des shows retirés.
+            self.vues.clear()
+            # Les permutations triées restent valides une fois les rangs retirés.
+            rangs_gardes = set(self.shows.rangs.values())
+            for attribut, ordre in self.ordres_de_tri.items():
+                self.ordres_de_tri[attribut] = array.array("I", (rang for rang in ordre if rang in rangs_gardes))
+
+    @chronometrer()
+    def appliquer_changements(self, changements):
+        """
+        Méthode permettant d'ajouter, de remplacer ou de retirer des shows sans
+        relire tout le fichier. La médiathèque n'est pas modifiée: une nouvelle
+        médiathèque est retournée, et il suffit de remplacer la référence à
+        l'ancienne (une seule affectation) pour que les lecteurs passent de
+        l'une à l'autre sans jamais voir de mise à jour partielle. L'ancienne
+        reste cohérente tant qu'elle est utilisée.
+
+        Le catalogue et les structures portant sur tout le catalogue (index,
+        ensembles de bits par valeur) ne sont pas copiés: ils sont partagés avec
+        l'ancienne médiathèque et complétés sur place. L'ancienne n'en lit jamais
+        les nouvelles rangées (ses rangs et ses ensembles de bits s'arrêtent à sa
+        taille), mais un lecteur qui parcourt une de ces structures au moment où
+        elle est complétée la verrait changer: les changements doivent donc être
+        appliqués dans le fil qui sert les lecteurs (la boucle asyncio, pour le
+        serveur). Un verrou, partagé par les médiathèques dérivées, empêche en
+        plus deux changements simultanés.
+
+        Le catalogue ne fait que grandir: un show ajouté ou remplacé reçoit une
+        nouvelle rangée à la fin, et un show remplacé passe donc en dernière
+        position (son ancienne rangée reste inutilisée jusqu'au prochain
+        chargement complet). Les structures portant sur tout le catalogue sont
+        complétées pour les nouvelles rangées seulement (voir
+        etendre_structures_du_catalogue), et celles propres aux shows de la
+        médiathèque et de ses vues pour les seuls shows changés (voir deriver).
+        Les voisins précalculés ne sont pas recalculés: un show ajouté n'en a
+        aucun jusqu'au prochain chargement complet.
+
+        Args:
+            changements (iterable): Paires (show_id, show), dans l'ordre: show
+            est le Show ajouté ou remplaçant, ou None si le show est retiré.
+
+        Returns:
+            Mediatheque: La médiathèque mise à jour.
+
+        Raises:
+            ValueError: Si des changements ont déjà été appliqués à cette
+            médiathèque: ils doivent l'être à la plus récente.
+            KeyError: Si un show a un classement inconnu. Aucun changement
+            n'est alors appliqué.
+        """
+        with self.verrou_des_changements:
+            if len(self.catalogue) != self.taille_du_catalogue:
+                raise ValueError("Les changements doivent être appliqués à la médiathèque la plus récente.")
+            return self._appliquer_changements(changements)
+
+    def _appliquer_changements(self, changements):
+        # Voir appliquer_changements, dont le verrou est tenu.
+        # Les changements sont tous lus avant de toucher au catalogue: une ligne
+        # mal formée n'y ajoute rien.
+        changements = list(changements)
+
+        debut = len(self.catalogue)
+        # Comme dans le fichier de shows, le dernier changement d'un show_id l'emporte.
+        rangs_changes = {}
+        try:
+            for show_id, show in changements:
+                rangs_changes.pop(show_id, None)
+                rangs_changes[show_id] = None if show is None else self.catalogue.ajouter(show)
+        except Exception:
+            # Un show invalide (un classement inconnu, par exemple) annule tout le
+            # lot: le catalogue retrouve sa taille et reste utilisable par la suite.
+            self.catalogue.tronquer(debut)
+            raise
+        rangs_ajoutes = {show_id: rang for show_id, rang in rangs_changes.items() if rang is not None}
+
+        valeurs_normalisees = self.etendre_structures_du_catalogue(debut)
+        nouvelle = self.deriver(rangs_changes, rangs_ajoutes)
+        nouvelle.taille_du_catalogue = len(self.catalogue)
+        nouvelle.valeurs_normalisees = valeurs_normalisees
+        nouvelle.ensembles_par_age_permis = None
+        # Le catalogue ne correspond plus au fichier (voir obtenir_recommandeur).
+        nouvelle.stat_source = None
+
+        # Les vues sont mises à jour avec les shows ajoutés à la médiathèque.
+        rangs_ajoutes = {show_id: rang for show_id, rang in rangs_ajoutes.items() if show_id in nouvelle.shows}
+        for cle, vue in self.vues.items():
+            nouvelle_vue = nouvelle.vues[cle] = vue.deriver(rangs_changes, rangs_ajoutes)
+            nouvelle_vue.mediatheque = nouvelle
+            nouvelle_vue.valeurs_normalisees = valeurs_normalisees
+        compter("changements_total", len(rangs_changes))
+        return nouvelle
+
+    def etendre_structures_du_catalogue(self, debut):
+        """
+        Méthode permettant de compléter les structures portant sur tout le
+        catalogue (valeurs normalisées, index inversés et flous, ensembles de
+        bits par valeur) avec les rangées ajoutées à partir de debut. Les index
+        et les ensembles sont complétés sur place: les médiathèques qui les
+        partagent ne contiennent aucune des nouvelles rangées, ils restent donc
+        valides pour elles.
+
+        Args:
+            debut (int): Rang de la première rangée ajoutée.
+
+        Returns:
+            dict: Les valeurs normalisées de chaque attribut déjà normalisé, pour
+            tout le catalogue. Le dictionnaire de la médiathèque n'est pas modifié.
+        """
+        colonnes = self.catalogue.colonnes
+        fin = len(self.catalogue)
+        valeurs_normalisees = dict(self.valeurs_normalisees)
+        if debut == fin:
+            return valeurs_normalisees
+
+        for attribut, valeurs in valeurs_normalisees.items():
+            maximum = None
+            if attribut == "popularite":
+                colonne = colonnes[attribut]
+                maximum = max(itertools.islice(colonne, debut), default=0.0)
+                if max(itertools.islice(colonne, debut, None)) > maximum:
+                    # La plus grande popularité a changé: toutes les valeurs sont recalculées.
+                    valeurs_normalisees[attribut] = self.normaliser_valeurs_par_attribut(attribut)
+                    continue
+            valeurs.extend(self.normaliser_valeurs_par_attribut(attribut, debut, maximum))
+
+        # Les valeurs normalisées, complétées ci-dessus, sont les textes des index inversés.
+        for index in self.index_textes.values():
+            index.indexer()
+
+        for attribut, (index, rangs_par_nom) in self.index_flous.items():
+            colonne = colonnes[attribut]
+            if rangs_par_nom is None:
+                for rang in range(debut, fin):
+                    index.ajouter(rang, colonne[rang])
+                continue
+            # Les noms apparus dans les nouvelles rangées deviennent des documents de l'index.
+            for code in range(len(rangs_par_nom), len(colonne.table)):
+                index.ajouter(code, colonne.table.valeurs[code])
+                rangs_par_nom.append(array.array("I"))
+            for rang in range(debut, fin):
+                for code in colonne.codes_de(rang):
+                    rangs_par_nom[code].append(rang)
+
+        for attribut, facettes in self.facettes.items():
+            colonne = colonnes[attribut]
+            rangs_par_valeur = {}
+            for rang in range(debut, fin):
+                valeurs = colonne[rang] if isinstance(colonne, ColonneDeListes) else (colonne[rang],)
+                for valeur in valeurs:
+                    rangs_par_valeur.setdefault(valeur, []).append(rang)
+            for valeur, rangs in rangs_par_valeur.items():
+                facettes[valeur] = facettes.get(valeur, 0) | ensemble_depuis_rangs(rangs, fin)
+        return valeurs_normalisees
+
+    def deriver(self, show_ids_retires, rangs_ajoutes):
+        """
+        Méthode permettant de construire une copie de la médiathèque (ou de la
+        vue) dont des shows sont retirés ou ajoutés, sans la modifier. La copie
+        partage ses structures portant sur tout le catalogue; celles propres à
+        ses shows (rangs, ensemble de bits, permutations triées) sont mises à
+        jour pour les seuls shows changés, et ses recommandations et ses vues
+        repartent de zéro.
+
+        Args:
+            show_ids_retires (iterable): Les show_ids retirés ou remplacés.
+            rangs_ajoutes (dict): Le rang dans le catalogue de chaque show ajouté
+            ou remplaçant, dans l'ordre des changements. Ceux refusés par le
+            filtre de la médiathèque sont ignorés.
+
+        Returns:
+            Mediatheque: La copie.
+        """
+        if self.filtre is not None:
+            rangs_ajoutes = {
+                show_id: rang
+                for show_id, rang in rangs_ajoutes.items()
+                if self.filtre.accepte_rang(self.catalogue, rang)
+            }
+        rangs = dict(self.shows.rangs)
+        rangs_retires = [rangs.pop(show_id) for show_id in show_ids_retires if show_id in rangs]
+        rangs.update(rangs_ajoutes)
+
+        nouvelle = copy.copy(self)
+        nouvelle.shows = VueShows(self.catalogue, rangs)
+        if self.ensemble_des_shows is not None:
+            taille = len(self.catalogue)
+            nouvelle.ensemble_des_shows = (
+                self.ensemble_des_shows & ~ensemble_depuis_rangs(rangs_retires, taille)
+            ) | ensemble_depuis_rangs(rangs_ajoutes.values(), taille)
+        nouvelle.ordres_de_tri = {
+            attribut: mettre_a_jour_ordre(ordre, self.catalogue.colonnes[attribut], rangs_retires, rangs_ajoutes.values())
+            for attribut, ordre in self.ordres_de_tri.items()
+        }
+        nouvelle.couvre_tout_le_catalogue = False
+        nouvelle.recommandations = collections.OrderedDict()
+        nouvelle.vues = collections.OrderedDict()
+        return nouvelle
+
+    @classmethod
+    def iterer_changements(cls, lignes, ligne_des_titres):
+        """
+        Générateur permettant de parcourir les changements d'un fichier de
+        delta. Chaque ligne est soit celle d'un show ajouté ou remplacé, au
+        format du fichier de shows, soit PREFIXE_DE_RETRAIT suivi du show_id
+        d'un show retiré. Les lignes vides sont ignorées.
+
+        Args:
+            lignes (iterable): Les lignes du delta (str), sans la ligne des titres.
+            ligne_des_titres (str): La ligne des titres du fichier de shows.
+
+        Yields:
+            tuple: Le show_id et le Show de chaque changement (None pour un retrait).
+        """
+        for ligne in lignes:
+            ligne = ligne.strip()
+            if not ligne:
+                continue
+            if ligne.startswith(cls.PREFIXE_DE_RETRAIT):
+                yield ligne[len(cls.PREFIXE_DE_RETRAIT):], None
+            else:
+                show = Show.creer_show_via_champs(Show.decouper_ligne(ligne, ligne_des_titres))
+                yield show.identifiant, show
+
+    def appliquer_delta(self, chemin_delta):
+        """
+        Méthode permettant d'appliquer un fichier de delta (voir
+        iterer_changements), dont la première ligne est la ligne des titres
+        du fichier de shows.
+
+        Args:
+            chemin_delta (str): Le chemin menant au fichier de delta.
+
+        Returns:
+            Mediatheque: La médiathèque mise à jour (voir appliquer_changements).
+        """
+        with open(chemin_delta, encoding="utf-8") as fichier:
+            ligne_des_titres = fichier.readline().strip()
+            return self.appliquer_changements(self.iterer_changements(fichier, ligne_des_titres))
+
+    def recharger(self):
+        """
+        Méthode permettant de prendre en compte les modifications du fichier de
+        shows. Si des lignes ont seulement été ajoutées à la fin du fichier, elles
+        sont appliquées comme un delta (voir recharger_par_ajout); sinon, le
+        fichier est relu en entier (voir relire). La médiathèque n'est pas modifiée.
+
+        Returns:
+            Mediatheque: La médiathèque à jour, ou elle-même si le fichier n'a pas changé.
+        """
+        nouvelle = self.recharger_par_ajout()
+        return self.relire() if nouvelle is None else nouvelle
+
+    def recharger_par_ajout(self):
+        """
+        Méthode permettant d'appliquer comme un delta (voir appliquer_changements)
+        les lignes ajoutées à la fin du fichier de shows depuis son chargement;
+        une dernière ligne incomplète, en cours d'écriture, est laissée pour le
+        rechargement suivant.
+
+        Le fichier n'est considéré comme complété que s'il s'agit du même fichier
+        (même inode) et que la fin de la partie déjà chargée n'a pas changé (voir
+        empreinte_du_fichier): un fichier réécrit, même plus long, doit être relu.
+
+        Returns:
+            Mediatheque: La médiathèque à jour, elle-même si le fichier n'a pas
+            changé, ou None s'il doit être relu en entier.
+        """
+        taille, date_modification, inode, controle = self.version_du_fichier
+        stat_source = os.stat(self.chemin_fichier)
+        if stat_source.st_ino != inode:
+            return None
+        if stat_source.st_size == taille and stat_source.st_mtime_ns == date_modification:
+            return self
+        if not 0 < taille < stat_source.st_size or empreinte_du_fichier(self.chemin_fichier, taille)[3] != controle:
+            return None
+
+        with open(self.chemin_fichier, "rb") as fichier:
+            ligne_des_titres = fichier.readline().decode("utf-8").strip()
+            # L'octet précédant l'ajout permet de vérifier qu'il commence par une ligne entière.
+            fichier.seek(taille - 1)
+            ajout = fichier.read(stat_source.st_size - taille + 1)
+        if not ajout.startswith(b"\n"):
+            return None
+        lignes_completes = ajout[1:ajout.rfind(b"\n") + 1]
+        if not lignes_completes:
+            return self
+        nouvelle = self.appliquer_changements(
+            self.iterer_changements(lignes_completes.decode("utf-8").splitlines(), ligne_des_titres)
+        )
+        nouvelle.version_du_fichier = empreinte_du_fichier(self.chemin_fichier, taille + len(lignes_completes))
+        return nouvelle
+
+    def relire(self):
+        """
+        Méthode permettant de relire le fichier de shows en entier, avec les
+        mêmes paramètres que la médiathèque. Elle ne partage rien avec la
+        médiathèque et peut donc être appelée depuis un autre fil.
+
+        Returns:
+            Mediatheque: La nouvelle médiathèque.
+        """
+        return Mediatheque(
+            self.chemin_fichier, self.attributs_indexes, self.utiliser_instantane, self.filtre, self.processus
+        )
+
+    @chronometrer()
     def filtrer_ids_sur_attribut_par_inclusion_de_string(self, attribut, valeur):
         """
         Méthode permettant de récupérer uniquement les identifiants des
         shows de la médiathèque où la valeur de l'attribut passé
         en argument contient la valeur passée en argument.
-        Le filtre est insensible à la casse.
+        Le filtre est insensible à la casse. Si l'attribut est indexé,
+        la recherche passe par l'index inversé plutôt que par un parcours
+        complet de la médiathèque.
 
         Args:
             attribut (str): Attribut de filtre
@@ -83,9 +1002,23 @@ class Mediatheque:
         Returns:
             list: Liste des show_ids respectant les critères du filtre.
         """
+        if attribut in self.attributs_indexes and isinstance(valeur, str):
+            # L'index peut contenir des shows qui ne font pas partie de la médiathèque,
+            # ou l'ancienne version d'un show modifié (voir appliquer_changements).
+            index = self.obtenir_index_texte(attribut)
+            identifiants = self.catalogue.colonnes["identifiant"]
+            rangs = self.shows.rangs
+            return [identifiants[rang] for rang in index.rechercher(valeur) if rangs.get(identifiants[rang]) == rang]
+
+        if attribut in self.ATTRIBUTS_TEXTE_NORMALISES and isinstance(valeur, str):
+            val = valeur.lower()
+            textes = self.obtenir_valeurs_normalisees(attribut)
+            return [show_id for show_id, rang in self.shows.rangs.items() if val in textes[rang]]
+
         val = valeur.lower() if isinstance(valeur, str) else valeur
         return [show_id for show_id, show in self.shows.items() if val in getattr(show, attribut).lower()]
 
+    @chronometrer()
     def filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string(self, attribut, valeur):
         """
         Méthode permettant de récupérer uniquement les identifiants des 
@@ -102,9 +1035,165 @@ class Mediatheque:
         Returns:
             list: Liste des show_ids respectant les critères du filtre.
         """
+        if attribut in self.ATTRIBUTS_A_FACETTES and isinstance(valeur, str):
+            identifiants = self.catalogue.colonnes["identifiant"]
+            return [identifiants[rang] for rang in rangs_de(self.ensemble_liste_contient(attribut, valeur))]
+
+        if (
+            attribut in self.ATTRIBUTS_LISTE_NORMALISES
+            and isinstance(valeur, str)
+            and self.SEPARATEUR_DE_LISTE not in valeur
+        ):
+            val = valeur.lower()
+            listes = self.obtenir_valeurs_normalisees(attribut)
+            if not val:
+                # La chaîne vide est incluse dans tout élément: il suffit que la liste ne soit pas vide.
+                return [show_id for show_id, rang in self.shows.rangs.items() if listes[rang]]
+            return [show_id for show_id, rang in self.shows.rangs.items() if val in listes[rang]]
+
         val = valeur.lower() if isinstance(valeur, str) else valeur
-        return [show_id for show_id, show in self.shows.items() if any([val in p.lower() for p in getattr(show, attribut)])]
+        return [show_id for show_id, show in self.shows.items() if any(val in p.lower() for p in getattr(show, attribut))]
+
+    @chronometrer()
+    def rechercher_par_pertinence(self, attribut, recherche, limite=None):
+        """
+        Méthode permettant de rechercher des shows par titre, par acteur ou par
+        directeur en tolérant les fautes de frappe et les accents (voir IndexFlou).
+        Les shows sont classés par pertinence BM25, mélangée à leur popularité
+        (voir classer_par_pertinence). Pour une liste, un show reçoit la
+        pertinence de son nom le plus pertinent.
+
+        Avec une limite, les shows sont parcourus du plus au moins pertinent
+        et seuls ceux qui peuvent encore faire partie des premiers sont notés
+        (voir classer_les_premiers_par_pertinence).
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+            recherche (str): Les mots recherchés.
+            limite (int, optional): Si fourni, seuls les limite premiers show_ids sont retournés.
+
+        Returns:
+            list: Les show_ids trouvés, du plus au moins pertinent.
+        """
+        index, rangs_par_nom = self.obtenir_index_flou(attribut)
+        if limite is not None:
+            return classer_les_premiers_par_pertinence(self.parcourir_par_pertinence(attribut, recherche), limite)
+        pertinences = index.rechercher(recherche)
+        if rangs_par_nom is not None:
+            pertinences = reporter_sur_les_shows(pertinences, rangs_par_nom)
+
+        # L'index peut contenir des shows qui ne font pas partie de la médiathèque,
+        # ou l'ancienne version d'un show modifié (voir appliquer_changements).
+        identifiants = self.catalogue.colonnes["identifiant"]
+        rangs = self.shows.rangs
+        popularites = self.obtenir_valeurs_normalisees("popularite")
+        return classer_par_pertinence(
+            (
+                (pertinence, popularites[rang], rang, identifiants[rang])
+                for rang, pertinence in pertinences.items()
+                if rangs.get(identifiants[rang]) == rang
+            ),
+            limite,
+        )
+
+    def parcourir_par_pertinence(self, attribut, recherche):
+        """
+        Générateur parcourant les shows de la médiathèque trouvés par une
+        recherche par pertinence, du plus au moins pertinent (voir
+        IndexFlou.parcourir_par_pertinence).
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+            recherche (str): Les mots recherchés.
+
+        Yields:
+            tuple: La pertinence, la popularité normalisée, le rang et le show_id
+            de chaque show (voir classer_par_pertinence).
+        """
+        index, rangs_par_nom = self.obtenir_index_flou(attribut)
+        trouves = index.parcourir_par_pertinence(recherche)
+        if rangs_par_nom is not None:
+            trouves = parcourir_les_shows(trouves, rangs_par_nom)
+        identifiants = self.catalogue.colonnes["identifiant"]
+        rangs = self.shows.rangs
+        popularites = self.obtenir_valeurs_normalisees("popularite")
+        for pertinence, rang in trouves:
+            show_id = identifiants[rang]
+            if rangs.get(show_id) == rang:
+                yield pertinence, popularites[rang], rang, show_id
+
+    def recommander_par_similarite(self, show_ids, limite):
+        """
+        Méthode permettant de récupérer les shows de la médiathèque les plus
+        semblables à quelques shows, parmi les voisins précalculés de ceux-ci
+        (voir Recommandeur.scores). À note égale, le premier show du catalogue
+        l'emporte.
+
+        Args:
+            show_ids (iterable): Les show_ids des shows de référence. Ceux qui ne
+            font pas partie de la médiathèque sont ignorés.
+            limite (int): Le nombre maximal de show_ids retournés.
+
+        Returns:
+            list: Les show_ids, du plus au moins semblable.
+        """
+        rangs = self.shows.rangs
+        identifiants = self.catalogue.colonnes["identifiant"]
+        scores = self.obtenir_recommandeur().scores(rangs[show_id] for show_id in show_ids if show_id in rangs)
+        meilleurs = heapq.nlargest(
+            limite,
+            (
+                (score, -rang, identifiants[rang])
+                for rang, score in scores.items()
+                if rangs.get(identifiants[rang]) == rang
+            ),
+        )
+        return [show_id for _, _, show_id in meilleurs]
+
+    @chronometrer()
+    def recommander(self, show_ids, limite=None):
+        """
+        Méthode permettant de recommander des shows de la médiathèque: ceux qui
+        ressemblent à un show (un seul show_id), ou ceux à proposer à un
+        utilisateur d'après les shows qu'il a consultés. Les shows recommandés
+        font tous partie de la médiathèque: pour une vue, ils respectent donc
+        son filtre d'accès. S'il n'y a pas assez de shows semblables, les
+        recommandations sont complétées par les shows les plus populaires.
+
+        Les dernières recommandations servies sont conservées, par show_ids et limite.
+
+        Args:
+            show_ids (iterable): Les show_ids des shows de référence, jamais recommandés.
+            limite (int, optional): Le nombre de show_ids à retourner. Par défaut,
+            NOMBRE_DE_RECOMMANDATIONS.
+
+        Returns:
+            list: Les show_ids recommandés, du plus au moins pertinent.
+        """
+        show_ids = tuple(show_ids)
+        if limite is None:
+            limite = self.NOMBRE_DE_RECOMMANDATIONS
+        cle = (show_ids, limite)
+        recommandations = self.recommandations.get(cle)
+        if recommandations is not None:
+            self.recommandations.move_to_end(cle)
+            return list(recommandations)
 
+        recommandations = self.recommander_par_similarite(show_ids, limite)
+        if len(recommandations) < limite:
+            exclus = set(show_ids).union(recommandations)
+            for show_id in self.iterer_ids_tries_par_attribut(None, "popularite"):
+                if len(recommandations) == limite:
+                    break
+                if show_id not in exclus:
+                    recommandations.append(show_id)
+
+        self.recommandations[cle] = tuple(recommandations)
+        if len(self.recommandations) > self.TAILLE_DU_CACHE_DE_RECOMMANDATIONS:
+            self.recommandations.popitem(last=False)
+        return recommandations
+
+    @chronometrer()
     def filtrer_ids_sur_age(self, age_utilisateur):
         """
         Méthode permettant de récupérer uniquement les shows de
@@ -117,24 +1206,131 @@ class Mediatheque:
         Returns:
             list: Liste des show_ids respectant la limite d'âge.
         """
-        return [show_id for show_id in self.shows if self.shows[show_id].age_minimum_requis <= age_utilisateur]
+        ensemble = self.obtenir_ensemble_age_permis(age_utilisateur) & self.obtenir_ensemble_des_shows()
+        identifiants = self.catalogue.colonnes["identifiant"]
+        return [identifiants[rang] for rang in rangs_de(ensemble)]
 
-    def trier_ids_par_attribut(self, show_ids, attribut):
+    @chronometrer()
+    def trier_ids_par_attribut(self, show_ids, attribut, limite=None):
         """
         Méthode permettant de trier les show_ids d'une médiathèque
         en ordre décroissant en se basant sur un attribut particulier
         des shows. Nous utilisons la méthode native sorted qui
         opère sur les listes.
 
+        Pour un attribut numérique, le tri s'appuie sur la permutation triée
+        de la médiathèque (voir obtenir_ordre_de_tri): un grand ensemble de
+        show_ids, donné dans l'ordre de la médiathèque, est obtenu en parcourant
+        cette permutation, les autres sont triés directement (ou par tas si
+        seuls les premiers sont demandés). Dans tous les cas, comme avec sorted,
+        les shows de même valeur gardent leur ordre dans show_ids.
+
         Args:
-            show_ids (list): Identifiants des shows à trier
+            show_ids (list): Identifiants des shows à trier. None signifie
+            tous les shows de la médiathèque.
             attribut (str): Attribut de tri
+            limite (int, optional): Si fourni, seuls les limite premiers
+            show_ids triés sont retournés.
 
         Returns:
             list: Liste des show_ids triée en ordre décroissant 
                   de l'attribut d'intérêt.
         """
-        return sorted(show_ids, key=lambda show_id: getattr(self.shows[show_id], attribut), reverse=True)
+        if attribut not in Catalogue.ATTRIBUTS_NUMERIQUES:
+            if show_ids is None:
+                show_ids = list(self.shows)
+            show_ids = sorted(show_ids, key=lambda show_id: getattr(self.shows[show_id], attribut), reverse=True)
+            return show_ids if limite is None else show_ids[:limite]
+
+        identifiants = self.catalogue.colonnes["identifiant"]
+        ordre = self.obtenir_ordre_de_tri(attribut)
+        if show_ids is None:
+            return [identifiants[rang] for rang in (ordre if limite is None else ordre[:limite])]
+
+        rangs = self.shows.rangs
+        rangs_voulus = [rangs[show_id] for show_id in show_ids]
+        if self.est_un_grand_sous_ensemble_ordonne(rangs_voulus, len(ordre)):
+            # Sous-ensemble assez grand: un parcours de la permutation coûte moins qu'un tri.
+            rangs_voulus = set(rangs_voulus)
+            selection = (rang for rang in ordre if rang in rangs_voulus)
+            return [identifiants[rang] for rang in itertools.islice(selection, limite)]
+
+        # La clé est lue directement dans la colonne, sans construire d'objet Show.
+        # sorted et heapq.nlargest sont stables: les égalités gardent l'ordre de show_ids.
+        colonne = self.catalogue.colonnes[attribut]
+
+        def cle(show_id):
+            return colonne[rangs[show_id]]
+
+        if limite is not None:
+            return heapq.nlargest(limite, show_ids, key=cle)
+        return sorted(show_ids, key=cle, reverse=True)
+
+    def iterer_ids_tries_par_attribut(self, show_ids, attribut):
+        """
+        Générateur produisant les show_ids triés en ordre décroissant d'un
+        attribut, dans le même ordre que trier_ids_par_attribut, mais sans
+        trier d'avance les shows qui ne sont jamais demandés.
+
+        Pour un attribut numérique, la permutation triée est parcourue (tous
+        les shows ou un grand sous-ensemble) ou un tas est vidé au fur et à
+        mesure (petit sous-ensemble). Les autres attributs sont triés d'un coup.
+
+        Args:
+            show_ids (list): Identifiants des shows à trier. None signifie
+            tous les shows de la médiathèque.
+            attribut (str): Attribut de tri
+
+        Yields:
+            str: Les show_ids dans l'ordre du tri.
+        """
+        if attribut not in Catalogue.ATTRIBUTS_NUMERIQUES:
+            yield from self.trier_ids_par_attribut(show_ids, attribut)
+            return
+
+        identifiants = self.catalogue.colonnes["identifiant"]
+        ordre = self.obtenir_ordre_de_tri(attribut)
+        if show_ids is None:
+            for rang in ordre:
+                yield identifiants[rang]
+            return
+
+        rangs = self.shows.rangs
+        rangs_voulus = [rangs[show_id] for show_id in show_ids]
+        if self.est_un_grand_sous_ensemble_ordonne(rangs_voulus, len(ordre)):
+            rangs_voulus = set(rangs_voulus)
+            for rang in ordre:
+                if rang in rangs_voulus:
+                    yield identifiants[rang]
+            return
+
+        # La position dans show_ids départage les égalités, comme trier_ids_par_attribut.
+        colonne = self.catalogue.colonnes[attribut]
+        tas = [(-colonne[rang], position, rang) for position, rang in enumerate(rangs_voulus)]
+        heapq.heapify(tas)
+        while tas:
+            yield identifiants[heapq.heappop(tas)[2]]
+
+    @staticmethod
+    def est_un_grand_sous_ensemble_ordonne(rangs_voulus, nombre_de_shows):
+        """
+        Méthode permettant de vérifier si des show_ids peuvent être triés en
+        parcourant la permutation triée de la médiathèque: ils doivent être
+        donnés dans l'ordre de la médiathèque, sans doublon (la permutation
+        départage les égalités par rang), et assez nombreux pour que le
+        parcours coûte moins qu'un tri.
+
+        Args:
+            rangs_voulus (list): Rang dans le catalogue de chaque show_id, dans l'ordre.
+            nombre_de_shows (int): Nombre de shows de la médiathèque.
+
+        Returns:
+            bool: True si la permutation peut être parcourue, False sinon.
+        """
+        nombre = len(rangs_voulus)
+        return nombre * max(1, nombre.bit_length()) >= nombre_de_shows and all(
+            precedent < rang for precedent, rang in zip(rangs_voulus, itertools.islice(rangs_voulus, 1, None))
+        )
 
     def lister_valeurs_uniques_par_attribut(self, attribut):
         """
@@ -150,8 +1346,290 @@ class Mediatheque:
         Returns:
             list: Liste des valeurs uniques de l'attribut de type list.
         """
+        colonne = self.catalogue.colonnes.get(attribut)
+        if isinstance(colonne, ColonneDeListes):
+            if self.couvre_tout_le_catalogue:
+                # Des changements appliqués depuis ont pu ajouter des valeurs à la table partagée.
+                return sorted(colonne.table.valeurs[:self.tailles_des_tables[attribut]])
+            if attribut in self.ATTRIBUTS_A_FACETTES:
+                tous = self.obtenir_ensemble_des_shows()
+                return sorted(valeur for valeur, ensemble in self.obtenir_facettes(attribut).items() if ensemble & tous)
+            codes = set()
+            for rang in self.shows.rangs.values():
+                codes.update(colonne.codes_de(rang))
+            return sorted(colonne.table.valeurs[code] for code in codes)
         return sorted(list(set([el for show in self.shows.values() for el in getattr(show, attribut)])))
 
+    def vue(self, filtre):
+        """
+        Méthode permettant de récupérer la vue de la médiathèque limitée aux
+        shows accessibles selon un filtre, sans copier ni modifier la médiathèque.
+        Les vues sont conservées par clé de filtre (voir FiltreDAcces.cle):
+        tous les utilisateurs ayant la même clé partagent la même vue. Seules
+        les TAILLE_DU_CACHE_DE_VUES dernières vues utilisées sont conservées.
+
+        Args:
+            filtre (FiltreDAcces): Le filtre d'accès de l'utilisateur.
+
+        Returns:
+            VueMediatheque: La vue.
+        """
+        cle = filtre.cle()
+        vue = self.vues.get(cle)
+        if vue is not None:
+            self.vues.move_to_end(cle)
+            return vue
+
+        ensemble = self.obtenir_ensemble_age_permis(filtre.age_utilisateur) & self.obtenir_ensemble_des_shows()
+        if filtre.pays is not None:
+            ensemble &= self.ensemble_liste_contient("pays", filtre.pays)
+        vue = self.vues[cle] = VueMediatheque(self, ensemble, filtre)
+        if len(self.vues) > self.TAILLE_DU_CACHE_DE_VUES:
+            self.vues.popitem(last=False)
+        return vue
+
+    def obtenir_ensemble_des_shows(self):
+        """
+        Méthode permettant de récupérer l'ensemble de bits des rangs des shows
+        de la médiathèque, en le calculant lors du premier appel.
+
+        Returns:
+            int: L'ensemble de bits (voir ensemble_de_bits).
+        """
+        if self.ensemble_des_shows is None:
+            self.ensemble_des_shows = ensemble_depuis_rangs(self.shows.rangs.values(), len(self.catalogue))
+        return self.ensemble_des_shows
+
+    def executer(self, requete):
+        """
+        Méthode permettant d'exécuter une Requete sur la médiathèque.
+
+        Le prédicat est évalué sur des ensembles de bits (voir evaluer_predicat):
+        les prédicats indexés sont calculés en premier et réduisent les candidats,
+        puis les autres sont vérifiés ensemble, en un seul parcours des candidats
+        restants. Les résultats sont ensuite triés par trier_ids_par_attribut.
+
+        Args:
+            requete (Requete): La requête à exécuter.
+
+        Returns:
+            list: Les show_ids des résultats, dans l'ordre de la médiathèque
+            ou dans l'ordre du tri de la requête.
+        """
+        tous = self.obtenir_ensemble_des_shows()
+        ensemble = tous if requete.predicat is None else self.evaluer_predicat(requete.predicat, tous)
+        fin = None if requete.limite is None else requete.decalage + requete.limite
+
+        if requete.tri is not None and ensemble == tous:
+            # Tous les shows sont triés: la permutation triée est utilisée directement.
+            show_ids = None
+        else:
+            identifiants = self.catalogue.colonnes["identifiant"]
+            show_ids = [identifiants[rang] for rang in rangs_de(ensemble)]
+        if requete.tri is not None:
+            show_ids = self.trier_ids_par_attribut(show_ids, requete.tri, fin)
+        return show_ids[requete.decalage:fin]
+
+    def evaluer_predicat(self, predicat, candidats):
+        """
+        Méthode permettant de récupérer l'ensemble des candidats respectant un prédicat.
+
+        Un prédicat indexé (voir predicat_est_indexe) est calculé directement
+        comme un ensemble de bits. Dans un Et, les prédicats indexés sont
+        appliqués en premier, puis les autres sont regroupés en un seul test
+        vérifié sur les candidats restants; dans un Ou, seuls les candidats
+        qui ne sont pas déjà acceptés sont vérifiés.
+
+        Args:
+            predicat (Predicat): Le prédicat à évaluer.
+            candidats (int): L'ensemble de bits des rangs à considérer.
+
+        Returns:
+            int: L'ensemble de bits des candidats respectant le prédicat.
+        """
+        if self.predicat_est_indexe(predicat):
+            return self.ensemble_du_predicat(predicat) & candidats
+
+        if isinstance(predicat, Et):
+            autres = []
+            for sous_predicat in predicat.predicats:
+                if self.predicat_est_indexe(sous_predicat):
+                    candidats &= self.ensemble_du_predicat(sous_predicat)
+                    if not candidats:
+                        return 0
+                else:
+                    autres.append(sous_predicat)
+            return self._filtrer_ensemble(candidats, Et(*autres)) if autres else candidats
+
+        if isinstance(predicat, Ou):
+            resultat = 0
+            autres = []
+            for sous_predicat in predicat.predicats:
+                if self.predicat_est_indexe(sous_predicat):
+                    resultat |= self.ensemble_du_predicat(sous_predicat) & candidats
+                else:
+                    autres.append(sous_predicat)
+            if autres:
+                resultat |= self._filtrer_ensemble(candidats & ~resultat, Ou(*autres))
+            return resultat
+
+        if isinstance(predicat, Non):
+            return candidats & ~self.evaluer_predicat(predicat.predicat, candidats)
+
+        return self._filtrer_ensemble(candidats, predicat)
+
+    def predicat_est_indexe(self, predicat):
+        """
+        Méthode permettant de savoir si un prédicat peut être calculé
+        directement comme un ensemble de bits, sans vérifier chaque show.
+
+        Args:
+            predicat (Predicat): Le prédicat.
+
+        Returns:
+            bool: True si le prédicat est indexé.
+        """
+        if isinstance(predicat, (Et, Ou)):
+            return all(self.predicat_est_indexe(sous_predicat) for sous_predicat in predicat.predicats)
+        if isinstance(predicat, Non):
+            return self.predicat_est_indexe(predicat.predicat)
+        if isinstance(predicat, AgePermis):
+            return True
+        if isinstance(predicat, ListeContient):
+            return predicat.attribut in self.ATTRIBUTS_A_FACETTES
+        return isinstance(predicat, Contient) and predicat.attribut in self.attributs_indexes
+
+    def ensemble_du_predicat(self, predicat):
+        """
+        Méthode permettant de calculer l'ensemble de bits des shows de la
+        médiathèque respectant un prédicat indexé.
+
+        Args:
+            predicat (Predicat): Le prédicat, indexé.
+
+        Returns:
+            int: L'ensemble de bits.
+        """
+        if isinstance(predicat, Et):
+            ensemble = self.obtenir_ensemble_des_shows()
+            for sous_predicat in predicat.predicats:
+                ensemble &= self.ensemble_du_predicat(sous_predicat)
+            return ensemble
+        if isinstance(predicat, Ou):
+            ensemble = 0
+            for sous_predicat in predicat.predicats:
+                ensemble |= self.ensemble_du_predicat(sous_predicat)
+            return ensemble
+        if isinstance(predicat, Non):
+            return self.obtenir_ensemble_des_shows() & ~self.ensemble_du_predicat(predicat.predicat)
+
+        if isinstance(predicat, AgePermis):
+            return self.obtenir_ensemble_age_permis(predicat.age_utilisateur) & self.obtenir_ensemble_des_shows()
+        if isinstance(predicat, ListeContient):
+            return self.ensemble_liste_contient(predicat.attribut, predicat.valeur)
+
+        # L'index peut contenir des shows qui ne font pas partie de la médiathèque.
+        index = self.obtenir_index_texte(predicat.attribut)
+        ensemble = ensemble_depuis_rangs(index.rechercher(predicat.valeur), len(self.catalogue))
+        return ensemble & self.obtenir_ensemble_des_shows()
+
+    def test_du_predicat(self, predicat):
+        """
+        Méthode permettant de construire la fonction qui vérifie un prédicat
+        sur un show, à partir de son rang. Les colonnes nécessaires sont
+        récupérées une seule fois; dans un Et ou un Ou, les prédicats les
+        moins coûteux sont vérifiés en premier.
+
+        Args:
+            predicat (Predicat): Le prédicat.
+
+        Returns:
+            function: Fonction recevant un rang et retournant True si le show le respecte.
+        """
+        if isinstance(predicat, (Et, Ou)):
+            tests = [
+                self.test_du_predicat(sous_predicat)
+                for sous_predicat in sorted(predicat.predicats, key=lambda sous_predicat: sous_predicat.COUT)
+            ]
+            attendu = isinstance(predicat, Ou)
+
+            def test_combine(rang):
+                # Et s'arrête au premier test faux, Ou au premier test vrai.
+                for test in tests:
+                    if test(rang) is attendu:
+                        return attendu
+                return not attendu
+
+            return test_combine
+
+        if isinstance(predicat, Non):
+            test = self.test_du_predicat(predicat.predicat)
+            return lambda rang: not test(rang)
+
+        if isinstance(predicat, AgePermis):
+            ages = self.catalogue.colonnes["age_minimum_requis"]
+            age_utilisateur = predicat.age_utilisateur
+            return lambda rang: ages[rang] <= age_utilisateur
+
+        val = predicat.valeur.lower()
+        if isinstance(predicat, ListeContient):
+            if self.SEPARATEUR_DE_LISTE in val:
+                colonne = self.catalogue.colonnes[predicat.attribut]
+                return lambda rang: any(val in element.lower() for element in colonne[rang])
+            listes = self.obtenir_valeurs_normalisees(predicat.attribut)
+            if not val:
+                return lambda rang: bool(listes[rang])
+            return lambda rang: val in listes[rang]
+
+        if predicat.attribut in self.ATTRIBUTS_TEXTE_NORMALISES:
+            textes = self.obtenir_valeurs_normalisees(predicat.attribut)
+            return lambda rang: val in textes[rang]
+        colonne = self.catalogue.colonnes[predicat.attribut]
+        return lambda rang: val in colonne[rang].lower()
+
+    def _filtrer_ensemble(self, candidats, predicat):
+        """
+        Méthode permettant de vérifier un prédicat sur chacun des candidats,
+        en un seul parcours.
+
+        Args:
+            candidats (int): L'ensemble de bits des rangs à vérifier.
+            predicat (Predicat): Le prédicat.
+
+        Returns:
+            int: L'ensemble de bits des candidats respectant le prédicat.
+        """
+        rangs = rangs_de(candidats)
+        if isinstance(predicat, Et):
+            # Les filtres sont enchaînés: chaque candidat traverse les tests un à un, en un seul parcours.
+            for sous_predicat in sorted(predicat.predicats, key=lambda sous_predicat: sous_predicat.COUT):
+                rangs = filter(self.test_du_predicat(sous_predicat), rangs)
+        else:
+            rangs = filter(self.test_du_predicat(predicat), rangs)
+        return ensemble_depuis_rangs(rangs, len(self.catalogue))
+
+    def rendre_show(self, show_id):
+        """
+        Méthode permettant de récupérer le texte affiché d'un show (str(show)).
+        Les TAILLE_DU_CACHE_DE_RENDU derniers textes rendus sont conservés;
+        au-delà, le moins récemment utilisé est oublié.
+
+        Args:
+            show_id (str): Identifiant du show.
+
+        Returns:
+            str: Le texte du show.
+        """
+        rang = self.shows.rangs[show_id]
+        texte = self.rendus.get(rang)
+        if texte is None:
+            texte = self.rendus[rang] = str(self.catalogue.show(rang))
+            if len(self.rendus) > self.TAILLE_DU_CACHE_DE_RENDU:
+                self.rendus.popitem(last=False)
+        else:
+            self.rendus.move_to_end(rang)
+        return texte
+
     def afficher_avec_pagination(
         self,
         identifiants=None,
@@ -163,28 +1641,105 @@ class Mediatheque:
         médiathèque. Cette méthode offre la pagination de l'affichage s'il
         y a trop de shows dans la médiathèque.
 
+        Les pages sont calculées à la demande par un Paginateur: afficher la
+        première page ne demande pas de trier tous les shows, et une page
+        déjà affichée n'est pas recalculée.
+
         Args:
-            identifiants (list): Liste des show_ids à afficher.
+            identifiants (list): Liste des show_ids à afficher. None signifie
+            tous les shows de la médiathèque.
             nombre_de_shows_par_page (int, optional): Nombre de shows
             à afficher par page. La valeur par défaut est de 10.
 
             attribut_pour_trier (str): Attribut de tri.
         """
-        show_ids = self.trier_ids_par_attribut(identifiants, attribut_pour_trier)
-        nb_pages = int(math.ceil(len(show_ids) / nombre_de_shows_par_page))
-        i = 0
-        while i < nb_pages:
-            print(f"Page: {i + 1} sur {nb_pages}")
-            for j in range(i * nombre_de_shows_par_page, min(len(show_ids), (i + 1) * nombre_de_shows_par_page)):
-                print((self.shows[show_ids[j]]))
-            print(f"Page: {i + 1} sur {nb_pages}")
-
-            choix = input("Entrer s [page suivante], p [page précédente], q [quitter]: ")
-            if choix.lower() == "s":
-                if i < nb_pages - 1:
-                    i += 1
-            elif choix.lower() == "p":
-                if i > 0:
-                    i -= 1
-            else:
-                break
+        paginateur = Paginateur(self, identifiants, nombre_de_shows_par_page, attribut_pour_trier)
+        numero_de_page = 0 if len(paginateur) else None
+        while numero_de_page is not None:
+            sys.stdout.write(paginateur.rendre_page_avec_entetes(numero_de_page))
+            choix = input(Paginateur.QUESTION_DE_NAVIGATION)
+            numero_de_page = paginateur.page_apres_choix(numero_de_page, choix)
+
+
+class VueMediatheque(Mediatheque):
+    """
+    Classe représentant une vue immuable d'une médiathèque, limitée à une
+    partie de ses shows (par exemple ceux auxquels un utilisateur a accès).
+
+    Une vue ne copie aucune donnée: elle partage le catalogue et les structures
+    dérivées de tout le catalogue (valeurs normalisées, index inversés et flous,
+    ensembles de bits par valeur, voisins des shows, textes rendus) avec sa
+    médiathèque. Seuls les rangs de ses shows, ses permutations triées et ses
+    recommandations lui sont propres.
+    Elle offre les mêmes méthodes de consultation qu'une Mediatheque.
+
+    Une vue ne peut pas être modifiée, mais la médiathèque met ses vues à jour
+    lorsqu'elle applique des changements (voir Mediatheque.appliquer_changements).
+
+    Une VueMediatheque est composée des attributs suivants:
+        - mediatheque (Mediatheque): la médiathèque dont elle est issue.
+        - filtre (FiltreDAcces): le filtre d'accès qui définit ses shows.
+        - shows (VueShows): dictionnaire des shows de la vue.
+    """
+    def __init__(self, mediatheque, ensemble, filtre):
+        """
+        Args:
+            mediatheque (Mediatheque): La médiathèque.
+            ensemble (int): L'ensemble de bits des rangs des shows de la vue
+            (tous des shows de la médiathèque).
+            filtre (FiltreDAcces): Le filtre d'accès dont ensemble est le résultat.
+        """
+        self.mediatheque = mediatheque
+        self.filtre = filtre
+        self.attributs_indexes = mediatheque.attributs_indexes
+        self.catalogue = mediatheque.catalogue
+        identifiants = self.catalogue.colonnes["identifiant"]
+        self.shows = VueShows(self.catalogue, {identifiants[rang]: rang for rang in rangs_de(ensemble)})
+        # Structures portant sur tout le catalogue: partagées avec la médiathèque.
+        self.valeurs_normalisees = mediatheque.valeurs_normalisees
+        self.index_textes = mediatheque.index_textes
+        self.index_flous = mediatheque.index_flous
+        self.facettes = mediatheque.facettes
+        self.rendus = mediatheque.rendus
+        # Structures propres aux shows de la vue.
+        self.ordres_de_tri = {}
+        self.recommandations = collections.OrderedDict()
+        self.ensemble_des_shows = ensemble
+        self.couvre_tout_le_catalogue = False
+        self.vues = collections.OrderedDict()
+
+    def obtenir_ensemble_age_permis(self, age_utilisateur):
+        return self.mediatheque.obtenir_ensemble_age_permis(age_utilisateur)
+
+    def obtenir_recommandeur(self):
+        return self.mediatheque.obtenir_recommandeur()
+
+    def reduire_liste_des_shows(self, identifiants_a_garder):
+        """
+        Une vue est immuable: pour une partie de ses shows, il faut créer une autre vue.
+        """
+        raise TypeError("Une vue de médiathèque ne peut pas être modifiée.")
+
+    def appliquer_changements(self, changements):
+        """
+        Les changements sont appliqués à la médiathèque, qui met ses vues à jour.
+        """
+        raise TypeError("Les changements s'appliquent à la médiathèque, pas à une vue.")
+
+    def recharger(self):
+        """
+        Les changements sont appliqués à la médiathèque, qui met ses vues à jour.
+        """
+        raise TypeError("Les changements s'appliquent à la médiathèque, pas à une vue.")
+
+    def recharger_par_ajout(self):
+        """
+        Les changements sont appliqués à la médiathèque, qui met ses vues à jour.
+        """
+        raise TypeError("Les changements s'appliquent à la médiathèque, pas à une vue.")
+
+    def relire(self):
+        """
+        Les changements sont appliqués à la médiathèque, qui met ses vues à jour.
+        """
+        raise TypeError("Les changements s'appliquent à la médiathèque, pas à une vue.")
@@ -0,0 +1,124 @@
+import itertools
+import math
+
+from instrumentation import chronometrer
+
+
+class Paginateur:
+    """
+    Classe représentant le découpage en pages d'une liste de shows triée.
+
+    Les pages sont calculées à la demande: le tri n'avance que jusqu'à la
+    dernière page consultée, et le texte de chaque page affichée est conservé
+    pour qu'un retour en arrière ne coûte rien.
+
+    Un Paginateur est composé des attributs suivants:
+        - mediatheque (Mediatheque): la médiathèque contenant les shows.
+        - nombre_de_shows_par_page (int): le nombre de shows par page.
+        - nombre_de_pages (int): le nombre total de pages.
+        - ids_tries (list): les show_ids triés calculés jusqu'à présent.
+        - pages_rendues (dict): le texte de chaque page déjà affichée.
+    """
+    def __init__(self, mediatheque, identifiants, nombre_de_shows_par_page, attribut_pour_trier):
+        """
+        Args:
+            mediatheque (Mediatheque): La médiathèque contenant les shows.
+            identifiants (list): Liste des show_ids à paginer. None signifie
+            tous les shows de la médiathèque.
+            nombre_de_shows_par_page (int): Nombre de shows par page.
+            attribut_pour_trier (str): Attribut de tri (ordre décroissant). None
+            signifie que les show_ids sont affichés dans l'ordre donné (par
+            exemple celui d'une recherche par pertinence).
+        """
+        self.mediatheque = mediatheque
+        self.nombre_de_shows_par_page = nombre_de_shows_par_page
+        nombre_de_shows = len(mediatheque) if identifiants is None else len(identifiants)
+        self.nombre_de_pages = int(math.ceil(nombre_de_shows / nombre_de_shows_par_page))
+        self.ids_tries = []
+        self.pages_rendues = {}
+        if attribut_pour_trier is None:
+            self._suite_des_ids = iter(mediatheque.shows if identifiants is None else identifiants)
+        else:
+            self._suite_des_ids = mediatheque.iterer_ids_tries_par_attribut(identifiants, attribut_pour_trier)
+
+    # Question posée après chaque page (voir page_apres_choix).
+    QUESTION_DE_NAVIGATION = "Entrer s [page suivante], p [page précédente], q [quitter]: "
+
+    def __len__(self):
+        """
+        Retourne le nombre de pages.
+        """
+        return self.nombre_de_pages
+
+    def page_apres_choix(self, numero_de_page, choix):
+        """
+        Méthode permettant de récupérer la page à afficher après la réponse
+        de l'utilisateur à QUESTION_DE_NAVIGATION: s avance d'une page, p
+        recule d'une page (sans sortir des pages existantes) et toute autre
+        réponse quitte l'affichage.
+
+        Args:
+            numero_de_page (int): Numéro de la page affichée (à partir de 0).
+            choix (str): La réponse de l'utilisateur.
+
+        Returns:
+            int: Le numéro de la page à afficher, ou None pour quitter.
+        """
+        choix = choix.lower()
+        if choix == "s":
+            return min(numero_de_page + 1, self.nombre_de_pages - 1)
+        if choix == "p":
+            return max(numero_de_page - 1, 0)
+        return None
+
+    def ids_de_la_page(self, numero_de_page):
+        """
+        Méthode permettant de récupérer les show_ids d'une page, en faisant
+        avancer le tri seulement jusqu'à la fin de cette page.
+
+        Args:
+            numero_de_page (int): Numéro de la page (à partir de 0).
+
+        Returns:
+            list: Les show_ids de la page, dans l'ordre.
+        """
+        debut = numero_de_page * self.nombre_de_shows_par_page
+        fin = debut + self.nombre_de_shows_par_page
+        manquants = fin - len(self.ids_tries)
+        if manquants > 0:
+            self.ids_tries.extend(itertools.islice(self._suite_des_ids, manquants))
+        return self.ids_tries[debut:fin]
+
+    @chronometrer()
+    def rendre_page(self, numero_de_page):
+        """
+        Méthode permettant de récupérer le texte d'une page, tel qu'il est
+        affiché (un show par bloc, chacun suivi d'un retour de ligne).
+
+        Args:
+            numero_de_page (int): Numéro de la page (à partir de 0).
+
+        Returns:
+            str: Le texte de la page.
+        """
+        texte = self.pages_rendues.get(numero_de_page)
+        if texte is None:
+            rendre_show = self.mediatheque.rendre_show
+            texte = self.pages_rendues[numero_de_page] = "".join(
+                rendre_show(show_id) + "\n" for show_id in self.ids_de_la_page(numero_de_page)
+            )
+        return texte
+
+    def rendre_page_avec_entetes(self, numero_de_page):
+        """
+        Méthode permettant de récupérer le texte d'une page précédé et suivi
+        de son numéro, à écrire d'un seul coup plutôt qu'un print par show.
+
+        Args:
+            numero_de_page (int): Numéro de la page (à partir de 0).
+
+        Returns:
+            str: Le texte affiché pour la page.
+        """
+        entete = f"Page: {numero_de_page + 1} sur {self.nombre_de_pages}\n"
+        return entete + self.rendre_page(numero_de_page) + entete
@@ -0,0 +1,618 @@
+import array
+import bisect
+import collections
+import heapq
+import math
+import re
+import unicodedata
+
+# Mots d'un texte: suites de lettres et de chiffres, après normalisation (voir normaliser).
+EXPRESSION_MOT = re.compile(r"[^\W_]+")
+# Part de la popularité dans le classement d'une recherche par pertinence (le reste
+# revient à la pertinence BM25).
+POIDS_DE_LA_POPULARITE = 0.2
+
+
+def normaliser(texte):
+    """
+    Fonction permettant de mettre un texte sous la forme comparée par la
+    recherche floue: en minuscules et sans accents (Zezé devient zeze).
+
+    Args:
+        texte (str): Le texte.
+
+    Returns:
+        str: Le texte normalisé.
+    """
+    texte = texte.lower()
+    if texte.isascii():
+        return texte
+    return "".join(caractere for caractere in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(caractere))
+
+
+def decouper(texte):
+    """
+    Fonction permettant de récupérer les mots normalisés d'un texte.
+
+    Args:
+        texte (str): Le texte.
+
+    Returns:
+        list: Les mots (str), dans l'ordre du texte.
+    """
+    return EXPRESSION_MOT.findall(normaliser(texte))
+
+
+def distance_d_edition(premier, second, maximum):
+    """
+    Fonction permettant de calculer la distance d'édition entre deux mots:
+    le nombre minimal d'insertions, de suppressions, de substitutions et
+    d'inversions de deux lettres voisines pour passer de l'un à l'autre.
+    Le calcul s'arrête dès que la distance dépasse maximum.
+
+    Args:
+        premier (str): Le premier mot.
+        second (str): Le second mot.
+        maximum (int): La distance au-delà de laquelle le calcul s'arrête.
+
+    Returns:
+        int: La distance, ou maximum + 1 si elle dépasse maximum.
+    """
+    if abs(len(premier) - len(second)) > maximum:
+        return maximum + 1
+    avant_precedente = None
+    precedente = list(range(len(second) + 1))
+    for i, lettre in enumerate(premier, 1):
+        courante = [i] + [0] * len(second)
+        minimum_de_la_ligne = i
+        for j, autre_lettre in enumerate(second, 1):
+            distance = min(
+                precedente[j] + 1,
+                courante[j - 1] + 1,
+                precedente[j - 1] + (lettre != autre_lettre),
+            )
+            if i > 1 and j > 1 and lettre == second[j - 2] and premier[i - 2] == autre_lettre:
+                distance = min(distance, avant_precedente[j - 2] + 1)
+            courante[j] = distance
+            if distance < minimum_de_la_ligne:
+                minimum_de_la_ligne = distance
+        if minimum_de_la_ligne > maximum:
+            return maximum + 1
+        avant_precedente, precedente = precedente, courante
+    return precedente[-1]
+
+
+def classer_par_pertinence(candidats, limite=None, poids_de_la_popularite=POIDS_DE_LA_POPULARITE):
+    """
+    Fonction permettant de classer les résultats d'une recherche: la note de
+    chacun mélange sa pertinence (relative à la meilleure) et sa popularité.
+    À note égale, le premier show de la médiathèque l'emporte.
+
+    Args:
+        candidats (iterable): Tuples (pertinence, popularite_normalisee, rang, show_id),
+        la popularité normalisée étant entre 0 et 1 (voir normaliser_popularites).
+        limite (int, optional): Si fourni, seuls les limite premiers show_ids sont retournés.
+        poids_de_la_popularite (float, optional): La part de la popularité dans la note.
+
+    Returns:
+        list: Les show_ids, du plus au moins pertinent.
+    """
+    candidats = list(candidats)
+    if not candidats:
+        return []
+    meilleure = max(candidat[0] for candidat in candidats)
+    poids_de_la_pertinence = (1 - poids_de_la_popularite) / meilleure
+    notes = (
+        (pertinence * poids_de_la_pertinence + popularite * poids_de_la_popularite, -rang, show_id)
+        for pertinence, popularite, rang, show_id in candidats
+    )
+    if limite is None:
+        classes = sorted(notes, reverse=True)
+    else:
+        classes = heapq.nlargest(limite, notes)
+    return [show_id for _, _, show_id in classes]
+
+
+def classer_les_premiers_par_pertinence(candidats, limite, poids_de_la_popularite=POIDS_DE_LA_POPULARITE):
+    """
+    Fonction permettant de récupérer les limite premiers résultats d'une
+    recherche, dans le même ordre que classer_par_pertinence, sans noter tous
+    les candidats: ceux-ci arrivent du plus au moins pertinent, et le parcours
+    s'arrête dès que la note d'un candidat ne peut plus dépasser celle du
+    dernier des limite meilleurs, même avec la plus grande popularité (1).
+
+    Args:
+        candidats (iterable): Tuples (pertinence, popularite_normalisee, rang, show_id),
+        par pertinence décroissante (voir IndexFlou.parcourir_par_pertinence).
+        limite (int): Le nombre maximal de show_ids retournés.
+        poids_de_la_popularite (float, optional): La part de la popularité dans la note.
+
+    Returns:
+        list: Les show_ids, du plus au moins pertinent.
+    """
+    if limite <= 0:
+        return []
+    meilleurs = []
+    poids_de_la_pertinence = None
+    for pertinence, popularite, rang, show_id in candidats:
+        if poids_de_la_pertinence is None:
+            # Le premier candidat est le plus pertinent.
+            poids_de_la_pertinence = (1 - poids_de_la_popularite) / pertinence
+        if len(meilleurs) == limite and pertinence * poids_de_la_pertinence + poids_de_la_popularite < meilleurs[0][0]:
+            break
+        note = (pertinence * poids_de_la_pertinence + popularite * poids_de_la_popularite, -rang, show_id)
+        if len(meilleurs) < limite:
+            heapq.heappush(meilleurs, note)
+        else:
+            heapq.heappushpop(meilleurs, note)
+    return [show_id for _, _, show_id in sorted(meilleurs, reverse=True)]
+
+
+def reporter_sur_les_shows(pertinences_des_noms, rangs_par_nom):
+    """
+    Fonction permettant de passer de la pertinence des noms trouvés (acteurs,
+    directeurs) à celle des shows: chaque show reçoit la pertinence de son
+    nom le plus pertinent.
+
+    Args:
+        pertinences_des_noms (dict): La pertinence (float) de chaque nom, par code.
+        rangs_par_nom (list): Les rangs des shows de chaque nom, par code.
+
+    Returns:
+        dict: La pertinence (float) de chaque show, par rang.
+    """
+    pertinences_des_shows = {}
+    for code, pertinence in pertinences_des_noms.items():
+        for rang in rangs_par_nom[code]:
+            if pertinence > pertinences_des_shows.get(rang, 0.0):
+                pertinences_des_shows[rang] = pertinence
+    return pertinences_des_shows
+
+
+def parcourir_les_shows(noms_par_pertinence, rangs_par_nom):
+    """
+    Générateur passant des noms trouvés (acteurs, directeurs), du plus au
+    moins pertinent, aux shows, dans le même ordre: comme pour
+    reporter_sur_les_shows, chaque show reçoit la pertinence de son nom le
+    plus pertinent, c'est-à-dire le premier rencontré.
+
+    Args:
+        noms_par_pertinence (iterable): Paires (pertinence, code du nom), par
+        pertinence décroissante (voir IndexFlou.parcourir_par_pertinence).
+        rangs_par_nom (list): Les rangs des shows de chaque nom, par code.
+
+    Yields:
+        tuple: La pertinence (float) et le rang de chaque show.
+    """
+    vus = set()
+    for pertinence, code in noms_par_pertinence:
+        for rang in rangs_par_nom[code]:
+            if rang not in vus:
+                vus.add(rang)
+                yield pertinence, rang
+
+
+def normaliser_popularites(popularites, maximum=None):
+    """
+    Fonction permettant de ramener des popularités entre 0 et 1, sur une
+    échelle logarithmique (quelques shows sont beaucoup plus populaires que
+    tous les autres).
+
+    Args:
+        popularites (iterable): Les popularités (float).
+        maximum (float, optional): La popularité ramenée à 1, au moins aussi
+        grande que toutes les autres. Par défaut, la plus grande des popularités.
+
+    Returns:
+        array: La popularité normalisée de chacune, dans le même ordre.
+    """
+    logarithmes = array.array("d", (math.log1p(max(popularite, 0.0)) for popularite in popularites))
+    if maximum is None:
+        echelle = max(logarithmes, default=0.0) or 1.0
+    else:
+        echelle = math.log1p(max(maximum, 0.0)) or 1.0
+    return array.array("d", (logarithme / echelle for logarithme in logarithmes))
+
+
+class IndexFlou:
+    """
+    Classe représentant un index de recherche plein texte tolérant les fautes
+    de frappe, avec un classement BM25.
+
+    Les textes sont découpés en mots normalisés (voir decouper). Chaque mot de
+    la recherche est rapproché des mots du vocabulaire de l'index: le même mot,
+    ceux qui le prolongent (recherche par préfixe) et ceux à une petite distance
+    d'édition. Ces derniers sont trouvés sans parcourir tout le vocabulaire:
+    seuls les mots de longueur voisine partageant le plus de trigrammes avec le
+    mot recherché sont comparés. La pertinence d'un document est la somme, pour
+    chaque mot de la recherche, de la meilleure contribution BM25 d'un mot
+    rapproché, pondérée par la proximité du rapprochement.
+
+    Un IndexFlou est composé des attributs suivants:
+        - identifiants (list): l'identifiant de chaque document, dans l'ordre d'ajout.
+        - longueurs (array): le nombre de mots de chaque document.
+        - termes (list): les mots distincts de l'index (le code d'un mot est sa position).
+        - codes_des_termes (dict): le code de chaque mot.
+        - documents_par_terme (list): pour chaque code, les positions des documents contenant le mot.
+        - frequences_par_terme (list): pour chaque code, le nombre d'occurrences du
+          mot dans chacun de ces documents.
+        - termes_par_trigramme (dict): pour chaque trigramme, les codes des mots qui le
+          contiennent, par longueur de mot.
+
+    Les documents peuvent aussi être parcourus du plus au moins pertinent (voir
+    parcourir_par_pertinence), sans noter ceux qui ne seront pas lus: pour cela,
+    les documents de chaque mot sont aussi gardés par contribution BM25
+    décroissante (listes triées par impact, voir impacts).
+    """
+    TAILLE_NGRAMME = 3
+    # Paramètres de BM25.
+    K1 = 1.2
+    B = 0.75
+    # Poids d'un mot rapproché selon sa distance d'édition au mot recherché (0, 1 ou 2).
+    FACTEURS_PAR_DISTANCE = (1.0, 0.7, 0.45)
+    # Poids d'un mot qui prolonge le mot recherché, et nombre maximal de tels mots.
+    FACTEUR_DU_PREFIXE = 0.8
+    MAXIMUM_DE_PREFIXES = 50
+    LONGUEUR_MINIMALE_DU_PREFIXE = 3
+    # Nombre maximal de mots comparés (distance d'édition) à un mot mal écrit: ceux qui
+    # partagent le plus de trigrammes avec lui.
+    MAXIMUM_DE_CANDIDATS = 24
+
+    def __init__(self, documents=()):
+        """
+        Construit l'index à partir des documents passés en argument.
+
+        Args:
+            documents (iterable): Paires (identifiant, texte) à indexer.
+        """
+        self.identifiants = []
+        self.longueurs = array.array("I")
+        self.longueur_totale = 0
+        self.termes = []
+        self.codes_des_termes = {}
+        self.documents_par_terme = []
+        self.frequences_par_terme = []
+        self.termes_par_trigramme = {}
+        # Structures dérivées, recalculées à la demande après un ajout.
+        self._vocabulaire_trie = None
+        self._parts_bm25 = {}
+        self._impacts = {}
+        for identifiant, texte in documents:
+            self.ajouter(identifiant, texte)
+
+    def __len__(self):
+        """
+        Retourne le nombre de documents indexés.
+        """
+        return len(self.identifiants)
+
+    @classmethod
+    def extraire_trigrammes(cls, mot):
+        """
+        Méthode permettant de récupérer les trigrammes distincts d'un mot, entouré
+        d'une espace de chaque côté (un mot de n lettres en a donc au plus n).
+
+        Args:
+            mot (str): Le mot.
+
+        Returns:
+            set: Les trigrammes du mot.
+        """
+        mot = f" {mot} "
+        n = cls.TAILLE_NGRAMME
+        return {mot[i:i + n] for i in range(len(mot) - n + 1)}
+
+    @staticmethod
+    def distance_permise(longueur):
+        """
+        Méthode permettant de récupérer la distance d'édition tolérée pour un mot:
+        aucune jusqu'à 3 lettres, une jusqu'à 7, deux au-delà.
+
+        Args:
+            longueur (int): La longueur du mot.
+
+        Returns:
+            int: La distance tolérée.
+        """
+        if longueur <= 3:
+            return 0
+        return 1 if longueur <= 7 else 2
+
+    def ajouter(self, identifiant, texte):
+        """
+        Méthode permettant d'ajouter un document à l'index.
+
+        Args:
+            identifiant: Identifiant du document (par exemple son rang).
+            texte (str): Texte du document.
+        """
+        position = len(self.identifiants)
+        mots = decouper(texte)
+        self.identifiants.append(identifiant)
+        self.longueurs.append(len(mots))
+        self.longueur_totale += len(mots)
+        self._parts_bm25 = {}
+        self._impacts = {}
+
+        for mot, frequence in collections.Counter(mots).items():
+            code = self.codes_des_termes.get(mot)
+            if code is None:
+                code = self.codes_des_termes[mot] = len(self.termes)
+                self.termes.append(mot)
+                self.documents_par_terme.append(array.array("I"))
+                self.frequences_par_terme.append(array.array("H"))
+                self._vocabulaire_trie = None
+                for trigramme in self.extraire_trigrammes(mot):
+                    self.termes_par_trigramme.setdefault(trigramme, {}).setdefault(len(mot), []).append(code)
+            self.documents_par_terme[code].append(position)
+            self.frequences_par_terme[code].append(min(frequence, 0xFFFF))
+
+    def vocabulaire_trie(self):
+        """
+        Méthode permettant de récupérer les mots de l'index en ordre alphabétique
+        (pour la recherche par préfixe), triés lors du premier appel suivant un ajout.
+
+        Returns:
+            list: Les mots (str) triés.
+        """
+        if self._vocabulaire_trie is None:
+            self._vocabulaire_trie = sorted(self.termes)
+        return self._vocabulaire_trie
+
+    def termes_proches(self, mot, prefixe=True):
+        """
+        Méthode permettant de rapprocher un mot recherché des mots de l'index.
+        Les mots à une petite distance d'édition ne sont cherchés que si le mot
+        lui-même n'est pas dans l'index (il est alors probablement mal écrit).
+
+        Args:
+            mot (str): Le mot recherché, normalisé.
+            prefixe (bool, optional): Si True, les mots qui prolongent le mot
+            recherché sont aussi rapprochés (le dernier mot d'une recherche est
+            souvent incomplet).
+
+        Returns:
+            dict: Le poids (float) de chaque code de mot rapproché: 1 pour le mot
+            lui-même, FACTEUR_DU_PREFIXE pour un mot qui le prolonge, et selon
+            FACTEURS_PAR_DISTANCE pour un mot à une petite distance d'édition.
+        """
+        proches = {}
+        code = self.codes_des_termes.get(mot)
+        if code is not None:
+            proches[code] = 1.0
+
+        longueur = len(mot)
+        distance_maximale = self.distance_permise(longueur)
+        if code is None and distance_maximale:
+            trigrammes = self.extraire_trigrammes(mot)
+            communs = collections.Counter()
+            for trigramme in trigrammes:
+                codes_par_longueur = self.termes_par_trigramme.get(trigramme)
+                if codes_par_longueur is None:
+                    continue
+                for longueur_voisine in range(longueur - distance_maximale, longueur + distance_maximale + 1):
+                    codes = codes_par_longueur.get(longueur_voisine)
+                    if codes:
+                        communs.update(codes)
+
+            termes = self.termes
+            # À égalité, le mot ajouté le premier l'emporte: l'ordre de Counter.most_common dépendrait
+            # de celui des trigrammes (un ensemble), qui change d'un processus à l'autre.
+            candidats = heapq.nlargest(
+                self.MAXIMUM_DE_CANDIDATS, communs.items(), key=lambda paire: (paire[1], -paire[0])
+            )
+            for code, nombre in candidats:
+                terme = termes[code]
+                # Une modification change au plus quatre trigrammes (une inversion): un mot trop
+                # éloigné ne peut pas en partager assez (filtre des q-grammes).
+                if nombre < max(len(trigrammes), len(terme)) - (self.TAILLE_NGRAMME + 1) * distance_maximale:
+                    continue
+                distance = distance_d_edition(mot, terme, distance_maximale)
+                if distance <= distance_maximale and distance <= self.distance_permise(len(terme)):
+                    proches[code] = self.FACTEURS_PAR_DISTANCE[distance]
+
+        if prefixe and longueur >= self.LONGUEUR_MINIMALE_DU_PREFIXE:
+            vocabulaire = self.vocabulaire_trie()
+            debut = bisect.bisect_right(vocabulaire, mot)
+            for terme in vocabulaire[debut:debut + self.MAXIMUM_DE_PREFIXES]:
+                if not terme.startswith(mot):
+                    break
+                proches.setdefault(self.codes_des_termes[terme], self.FACTEUR_DU_PREFIXE)
+        return proches
+
+    def parts_bm25(self, code):
+        """
+        Méthode permettant de récupérer la partie de la contribution BM25 d'un mot
+        qui dépend de chaque document (fréquence et longueur du document), calculée
+        lors du premier appel suivant un ajout.
+
+        Args:
+            code (int): Le code du mot.
+
+        Returns:
+            array: La part de chaque document contenant le mot (même ordre que documents_par_terme).
+        """
+        parts = self._parts_bm25.get(code)
+        if parts is None:
+            k1, b = self.K1, self.B
+            longueurs = self.longueurs
+            longueur_moyenne = self.longueur_totale / len(self.identifiants) or 1.0
+            parts = self._parts_bm25[code] = array.array("d", (
+                frequence * (k1 + 1) / (frequence + k1 * (1 - b + b * longueurs[position] / longueur_moyenne))
+                for position, frequence in zip(self.documents_par_terme[code], self.frequences_par_terme[code])
+            ))
+        return parts
+
+    def impacts(self, code):
+        """
+        Méthode permettant de récupérer les documents contenant un mot par part
+        BM25 décroissante (voir parts_bm25), triés lors du premier appel suivant un ajout.
+
+        Args:
+            code (int): Le code du mot.
+
+        Returns:
+            tuple: Les parts (array), en ordre décroissant, et les positions (array)
+            des documents correspondants.
+        """
+        impacts = self._impacts.get(code)
+        if impacts is None:
+            parts = self.parts_bm25(code)
+            documents = self.documents_par_terme[code]
+            ordre = sorted(range(len(parts)), key=parts.__getitem__, reverse=True)
+            impacts = self._impacts[code] = (
+                array.array("d", (parts[i] for i in ordre)),
+                array.array("I", (documents[i] for i in ordre)),
+            )
+        return impacts
+
+    def poids_des_termes(self, mot, prefixe=True):
+        """
+        Méthode permettant de récupérer le poids, dans la pertinence BM25, de
+        chaque mot de l'index rapproché d'un mot recherché (voir termes_proches).
+
+        Tous les mots rapprochés d'un mot recherché partagent la même rareté (idf),
+        celle de l'ensemble de leurs documents: un mot rare qui prolonge un mot
+        courant ne doit pas l'emporter sur celui-ci.
+
+        Args:
+            mot (str): Le mot recherché, normalisé.
+            prefixe (bool, optional): Voir termes_proches.
+
+        Returns:
+            dict: Le poids (float) de chaque code de mot rapproché.
+        """
+        nombre_de_documents = len(self.identifiants)
+        proches = self.termes_proches(mot, prefixe)
+        frequence = min(nombre_de_documents, sum(len(self.documents_par_terme[code]) for code in proches))
+        idf = math.log(1 + (nombre_de_documents - frequence + 0.5) / (frequence + 0.5))
+        return {code: facteur * idf for code, facteur in proches.items()}
+
+    def poids_de_la_recherche(self, recherche):
+        """
+        Méthode permettant de récupérer les poids des mots rapprochés de chaque
+        mot distinct d'une recherche (voir poids_des_termes). Seul le dernier
+        mot est aussi rapproché des mots qui le prolongent.
+
+        Args:
+            recherche (str): Les mots recherchés.
+
+        Returns:
+            list: Pour chaque mot recherché, dans l'ordre, le poids (float) de chaque code de mot rapproché.
+        """
+        mots = list(dict.fromkeys(decouper(recherche)))
+        return [self.poids_des_termes(mot, prefixe=numero == len(mots)) for numero, mot in enumerate(mots, 1)]
+
+    def rechercher(self, recherche):
+        """
+        Méthode permettant de récupérer la pertinence des documents pour une recherche.
+
+        Args:
+            recherche (str): Les mots recherchés.
+
+        Returns:
+            dict: La pertinence (float, positive) de chaque document trouvé, par identifiant.
+        """
+        pertinences = {}
+        for poids_des_termes in self.poids_de_la_recherche(recherche):
+            meilleures = {}
+            for code, poids in poids_des_termes.items():
+                for position, part in zip(self.documents_par_terme[code], self.parts_bm25(code)):
+                    contribution = poids * part
+                    if contribution > meilleures.get(position, 0.0):
+                        meilleures[position] = contribution
+            for position, contribution in meilleures.items():
+                pertinences[position] = pertinences.get(position, 0.0) + contribution
+
+        identifiants = self.identifiants
+        return {identifiants[position]: pertinence for position, pertinence in pertinences.items()}
+
+    def contributions(self, code, poids):
+        """
+        Générateur parcourant les documents contenant un mot par contribution
+        décroissante (voir impacts).
+
+        Args:
+            code (int): Le code du mot.
+            poids (float): Le poids du mot (voir poids_des_termes).
+
+        Yields:
+            tuple: L'opposé de la contribution (float) et la position de chaque document.
+        """
+        for part, position in zip(*self.impacts(code)):
+            yield -(poids * part), position
+
+    def pertinence_du_document(self, position, poids_de_la_recherche):
+        """
+        Méthode permettant de calculer la pertinence d'un seul document, comme rechercher.
+
+        Args:
+            position (int): La position du document.
+            poids_de_la_recherche (list): Voir poids_de_la_recherche.
+
+        Returns:
+            float: La pertinence du document.
+        """
+        pertinence = 0.0
+        for poids_des_termes in poids_de_la_recherche:
+            meilleure = 0.0
+            for code, poids in poids_des_termes.items():
+                documents = self.documents_par_terme[code]
+                i = bisect.bisect_left(documents, position)
+                if i < len(documents) and documents[i] == position:
+                    contribution = poids * self.parts_bm25(code)[i]
+                    if contribution > meilleure:
+                        meilleure = contribution
+            pertinence += meilleure
+        return pertinence
+
+    def parcourir_par_pertinence(self, recherche):
+        """
+        Générateur parcourant les documents trouvés par une recherche, du plus
+        au moins pertinent, avec la même pertinence que rechercher. Seuls les
+        documents lus sont notés: un parcours arrêté après les premiers résultats
+        ne coûte presque rien, même pour un mot très courant.
+
+        Les documents de chaque mot recherché sont lus par contribution
+        décroissante (listes triées par impact), un mot après l'autre, et la
+        pertinence complète de chaque nouveau document est calculée (voir
+        pertinence_du_document). Un document est produit dès que sa pertinence
+        atteint le seuil, la somme des dernières contributions lues pour chaque
+        mot: aucun document pas encore lu ne peut le dépasser (algorithme à seuil).
+
+        Args:
+            recherche (str): Les mots recherchés.
+
+        Yields:
+            tuple: La pertinence (float) et l'identifiant de chaque document trouvé.
+        """
+        poids_de_la_recherche = self.poids_de_la_recherche(recherche)
+        flux = [
+            heapq.merge(*(self.contributions(code, poids) for code, poids in poids_des_termes.items()))
+            for poids_des_termes in poids_de_la_recherche
+        ]
+        identifiants = self.identifiants
+        seuils = [math.inf] * len(flux)
+        actifs = list(range(len(flux)))
+        vus, prets = set(), []
+        while actifs:
+            for numero in tuple(actifs):
+                suivant = next(flux[numero], None)
+                if suivant is None:
+                    seuils[numero] = 0.0
+                    actifs.remove(numero)
+                    continue
+                oppose_de_la_contribution, position = suivant
+                seuils[numero] = -oppose_de_la_contribution
+                if position not in vus:
+                    vus.add(position)
+                    if len(flux) == 1:
+                        # Pour un seul mot, la première contribution lue d'un document est sa pertinence.
+                        pertinence = -oppose_de_la_contribution
+                    else:
+                        pertinence = self.pertinence_du_document(position, poids_de_la_recherche)
+                    heapq.heappush(prets, (-pertinence, position))
+            seuil = sum(seuils)
+            while prets and -prets[0][0] >= seuil:
+                oppose_de_la_pertinence, position = heapq.heappop(prets)
+                yield -oppose_de_la_pertinence, identifiants[position]
@@ -0,0 +1,316 @@
+import array
+import heapq
+import math
+import os
+import struct
+import sys
+
+# Recommandations de shows: les shows semblables à un show, et ceux à proposer à un
+# utilisateur d'après les shows qu'il a consultés.
+#
+# Chaque show est décrit par un vecteur creux de traits: ses catégories, ses acteurs, ses
+# directeurs, ses pays et sa langue. Le poids d'un trait est celui de son attribut
+# (POIDS_DES_ATTRIBUTS) multiplié par sa rareté (idf), et chaque vecteur est ramené à une
+# norme de 1: la similarité de deux shows est le cosinus de leurs vecteurs. Les vecteurs
+# sont stockés en lignes compressées (CSR) dans des tableaux array.
+#
+# Les voisins de chaque show (ses shows les plus semblables) sont calculés d'avance, une
+# fois par version du fichier de shows, et conservés dans un fichier à côté de celui-ci
+# (voir ecrire_voisins). Le calcul est approché: pour un trait très répandu (une catégorie,
+# un pays, une langue), seuls les MAXIMUM_PAR_TRAIT shows les plus populaires qui le
+# possèdent sont des voisins possibles, et seuls ceux-là reçoivent sa part de similarité.
+#
+# Les voisins portent sur tout le catalogue: les filtres d'accès (âge, pays) sont appliqués
+# au moment de recommander, par la médiathèque (ou la vue) qui sert les recommandations.
+
+EXTENSION = ".voisins"
+SIGNATURE = b"ULFV"
+VERSION = 1
+# Signature, version, boutisme des tableaux, taille et date de modification du fichier
+# source, nombre de shows, nombre total de voisins.
+FORMAT_EN_TETE = "<4sHBQqII"
+
+
+def traits_depuis_catalogue(catalogue):
+    """
+    Fonction permettant de récupérer les traits de chaque show d'un catalogue.
+
+    Args:
+        catalogue (Catalogue): Le catalogue.
+
+    Returns:
+        list: Les traits de chaque show, par rang: des tuples (attribut, valeur).
+    """
+    colonnes = catalogue.colonnes
+    traits_par_show = []
+    for rang in range(len(catalogue)):
+        traits = [
+            (attribut, valeur)
+            for attribut in Recommandeur.ATTRIBUTS_LISTE
+            for valeur in colonnes[attribut][rang]
+        ]
+        langue = colonnes["langue"][rang]
+        if langue:
+            traits.append(("langue", langue))
+        traits_par_show.append(traits)
+    return traits_par_show
+
+
+class Recommandeur:
+    """
+    Classe représentant les voisins précalculés de chaque show d'un catalogue.
+
+    Les voisins des shows sont mis bout à bout, du plus au moins semblable:
+    debuts[rang] et debuts[rang + 1] délimitent ceux du show de ce rang.
+
+    Un Recommandeur est composé des attributs suivants:
+        - debuts (array): le début des voisins de chaque show, par rang.
+        - voisins (array): le rang de chaque voisin.
+        - similarites (array): la similarité (entre 0 et 1) de chaque voisin.
+    """
+    POIDS_DES_ATTRIBUTS = {"categories": 1.0, "acteurs": 1.0, "directeurs": 1.5, "pays": 0.5, "langue": 0.5}
+    ATTRIBUTS_LISTE = ("categories", "acteurs", "directeurs", "pays")
+    # Nombre de voisins conservés par show.
+    NOMBRE_DE_VOISINS = 30
+    # Nombre maximal de shows (les plus populaires) considérés pour chaque trait.
+    MAXIMUM_PAR_TRAIT = 100
+
+    def __init__(self, debuts, voisins, similarites):
+        self.debuts = debuts
+        self.voisins = voisins
+        self.similarites = similarites
+
+    def __len__(self):
+        """
+        Retourne le nombre de shows.
+        """
+        return len(self.debuts) - 1
+
+    @classmethod
+    def construire(cls, traits_par_show, popularites, nombre_de_voisins=None, maximum_par_trait=None):
+        """
+        Méthode permettant de calculer les voisins de chaque show.
+
+        Args:
+            traits_par_show (list): Les traits de chaque show, par rang (voir traits_depuis_catalogue).
+            popularites (sequence): La popularité de chaque show, par rang.
+            nombre_de_voisins (int, optional): Nombre de voisins conservés par show.
+            maximum_par_trait (int, optional): Nombre de shows considérés pour chaque trait.
+
+        Returns:
+            Recommandeur: Les voisins des shows.
+        """
+        nombre_de_voisins = nombre_de_voisins or cls.NOMBRE_DE_VOISINS
+        maximum_par_trait = maximum_par_trait or cls.MAXIMUM_PAR_TRAIT
+        matrice = cls.vectoriser(traits_par_show)
+        debuts_des_lignes, colonnes, valeurs = matrice
+        nombre_de_shows = len(debuts_des_lignes) - 1
+
+        # Index inversé limité aux shows les plus populaires de chaque trait.
+        shows_par_trait = {}
+        ordre = sorted(range(nombre_de_shows), key=lambda rang: (-popularites[rang], rang))
+        for rang in ordre:
+            for position in range(debuts_des_lignes[rang], debuts_des_lignes[rang + 1]):
+                shows = shows_par_trait.setdefault(colonnes[position], [])
+                if len(shows) < maximum_par_trait:
+                    shows.append((rang, valeurs[position]))
+
+        debuts = array.array("I", [0])
+        voisins = array.array("I")
+        similarites = array.array("d")
+        for rang in range(nombre_de_shows):
+            scores = {}
+            for position in range(debuts_des_lignes[rang], debuts_des_lignes[rang + 1]):
+                poids = valeurs[position]
+                for autre, poids_de_l_autre in shows_par_trait[colonnes[position]]:
+                    scores[autre] = scores.get(autre, 0.0) + poids * poids_de_l_autre
+            scores.pop(rang, None)
+            meilleurs = heapq.nlargest(nombre_de_voisins, scores.items(), key=lambda element: (element[1], -element[0]))
+            voisins.extend(autre for autre, _ in meilleurs)
+            similarites.extend(min(score, 1.0) for _, score in meilleurs)
+            debuts.append(len(voisins))
+        return cls(debuts, voisins, similarites)
+
+    @classmethod
+    def vectoriser(cls, traits_par_show):
+        """
+        Méthode permettant de construire le vecteur creux (normé) de chaque show.
+
+        Args:
+            traits_par_show (list): Les traits de chaque show, par rang.
+
+        Returns:
+            tuple: La matrice en lignes compressées: le début de chaque ligne
+            (array), puis le code du trait (array) et le poids (array) de
+            chaque élément non nul.
+        """
+        codes = {}
+        lignes = []
+        frequences = []
+        for traits in traits_par_show:
+            # Les traits sont triés pour que le calcul ne dépende pas de l'ordre des listes.
+            ligne = [codes.setdefault(trait, len(codes)) for trait in sorted(set(traits))]
+            for code in ligne:
+                if code == len(frequences):
+                    frequences.append(0)
+                frequences[code] += 1
+            lignes.append(ligne)
+
+        nombre_de_shows = len(lignes)
+        poids_des_traits = array.array("d", bytes(8 * len(codes)))
+        for (attribut, _), code in codes.items():
+            poids_des_traits[code] = cls.POIDS_DES_ATTRIBUTS[attribut] * math.log(1 + nombre_de_shows / frequences[code])
+
+        debuts = array.array("Q", [0])
+        colonnes = array.array("I")
+        valeurs = array.array("d")
+        for ligne in lignes:
+            norme = math.sqrt(sum(poids_des_traits[code] ** 2 for code in ligne)) or 1.0
+            colonnes.extend(ligne)
+            valeurs.extend(poids_des_traits[code] / norme for code in ligne)
+            debuts.append(len(colonnes))
+        return debuts, colonnes, valeurs
+
+    def voisins_de(self, rang):
+        """
+        Méthode permettant de récupérer les voisins d'un show.
+
+        Args:
+            rang (int): Le rang du show.
+
+        Returns:
+            zip: Les paires (rang, similarité) de ses voisins, du plus au moins
+            semblable. Un show ajouté au catalogue après le calcul des voisins
+            (voir Mediatheque.appliquer_changements) n'en a aucun.
+        """
+        if rang >= len(self):
+            return zip((), ())
+        debut, fin = self.debuts[rang], self.debuts[rang + 1]
+        return zip(self.voisins[debut:fin], self.similarites[debut:fin])
+
+    def scores(self, rangs):
+        """
+        Méthode permettant de noter les voisins de quelques shows: chaque
+        voisin reçoit la somme de ses similarités avec ces shows. Les shows
+        eux-mêmes sont exclus.
+
+        Args:
+            rangs (iterable): Les rangs des shows.
+
+        Returns:
+            dict: La note (float) de chaque voisin, par rang.
+        """
+        rangs = list(dict.fromkeys(rangs))
+        scores = {}
+        for rang in rangs:
+            for voisin, similarite in self.voisins_de(rang):
+                scores[voisin] = scores.get(voisin, 0.0) + similarite
+        for rang in rangs:
+            scores.pop(rang, None)
+        return scores
+
+
+def chemin_voisins(chemin_fichier):
+    """
+    Fonction permettant de récupérer le chemin du fichier des voisins d'un fichier de shows.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows.
+
+    Returns:
+        str: Le chemin du fichier des voisins, à côté du fichier de shows.
+    """
+    return chemin_fichier + EXTENSION
+
+
+def ecrire_voisins(recommandeur, chemin_fichier, stat_source):
+    """
+    Fonction permettant d'écrire les voisins calculés pour un fichier de
+    shows à côté de celui-ci, comme un instantané (voir ecrire_instantane):
+    le fichier est remplacé d'un seul coup, et les erreurs d'écriture sont
+    ignorées.
+
+    Args:
+        recommandeur (Recommandeur): Les voisins à écrire.
+        chemin_fichier (str): Le chemin menant au fichier de shows source.
+        stat_source (os.stat_result): Le résultat de os.stat sur le fichier
+            source, pris avant sa lecture.
+    """
+    en_tete = struct.pack(
+        FORMAT_EN_TETE,
+        SIGNATURE,
+        VERSION,
+        sys.byteorder == "little",
+        stat_source.st_size,
+        stat_source.st_mtime_ns,
+        len(recommandeur),
+        len(recommandeur.voisins),
+    )
+    chemin = chemin_voisins(chemin_fichier)
+    chemin_temporaire = f"{chemin}.{os.getpid()}.tmp"
+    try:
+        with open(chemin_temporaire, "wb") as fichier:
+            fichier.write(en_tete)
+            for tableau in (recommandeur.debuts, recommandeur.voisins, recommandeur.similarites):
+                tableau.tofile(fichier)
+        os.replace(chemin_temporaire, chemin)
+    except OSError:
+        try:
+            os.remove(chemin_temporaire)
+        except OSError:
+            pass
+
+
+def lire_voisins(chemin_fichier, stat_source):
+    """
+    Fonction permettant de charger les voisins précalculés d'un fichier de shows.
+
+    Args:
+        chemin_fichier (str): Le chemin menant au fichier de shows source.
+        stat_source (os.stat_result): Le résultat de os.stat sur le fichier source.
+
+    Returns:
+        Recommandeur: Les voisins, ou None si le fichier est absent, périmé ou invalide.
+    """
+    try:
+        with open(chemin_voisins(chemin_fichier), "rb") as fichier:
+            contenu = fichier.read()
+    except OSError:
+        return None
+
+    try:
+        signature, version, petit_boutiste, taille, date_modification, nombre_de_shows, nombre_de_voisins = (
+            struct.unpack_from(FORMAT_EN_TETE, contenu)
+        )
+    except struct.error:
+        return None
+    if (
+        signature != SIGNATURE
+        or version != VERSION
+        or bool(petit_boutiste) != (sys.byteorder == "little")
+        or taille != stat_source.st_size
+        or date_modification != stat_source.st_mtime_ns
+    ):
+        return None
+
+    tableaux = []
+    position = struct.calcsize(FORMAT_EN_TETE)
+    for typecode, nombre in (("I", nombre_de_shows + 1), ("I", nombre_de_voisins), ("d", nombre_de_voisins)):
+        tableau = array.array(typecode)
+        longueur = nombre * tableau.itemsize
+        if position + longueur > len(contenu):
+            return None
+        tableau.frombytes(contenu[position:position + longueur])
+        tableaux.append(tableau)
+        position += longueur
+    return Recommandeur(*tableaux)
+
+
+if __name__ == "__main__":
+    # Précalcul des voisins d'un fichier de shows (et de son instantané), par exemple
+    # avant de démarrer le serveur: python recommandation.py ulflix.txt
+    from mediatheque import Mediatheque
+
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python recommandation.py chemin_fichier_de_shows")
+    Mediatheque(sys.argv[1]).obtenir_recommandeur()
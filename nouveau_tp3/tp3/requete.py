@@ -0,0 +1,125 @@
+class Predicat:
+    """
+    Classe de base des conditions d'une Requete.
+
+    Les prédicats se combinent avec les opérateurs & (Et), | (Ou) et ~ (Non).
+    Ils ne font que décrire la condition: c'est la médiathèque qui choisit
+    comment l'évaluer (voir Mediatheque.executer).
+
+    Chaque prédicat a un COUT, une estimation relative du coût de son
+    évaluation pour un show: les moins coûteux sont vérifiés en premier.
+    """
+    COUT = 1
+
+    def __and__(self, autre):
+        return Et(self, autre)
+
+    def __or__(self, autre):
+        return Ou(self, autre)
+
+    def __invert__(self):
+        return Non(self)
+
+
+class Contient(Predicat):
+    """
+    Prédicat vrai pour les shows dont l'attribut de type str contient la valeur
+    (sans tenir compte de la casse), comme
+    Mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_string.
+    """
+    COUT = 3
+
+    def __init__(self, attribut, valeur):
+        self.attribut = attribut
+        self.valeur = valeur
+
+    def __repr__(self):
+        return f"Contient({self.attribut!r}, {self.valeur!r})"
+
+
+class ListeContient(Predicat):
+    """
+    Prédicat vrai pour les shows dont l'un des éléments de l'attribut de type
+    liste contient la valeur (sans tenir compte de la casse), comme
+    Mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string.
+    """
+    COUT = 2
+
+    def __init__(self, attribut, valeur):
+        self.attribut = attribut
+        self.valeur = valeur
+
+    def __repr__(self):
+        return f"ListeContient({self.attribut!r}, {self.valeur!r})"
+
+
+class AgePermis(Predicat):
+    """
+    Prédicat vrai pour les shows qu'un utilisateur de cet âge peut regarder,
+    comme Mediatheque.filtrer_ids_sur_age.
+    """
+    COUT = 1
+
+    def __init__(self, age_utilisateur):
+        self.age_utilisateur = age_utilisateur
+
+    def __repr__(self):
+        return f"AgePermis({self.age_utilisateur!r})"
+
+
+class Et(Predicat):
+    """
+    Prédicat vrai pour les shows respectant tous les prédicats qu'il contient.
+    """
+    def __init__(self, *predicats):
+        self.predicats = predicats
+        self.COUT = sum(predicat.COUT for predicat in predicats)
+
+    def __repr__(self):
+        return f"Et{self.predicats!r}"
+
+
+class Ou(Predicat):
+    """
+    Prédicat vrai pour les shows respectant au moins un des prédicats qu'il contient.
+    """
+    def __init__(self, *predicats):
+        self.predicats = predicats
+        self.COUT = sum(predicat.COUT for predicat in predicats)
+
+    def __repr__(self):
+        return f"Ou{self.predicats!r}"
+
+
+class Non(Predicat):
+    """
+    Prédicat vrai pour les shows ne respectant pas le prédicat qu'il contient.
+    """
+    def __init__(self, predicat):
+        self.predicat = predicat
+        self.COUT = predicat.COUT
+
+    def __repr__(self):
+        return f"Non({self.predicat!r})"
+
+
+class Requete:
+    """
+    Classe représentant une requête sur une médiathèque: une condition,
+    un tri et une fenêtre (décalage et limite) sur les résultats.
+
+    Une Requete est composée des attributs suivants:
+        - predicat (Predicat): la condition, ou None pour tous les shows.
+        - tri (str): l'attribut de tri (ordre décroissant), ou None pour
+          garder l'ordre de la médiathèque.
+        - limite (int): le nombre maximal de résultats, ou None.
+        - decalage (int): le nombre de résultats à sauter.
+    """
+    def __init__(self, predicat=None, tri=None, limite=None, decalage=0):
+        self.predicat = predicat
+        self.tri = tri
+        self.limite = limite
+        self.decalage = decalage
+
+    def __repr__(self):
+        return f"Requete({self.predicat!r}, tri={self.tri!r}, limite={self.limite!r}, decalage={self.decalage!r})"
@@ -0,0 +1,688 @@
+import asyncio
+import collections
+import math
+import os
+import signal
+import sys
+import threading
+
+from instrumentation import profiler
+from mediatheque import FiltreDAcces, Mediatheque
+from pagination import Paginateur
+from requete import Contient, Requete
+from stockage_sqlite import AnnuaireUtilisateurSqlite, MediathequeSqlite
+from utilisateur import AnnuaireUtilisateur
+from utils import HacheurDeMotDePasse, LimiteurDeTentatives
+
+# Le serveur parle un protocole texte ligne par ligne (UTF-8): chaque ligne envoyée au client
+# est affichée telle quelle, sauf celles qui commencent par PREFIXE_DE_QUESTION, qui attendent
+# une ligne de réponse. La connexion est fermée à la fin de la session.
+PREFIXE_DE_QUESTION = "> "
+
+
+class CanalConsole:
+    """
+    Canal d'une session sur l'entrée et la sortie standard.
+
+    L'entrée standard est lue dans un fil d'exécution démon, directement sur
+    son descripteur (os.read): avec asyncio.to_thread, l'interpréteur
+    attendrait la fin de la lecture en cours (jusqu'à la prochaine ligne)
+    avant de s'arrêter après Ctrl-C, et avec input(), le fil garderait le
+    verrou de sys.stdin pendant l'arrêt.
+
+    Un CanalConsole est composé des attributs suivants:
+        - tampon (bytes): les octets lus après la dernière ligne retournée.
+    """
+    # Nombre maximal d'octets lus à la fois sur l'entrée standard.
+    TAILLE_DE_LECTURE = 1 << 16
+
+    def __init__(self):
+        self.tampon = b""
+
+    def ecrire(self, texte):
+        """
+        Méthode permettant d'afficher du texte.
+
+        Args:
+            texte (str): Le texte à afficher.
+        """
+        sys.stdout.write(texte)
+
+    def lire_ligne(self):
+        """
+        Méthode bloquante permettant de lire la prochaine ligne de l'entrée standard.
+
+        Returns:
+            str: La ligne, sans le retour de ligne.
+
+        Raises:
+            EOFError: Si l'entrée standard est fermée.
+        """
+        while b"\n" not in self.tampon:
+            morceau = os.read(sys.stdin.fileno(), self.TAILLE_DE_LECTURE)
+            if not morceau:
+                if not self.tampon:
+                    raise EOFError("L'entrée standard est fermée.")
+                break
+            self.tampon += morceau
+        ligne, _, self.tampon = self.tampon.partition(b"\n")
+        return ligne.decode("utf-8", errors="replace").rstrip("\r")
+
+    async def demander(self, question):
+        """
+        Méthode permettant de poser une question et d'attendre la réponse.
+
+        Args:
+            question (str): La question à afficher.
+
+        Returns:
+            str: La réponse saisie.
+
+        Raises:
+            EOFError: Si l'entrée standard est fermée.
+        """
+        sys.stdout.write(question)
+        sys.stdout.flush()
+        boucle = asyncio.get_running_loop()
+        reponse = boucle.create_future()
+
+        def transmettre(resultat, erreur):
+            if reponse.done():
+                return
+            if erreur is None:
+                reponse.set_result(resultat)
+            else:
+                reponse.set_exception(erreur)
+
+        def lire():
+            try:
+                resultat, erreur = self.lire_ligne(), None
+            except Exception as exception:
+                resultat, erreur = None, exception
+            try:
+                boucle.call_soon_threadsafe(transmettre, resultat, erreur)
+            except RuntimeError:
+                # La boucle est déjà fermée: plus personne n'attend la réponse.
+                pass
+
+        threading.Thread(target=lire, daemon=True).start()
+        return await reponse
+
+
+class CanalTcp:
+    """
+    Canal d'une session sur une connexion TCP (voir PREFIXE_DE_QUESTION).
+
+    Un CanalTcp est composé des attributs suivants:
+        - lecteur (asyncio.StreamReader): le flux des réponses du client.
+        - ecrivain (asyncio.StreamWriter): le flux vers le client.
+    """
+    def __init__(self, lecteur, ecrivain):
+        self.lecteur = lecteur
+        self.ecrivain = ecrivain
+
+    def ecrire(self, texte):
+        """
+        Méthode permettant d'envoyer du texte au client. Il part au plus
+        tard avec la prochaine question.
+
+        Args:
+            texte (str): Le texte à envoyer.
+        """
+        self.ecrivain.write(texte.encode("utf-8"))
+
+    async def demander(self, question):
+        """
+        Méthode permettant de poser une question au client et d'attendre sa réponse.
+
+        Args:
+            question (str): La question à poser.
+
+        Returns:
+            str: La réponse du client, sans le retour de ligne.
+
+        Raises:
+            EOFError: Si le client a fermé la connexion ou envoyé une ligne trop longue.
+        """
+        self.ecrire(PREFIXE_DE_QUESTION + question.rstrip() + "\n")
+        await self.ecrivain.drain()
+        try:
+            ligne = await self.lecteur.readline()
+        except ValueError:
+            raise EOFError("La réponse du client est trop longue.")
+        if not ligne:
+            raise EOFError("Le client a fermé la connexion.")
+        return ligne.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+class Session:
+    """
+    Classe représentant la session d'un utilisateur de ULFlix: les menus
+    d'accueil et utilisateur, avec les mêmes questions et les mêmes messages
+    que l'application en console, mais sans bloquer pendant l'attente des
+    réponses. Plusieurs sessions peuvent donc partager une même boucle asyncio.
+
+    Toutes les sessions partagent la médiathèque et l'annuaire: chaque
+    utilisateur authentifié consulte la vue de la médiathèque qui correspond
+    à son filtre d'accès (voir Mediatheque.vue).
+
+    Une Session est composée des attributs suivants:
+        - mediatheque (Mediatheque): la médiathèque partagée.
+        - annuaire_utilisateur (AnnuaireUtilisateur): l'annuaire partagé.
+        - canal (CanalConsole ou CanalTcp): le canal vers l'utilisateur.
+        - nombre_de_shows_par_page (int): le nombre de shows par page.
+        - utilisateur (Utilisateur): l'utilisateur, une fois authentifié.
+        - limiteur (LimiteurDeTentatives): les échecs d'authentification, par
+          adresse email (partagé par les sessions d'un serveur).
+        - historique (deque): les show_ids des derniers shows consultés par
+          l'utilisateur, du plus ancien au plus récent (voir consulter).
+    """
+    MENU_D_ACCUEIL = (
+        "Menu d'acceuil",
+        "1 - S'inscrire",
+        "2 - S'authentifier",
+        "3 - Quitter l'application",
+    )
+    MENU_UTILISATEUR = (
+        "Menu utilisateur",
+        "1 - Rechercher des films ou séries avec une expression",
+        "2 - Rechercher des films ou séries selon le genre",
+        "3 - Rechercher des films ou séries selon les acteurs",
+        "4 - Afficher la médiathèque par ordre des shows les plus récemment ajoutés",
+        "5 - Afficher la médiathèque par ordre des shows les plus populaires",
+        "6 - Afficher la médiathèque par ordre des shows les mieux évalués",
+        "7 - Quitter l'application",
+        # Les options ajoutées suivent Quitter, qui garde son numéro.
+        "8 - Afficher les films ou séries semblables à un titre",
+        "9 - Afficher les films ou séries recommandés pour vous",
+    )
+    # Nombre de shows consultés sur lesquels les recommandations sont basées.
+    TAILLE_DE_L_HISTORIQUE = 10
+    # Nombre maximal de résultats d'une recherche par pertinence notés: ceux du filtre
+    # exact qui en font partie sont affichés en premier (voir classer_resultats).
+    NOMBRE_DE_RESULTATS_PERTINENTS = 100
+    # Nombre de suggestions proposées quand le filtre exact ne trouve rien
+    # (voir afficher_resultats_de_recherche).
+    NOMBRE_DE_SUGGESTIONS = 10
+
+    def __init__(self, mediatheque, annuaire_utilisateur, canal, nombre_de_shows_par_page=10, limiteur=None):
+        self.mediatheque = mediatheque
+        self.annuaire_utilisateur = annuaire_utilisateur
+        self.canal = canal
+        self.nombre_de_shows_par_page = nombre_de_shows_par_page
+        self.limiteur = LimiteurDeTentatives() if limiteur is None else limiteur
+        self.utilisateur = None
+        self.historique = collections.deque(maxlen=self.TAILLE_DE_L_HISTORIQUE)
+
+    def afficher(self, *lignes):
+        """
+        Méthode permettant d'afficher des lignes de texte à l'utilisateur.
+
+        Args:
+            *lignes (str): Les lignes à afficher.
+        """
+        self.canal.ecrire("".join(ligne + "\n" for ligne in lignes))
+
+    async def demander(self, question):
+        """
+        Méthode permettant de poser une question à l'utilisateur.
+
+        Args:
+            question (str): La question.
+
+        Returns:
+            str: La réponse de l'utilisateur.
+        """
+        return await self.canal.demander(question)
+
+    async def choisir_dans_menu(self, menu):
+        """
+        Méthode permettant d'afficher un menu et de récupérer le choix de
+        l'utilisateur, jusqu'à ce qu'il soit valide.
+
+        Args:
+            menu (tuple): Le titre du menu suivi d'une ligne par option.
+
+        Returns:
+            int: Le choix de l'utilisateur (entre 1 et le nombre d'options).
+        """
+        choix_menu = None
+        while choix_menu is None:
+            try:
+                self.afficher(*menu)
+                choix_menu = int(await self.demander("Veuillez entrer votre choix: "))
+                assert 1 <= choix_menu <= len(menu) - 1
+            except (ValueError, AssertionError):
+                self.afficher("Votre choix n'est pas dans la liste des options. Veuillez réessayer.")
+                choix_menu = None
+        return choix_menu
+
+    async def inscrire(self):
+        """
+        Méthode permettant de créer le compte ULFlix de l'utilisateur, comme
+        AnnuaireUtilisateur.inscrire.
+
+        Returns:
+            Utilisateur: L'utilisateur inscrit.
+        """
+        annuaire_utilisateur = self.annuaire_utilisateur
+        reponses = {}
+        hash_mot_de_passe = None
+        while True:
+            for attribut, question in annuaire_utilisateur.QUESTIONS_D_INSCRIPTION:
+                valeur = reponses.get(attribut)
+                while valeur is None:
+                    valeur, erreur = annuaire_utilisateur.valider_reponse_d_inscription(attribut, await self.demander(question))
+                    if erreur is not None:
+                        self.afficher(erreur)
+                reponses[attribut] = valeur
+            if hash_mot_de_passe is None:
+                hash_mot_de_passe = await HacheurDeMotDePasse.hacher_async(reponses["mot_de_passe"])
+
+            # Une autre session a pu inscrire la même adresse email pendant les questions
+            # suivantes: elle est vérifiée de nouveau juste avant de créer le compte.
+            _, erreur = annuaire_utilisateur.valider_reponse_d_inscription("email", reponses["email"])
+            if erreur is None:
+                break
+            self.afficher(erreur)
+            del reponses["email"]
+
+        utilisateur = annuaire_utilisateur.nouvel_utilisateur(reponses, hash_mot_de_passe)
+        await annuaire_utilisateur.enregistrer_utilisateur_async(utilisateur)
+        return utilisateur
+
+    async def authentifier(self):
+        """
+        Méthode permettant d'authentifier l'utilisateur, comme
+        AnnuaireUtilisateur.authentifier. Après trop d'échecs pour un compte
+        (voir LimiteurDeTentatives), la tentative suivante est retardée; seule
+        la session attend, les autres continuent d'être servies.
+
+        Returns:
+            Utilisateur: L'utilisateur authentifié.
+        """
+        utilisateur = None
+        while utilisateur is None:
+            email_saisi = await self.demander("Veuillez entrer l'adresse email associée à votre compte: ")
+            utilisateur, erreur = self.annuaire_utilisateur.valider_email_de_connexion(email_saisi)
+            if erreur is not None:
+                self.afficher(erreur)
+
+        while True:
+            attente = self.limiteur.attente(utilisateur.email)
+            if attente:
+                self.afficher(f"Trop de tentatives pour ce compte. Veuillez patienter {math.ceil(attente)} secondes.")
+                await asyncio.sleep(attente)
+            mot_de_passe_en_clair = await self.demander("Veuillez entrer votre mot de passe: ")
+            if await HacheurDeMotDePasse.verifier_async(utilisateur.mot_de_passe, mot_de_passe_en_clair):
+                self.limiteur.oublier(utilisateur.email)
+                return utilisateur
+            self.limiteur.noter_echec(utilisateur.email)
+            self.afficher("Mot de passe incorrect.")
+
+    async def afficher_avec_pagination(self, mediatheque, identifiants=None, attribut_pour_trier="date_ajout"):
+        """
+        Méthode permettant d'afficher des shows page par page, comme
+        Mediatheque.afficher_avec_pagination.
+
+        Args:
+            mediatheque (Mediatheque): La médiathèque (ou la vue) contenant les shows.
+            identifiants (list): Liste des show_ids à afficher. None signifie
+            tous les shows de la médiathèque.
+            attribut_pour_trier (str): Attribut de tri.
+        """
+        paginateur = Paginateur(mediatheque, identifiants, self.nombre_de_shows_par_page, attribut_pour_trier)
+        numero_de_page = 0 if len(paginateur) else None
+        while numero_de_page is not None:
+            self.canal.ecrire(paginateur.rendre_page_avec_entetes(numero_de_page))
+            choix = await self.demander(Paginateur.QUESTION_DE_NAVIGATION)
+            numero_de_page = paginateur.page_apres_choix(numero_de_page, choix)
+
+    def consulter(self, show_id):
+        """
+        Méthode permettant d'ajouter un show à l'historique de l'utilisateur:
+        le show semblable auquel il a demandé des shows semblables, ou le
+        premier résultat de ses recherches.
+
+        Args:
+            show_id (str): Le show_id du show consulté.
+        """
+        if show_id in self.historique:
+            self.historique.remove(show_id)
+        self.historique.append(show_id)
+
+    @staticmethod
+    def classer_resultats(mediatheque, pertinents, exacts):
+        """
+        Méthode permettant d'ordonner les résultats d'un filtre exact par
+        inclusion à l'aide d'une recherche par pertinence (tolérante aux
+        fautes): les shows du filtre qu'elle a trouvés viennent en premier,
+        dans son ordre, puis les autres (par exemple trouvés dans la
+        description ou par un bout de mot), du plus au moins populaire. Seuls
+        les shows du filtre sont retournés.
+
+        Args:
+            mediatheque (Mediatheque): La médiathèque (ou la vue) contenant les shows.
+            pertinents (list): Les show_ids de la recherche par pertinence, dans l'ordre.
+            exacts (list): Les show_ids du filtre exact.
+
+        Returns:
+            list: Les show_ids du filtre exact, dans l'ordre d'affichage.
+        """
+        exacts_restants = set(exacts)
+        premiers = [show_id for show_id in pertinents if show_id in exacts_restants]
+        exacts_restants.difference_update(premiers)
+        autres = [show_id for show_id in exacts if show_id in exacts_restants]
+        if not autres:
+            return premiers
+        return premiers + mediatheque.trier_ids_par_attribut(autres, "popularite")
+
+    async def afficher_resultats_de_recherche(self, mediatheque, pertinents, exacts):
+        """
+        Méthode permettant d'afficher les résultats d'une recherche: ceux du
+        filtre exact, ordonnés par classer_resultats. Si le filtre ne trouve
+        rien, les premiers shows de la recherche par pertinence sont proposés
+        à part, comme suggestions.
+
+        Args:
+            mediatheque (Mediatheque): La médiathèque (ou la vue) contenant les shows.
+            pertinents (list): Les show_ids de la recherche par pertinence, dans l'ordre.
+            exacts (list): Les show_ids du filtre exact.
+        """
+        selection_ids = self.classer_resultats(mediatheque, pertinents, exacts)
+        self.afficher(f"{len(selection_ids)} résultats trouvés.")
+        if selection_ids:
+            self.consulter(selection_ids[0])
+            await self.afficher_avec_pagination(mediatheque, selection_ids, attribut_pour_trier=None)
+        elif pertinents:
+            self.afficher("Vouliez-vous dire:")
+            await self.afficher_avec_pagination(
+                mediatheque, pertinents[:self.NOMBRE_DE_SUGGESTIONS], attribut_pour_trier=None
+            )
+
+    async def executer(self):
+        """
+        Méthode permettant de dérouler la session, du menu d'accueil jusqu'à
+        ce que l'utilisateur quitte l'application.
+        """
+        self.afficher("#" * 80, "###{:^74s}###".format("Bienvenue dans ULFlix"), "#" * 80)
+        choix = await self.choisir_dans_menu(self.MENU_D_ACCUEIL)
+        if choix == 1:
+            self.utilisateur = await self.inscrire()
+        elif choix == 2:
+            self.utilisateur = await self.authentifier()
+        else:
+            return
+
+        utilisateur = self.utilisateur
+        # L'utilisateur consulte la vue des shows auxquels il a accès, sans modifier la médiathèque.
+        filtre = FiltreDAcces(utilisateur.age, utilisateur.pays if utilisateur.abonnement == 1 else None)
+        mediatheque = self.mediatheque.vue(filtre)
+
+        self.afficher(f"Salut {utilisateur.nom.title()}! Tu as accès à {len(mediatheque)} films et séries télés.")
+
+        while True:
+            choix_menu = await self.choisir_dans_menu(self.MENU_UTILISATEUR)
+            if choix_menu == 1:  # Rechercher des films ou séries avec une expression
+                recherche = await self.demander("Veuillez entrer les termes de votre recherche: ")
+                await self.afficher_resultats_de_recherche(
+                    mediatheque,
+                    mediatheque.rechercher_par_pertinence("titre", recherche, self.NOMBRE_DE_RESULTATS_PERTINENTS),
+                    mediatheque.executer(Requete(Contient("titre", recherche) | Contient("description", recherche))),
+                )
+
+            elif choix_menu == 2:  # Rechercher des films ou séries selon le genre
+                genres = mediatheque.lister_valeurs_uniques_par_attribut("categories")
+                self.afficher("Catégories disponibles:", *(f"{i+1:>2} - {genre}" for i, genre in enumerate(genres)))
+
+                choix_categorie = None
+                while choix_categorie is None:
+                    try:
+                        choix_categorie = int(await self.demander("Entrer votre choix de catégorie: "))
+                        assert choix_categorie in range(1, len(genres) + 1)
+                    except (ValueError, AssertionError):
+                        self.afficher("Le choix de catégorie est invalide. Réessayer svp.")
+                        choix_categorie = None
+
+                choix_categorie = genres[choix_categorie - 1]
+                selection_ids = mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string("categories", choix_categorie)
+                self.afficher(f"{len(selection_ids)} résultats trouvés.")
+                await self.afficher_avec_pagination(mediatheque, selection_ids, attribut_pour_trier="popularite")
+
+            elif choix_menu == 3:  # Rechercher des films ou séries selon les acteurs
+                recherche = await self.demander("Veuillez entrer le nom ou prénom d'un acteur: ")
+                await self.afficher_resultats_de_recherche(
+                    mediatheque,
+                    mediatheque.rechercher_par_pertinence("acteurs", recherche, self.NOMBRE_DE_RESULTATS_PERTINENTS),
+                    mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string("acteurs", recherche),
+                )
+
+            elif choix_menu == 4:  # Afficher les films ou séries les plus récents
+                await self.afficher_avec_pagination(mediatheque, attribut_pour_trier="date_ajout")
+
+            elif choix_menu == 5:  # Afficher les films ou séries les plus populaires
+                await self.afficher_avec_pagination(mediatheque, attribut_pour_trier="popularite")
+
+            elif choix_menu == 6:  # Afficher les films ou séries les plus mieux évalués
+                await self.afficher_avec_pagination(mediatheque, attribut_pour_trier="note")
+
+            elif choix_menu == 8:  # Afficher les films ou séries semblables à un titre
+                recherche = await self.demander("Veuillez entrer le titre d'un film ou d'une série: ")
+                trouves = mediatheque.rechercher_par_pertinence("titre", recherche, limite=1)
+                if not trouves:
+                    self.afficher("Aucun film ou série ne correspond à ce titre.")
+                    continue
+                show_id = trouves[0]
+                self.consulter(show_id)
+                self.afficher(f"Films et séries semblables à {mediatheque.shows[show_id].titre}:")
+                await self.afficher_avec_pagination(mediatheque, mediatheque.recommander([show_id]), attribut_pour_trier=None)
+
+            elif choix_menu == 9:  # Afficher les films ou séries recommandés pour l'utilisateur
+                if self.historique:
+                    self.afficher(f"Recommandations basées sur vos {len(self.historique)} derniers films et séries consultés:")
+                else:
+                    self.afficher("Consultez des films ou des séries pour des recommandations personnalisées. Les plus populaires:")
+                await self.afficher_avec_pagination(mediatheque, mediatheque.recommander(self.historique), attribut_pour_trier=None)
+
+            else:
+                return
+
+
+class ServeurULFlix:
+    """
+    Classe représentant le serveur TCP de ULFlix: chaque connexion est une
+    Session, et toutes les sessions partagent la même médiathèque et le même
+    annuaire, chargés une seule fois.
+
+    Les sessions s'exécutent à tour de rôle dans une seule boucle asyncio:
+    une session qui attend la réponse de son client ne bloque pas les autres.
+    La médiathèque peut être rechargée sans arrêter le serveur (voir
+    recharger_mediatheque): chaque session garde celle de son ouverture.
+
+    Un ServeurULFlix est composé des attributs suivants:
+        - mediatheque (Mediatheque): la médiathèque partagée.
+        - annuaire_utilisateur (AnnuaireUtilisateur): l'annuaire partagé.
+        - nombre_de_shows_par_page (int): le nombre de shows par page.
+        - nombre_de_sessions (int): le nombre de sessions ouvertes depuis le démarrage.
+        - sessions_actives (int): le nombre de sessions en cours.
+        - limiteur (LimiteurDeTentatives): les échecs d'authentification de
+          toutes les sessions, par adresse email.
+        - relecture (asyncio.Task): la relecture de la médiathèque en cours, ou None.
+        - rechargement_en_attente (bool): True si un rechargement a été demandé
+          pendant la relecture.
+    """
+    def __init__(self, mediatheque, annuaire_utilisateur, nombre_de_shows_par_page=10):
+        self.mediatheque = mediatheque
+        self.annuaire_utilisateur = annuaire_utilisateur
+        self.nombre_de_shows_par_page = nombre_de_shows_par_page
+        self.nombre_de_sessions = 0
+        self.sessions_actives = 0
+        self.limiteur = LimiteurDeTentatives()
+        self.relecture = None
+        self.rechargement_en_attente = False
+
+    async def gerer_connexion(self, lecteur, ecrivain):
+        """
+        Méthode permettant de dérouler la session d'une connexion, puis de la fermer.
+
+        Args:
+            lecteur (asyncio.StreamReader): Le flux des réponses du client.
+            ecrivain (asyncio.StreamWriter): Le flux vers le client.
+        """
+        self.nombre_de_sessions += 1
+        self.sessions_actives += 1
+        session = Session(
+            self.mediatheque,
+            self.annuaire_utilisateur,
+            CanalTcp(lecteur, ecrivain),
+            self.nombre_de_shows_par_page,
+            self.limiteur,
+        )
+        try:
+            await session.executer()
+            await ecrivain.drain()
+        except (EOFError, ConnectionError):
+            pass
+        finally:
+            self.sessions_actives -= 1
+            ecrivain.close()
+            try:
+                await ecrivain.wait_closed()
+            except ConnectionError:
+                pass
+
+    def recharger_mediatheque(self):
+        """
+        Méthode permettant de prendre en compte les modifications du fichier de
+        shows (voir Mediatheque.recharger). La nouvelle médiathèque remplace
+        l'ancienne d'une seule affectation, dans la boucle asyncio: les sessions
+        déjà ouvertes continuent avec l'ancienne, les suivantes reçoivent la nouvelle.
+
+        Les lignes ajoutées au fichier sont appliquées directement, dans la
+        boucle: la nouvelle médiathèque complète sur place des structures
+        qu'elle partage avec l'ancienne (voir Mediatheque.appliquer_changements),
+        ce qu'aucune session ne doit voir en cours de lecture. Un fichier
+        à relire en entier l'est dans un autre fil (voir relire_mediatheque),
+        pour que les sessions continuent d'être servies pendant la lecture; une
+        demande reçue pendant la relecture est traitée à la fin de celle-ci.
+
+        Returns:
+            asyncio.Task: La relecture lancée ou en cours, ou None si la
+            médiathèque a été mise à jour directement.
+        """
+        if self.relecture is not None:
+            self.rechargement_en_attente = True
+            return self.relecture
+        if not isinstance(self.mediatheque, Mediatheque):
+            # La connexion SQLite ne peut être utilisée que depuis le fil qui l'a ouverte.
+            self.mediatheque = self.mediatheque.recharger()
+            return None
+
+        nouvelle = self.mediatheque.recharger_par_ajout()
+        if nouvelle is not None:
+            self.mediatheque = nouvelle
+            return None
+        self.relecture = asyncio.get_running_loop().create_task(self.relire_mediatheque())
+        return self.relecture
+
+    async def relire_mediatheque(self):
+        """
+        Méthode permettant de relire le fichier de shows en entier dans un
+        autre fil (voir Mediatheque.relire), puis de remplacer la médiathèque.
+        """
+        try:
+            self.mediatheque = await asyncio.to_thread(self.mediatheque.relire)
+        finally:
+            self.relecture = None
+            if self.rechargement_en_attente:
+                self.rechargement_en_attente = False
+                self.recharger_mediatheque()
+
+    async def demarrer(self, hote="127.0.0.1", port=8765):
+        """
+        Méthode permettant de commencer à accepter des connexions.
+
+        Args:
+            hote (str, optional): L'adresse d'écoute.
+            port (int, optional): Le port d'écoute (0 pour un port libre quelconque).
+
+        Returns:
+            asyncio.Server: Le serveur démarré.
+        """
+        return await asyncio.start_server(self.gerer_connexion, hote, port)
+
+    async def servir(self, hote="127.0.0.1", port=8765):
+        """
+        Méthode permettant d'accepter des connexions jusqu'à l'arrêt du programme.
+        Là où le signal SIGHUP existe, il recharge la médiathèque (kill -HUP <pid>).
+
+        Args:
+            hote (str, optional): L'adresse d'écoute.
+            port (int, optional): Le port d'écoute.
+        """
+        if hasattr(signal, "SIGHUP"):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.recharger_mediatheque)
+        serveur = await self.demarrer(hote, port)
+        async with serveur:
+            await serveur.serve_forever()
+
+
+def charger_annuaire(fichier_des_utilisateurs):
+    """
+    Fonction permettant de charger l'annuaire des utilisateurs. Si la variable
+    d'environnement ULFLIX_BASE_SQLITE donne le chemin d'une base SQLite, les
+    utilisateurs y sont stockés (le fichier texte ne sert qu'à la remplir). La
+    variable ULFLIX_HACHAGE choisit l'algorithme de hachage des nouveaux mots
+    de passe (voir HacheurDeMotDePasse.configurer).
+
+    Args:
+        fichier_des_utilisateurs (str): Le chemin du fichier des utilisateurs.
+
+    Returns:
+        AnnuaireUtilisateur: L'annuaire des utilisateurs.
+    """
+    algorithme_de_hachage = os.environ.get("ULFLIX_HACHAGE")
+    if algorithme_de_hachage:
+        HacheurDeMotDePasse.configurer(algorithme_de_hachage)
+
+    base_sqlite = os.environ.get("ULFLIX_BASE_SQLITE")
+    if base_sqlite:
+        return AnnuaireUtilisateurSqlite(base_sqlite, fichier_des_utilisateurs)
+    return AnnuaireUtilisateur(fichier_des_utilisateurs, chargement_paresseux=True)
+
+
+def charger_mediatheque_et_annuaire(fichier_des_shows, fichier_des_utilisateurs):
+    """
+    Fonction permettant de charger la médiathèque et l'annuaire des utilisateurs
+    (voir charger_annuaire). Si la variable d'environnement ULFLIX_BASE_SQLITE
+    donne le chemin d'une base SQLite, les shows y sont aussi stockés.
+
+    Args:
+        fichier_des_shows (str): Le chemin du fichier des shows.
+        fichier_des_utilisateurs (str): Le chemin du fichier des utilisateurs.
+
+    Returns:
+        tuple: La médiathèque et l'annuaire des utilisateurs.
+    """
+    annuaire_utilisateur = charger_annuaire(fichier_des_utilisateurs)
+    base_sqlite = os.environ.get("ULFLIX_BASE_SQLITE")
+    if base_sqlite:
+        return MediathequeSqlite(base_sqlite, fichier_des_shows), annuaire_utilisateur
+    return Mediatheque(fichier_des_shows), annuaire_utilisateur
+
+
+if __name__ == "__main__":
+    # python serveur.py [port] [hote]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    hote = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
+    mediatheque, annuaire_utilisateur = charger_mediatheque_et_annuaire("ulflix.txt", "ulflix-utilisateurs.txt")
+    if not isinstance(annuaire_utilisateur, AnnuaireUtilisateurSqlite):
+        # Le fichier des utilisateurs est compacté (trié, sans doublon) pendant que le serveur répond.
+        annuaire_utilisateur.compacter_en_arriere_plan()
+    print(f"ULFlix écoute sur {hote}:{port} ({len(mediatheque)} shows).")
+    # Les sessions s'exécutant en même temps, c'est le serveur entier qui est profilé.
+    try:
+        with profiler("serveur"):
+            asyncio.run(ServeurULFlix(mediatheque, annuaire_utilisateur).servir(hote, port))
+    except KeyboardInterrupt:
+        pass
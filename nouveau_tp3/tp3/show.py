@@ -1,6 +1,73 @@
 import datetime
+import functools
 import textwrap
 
+# Numéro de chaque mois, pour le format "%B %d, %Y" utilisé par la colonne date_ajout.
+NUMERO_DU_MOIS = {
+    "january": 1,
+    "february": 2,
+    "march": 3,
+    "april": 4,
+    "may": 5,
+    "june": 6,
+    "july": 7,
+    "august": 8,
+    "september": 9,
+    "october": 10,
+    "november": 11,
+    "december": 12,
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def convertir_date_ajout(texte):
+    """
+    Fonction permettant de convertir une date au format "%B %d, %Y"
+    (par exemple "August 14, 2020") en objet datetime.
+
+    Le format attendu est découpé directement, sans passer par
+    datetime.strptime qui est beaucoup plus lent. Toute autre forme de date
+    est confiée à strptime, qui donne alors le résultat (ou l'erreur) de référence.
+    Comme les mêmes dates reviennent très souvent dans un fichier de shows,
+    les résultats sont mémorisés.
+
+    Args:
+        texte (str): La date à convertir.
+
+    Returns:
+        datetime.datetime: La date convertie.
+    """
+    try:
+        mois, jour, annee = texte.split(" ")
+        chiffres = jour[:-1] + annee
+        if jour[-1:] == "," and len(jour) <= 3 and len(annee) == 4 and chiffres.isascii() and chiffres.isdigit():
+            return datetime.datetime(int(annee), NUMERO_DU_MOIS[mois.lower()], int(jour[:-1]))
+    except (ValueError, KeyError):
+        pass
+    return datetime.datetime.strptime(texte, "%B %d, %Y")
+
+
+def raccourcir_texte(texte, largeur, indicateur="..."):
+    """
+    Fonction équivalente à textwrap.shorten(texte, width=largeur, placeholder=indicateur).
+
+    Les espaces consécutifs sont fusionnés puis, si le texte tient dans la
+    largeur (le cas le plus fréquent pour les synopsis), il est retourné tel
+    quel sans passer par textwrap, qui est lent.
+
+    Args:
+        texte (str): Le texte à raccourcir.
+        largeur (int): La longueur maximale du résultat.
+        indicateur (str, optional): Le texte ajouté à la fin d'un texte coupé.
+
+    Returns:
+        str: Le texte raccourci.
+    """
+    texte = " ".join(texte.split())
+    if len(texte) <= largeur:
+        return texte
+    return textwrap.shorten(texte, width=largeur, placeholder=indicateur)
+
 
 class Show:
     LIMITE_MINIMUM_D_AGE_PAR_CLASSEMENT = {
@@ -22,6 +89,12 @@ class Show:
         "": 13,  # Si la valeur est manquante, donc par défaut, il doit être considéré comme PG-13
     }
 
+    # Les shows sont construits à la demande à partir du catalogue: on évite un __dict__ par instance.
+    __slots__ = (
+        "identifiant", "titre", "description", "langue", "popularite", "note", "type", "directeurs",
+        "acteurs", "pays", "date_ajout", "annee_sortie", "classement", "duree", "categories",
+    )
+
     def __init__(self, identifiant, titre, description, langue, popularite, note, type_, directeurs, acteurs, pays, date_ajout, annee_sortie, classement, duree, categories):
         """
         Construit un show à partir des valeurs passées en argument.
@@ -61,28 +134,49 @@ class Show:
         Returns:
             Show: Un objet Show représentant le show.
         """
-        res = {cle: valeur for cle, valeur in zip(ligne_des_titres.split("|"), ligne.split("|"))}
+        return cls.creer_show_via_champs(cls.decouper_ligne(ligne, ligne_des_titres))
+
+    @staticmethod
+    def decouper_ligne(ligne, ligne_des_titres):
+        """
+        Méthode permettant de découper une ligne du fichier de shows en champs,
+        sans les convertir. Cela permet d'examiner un show (par exemple son
+        classement ou ses pays) avant de payer le coût de sa construction.
+
+        Args:
+            ligne (str): La ligne à découper.
+            ligne_des_titres (str): La première ligne contenant l'ensemble des titres.
+
+        Returns:
+            dict: Dictionnaire associant chaque titre de colonne à sa valeur brute (str).
+        """
+        return {cle: valeur for cle, valeur in zip(ligne_des_titres.split("|"), ligne.split("|"))}
+
+    @classmethod
+    def creer_show_via_champs(cls, res):
+        """
+        Méthode permettant de construire un objet Show à partir des champs
+        bruts d'une ligne (voir decouper_ligne).
+
+        Args:
+            res (dict): Les champs bruts de la ligne.
+
+        Returns:
+            Show: Un objet Show représentant le show.
+        """
         date = res["date_ajout"] if (res["date_ajout"] != "") else "January 1, 2000"
-<<<<<<< HEAD:nouveau_tp3/tp3/show.py
-        return Show(
+        return cls(
             res["show_id"],
             res["titre"],
             res["description"],
             res["langue"],
-=======
-        return cls(
-            res["show_id"], 
-            res["titre"], 
-            res["description"], 
-            res["langue"], 
->>>>>>> master:show.py
             float(res["popularite"]),
             float(res["note"]),
             res["type"],
             [] if len(res["directeurs"]) == 0 else res["directeurs"].split(", "),
             [] if len(res["acteurs"]) == 0 else res["acteurs"].split(", "),
             res["pays"].split(", "),
-            datetime.datetime.strptime(date.strip(), "%B %d, %Y"),
+            convertir_date_ajout(date.strip()),
             int(res["annee_sortie"]),
             res["classement"],
             res["duree"],
@@ -98,7 +192,7 @@ class Show:
         repr_ = f"""
         {self.type:<10s} - {self.titre:>50s} ({self.langue.upper()}) {pop:>100s}
         Année: {str(self.annee_sortie):<10s} Durée: {self.duree:<10s} {sdate:>130s}
-        Synopsis: {textwrap.shorten(self.description, width=150, placeholder="..."):<}
+        Synopsis: {raccourcir_texte(self.description, 150):<}
         Acteurs: {"Inconnus" if len(self.acteurs) == 0 else ", ".join(self.acteurs):<50s}
         Directeurs: {"Inconnus" if len(self.directeurs) == 0 else ", ".join(self.directeurs):<50s}
         """
@@ -0,0 +1,1205 @@
+import collections
+import collections.abc
+import datetime
+import itertools
+import json
+import math
+import os
+import sqlite3
+import weakref
+
+from catalogue import Catalogue
+from instrumentation import chronometrer
+from mediatheque import Mediatheque
+from recherche_floue import (
+    IndexFlou,
+    classer_les_premiers_par_pertinence,
+    classer_par_pertinence,
+    parcourir_les_shows,
+    reporter_sur_les_shows,
+)
+from recommandation import Recommandeur, traits_depuis_catalogue
+from requete import AgePermis, Contient, Et, ListeContient, Non, Ou, Requete
+from show import Show
+from utilisateur import AnnuaireUtilisateur, Utilisateur, lire_rangees, rangees_valides_et_uniques
+
+# Stockage des shows et des utilisateurs dans une base SQLite locale, partageable entre
+# plusieurs processus (journal WAL). La base remplace les fichiers texte au démarrage:
+# rien n'est chargé en mémoire, chaque filtre et chaque tri devient une requête SQL.
+#
+# Schéma:
+#   - shows: une rangée par show, rang = position dans le fichier de shows. Les listes
+#     sont stockées en JSON, date_ajout est un ordinal (datetime.date.toordinal), et
+#     titre/description sont aussi stockés en minuscules (str.lower de Python, pour que
+#     les filtres donnent exactement les mêmes résultats que Mediatheque);
+#   - elements: un élément de liste (directeurs, acteurs, pays, categories) par rangée;
+#   - textes: table FTS5 (tokeniseur trigram) sur titre et description en minuscules,
+#     qui sert à présélectionner les shows avant la vérification par instr;
+#   - voisins: les voisins précalculés de chaque show (voir recommandation.py), calculés
+#     à l'import du fichier de shows;
+#   - utilisateurs: une rangée par utilisateur, l'adresse email est unique;
+#   - meta: la taille et la date de modification du fichier de shows importé.
+
+VERSION_DU_SCHEMA = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    cle TEXT PRIMARY KEY,
+    valeur
+);
+CREATE TABLE IF NOT EXISTS shows (
+    rang INTEGER PRIMARY KEY,
+    identifiant TEXT NOT NULL UNIQUE,
+    titre TEXT NOT NULL,
+    description TEXT NOT NULL,
+    langue TEXT NOT NULL,
+    popularite REAL NOT NULL,
+    note REAL NOT NULL,
+    type TEXT NOT NULL,
+    directeurs TEXT NOT NULL,
+    acteurs TEXT NOT NULL,
+    pays TEXT NOT NULL,
+    date_ajout INTEGER NOT NULL,
+    annee_sortie INTEGER NOT NULL,
+    classement TEXT NOT NULL,
+    duree TEXT NOT NULL,
+    categories TEXT NOT NULL,
+    age_minimum_requis INTEGER NOT NULL,
+    titre_minuscules TEXT NOT NULL,
+    description_minuscules TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shows_age_minimum_requis ON shows (age_minimum_requis);
+CREATE INDEX IF NOT EXISTS shows_popularite ON shows (popularite DESC, rang);
+CREATE INDEX IF NOT EXISTS shows_note ON shows (note DESC, rang);
+CREATE INDEX IF NOT EXISTS shows_date_ajout ON shows (date_ajout DESC, rang);
+CREATE INDEX IF NOT EXISTS shows_annee_sortie ON shows (annee_sortie DESC, rang);
+CREATE TABLE IF NOT EXISTS elements (
+    attribut TEXT NOT NULL,
+    valeur TEXT NOT NULL,
+    minuscules TEXT NOT NULL,
+    rang INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS elements_valeur ON elements (attribut, valeur, rang);
+CREATE INDEX IF NOT EXISTS elements_minuscules ON elements (attribut, minuscules, rang);
+CREATE VIRTUAL TABLE IF NOT EXISTS textes USING fts5 (titre, description, content='', tokenize='trigram');
+CREATE TABLE IF NOT EXISTS voisins (
+    rang INTEGER NOT NULL,
+    voisin INTEGER NOT NULL,
+    similarite REAL NOT NULL,
+    PRIMARY KEY (rang, voisin)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS utilisateurs (
+    numero INTEGER PRIMARY KEY,
+    nom TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    age INTEGER NOT NULL,
+    pays TEXT NOT NULL,
+    abonnement INTEGER NOT NULL,
+    mot_de_passe TEXT NOT NULL
+);
+"""
+# Un trigramme est la plus petite recherche que l'index FTS5 peut présélectionner.
+TAILLE_MINIMUM_RECHERCHE_PLEIN_TEXTE = 3
+
+
+# Numéros donnés aux tables temporaires de chaque médiathèque: les vues partagent la
+# connexion de leur médiathèque (voir MediathequeSqlite.vue), chacune avec ses tables.
+NUMEROS_DES_TABLES_TEMPORAIRES = itertools.count()
+
+
+def ouvrir_base(chemin_base):
+    """
+    Fonction permettant d'ouvrir (et de créer au besoin) une base SQLite ULFlix.
+
+    La connexion est en mode autocommit: chaque écriture qui doit être
+    atomique ouvre elle-même sa transaction (BEGIN IMMEDIATE).
+
+    Args:
+        chemin_base (str): Le chemin du fichier de la base.
+
+    Returns:
+        sqlite3.Connection: La connexion à la base.
+    """
+    connexion = sqlite3.connect(chemin_base, isolation_level=None, timeout=30)
+    connexion.execute("PRAGMA journal_mode = WAL")
+    connexion.execute("PRAGMA synchronous = NORMAL")
+    if connexion.execute("PRAGMA user_version").fetchone()[0] != VERSION_DU_SCHEMA:
+        # Les shows d'une base d'une version précédente seront importés de nouveau.
+        try:
+            connexion.executescript(
+                f"BEGIN IMMEDIATE; {SCHEMA} DELETE FROM meta WHERE cle = 'source_shows'; "
+                f"PRAGMA user_version = {VERSION_DU_SCHEMA}; COMMIT;"
+            )
+        except BaseException:
+            if connexion.in_transaction:
+                connexion.execute("ROLLBACK")
+            raise
+    # Minuscules calculées par Python: SQLite ne sait mettre en minuscules que l'ASCII.
+    connexion.create_function("minuscules", 1, str.lower, deterministic=True)
+    return connexion
+
+
+def supprimer_tables(connexion, tables):
+    """
+    Fonction permettant de supprimer des tables temporaires, si la connexion
+    est encore ouverte.
+
+    Args:
+        connexion (sqlite3.Connection): La connexion à laquelle les tables appartiennent.
+        tables (tuple): Les noms (str) des tables.
+    """
+    try:
+        for table in tables:
+            connexion.execute(f"DROP TABLE IF EXISTS {table}")
+    except sqlite3.ProgrammingError:
+        # La connexion a déjà été fermée, avec ses tables temporaires.
+        pass
+    except sqlite3.OperationalError:
+        # Une lecture est en cours sur la connexion: les tables restent jusqu'à sa fermeture.
+        pass
+
+
+def expression_plein_texte(colonne, valeur):
+    """
+    Fonction permettant de construire une requête FTS5 cherchant une
+    sous-chaîne dans une colonne de la table textes.
+
+    Args:
+        colonne (str): La colonne de la table textes.
+        valeur (str): La sous-chaîne cherchée (au moins trois caractères).
+
+    Returns:
+        str: L'expression à passer à MATCH.
+    """
+    return '%s : "%s"' % (colonne, valeur.replace('"', '""'))
+
+
+class VueShowsSqlite(collections.abc.Mapping):
+    """
+    Dictionnaire en lecture des shows d'une MediathequeSqlite, équivalent
+    à VueShows: les objets Show sont construits à la demande depuis la base.
+    """
+    def __init__(self, mediatheque):
+        self.mediatheque = mediatheque
+
+    def __getitem__(self, show_id):
+        rangee = self.mediatheque.connexion.execute(
+            f"SELECT {MediathequeSqlite.COLONNES_SHOW} FROM shows WHERE identifiant = ?"
+            + self.mediatheque.restriction(),
+            (show_id,),
+        ).fetchone()
+        if rangee is None:
+            raise KeyError(show_id)
+        return MediathequeSqlite.show_depuis_rangee(rangee)
+
+    def __contains__(self, show_id):
+        return self.mediatheque.connexion.execute(
+            "SELECT 1 FROM shows WHERE identifiant = ?" + self.mediatheque.restriction(), (show_id,)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        curseur = self.mediatheque.connexion.execute(
+            "SELECT identifiant FROM shows WHERE 1" + self.mediatheque.restriction() + " ORDER BY rang"
+        )
+        return (show_id for show_id, in curseur)
+
+    def __len__(self):
+        return self.mediatheque.connexion.execute(
+            "SELECT count(*) FROM shows WHERE 1" + self.mediatheque.restriction()
+        ).fetchone()[0]
+
+
+class MediathequeSqlite(Mediatheque):
+    """
+    Médiathèque dont les shows sont stockés dans une base SQLite.
+
+    Elle offre les mêmes méthodes que Mediatheque et donne les mêmes résultats,
+    mais ne charge rien au démarrage: les filtres, les tris et les listes de
+    valeurs uniques sont calculés par SQLite à l'aide de ses index.
+    Les shows retirés par reduire_liste_des_shows (ou refusés par le filtre)
+    sont exclus grâce à une table temporaire de rangs gardés, propre à la
+    médiathèque: plusieurs médiathèques peuvent donc partager la même base,
+    et même la même connexion.
+
+    Une MediathequeSqlite est composée des attributs suivants:
+        - chemin_base (str): le chemin de la base SQLite.
+        - connexion (sqlite3.Connection): la connexion à la base.
+        - table_gardes (str): le nom de la table temporaire des rangs gardés.
+        - table_selection (str): le nom de la table temporaire des show_ids sélectionnés.
+        - restreinte (bool): True si seuls les shows de la table gardes font partie de la médiathèque.
+        - shows (VueShowsSqlite): dictionnaire des shows de la médiathèque.
+    """
+    ATTRIBUTS_CHAINES = ("identifiant", "titre", "description", "langue", "type", "classement", "duree")
+    # Nombre de shows trouvés par une recherche par pertinence dont le show_id et la
+    # popularité sont lus à la fois (voir parcourir_par_pertinence).
+    TAILLE_DES_LOTS_DE_PERTINENCE = 256
+    COLONNES_SHOW = (
+        "identifiant, titre, description, langue, popularite, note, type, directeurs, "
+        "acteurs, pays, date_ajout, annee_sortie, classement, duree, categories"
+    )
+
+    def __init__(self, chemin_base, chemin_fichier=None, filtre=None, connexion=None):
+        """
+        Args:
+            chemin_base (str): Le chemin de la base SQLite (créée si elle n'existe pas).
+            chemin_fichier (str, optional): Le chemin d'un fichier de shows. S'il est
+            fourni, il est importé dans la base lorsqu'il a changé depuis le dernier import.
+            filtre (FiltreDAcces, optional): Si fourni, seuls les shows respectant
+            ce filtre font partie de la médiathèque.
+            connexion (sqlite3.Connection, optional): Une connexion à la base à
+            partager (voir vue). Si omise, une connexion est ouverte.
+        """
+        self.chemin_base = chemin_base
+        self.chemin_fichier = chemin_fichier
+        self.connexion_partagee = connexion is not None
+        self.connexion = ouvrir_base(chemin_base) if connexion is None else connexion
+        numero = next(NUMEROS_DES_TABLES_TEMPORAIRES)
+        self.table_gardes = f"temp.gardes_{numero}"
+        self.table_selection = f"temp.selection_{numero}"
+        self.connexion.execute(f"CREATE TEMP TABLE {self.table_gardes} (rang INTEGER PRIMARY KEY)")
+        self.connexion.execute(f"CREATE TEMP TABLE {self.table_selection} (identifiant TEXT NOT NULL)")
+        self.restreinte = False
+        self.filtre = filtre
+        self.shows = VueShowsSqlite(self)
+        self.rendus = collections.OrderedDict()
+        self.index_flous = {}
+        self.recommandations = collections.OrderedDict()
+        self.vues = collections.OrderedDict()
+
+        if chemin_fichier is not None:
+            self.importer_fichier(chemin_fichier)
+        if filtre is not None:
+            self.appliquer_filtre(filtre)
+
+    def importer_fichier(self, chemin_fichier):
+        """
+        Méthode permettant d'importer un fichier de shows dans la base, en
+        remplaçant les shows qu'elle contenait. Le fichier est analysé comme
+        par Mediatheque (même traitement des show_ids répétés). Rien n'est fait
+        si la base contient déjà la version actuelle du fichier.
+
+        Args:
+            chemin_fichier (str): Le chemin menant au fichier de shows.
+
+        Returns:
+            bool: True si le fichier a été importé, False s'il l'était déjà.
+        """
+        stat_source = os.stat(chemin_fichier)
+        source = f"{stat_source.st_size}:{stat_source.st_mtime_ns}"
+        requete_source = "SELECT valeur FROM meta WHERE cle = 'source_shows'"
+        if self.connexion.execute(requete_source).fetchone() == (source,):
+            return False
+
+        catalogue = Mediatheque(chemin_fichier, attributs_indexes=(), utiliser_instantane=False).catalogue
+        connexion = self.connexion
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre processus a pu importer le même fichier pendant l'analyse.
+            if connexion.execute(requete_source).fetchone() != (source,):
+                connexion.execute("DELETE FROM shows")
+                connexion.execute("DELETE FROM elements")
+                connexion.execute("DELETE FROM voisins")
+                connexion.execute("INSERT INTO textes (textes) VALUES ('delete-all')")
+                connexion.executemany(
+                    "INSERT INTO shows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._rangees_depuis_catalogue(catalogue),
+                )
+                connexion.executemany(
+                    "INSERT INTO elements VALUES (?, ?, ?, ?)", self._elements_depuis_catalogue(catalogue)
+                )
+                connexion.executemany("INSERT INTO voisins VALUES (?, ?, ?)", self._voisins_depuis_catalogue(catalogue))
+                connexion.execute(
+                    "INSERT INTO textes (rowid, titre, description) "
+                    "SELECT rang, titre_minuscules, description_minuscules FROM shows"
+                )
+                connexion.execute("INSERT OR REPLACE INTO meta VALUES ('source_shows', ?)", (source,))
+            connexion.execute("COMMIT")
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        self.rendus.clear()
+        self.index_flous.clear()
+        self.recommandations.clear()
+        return True
+
+    @chronometrer()
+    def appliquer_changements(self, changements):
+        """
+        Méthode permettant d'ajouter, de remplacer ou de retirer des shows dans
+        la base, comme Mediatheque.appliquer_changements, en une seule
+        transaction: les autres connexions (vues, autres processus) voient tous
+        les changements ou aucun. Un show ajouté ou remplacé reçoit un rang
+        après tous les autres, et n'a pas de voisins jusqu'au prochain import.
+
+        La base est modifiée sur place et la médiathèque elle-même est
+        retournée. Ses vues sont oubliées et recréées à la demande: une vue
+        déjà servie ne voit pas les shows ajoutés.
+
+        Args:
+            changements (iterable): Paires (show_id, show), dans l'ordre: show
+            est le Show ajouté ou remplaçant, ou None si le show est retiré.
+
+        Returns:
+            MediathequeSqlite: La médiathèque.
+        """
+        # Comme dans le fichier de shows, le dernier changement d'un show_id l'emporte.
+        shows_changes = {}
+        for show_id, show in changements:
+            shows_changes.pop(show_id, None)
+            shows_changes[show_id] = show
+        catalogue = Catalogue()
+        for show in shows_changes.values():
+            if show is not None:
+                catalogue.ajouter(show)
+
+        connexion = self.connexion
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            self._remplir_selection(shows_changes)
+            # Le contenu de la table textes n'est pas conservé: ses entrées sont retirées avec leurs valeurs.
+            connexion.execute(
+                "INSERT INTO textes (textes, rowid, titre, description) "
+                "SELECT 'delete', rang, titre_minuscules, description_minuscules FROM shows "
+                f"WHERE identifiant IN (SELECT identifiant FROM {self.table_selection})"
+            )
+            for table in ("elements", "voisins", self.table_gardes):
+                connexion.execute(
+                    f"DELETE FROM {table} WHERE rang IN "
+                    f"(SELECT rang FROM shows WHERE identifiant IN (SELECT identifiant FROM {self.table_selection}))"
+                )
+            # Les voisins des autres shows qui désignent un show retiré sont écartés par la jointure sur shows.
+            connexion.execute(
+                f"DELETE FROM shows WHERE identifiant IN (SELECT identifiant FROM {self.table_selection})"
+            )
+
+            premier_rang = connexion.execute("SELECT coalesce(max(rang), -1) + 1 FROM shows").fetchone()[0]
+            connexion.executemany(
+                "INSERT INTO shows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._rangees_depuis_catalogue(catalogue, premier_rang),
+            )
+            connexion.executemany(
+                "INSERT INTO elements VALUES (?, ?, ?, ?)", self._elements_depuis_catalogue(catalogue, premier_rang)
+            )
+            connexion.execute(
+                "INSERT INTO textes (rowid, titre, description) "
+                "SELECT rang, titre_minuscules, description_minuscules FROM shows WHERE rang >= ?",
+                (premier_rang,),
+            )
+            if self.restreinte:
+                connexion.executemany(
+                    f"INSERT INTO {self.table_gardes} VALUES (?)",
+                    (
+                        (premier_rang + rang,)
+                        for rang in range(len(catalogue))
+                        if self.filtre is None or self.filtre.accepte_rang(catalogue, rang)
+                    ),
+                )
+            connexion.execute("COMMIT")
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        self.rendus.clear()
+        self.index_flous.clear()
+        self.recommandations.clear()
+        self.oublier_vues()
+        return self
+
+    def recharger(self):
+        """
+        Méthode permettant de prendre en compte les modifications du fichier de
+        shows: il est importé de nouveau s'il a changé (voir importer_fichier),
+        en une seule transaction. Ses vues sont alors oubliées et recréées à la demande.
+
+        Returns:
+            MediathequeSqlite: La médiathèque.
+        """
+        if self.chemin_fichier is not None and self.importer_fichier(self.chemin_fichier):
+            self.oublier_vues()
+        return self
+
+    @staticmethod
+    def _rangees_depuis_catalogue(catalogue, premier_rang=0):
+        """
+        Générateur produisant la rangée de la table shows de chaque show d'un
+        catalogue, le premier show recevant le rang premier_rang.
+        """
+        colonnes = catalogue.colonnes
+        for rang in range(len(catalogue)):
+            show = catalogue.show(rang)
+            yield (
+                premier_rang + rang,
+                show.identifiant,
+                show.titre,
+                show.description,
+                show.langue,
+                show.popularite,
+                show.note,
+                show.type,
+                json.dumps(show.directeurs, ensure_ascii=False),
+                json.dumps(show.acteurs, ensure_ascii=False),
+                json.dumps(show.pays, ensure_ascii=False),
+                colonnes["date_ajout"][rang],
+                show.annee_sortie,
+                show.classement,
+                show.duree,
+                json.dumps(show.categories, ensure_ascii=False),
+                colonnes["age_minimum_requis"][rang],
+                show.titre.lower(),
+                show.description.lower(),
+            )
+
+    @staticmethod
+    def _elements_depuis_catalogue(catalogue, premier_rang=0):
+        """
+        Générateur produisant les rangées de la table elements d'un catalogue,
+        le premier show recevant le rang premier_rang.
+        """
+        for attribut in Catalogue.ATTRIBUTS_LISTE:
+            colonne = catalogue.colonnes[attribut]
+            for rang in range(len(colonne)):
+                for valeur in colonne[rang]:
+                    yield attribut, valeur, valeur.lower(), premier_rang + rang
+
+    @staticmethod
+    def _voisins_depuis_catalogue(catalogue):
+        """
+        Générateur produisant les rangées de la table voisins d'un catalogue,
+        calculées comme pour Mediatheque.obtenir_recommandeur.
+        """
+        recommandeur = Recommandeur.construire(traits_depuis_catalogue(catalogue), catalogue.colonnes["popularite"])
+        for rang in range(len(recommandeur)):
+            for voisin, similarite in recommandeur.voisins_de(rang):
+                yield rang, voisin, similarite
+
+    @staticmethod
+    def show_depuis_rangee(rangee):
+        """
+        Méthode permettant de construire un objet Show à partir d'une rangée
+        de la table shows (colonnes COLONNES_SHOW).
+
+        Args:
+            rangee (tuple): La rangée.
+
+        Returns:
+            Show: Le show correspondant.
+        """
+        (identifiant, titre, description, langue, popularite, note, type_, directeurs,
+         acteurs, pays, date_ajout, annee_sortie, classement, duree, categories) = rangee
+        return Show(
+            identifiant,
+            titre,
+            description,
+            langue,
+            popularite,
+            note,
+            type_,
+            json.loads(directeurs),
+            json.loads(acteurs),
+            json.loads(pays),
+            datetime.datetime.fromordinal(date_ajout),
+            annee_sortie,
+            classement,
+            duree,
+            json.loads(categories),
+        )
+
+    def restriction(self, colonne="rang"):
+        """
+        Méthode permettant de récupérer la condition SQL (à ajouter à une clause
+        WHERE) qui limite une requête aux shows de la médiathèque.
+
+        Args:
+            colonne (str, optional): La colonne contenant le rang des shows dans la requête.
+
+        Returns:
+            str: La condition, précédée de AND, ou une chaîne vide si tous les shows de la base en font partie.
+        """
+        return f" AND {colonne} IN (SELECT rang FROM {self.table_gardes})" if self.restreinte else ""
+
+    def _remplir_selection(self, identifiants):
+        """
+        Méthode permettant de placer des show_ids dans la table temporaire table_selection.
+        """
+        self.connexion.execute(f"DELETE FROM {self.table_selection}")
+        self.connexion.executemany(
+            f"INSERT INTO {self.table_selection} VALUES (?)", ((show_id,) for show_id in identifiants)
+        )
+
+    def _garder_rangs(self, requete, parametres=()):
+        """
+        Méthode permettant de restreindre la médiathèque aux shows dont le
+        rang est retourné par une requête (en plus de la restriction actuelle).
+
+        Args:
+            requete (str): Requête SQL retournant des rangs.
+            parametres (tuple, optional): Paramètres de la requête.
+        """
+        if self.restreinte:
+            self.connexion.execute(f"DELETE FROM {self.table_gardes} WHERE rang NOT IN ({requete})", parametres)
+        else:
+            self.connexion.execute(f"INSERT INTO {self.table_gardes} {requete}", parametres)
+            self.restreinte = True
+
+    def appliquer_filtre(self, filtre):
+        """
+        Méthode permettant de retirer de la médiathèque les shows qui ne
+        respectent pas un filtre d'accès, sans les lire.
+
+        Args:
+            filtre (FiltreDAcces): Le filtre à appliquer.
+        """
+        predicat = AgePermis(filtre.age_utilisateur)
+        if filtre.pays is not None:
+            predicat &= ListeContient("pays", filtre.pays)
+        condition, parametres = self.condition_du_predicat(predicat)
+        self._garder_rangs("SELECT rang FROM shows WHERE " + condition, parametres)
+
+    def vue(self, filtre):
+        """
+        Méthode permettant de récupérer la médiathèque limitée aux shows
+        accessibles selon un filtre. Chaque vue est une autre MediathequeSqlite
+        qui partage la connexion de la médiathèque (avec ses propres tables
+        temporaires): elle porte sur tous les shows de la base, même si
+        celle-ci a été réduite. Les vues sont conservées par clé de filtre,
+        dans la limite de TAILLE_DU_CACHE_DE_VUES, comme pour Mediatheque.vue.
+
+        Args:
+            filtre (FiltreDAcces): Le filtre d'accès de l'utilisateur.
+
+        Returns:
+            MediathequeSqlite: La vue.
+        """
+        cle = filtre.cle()
+        vue = self.vues.get(cle)
+        if vue is not None:
+            self.vues.move_to_end(cle)
+            return vue
+
+        vue = self.vues[cle] = MediathequeSqlite(self.chemin_base, filtre=filtre, connexion=self.connexion)
+        # Les index flous portent sur tous les shows de la base: ils sont partagés.
+        vue.index_flous = self.index_flous
+        # Les tables temporaires de la vue sont supprimées lorsqu'elle n'est plus utilisée.
+        weakref.finalize(vue, supprimer_tables, self.connexion, (vue.table_gardes, vue.table_selection))
+        if len(self.vues) > self.TAILLE_DU_CACHE_DE_VUES:
+            self.vues.popitem(last=False)
+        return vue
+
+    def oublier_vues(self):
+        """
+        Méthode permettant d'oublier les vues créées: elles seront recréées à la demande.
+        """
+        self.vues = collections.OrderedDict()
+
+    def __len__(self):
+        """
+        Retourne le nombre de shows dans la médiatheque.
+        """
+        return len(self.shows)
+
+    def reduire_liste_des_shows(self, identifiants_a_garder):
+        """
+        Méthode permettant de supprimer de la médiathèque, les shows dont
+        les identifiants ne font pas partie de la liste des identifiants à
+        garder. Les shows restent dans la base: seule la table gardes change.
+
+        Args:
+            identifiants_a_garder (list): Liste des identifiants des shows
+            à ne pas supprimer de la médiathèque.
+        """
+        self._remplir_selection(identifiants_a_garder)
+        self._garder_rangs(
+            f"SELECT s.rang FROM {self.table_selection} AS t JOIN shows AS s ON s.identifiant = t.identifiant"
+        )
+        self.recommandations.clear()
+
+    @chronometrer()
+    def filtrer_ids_sur_attribut_par_inclusion_de_string(self, attribut, valeur):
+        """
+        Méthode permettant de récupérer uniquement les identifiants des
+        shows de la médiathèque où la valeur de l'attribut passé
+        en argument contient la valeur passée en argument.
+        Le filtre est insensible à la casse. Pour le titre et la description,
+        l'index FTS5 présélectionne les shows contenant tous les trigrammes
+        de la valeur.
+
+        Args:
+            attribut (str): Attribut de filtre
+            valeur (str): Valeur de filtre.
+
+        Returns:
+            list: Liste des show_ids respectant les critères du filtre.
+        """
+        return self.executer(Requete(Contient(attribut, valeur)))
+
+    @chronometrer()
+    def filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string(self, attribut, valeur):
+        """
+        Méthode permettant de récupérer uniquement les identifiants des
+        shows de la médiathèque où l'un des éléments de l'attribut de type
+        liste passé en argument contient la valeur passée en argument.
+        Le filtre est insensible à la casse.
+
+        Args:
+            attribut (str): Attribut de filtre
+            valeur (str): Valeur de filtre.
+
+        Returns:
+            list: Liste des show_ids respectant les critères du filtre.
+        """
+        return self.executer(Requete(ListeContient(attribut, valeur)))
+
+    def obtenir_index_flou(self, attribut):
+        """
+        Méthode permettant de récupérer l'index de recherche floue d'un
+        attribut, construit lors du premier appel à partir des tables shows
+        (titres) et elements (noms). Il porte sur tous les shows de la base
+        et a la même forme que pour Mediatheque.obtenir_index_flou.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+
+        Returns:
+            tuple: L'IndexFlou et, pour une liste, les rangs (list) des shows de
+            chaque nom, par code du nom (None pour un titre).
+
+        Raises:
+            KeyError: Si l'attribut ne fait pas partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+        """
+        if attribut not in self.ATTRIBUTS_DE_RECHERCHE_FLOUE:
+            raise KeyError(attribut)
+        entree = self.index_flous.get(attribut)
+        if entree is None:
+            if attribut in Catalogue.ATTRIBUTS_LISTE:
+                codes, rangs_par_nom = {}, []
+                curseur = self.connexion.execute(
+                    "SELECT valeur, rang FROM elements WHERE attribut = ? ORDER BY rang", (attribut,)
+                )
+                for nom, rang in curseur:
+                    code = codes.setdefault(nom, len(codes))
+                    if code == len(rangs_par_nom):
+                        rangs_par_nom.append([])
+                    rangs_par_nom[code].append(rang)
+                entree = (IndexFlou((code, nom) for nom, code in codes.items()), rangs_par_nom)
+            else:
+                entree = (IndexFlou(self.connexion.execute(f"SELECT rang, {attribut} FROM shows")), None)
+            self.index_flous[attribut] = entree
+        return entree
+
+    @chronometrer()
+    def rechercher_par_pertinence(self, attribut, recherche, limite=None):
+        """
+        Méthode permettant de rechercher des shows par titre, par acteur ou par
+        directeur en tolérant les fautes de frappe, comme
+        Mediatheque.rechercher_par_pertinence (même classement). Seuls les
+        show_ids et les popularités des shows trouvés sont lus dans la base.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+            recherche (str): Les mots recherchés.
+            limite (int, optional): Si fourni, seuls les limite premiers show_ids sont retournés.
+
+        Returns:
+            list: Les show_ids trouvés, du plus au moins pertinent.
+        """
+        if limite is not None:
+            return classer_les_premiers_par_pertinence(self.parcourir_par_pertinence(attribut, recherche), limite)
+        index, rangs_par_nom = self.obtenir_index_flou(attribut)
+        pertinences = index.rechercher(recherche)
+        if rangs_par_nom is not None:
+            pertinences = reporter_sur_les_shows(pertinences, rangs_par_nom)
+        return classer_par_pertinence(
+            self._completer_les_trouves(((pertinence, rang) for rang, pertinence in pertinences.items()), None)
+        )
+
+    def parcourir_par_pertinence(self, attribut, recherche):
+        """
+        Générateur parcourant les shows de la médiathèque trouvés par une
+        recherche par pertinence, du plus au moins pertinent, comme
+        Mediatheque.parcourir_par_pertinence. Les show_ids et les popularités
+        sont lus dans la base par lots de TAILLE_DES_LOTS_DE_PERTINENCE shows.
+
+        Args:
+            attribut (str): Attribut faisant partie de ATTRIBUTS_DE_RECHERCHE_FLOUE.
+            recherche (str): Les mots recherchés.
+
+        Yields:
+            tuple: La pertinence, la popularité normalisée, le rang et le show_id de chaque show.
+        """
+        index, rangs_par_nom = self.obtenir_index_flou(attribut)
+        trouves = index.parcourir_par_pertinence(recherche)
+        if rangs_par_nom is not None:
+            trouves = parcourir_les_shows(trouves, rangs_par_nom)
+        yield from self._completer_les_trouves(trouves, self.TAILLE_DES_LOTS_DE_PERTINENCE)
+
+    def _completer_les_trouves(self, trouves, taille_des_lots):
+        """
+        Générateur ajoutant le show_id et la popularité normalisée des shows
+        trouvés par une recherche, en gardant leur ordre. Les shows qui ne font
+        pas partie de la médiathèque sont écartés.
+
+        Args:
+            trouves (iterable): Paires (pertinence, rang).
+            taille_des_lots (int): Nombre de shows lus à la fois dans la base, ou None pour tous.
+
+        Yields:
+            tuple: La pertinence, la popularité normalisée, le rang et le show_id de chaque show.
+        """
+        trouves = iter(trouves)
+        maximum = None
+        while True:
+            lot = list(itertools.islice(trouves, taille_des_lots))
+            if not lot:
+                return
+            if maximum is None:
+                # Même normalisation que normaliser_popularites, sur tous les shows de la base.
+                popularite_maximale, = self.connexion.execute("SELECT max(popularite) FROM shows").fetchone()
+                maximum = math.log1p(max(popularite_maximale, 0.0)) or 1.0
+            curseur = self.connexion.execute(
+                "SELECT rang, identifiant, popularite FROM shows "
+                f"WHERE rang IN (SELECT value FROM json_each(?)){self.restriction()}",
+                (json.dumps([rang for _, rang in lot]),),
+            )
+            shows = {rang: (show_id, popularite) for rang, show_id, popularite in curseur}
+            for pertinence, rang in lot:
+                show = shows.get(rang)
+                if show is not None:
+                    yield pertinence, math.log1p(max(show[1], 0.0)) / maximum, rang, show[0]
+
+    def recommander_par_similarite(self, show_ids, limite):
+        """
+        Méthode permettant de récupérer les shows de la médiathèque les plus
+        semblables à quelques shows, comme Mediatheque.recommander_par_similarite,
+        à partir de la table voisins.
+
+        Args:
+            show_ids (iterable): Les show_ids des shows de référence. Ceux qui ne
+            font pas partie de la médiathèque sont ignorés.
+            limite (int): Le nombre maximal de show_ids retournés.
+
+        Returns:
+            list: Les show_ids, du plus au moins semblable.
+        """
+        curseur = self.connexion.execute(
+            "WITH reference AS ("
+            "    SELECT rang FROM shows WHERE identifiant IN (SELECT value FROM json_each(?))"
+            f"{self.restriction()}"
+            ") "
+            "SELECT s.identifiant FROM voisins AS v JOIN shows AS s ON s.rang = v.voisin "
+            "WHERE v.rang IN reference AND v.voisin NOT IN reference"
+            f"{self.restriction('s.rang')} "
+            "GROUP BY s.rang ORDER BY sum(v.similarite) DESC, s.rang LIMIT ?",
+            (json.dumps(list(dict.fromkeys(show_ids))), limite),
+        )
+        return [show_id for show_id, in curseur]
+
+    @chronometrer()
+    def filtrer_ids_sur_age(self, age_utilisateur):
+        """
+        Méthode permettant de récupérer uniquement les shows de
+        la médiathèque où la limite d'âge est respectée.
+
+        Args:
+            age_utilisateur (int): Âge de l'utilisateur
+
+        Returns:
+            list: Liste des show_ids respectant la limite d'âge.
+        """
+        return self.executer(Requete(AgePermis(age_utilisateur)))
+
+    def executer(self, requete):
+        """
+        Méthode permettant d'exécuter une Requete sur la médiathèque. Le
+        prédicat, le tri (s'il porte sur un attribut numérique) et la fenêtre
+        de résultats sont traduits en une seule requête SQL: c'est SQLite qui
+        choisit les index à utiliser.
+
+        Args:
+            requete (Requete): La requête à exécuter.
+
+        Returns:
+            list: Les show_ids des résultats, dans l'ordre de la médiathèque
+            ou dans l'ordre du tri de la requête.
+        """
+        condition, parametres = ("1", ()) if requete.predicat is None else self.condition_du_predicat(requete.predicat)
+        requete_sql = f"SELECT identifiant FROM shows WHERE ({condition})" + self.restriction()
+
+        if requete.tri is not None and requete.tri not in Catalogue.ATTRIBUTS_NUMERIQUES:
+            fin = None if requete.limite is None else requete.decalage + requete.limite
+            show_ids = [show_id for show_id, in self.connexion.execute(requete_sql + " ORDER BY rang", parametres)]
+            return self.trier_ids_par_attribut(show_ids, requete.tri, fin)[requete.decalage:fin]
+
+        ordre = "rang" if requete.tri is None else f"{requete.tri} DESC, rang"
+        limite = -1 if requete.limite is None else requete.limite
+        curseur = self.connexion.execute(
+            f"{requete_sql} ORDER BY {ordre} LIMIT ? OFFSET ?", parametres + (limite, requete.decalage)
+        )
+        return [show_id for show_id, in curseur]
+
+    def condition_du_predicat(self, predicat):
+        """
+        Méthode permettant de traduire un prédicat en condition SQL sur la table shows.
+
+        Args:
+            predicat (Predicat): Le prédicat.
+
+        Returns:
+            tuple: La condition (str) et ses paramètres (tuple).
+        """
+        if isinstance(predicat, (Et, Ou)):
+            if not predicat.predicats:
+                return ("1" if isinstance(predicat, Et) else "0"), ()
+            conditions = [self.condition_du_predicat(sous_predicat) for sous_predicat in predicat.predicats]
+            operateur = " AND " if isinstance(predicat, Et) else " OR "
+            return (
+                operateur.join(f"({condition})" for condition, _ in conditions),
+                tuple(parametre for _, parametres in conditions for parametre in parametres),
+            )
+
+        if isinstance(predicat, Non):
+            condition, parametres = self.condition_du_predicat(predicat.predicat)
+            return f"NOT ({condition})", parametres
+
+        if isinstance(predicat, AgePermis):
+            return "age_minimum_requis <= ?", (predicat.age_utilisateur,)
+
+        val = predicat.valeur.lower()
+        if isinstance(predicat, ListeContient):
+            if predicat.attribut not in Catalogue.ATTRIBUTS_LISTE:
+                raise KeyError(predicat.attribut)
+            return (
+                "rang IN (SELECT rang FROM elements WHERE attribut = ? AND instr(minuscules, ?) > 0)",
+                (predicat.attribut, val),
+            )
+
+        if predicat.attribut not in self.ATTRIBUTS_CHAINES:
+            raise KeyError(predicat.attribut)
+        if predicat.attribut not in self.ATTRIBUTS_TEXTE_NORMALISES:
+            return f"instr(minuscules({predicat.attribut}), ?) > 0", (val,)
+        condition = f"instr({predicat.attribut}_minuscules, ?) > 0"
+        if len(val) < TAILLE_MINIMUM_RECHERCHE_PLEIN_TEXTE:
+            return condition, (val,)
+        return (
+            condition + " AND rang IN (SELECT rowid FROM textes WHERE textes MATCH ?)",
+            (val, expression_plein_texte(predicat.attribut, val)),
+        )
+
+    @chronometrer()
+    def trier_ids_par_attribut(self, show_ids, attribut, limite=None):
+        """
+        Méthode permettant de trier les show_ids d'une médiathèque
+        en ordre décroissant en se basant sur un attribut particulier
+        des shows. Pour un attribut numérique, le tri est fait par SQLite
+        (avec l'index de l'attribut lorsque tous les shows sont triés). Comme
+        avec sorted, les shows de même valeur gardent leur ordre dans show_ids
+        (leur position dans la médiathèque lorsque tous les shows sont triés).
+
+        Args:
+            show_ids (list): Identifiants des shows à trier. None signifie
+            tous les shows de la médiathèque.
+            attribut (str): Attribut de tri
+            limite (int, optional): Si fourni, seuls les limite premiers
+            show_ids triés sont retournés.
+
+        Returns:
+            list: Liste des show_ids triée en ordre décroissant
+                  de l'attribut d'intérêt.
+        """
+        if attribut not in Catalogue.ATTRIBUTS_NUMERIQUES:
+            if show_ids is None:
+                show_ids = list(self.shows)
+            show_ids = sorted(show_ids, key=lambda show_id: getattr(self.shows[show_id], attribut), reverse=True)
+            return show_ids if limite is None else show_ids[:limite]
+
+        limite = -1 if limite is None else limite
+        if show_ids is None:
+            curseur = self.connexion.execute(
+                f"SELECT identifiant FROM shows WHERE 1{self.restriction()} ORDER BY {attribut} DESC, rang LIMIT ?",
+                (limite,),
+            )
+        else:
+            self._remplir_selection(show_ids)
+            curseur = self.connexion.execute(
+                f"SELECT s.identifiant FROM {self.table_selection} AS t "
+                "JOIN shows AS s ON s.identifiant = t.identifiant "
+                f"ORDER BY s.{attribut} DESC, t.rowid LIMIT ?",
+                (limite,),
+            )
+        return [show_id for show_id, in curseur]
+
+    def iterer_ids_tries_par_attribut(self, show_ids, attribut):
+        """
+        Générateur produisant les show_ids triés en ordre décroissant d'un
+        attribut, dans le même ordre que trier_ids_par_attribut. Lorsque tous
+        les shows sont triés selon un attribut numérique, les show_ids sont
+        lus au fur et à mesure en parcourant l'index de l'attribut.
+
+        Args:
+            show_ids (list): Identifiants des shows à trier. None signifie
+            tous les shows de la médiathèque.
+            attribut (str): Attribut de tri
+
+        Yields:
+            str: Les show_ids dans l'ordre du tri.
+        """
+        if show_ids is not None or attribut not in Catalogue.ATTRIBUTS_NUMERIQUES:
+            yield from self.trier_ids_par_attribut(show_ids, attribut)
+            return
+        curseur = self.connexion.execute(
+            f"SELECT identifiant FROM shows WHERE 1{self.restriction()} ORDER BY {attribut} DESC, rang"
+        )
+        for show_id, in curseur:
+            yield show_id
+
+    def lister_valeurs_uniques_par_attribut(self, attribut):
+        """
+        Méthode permettant de récupérer les valeurs uniques contenues dans
+        toutes les listes d'un attribut de type liste, triées par ordre croissant.
+
+        Args:
+            attribut (str): Attribut dont le contenu devra contenir
+            des valeurs uniques.
+
+        Returns:
+            list: Liste des valeurs uniques de l'attribut de type list.
+        """
+        if attribut not in Catalogue.ATTRIBUTS_LISTE:
+            return sorted(set(el for show in self.shows.values() for el in getattr(show, attribut)))
+        curseur = self.connexion.execute(
+            "SELECT DISTINCT valeur FROM elements WHERE attribut = ?" + self.restriction(), (attribut,)
+        )
+        return sorted(valeur for valeur, in curseur)
+
+    def compter_facettes(self, attribut, predicat=None):
+        """
+        Méthode permettant de compter les shows de chaque valeur distincte
+        d'un attribut, parmi les shows de la médiathèque respectant un prédicat.
+
+        Args:
+            attribut (str): Attribut de type liste ou age_minimum_requis.
+            predicat (Predicat, optional): Condition sur les shows comptés.
+            None signifie tous les shows de la médiathèque.
+
+        Returns:
+            dict: Le nombre de shows de chaque valeur (seulement celles présentes),
+            par ordre croissant des valeurs.
+        """
+        condition, parametres = ("1", ()) if predicat is None else self.condition_du_predicat(predicat)
+        shows_comptes = f"SELECT rang FROM shows WHERE ({condition})" + self.restriction()
+        if attribut == "age_minimum_requis":
+            curseur = self.connexion.execute(
+                f"SELECT age_minimum_requis, count(*) FROM shows WHERE rang IN ({shows_comptes}) "
+                "GROUP BY age_minimum_requis",
+                parametres,
+            )
+        elif attribut in Catalogue.ATTRIBUTS_LISTE:
+            curseur = self.connexion.execute(
+                "SELECT valeur, count(DISTINCT rang) FROM elements "
+                f"WHERE attribut = ? AND rang IN ({shows_comptes}) GROUP BY valeur",
+                (attribut,) + parametres,
+            )
+        else:
+            raise KeyError(attribut)
+        return dict(sorted(curseur))
+
+    def rendre_show(self, show_id):
+        """
+        Méthode permettant de récupérer le texte affiché d'un show (str(show)),
+        avec le même cache que Mediatheque.rendre_show.
+
+        Args:
+            show_id (str): Identifiant du show.
+
+        Returns:
+            str: Le texte du show.
+        """
+        texte = self.rendus.get(show_id)
+        if texte is None:
+            texte = self.rendus[show_id] = str(self.shows[show_id])
+            if len(self.rendus) > self.TAILLE_DU_CACHE_DE_RENDU:
+                self.rendus.popitem(last=False)
+        else:
+            self.rendus.move_to_end(show_id)
+        return texte
+
+    def fermer(self):
+        """
+        Méthode permettant de fermer la connexion à la base, ou de supprimer
+        les tables temporaires de la médiathèque si sa connexion est partagée.
+        """
+        if self.connexion_partagee:
+            supprimer_tables(self.connexion, (self.table_gardes, self.table_selection))
+        else:
+            self.connexion.close()
+
+
+class AnnuaireUtilisateurSqlite(AnnuaireUtilisateur):
+    """
+    Annuaire des utilisateurs stocké dans une base SQLite.
+
+    Les utilisateurs sont lus un à un dans la base lorsqu'ils sont recherchés,
+    et une inscription est une insertion: plusieurs processus peuvent donc
+    partager le même annuaire. Les utilisateurs déjà lus restent dans
+    utilisateurs et utilisateurs_par_email, comme en chargement paresseux.
+
+    Un AnnuaireUtilisateurSqlite est composé des attributs suivants:
+        - chemin_base_de_donnees (str): le chemin de la base SQLite.
+        - connexion (sqlite3.Connection): la connexion à la base.
+        - utilisateurs (list) et utilisateurs_par_email (dict): les utilisateurs déjà lus.
+    """
+    def __init__(self, chemin_base, chemin_fichier=None):
+        """
+        Args:
+            chemin_base (str): Le chemin de la base SQLite (créée si elle n'existe pas).
+            chemin_fichier (str, optional): Le chemin d'un fichier d'utilisateurs à
+            importer si la base ne contient encore aucun utilisateur. Ensuite, c'est
+            la base qui fait foi: le fichier n'est plus relu.
+        """
+        self.chemin_base_de_donnees = chemin_base
+        self.connexion = ouvrir_base(chemin_base)
+        self.utilisateurs = []
+        self.utilisateurs_par_email = {}
+        self.index = None
+
+        if chemin_fichier is not None and os.path.exists(chemin_fichier):
+            self.importer_fichier(chemin_fichier)
+
+    def importer_fichier(self, chemin_fichier):
+        """
+        Méthode permettant d'importer un fichier d'utilisateurs dans une base
+        qui n'en contient aucun. Comme dans AnnuaireUtilisateur, si plusieurs
+        utilisateurs ont la même adresse email, le premier l'emporte, et les
+        rangées invalides sont ignorées (voir rangees_valides_et_uniques).
+
+        Args:
+            chemin_fichier (str): Le chemin du fichier des utilisateurs.
+        """
+        connexion = self.connexion
+        if connexion.execute("SELECT 1 FROM utilisateurs LIMIT 1").fetchone() is not None:
+            return
+        rangees = list(lire_rangees(chemin_fichier))
+
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            if connexion.execute("SELECT 1 FROM utilisateurs LIMIT 1").fetchone() is None:
+                connexion.executemany(
+                    "INSERT OR IGNORE INTO utilisateurs (nom, email, age, pays, abonnement, mot_de_passe) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rangees_valides_et_uniques(rangees),
+                )
+            connexion.execute("COMMIT")
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+
+    def contient_email(self, email):
+        """
+        Méthode permettant de savoir si un utilisateur a une adresse email,
+        sans le charger.
+
+        Args:
+            email (str): L'adresse email.
+
+        Returns:
+            bool: True si un utilisateur de la base a cette adresse.
+        """
+        if email in self.utilisateurs_par_email:
+            return True
+        return self.connexion.execute("SELECT 1 FROM utilisateurs WHERE email = ?", (email,)).fetchone() is not None
+
+    def ecrire_rangees(self, rangees):
+        """
+        Méthode permettant d'insérer dans la base des utilisateurs déjà validés
+        (voir rangees_valides_et_uniques), en une seule transaction.
+
+        Args:
+            rangees (iterable): Les rangées (nom, email, age, pays, abonnement, mot_de_passe).
+
+        Returns:
+            int: Le nombre d'utilisateurs insérés.
+        """
+        connexion = self.connexion
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            avant = connexion.total_changes
+            # INSERT OR IGNORE: une adresse ajoutée entre-temps par un autre processus est ignorée.
+            connexion.executemany(
+                "INSERT OR IGNORE INTO utilisateurs (nom, email, age, pays, abonnement, mot_de_passe) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rangees,
+            )
+            nombre = connexion.total_changes - avant
+            connexion.execute("COMMIT")
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        return nombre
+
+    def iterer_rangees(self):
+        """
+        Générateur parcourant les utilisateurs de la base dans leur ordre
+        d'insertion, sans les charger en mémoire.
+
+        Yields:
+            list: Les rangées (nom, email, age, pays, abonnement, mot_de_passe).
+        """
+        curseur = self.connexion.execute(
+            "SELECT nom, email, age, pays, abonnement, mot_de_passe FROM utilisateurs ORDER BY numero"
+        )
+        for nom, email, age, pays, abonnement, mot_de_passe in curseur:
+            yield [nom, email, str(age), pays, str(abonnement), mot_de_passe]
+
+    def trouver_par_email(self, email):
+        """
+        Méthode permettant de retrouver un utilisateur à partir de son adresse email.
+
+        Args:
+            email (str): L'adresse email de l'utilisateur.
+
+        Returns:
+            Utilisateur: L'utilisateur, ou None si aucun utilisateur n'a cette adresse.
+        """
+        utilisateur = self.utilisateurs_par_email.get(email)
+        if utilisateur is None:
+            rangee = self.connexion.execute(
+                "SELECT nom, email, age, pays, abonnement, mot_de_passe FROM utilisateurs WHERE email = ?",
+                (email,),
+            ).fetchone()
+            if rangee is not None:
+                utilisateur = Utilisateur(*rangee)
+                self.ajouter_utilisateur(utilisateur)
+        return utilisateur
+
+    def enregistrer_utilisateur(self, utilisateur):
+        """
+        Méthode permettant d'enregistrer un nouvel utilisateur dans la base.
+
+        Args:
+            utilisateur (Utilisateur): L'utilisateur à enregistrer.
+        """
+        self.connexion.execute(
+            "INSERT INTO utilisateurs (nom, email, age, pays, abonnement, mot_de_passe) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                utilisateur.nom,
+                utilisateur.email,
+                utilisateur.age,
+                utilisateur.pays,
+                utilisateur.abonnement,
+                utilisateur.mot_de_passe,
+            ),
+        )
+        self.ajouter_utilisateur(utilisateur)
+
+    async def enregistrer_utilisateur_async(self, utilisateur):
+        """
+        Coroutine permettant d'enregistrer un nouvel utilisateur dans la base
+        (une insertion est courte: elle est faite directement).
+
+        Args:
+            utilisateur (Utilisateur): L'utilisateur à enregistrer.
+        """
+        self.enregistrer_utilisateur(utilisateur)
+
+    def fermer(self):
+        """
+        Méthode permettant de fermer la connexion à la base.
+        """
+        self.connexion.close()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+# Les modules de ULFlix sont importés directement (from show import Show), depuis le dossier tp3.
+DOSSIER_TP3 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOSSIER_TP3)
+
+from show import Show  # noqa: E402
+
+# Le fichier de shows complet livré avec le TP.
+CHEMIN_ULFLIX = os.path.join(DOSSIER_TP3, "ulflix.txt")
+
+EN_TETE = "show_id|titre|description|langue|popularite|note|type|directeurs|acteurs|pays|date_ajout|annee_sortie|classement|duree|categories\n"
+
+
+def ligne_de_show(numero, classement="TV-MA", pays="Canada", acteurs="Ana Lopez, Bob Smith", titre=None):
+    """
+    Fonction construisant la ligne d'un show de test, au format du fichier de la médiathèque.
+    """
+    return (
+        f"s{numero}|{titre or f'Titre {numero}'}|Description du show {numero}|fr|{numero * 1.5}|{numero % 10}.5|Movie"
+        f"|Directeur {numero}|{acteurs}|{pays}|January {numero % 28 + 1}, 2020|{2000 + numero % 20}|{classement}"
+        f"|{90 + numero} min|Dramas, Comedies\n"
+    )
+
+
+# Quelques shows variés: classements, pays et acteurs différents.
+LIGNES_DE_TEST = [
+    ligne_de_show(numero, classement, pays, acteurs)
+    for numero, (classement, pays, acteurs) in enumerate(
+        [
+            ("TV-MA", "Canada", "Ana Lopez, Bob Smith"),
+            ("TV-Y", "France", "Chloe Martin"),
+            ("PG-13", "Canada, France", "Bob Smith"),
+            ("R", "Mexico", "Ana Lopez"),
+            ("G", "Canada", "Dan Brown"),
+            ("TV-14", "Japan", "Bob Smith, Dan Brown"),
+            ("NC-17", "France", ""),
+            ("TV-PG", "Canada", "Chloe Martin, Ana Lopez"),
+        ],
+        start=1,
+    )
+]
+
+
+@pytest.fixture
+def fichier_de_shows(tmp_path):
+    chemin = tmp_path / "shows.txt"
+    chemin.write_text(EN_TETE + "".join(LIGNES_DE_TEST), encoding="utf-8")
+    return str(chemin)
+
+
+def shows_de_reference(chemin_fichier):
+    """
+    Fonction chargeant les shows d'un fichier comme la version d'origine de
+    Mediatheque.charger_shows_depuis_fichier: un objet Show par ligne, le
+    dernier show d'un show_id remplaçant les précédents.
+    """
+    shows = {}
+    with open(chemin_fichier, encoding="utf-8") as fichier:
+        ligne_des_titres, *lignes_des_shows = [ligne.strip() for ligne in fichier]
+        for ligne in lignes_des_shows:
+            show = Show.creer_show_via_ligne_et_ligne_des_titres(ligne, ligne_des_titres)
+            shows[show.identifiant] = show
+    return shows
+
+
+def attributs(show):
+    """
+    Fonction retournant les attributs d'un show, pour comparer deux shows.
+    """
+    return {attribut: getattr(show, attribut) for attribut in Show.__slots__}
+
@@ -0,0 +1,45 @@
+import pytest
+
+from catalogue import Catalogue
+from conftest import CHEMIN_ULFLIX, attributs, shows_de_reference
+from mediatheque import Mediatheque
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return shows_de_reference(CHEMIN_ULFLIX)
+
+
+def test_aller_retour_dans_le_catalogue(reference):
+    catalogue = Catalogue()
+    rangs = {show_id: catalogue.ajouter(show) for show_id, show in reference.items()}
+    for show_id, show in reference.items():
+        reconstruit = catalogue.show(rangs[show_id])
+        assert attributs(reconstruit) == attributs(show)
+        assert str(reconstruit) == str(show)
+        assert catalogue.colonnes["age_minimum_requis"][rangs[show_id]] == show.age_minimum_requis
+
+
+def test_etendre_extraire_et_tronquer(reference):
+    shows = list(reference.values())[:50]
+    premier, second = Catalogue(), Catalogue()
+    for show in shows[:20]:
+        premier.ajouter(show)
+    for show in shows[20:]:
+        second.ajouter(show)
+    premier.etendre(second)
+    assert [attributs(premier.show(rang)) for rang in range(len(premier))] == [attributs(show) for show in shows]
+
+    extrait = premier.extraire([40, 3, 17])
+    assert [attributs(extrait.show(rang)) for rang in range(3)] == [attributs(shows[rang]) for rang in (40, 3, 17)]
+
+    premier.tronquer(10)
+    assert {len(colonne) for colonne in premier.colonnes.values()} == {10}
+    premier.ajouter(shows[30])
+    assert attributs(premier.show(10)) == attributs(shows[30])
+
+
+def test_mediatheque_equivalente_au_chargement_d_origine(reference):
+    mediatheque = Mediatheque(CHEMIN_ULFLIX, utiliser_instantane=False)
+    assert list(mediatheque.shows) == list(reference)
+    assert all(attributs(mediatheque.shows[show_id]) == attributs(show) for show_id, show in reference.items())
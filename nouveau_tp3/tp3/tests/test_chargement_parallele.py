@@ -0,0 +1,74 @@
+import pytest
+
+from catalogue import Catalogue
+from chargement_parallele import analyser_fichier_en_parallele, decouper_en_morceaux
+from conftest import CHEMIN_ULFLIX, attributs, shows_de_reference
+from mediatheque import FiltreDAcces, Mediatheque
+from show import Show
+
+FILTRES = [None, FiltreDAcces(13), FiltreDAcces(30, "united states")]
+
+
+def analyser_sequentiellement(chemin_fichier, filtre):
+    catalogue = Catalogue()
+    rangees = []
+    for champs in Mediatheque.iterer_champs_depuis_fichier(chemin_fichier):
+        if filtre is None or filtre.accepte_champs(champs):
+            rangees.append((champs["show_id"], catalogue.ajouter(Show.creer_show_via_champs(champs))))
+        else:
+            rangees.append((champs["show_id"], None))
+    return catalogue, rangees
+
+
+def accepte(filtre, show):
+    return filtre is None or (show.age_minimum_requis <= filtre.age_utilisateur and filtre.accepte_pays(show.pays))
+
+
+@pytest.fixture
+def fichier_avec_doublons(tmp_path):
+    # Des show_ids répétés d'un bout à l'autre du fichier, donc d'un morceau à l'autre,
+    # et une dernière ligne sans fin de ligne.
+    with open(CHEMIN_ULFLIX, encoding="utf-8") as fichier:
+        ligne_des_titres, *lignes = fichier.read().splitlines()
+    repetees = []
+    for numero, ligne in enumerate(lignes[:40]):
+        champs = ligne.split("|")
+        champs[1] += " (bis)"
+        champs[12] = "TV-Y" if numero % 2 else "NC-17"
+        repetees.append("|".join(champs))
+    chemin = tmp_path / "doublons.txt"
+    chemin.write_text("\n".join([ligne_des_titres, *lignes, *repetees]), encoding="utf-8")
+    return str(chemin)
+
+
+def test_morceaux_couvrent_le_fichier_sur_des_fins_de_ligne():
+    with open(CHEMIN_ULFLIX, "rb") as fichier:
+        contenu = fichier.read()
+    for nombre_de_morceaux in (1, 2, 7, 100):
+        _, plages = decouper_en_morceaux(CHEMIN_ULFLIX, nombre_de_morceaux)
+        assert plages[0][0] == contenu.index(b"\n") + 1 and plages[-1][1] == len(contenu)
+        assert all(fin == debut for (_, fin), (debut, _) in zip(plages, plages[1:]))
+        assert all(contenu[fin - 1:fin] == b"\n" for _, fin in plages)
+
+
+@pytest.mark.parametrize("filtre", FILTRES)
+def test_analyse_parallele_identique_a_l_analyse_sequentielle(filtre):
+    catalogue, rangees = analyser_sequentiellement(CHEMIN_ULFLIX, filtre)
+    for processus in (2, 5):
+        catalogue_parallele, rangees_paralleles = analyser_fichier_en_parallele(CHEMIN_ULFLIX, processus, filtre)
+        assert rangees_paralleles == rangees
+        assert len(catalogue_parallele) == len(catalogue)
+        assert all(
+            attributs(catalogue_parallele.show(rang)) == attributs(catalogue.show(rang)) for rang in range(len(catalogue))
+        )
+
+
+@pytest.mark.parametrize("filtre", FILTRES)
+def test_mediatheque_parallele_equivalente_au_chargement_d_origine(fichier_avec_doublons, filtre):
+    reference = {
+        show_id: show for show_id, show in shows_de_reference(fichier_avec_doublons).items() if accepte(filtre, show)
+    }
+    for processus in (1, 3):
+        mediatheque = Mediatheque(fichier_avec_doublons, utiliser_instantane=False, filtre=filtre, processus=processus)
+        assert list(mediatheque.shows) == list(reference)
+        assert all(attributs(mediatheque.shows[show_id]) == attributs(show) for show_id, show in reference.items())
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+from conftest import EN_TETE, LIGNES_DE_TEST, ligne_de_show
+from mediatheque import Mediatheque
+from serveur import ServeurULFlix
+from show import Show
+
+
+@pytest.fixture
+def mediatheque(fichier_de_shows):
+    return Mediatheque(fichier_de_shows, utiliser_instantane=False)
+
+
+def show_de(numero, classement="TV-MA"):
+    return Show.creer_show_via_champs(Show.decouper_ligne(ligne_de_show(numero, classement).strip(), EN_TETE.strip()))
+
+
+def tailles_des_colonnes(catalogue):
+    return {attribut: len(colonne) for attribut, colonne in catalogue.colonnes.items()}
+
+
+def test_classement_inconnu_ne_laisse_pas_de_rangee_partielle(mediatheque):
+    tailles = tailles_des_colonnes(mediatheque.catalogue)
+    with pytest.raises(KeyError):
+        mediatheque.appliquer_changements([("s9", show_de(9)), ("s10", show_de(10, classement="ZZZ"))])
+    assert tailles_des_colonnes(mediatheque.catalogue) == tailles
+
+    # La médiathèque reste la plus récente: les changements suivants s'appliquent.
+    nouvelle = mediatheque.appliquer_changements([("s9", show_de(9))])
+    assert nouvelle.shows["s9"].titre == "Titre 9"
+    assert set(tailles_des_colonnes(nouvelle.catalogue).values()) == {len(LIGNES_DE_TEST) + 1}
+
+
+def test_ajout_a_la_fin_applique_comme_un_delta(mediatheque, fichier_de_shows):
+    with open(fichier_de_shows, "a", encoding="utf-8") as fichier:
+        fichier.write(ligne_de_show(9) + "s10|incomplete")
+    nouvelle = mediatheque.recharger()
+    assert nouvelle.catalogue is mediatheque.catalogue
+    assert "s9" in nouvelle.shows and "s10" not in nouvelle.shows
+    assert nouvelle.recharger() is nouvelle
+
+
+def test_fichier_reecrit_plus_long_est_relu(mediatheque, fichier_de_shows):
+    # Le fichier réécrit est plus long et garde une fin de ligne à l'ancienne fin:
+    # seule l'empreinte de la partie chargée révèle le changement du titre de s1.
+    lignes = [ligne_de_show(1, titre="Titrx 1")] + LIGNES_DE_TEST[1:] + [ligne_de_show(9)]
+    with open(fichier_de_shows, "w", encoding="utf-8") as fichier:
+        fichier.write(EN_TETE + "".join(lignes))
+    nouvelle = mediatheque.recharger()
+    assert nouvelle.catalogue is not mediatheque.catalogue
+    assert nouvelle.shows["s1"].titre == "Titrx 1"
+    assert "s9" in nouvelle.shows
+
+
+def test_relecture_du_serveur_hors_de_la_boucle(mediatheque, fichier_de_shows, monkeypatch):
+    fils = []
+    relire = Mediatheque.relire
+
+    def relire_en_notant_le_fil(self):
+        fils.append(threading.get_ident())
+        return relire(self)
+
+    monkeypatch.setattr(Mediatheque, "relire", relire_en_notant_le_fil)
+    with open(fichier_de_shows, "w", encoding="utf-8") as fichier:
+        fichier.write(EN_TETE + "".join(LIGNES_DE_TEST[1:]))
+    serveur = ServeurULFlix(mediatheque, annuaire_utilisateur=None)
+
+    async def recharger():
+        relecture = serveur.recharger_mediatheque()
+        # La médiathèque n'est remplacée qu'à la fin de la relecture.
+        assert relecture is not None and serveur.mediatheque is mediatheque
+        assert serveur.recharger_mediatheque() is relecture
+        await relecture
+
+    asyncio.run(recharger())
+    assert fils and threading.get_ident() not in fils
+    assert "s1" not in serveur.mediatheque.shows
+    assert serveur.relecture is None and not serveur.rechargement_en_attente
+
+
+def test_ancienne_mediatheque_ne_voit_pas_les_valeurs_ajoutees(mediatheque):
+    acteurs = mediatheque.lister_valeurs_uniques_par_attribut("acteurs")
+    show = Show.creer_show_via_champs(
+        Show.decouper_ligne(ligne_de_show(9, acteurs="Eve Nouvelle").strip(), EN_TETE.strip())
+    )
+    nouvelle = mediatheque.appliquer_changements([("s9", show)])
+    assert mediatheque.couvre_tout_le_catalogue and not nouvelle.couvre_tout_le_catalogue
+    assert mediatheque.lister_valeurs_uniques_par_attribut("acteurs") == acteurs
+    assert nouvelle.lister_valeurs_uniques_par_attribut("acteurs") == sorted(acteurs + ["Eve Nouvelle"])
+
+
+def test_index_texte_partage_les_valeurs_normalisees(mediatheque):
+    index = mediatheque.obtenir_index_texte("titre")
+    assert index.textes is mediatheque.obtenir_valeurs_normalisees("titre")
+    assert mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_string("titre", "TITRE 1") == ["s1"]
+
+    nouvelle = mediatheque.appliquer_changements([("s19", show_de(19))])
+    assert len(index) == len(nouvelle.catalogue)
+    assert nouvelle.filtrer_ids_sur_attribut_par_inclusion_de_string("titre", "titre 1") == ["s1", "s19"]
+    assert mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_string("titre", "titre 1") == ["s1"]
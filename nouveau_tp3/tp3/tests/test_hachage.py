@@ -0,0 +1,54 @@
+import asyncio
+
+from serveur import Session
+from test_pagination import CanalScripte
+from utilisateur import Utilisateur
+from utils import HacheurDeMotDePasse, LimiteurDeTentatives
+
+
+def test_hachage_corrompu_refuse_sans_erreur():
+    hachage = HacheurDeMotDePasse.hacher("secret123")
+    assert HacheurDeMotDePasse.verifier(hachage, "secret123")
+    assert not HacheurDeMotDePasse.verifier(hachage[:-1] + "é", "secret123")
+    assert not HacheurDeMotDePasse.verifier("pbkdf2_sha256$1$zz$é", "secret123")
+    assert not HacheurDeMotDePasse.verifier("pbkdf2_sha256$99999999999999999999$00$00", "secret123")
+
+
+def test_limiteur_de_tentatives():
+    maintenant = [100.0]
+    limiteur = LimiteurDeTentatives(nombre_d_echecs=2, fenetre=10.0, horloge=lambda: maintenant[0])
+    limiteur.noter_echec("un@exemple.com")
+    assert limiteur.attente("un@exemple.com") == 0
+    maintenant[0] = 104.0
+    limiteur.noter_echec("un@exemple.com")
+    assert limiteur.attente("un@exemple.com") == 6.0
+    assert limiteur.attente("deux@exemple.com") == 0
+    maintenant[0] = 111.0
+    assert limiteur.attente("un@exemple.com") == 0
+    limiteur.oublier("un@exemple.com")
+    assert "un@exemple.com" not in limiteur.echecs
+
+
+class AnnuaireFixe:
+    def __init__(self, utilisateur):
+        self.utilisateur = utilisateur
+
+    def valider_email_de_connexion(self, reponse):
+        return self.utilisateur, None
+
+
+def test_session_retarde_apres_trop_d_echecs(monkeypatch):
+    utilisateur = Utilisateur("Nom", "un@exemple.com", "30", "Canada", "1", HacheurDeMotDePasse.hacher("secret123"))
+    attentes = []
+
+    async def dormir(secondes):
+        attentes.append(secondes)
+
+    monkeypatch.setattr(asyncio, "sleep", dormir)
+    limiteur = LimiteurDeTentatives(nombre_d_echecs=2, fenetre=60.0)
+    canal = CanalScripte(["un@exemple.com", "non", "non", "secret123"])
+    session = Session(None, AnnuaireFixe(utilisateur), canal, limiteur=limiteur)
+    assert asyncio.run(session.authentifier()) is utilisateur
+    assert len(attentes) == 1 and 0 < attentes[0] <= 60.0
+    assert "Trop de tentatives" in canal.texte
+    assert "un@exemple.com" not in limiteur.echecs
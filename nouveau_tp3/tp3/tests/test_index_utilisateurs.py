@@ -0,0 +1,75 @@
+import os
+
+from index_utilisateurs import EXTENSION, IndexDesUtilisateurs
+from journal_utilisateurs import encoder_rangee
+
+
+def ecrire_utilisateurs(chemin, emails, mode="wb"):
+    with open(chemin, mode) as fichier:
+        for email in emails:
+            fichier.write(encoder_rangee(["Nom", email, "30", "Canada", "1", "hash"]))
+
+
+def position_de(chemin, email):
+    with open(chemin, "rb") as fichier:
+        return fichier.read().index(encoder_rangee(["Nom", email, "30", "Canada", "1", "hash"]))
+
+
+def test_ajout_a_la_fin_relu_sans_reconstruction(tmp_path):
+    chemin = str(tmp_path / "utilisateurs.txt")
+    ecrire_utilisateurs(chemin, ["aa@bb.ca", "cc@dd.ca"])
+    IndexDesUtilisateurs(chemin).fermer()
+    date_de_l_index = os.stat(chemin + EXTENSION).st_mtime_ns
+
+    ecrire_utilisateurs(chemin, ["ee@ff.ca"], mode="ab")
+    index = IndexDesUtilisateurs(chemin)
+    assert index.chercher("ee@ff.ca") == position_de(chemin, "ee@ff.ca")
+    assert index.chercher("aa@bb.ca") == 0
+    assert os.stat(chemin + EXTENSION).st_mtime_ns == date_de_l_index
+
+
+def test_reecriture_de_meme_taille_reconstruit_l_index(tmp_path):
+    chemin = str(tmp_path / "utilisateurs.txt")
+    ecrire_utilisateurs(chemin, ["aa@bb.ca", "cc@dd.ca"])
+    IndexDesUtilisateurs(chemin).fermer()
+
+    date = os.stat(chemin).st_mtime_ns
+    ecrire_utilisateurs(chemin, ["cc@dd.ca", "aa@bb.ca"])
+    # La date de modification n'est pas plus précise que l'horloge du noyau.
+    os.utime(chemin, ns=(date + 1_000_000, date + 1_000_000))
+    index = IndexDesUtilisateurs(chemin)
+    assert index.chercher("cc@dd.ca") == 0
+    assert index.chercher("aa@bb.ca") == position_de(chemin, "aa@bb.ca")
+
+
+def test_reecriture_plus_longue_reconstruit_l_index(tmp_path):
+    chemin = str(tmp_path / "utilisateurs.txt")
+    ecrire_utilisateurs(chemin, ["aa@bb.ca", "cc@dd.ca"])
+    IndexDesUtilisateurs(chemin).fermer()
+
+    # Même inode, fichier plus long, mais les lignes indexées ont changé de place.
+    ecrire_utilisateurs(chemin, ["zz@yy.ca", "cc@dd.ca", "aa@bb.ca"], mode="r+b")
+    index = IndexDesUtilisateurs(chemin)
+    assert index.chercher("zz@yy.ca") == 0
+    assert index.chercher("aa@bb.ca") == position_de(chemin, "aa@bb.ca")
+
+
+def test_fichier_remplace_reconstruit_l_index(tmp_path):
+    chemin = str(tmp_path / "utilisateurs.txt")
+    ecrire_utilisateurs(chemin, ["aa@bb.ca"])
+    IndexDesUtilisateurs(chemin).fermer()
+
+    autre = str(tmp_path / "autre.txt")
+    ecrire_utilisateurs(autre, ["aa@bb.ca", "cc@dd.ca"])
+    os.replace(autre, chemin)
+    index = IndexDesUtilisateurs(chemin)
+    assert index.chercher("cc@dd.ca") == position_de(chemin, "cc@dd.ca")
+
+
+def test_ancien_format_d_en_tete_reconstruit_l_index(tmp_path):
+    chemin = str(tmp_path / "utilisateurs.txt")
+    ecrire_utilisateurs(chemin, ["aa@bb.ca", "cc@dd.ca"])
+    with open(chemin + EXTENSION, "wb") as fichier:
+        fichier.write(b"%d\ncc@dd.ca\t0\n" % os.path.getsize(chemin))
+    index = IndexDesUtilisateurs(chemin)
+    assert index.chercher("cc@dd.ca") == position_de(chemin, "cc@dd.ca")
@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import CHEMIN_ULFLIX, attributs, shows_de_reference
+from instantane import chemin_instantane, lire_instantane
+from mediatheque import Mediatheque
+
+
+@pytest.fixture
+def copie_d_ulflix(tmp_path):
+    # L'instantané est écrit à côté du fichier source: on travaille sur une copie.
+    chemin = str(tmp_path / "ulflix.txt")
+    shutil.copyfile(CHEMIN_ULFLIX, chemin)
+    return chemin
+
+
+def verifier_equivalence(mediatheque, chemin_fichier):
+    reference = shows_de_reference(chemin_fichier)
+    assert list(mediatheque.shows) == list(reference)
+    assert all(attributs(mediatheque.shows[show_id]) == attributs(show) for show_id, show in reference.items())
+
+
+def test_instantane_ecrit_puis_relu(copie_d_ulflix):
+    verifier_equivalence(Mediatheque(copie_d_ulflix), copie_d_ulflix)
+    assert os.path.exists(chemin_instantane(copie_d_ulflix))
+    assert lire_instantane(copie_d_ulflix, os.stat(copie_d_ulflix)) is not None
+    verifier_equivalence(Mediatheque(copie_d_ulflix), copie_d_ulflix)
+
+
+def test_instantane_perime_si_le_fichier_change_de_date(copie_d_ulflix):
+    Mediatheque(copie_d_ulflix)
+    # Modification de même taille: seule la date de modification trahit le changement.
+    with open(copie_d_ulflix, encoding="utf-8") as fichier:
+        contenu = fichier.read()
+    ancien = contenu.split("\n")[1].split("|")[1]
+    nouveau = ancien[::-1] if ancien[::-1] != ancien else ancien.upper()
+    assert len(nouveau.encode("utf-8")) == len(ancien.encode("utf-8")) and nouveau != ancien
+    stat_avant = os.stat(copie_d_ulflix)
+    with open(copie_d_ulflix, "w", encoding="utf-8") as fichier:
+        fichier.write(contenu.replace(f"|{ancien}|", f"|{nouveau}|", 1))
+    os.utime(copie_d_ulflix, ns=(stat_avant.st_atime_ns, stat_avant.st_mtime_ns + 1_000_000_000))
+    assert os.stat(copie_d_ulflix).st_size == stat_avant.st_size
+
+    assert lire_instantane(copie_d_ulflix, os.stat(copie_d_ulflix)) is None
+    mediatheque = Mediatheque(copie_d_ulflix)
+    verifier_equivalence(mediatheque, copie_d_ulflix)
+    assert nouveau in {show.titre for show in mediatheque.shows.values()}
+    # L'instantané reconstruit correspond au nouveau contenu.
+    assert lire_instantane(copie_d_ulflix, os.stat(copie_d_ulflix)) is not None
+
+
+def test_instantane_perime_si_le_fichier_change_de_taille(copie_d_ulflix):
+    Mediatheque(copie_d_ulflix)
+    with open(copie_d_ulflix, encoding="utf-8") as fichier:
+        lignes = fichier.readlines()
+    stat_avant = os.stat(copie_d_ulflix)
+    with open(copie_d_ulflix, "w", encoding="utf-8") as fichier:
+        fichier.writelines(lignes[:-1])
+    # Même date de modification: seule la taille trahit le changement.
+    os.utime(copie_d_ulflix, ns=(stat_avant.st_atime_ns, stat_avant.st_mtime_ns))
+
+    assert lire_instantane(copie_d_ulflix, os.stat(copie_d_ulflix)) is None
+    mediatheque = Mediatheque(copie_d_ulflix)
+    verifier_equivalence(mediatheque, copie_d_ulflix)
+    assert len(mediatheque.shows) == len(shows_de_reference(CHEMIN_ULFLIX)) - 1
+
+
+def test_instantane_corrompu_ignore(copie_d_ulflix):
+    Mediatheque(copie_d_ulflix)
+    chemin = chemin_instantane(copie_d_ulflix)
+    with open(chemin, "r+b") as fichier:
+        fichier.truncate(os.path.getsize(chemin) // 2)
+    assert lire_instantane(copie_d_ulflix, os.stat(copie_d_ulflix)) is None
+    verifier_equivalence(Mediatheque(copie_d_ulflix), copie_d_ulflix)
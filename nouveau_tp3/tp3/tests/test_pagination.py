@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+from mediatheque import Mediatheque
+from pagination import Paginateur
+from serveur import CanalConsole, Session
+
+
+class CanalScripte:
+    """
+    Canal de test: les réponses sont données à l'avance et le texte écrit est conservé.
+    """
+    def __init__(self, reponses):
+        self.reponses = list(reponses)
+        self.texte = ""
+
+    def ecrire(self, texte):
+        self.texte += texte
+
+    async def demander(self, question):
+        self.texte += question
+        return self.reponses.pop(0)
+
+
+def test_navigation_reste_dans_les_pages(fichier_de_shows):
+    paginateur = Paginateur(Mediatheque(fichier_de_shows, utiliser_instantane=False), None, 3, "date_ajout")
+    assert len(paginateur) == 3
+    assert paginateur.page_apres_choix(0, "p") == 0
+    assert paginateur.page_apres_choix(0, "S") == 1
+    assert paginateur.page_apres_choix(2, "s") == 2
+    assert paginateur.page_apres_choix(1, "q") is None
+    assert paginateur.rendre_page_avec_entetes(1).startswith("Page: 2 sur 3\n")
+
+
+def test_session_et_console_affichent_les_memes_pages(fichier_de_shows, monkeypatch, capsys):
+    mediatheque = Mediatheque(fichier_de_shows, utiliser_instantane=False)
+    reponses = ["s", "s", "s", "p", "q"]
+    monkeypatch.setattr("builtins.input", lambda question: print(question, end="") or reponses.pop(0))
+    mediatheque.afficher_avec_pagination(nombre_de_shows_par_page=3)
+
+    canal = CanalScripte(["s", "s", "s", "p", "q"])
+    session = Session(mediatheque, None, canal, nombre_de_shows_par_page=3)
+    asyncio.run(session.afficher_avec_pagination(mediatheque))
+    assert canal.texte == capsys.readouterr().out
+    assert canal.texte.count("Page: 3 sur 3\n") == 4
+
+
+def test_console_lit_les_lignes_sur_le_descripteur(monkeypatch):
+    lecture, ecriture = os.pipe()
+    os.write(ecriture, "oui\r\nnon é\nfin".encode("utf-8"))
+    os.close(ecriture)
+    monkeypatch.setattr("sys.stdin", os.fdopen(lecture))
+    canal = CanalConsole()
+    assert [asyncio.run(canal.demander("? ")) for _ in range(3)] == ["oui", "non é", "fin"]
@@ -0,0 +1,79 @@
+import asyncio
+import itertools
+
+import pytest
+
+from mediatheque import FiltreDAcces, Mediatheque
+from recherche_floue import IndexFlou
+from requete import Contient, Requete
+from serveur import Session
+from stockage_sqlite import MediathequeSqlite
+from test_pagination import CanalScripte
+
+TITRES = [
+    "The Irishman", "The House of Love", "Love Actually", "Christmas Love", "The Christmas House",
+    "Harry Potter", "The Theory of Everything", "Houses", "Lovers in Paris", "The Last Christmas",
+    "War and Love", "The War", "Thelma", "Theo and the Others", "The The The",
+]
+RECHERCHES = ["the", "love", "chrismas", "the irishman", "harry poter", "love the", "th", "zz", ""]
+
+
+def test_parcours_par_pertinence_dans_l_ordre_de_rechercher():
+    index = IndexFlou(enumerate(TITRES))
+    for recherche in RECHERCHES:
+        pertinences = index.rechercher(recherche)
+        parcours = list(index.parcourir_par_pertinence(recherche))
+        assert sorted(identifiant for _, identifiant in parcours) == sorted(pertinences)
+        assert all(pertinences[identifiant] == pertinence for pertinence, identifiant in parcours)
+        assert [pertinence for pertinence, _ in parcours] == sorted(pertinences.values(), reverse=True)
+
+
+@pytest.fixture
+def mediatheques(tmp_path):
+    from conftest import EN_TETE, ligne_de_show
+
+    chemin = tmp_path / "shows.txt"
+    acteurs = ["Tom Hanks, Ana Lopez", "Tom Wood", "John Cleese, Tom Hanks", "Johnny Depp", "Ana Lopes"]
+    lignes = [
+        ligne_de_show(numero, pays="Canada" if numero % 2 else "France", acteurs=acteurs[numero % 5], titre=titre)
+        for numero, titre in enumerate(TITRES * 3, 1)
+    ]
+    chemin.write_text(EN_TETE + "".join(lignes), encoding="utf-8")
+    mediatheque = Mediatheque(str(chemin), utiliser_instantane=False)
+    mediatheque_sqlite = MediathequeSqlite(str(tmp_path / "shows.db"), str(chemin))
+    return [mediatheque, mediatheque.vue(FiltreDAcces(20, "canada")), mediatheque_sqlite]
+
+
+def test_premiers_resultats_identiques_au_classement_complet(mediatheques):
+    recherches = [("titre", recherche) for recherche in RECHERCHES] + [("acteurs", "tom hnaks"), ("acteurs", "ana")]
+    for mediatheque, (attribut, recherche) in itertools.product(mediatheques, recherches):
+        complet = mediatheque.rechercher_par_pertinence(attribut, recherche)
+        for limite in (0, 1, 3, 10, 100):
+            assert mediatheque.rechercher_par_pertinence(attribut, recherche, limite) == complet[:limite]
+
+
+def test_attribut_sans_recherche_floue(mediatheques):
+    for mediatheque in mediatheques:
+        with pytest.raises(KeyError):
+            mediatheque.obtenir_index_flou("description")
+
+
+def test_session_compte_seulement_les_resultats_exacts(fichier_de_shows):
+    mediatheque = Mediatheque(fichier_de_shows, utiliser_instantane=False)
+    pertinents = mediatheque.rechercher_par_pertinence("titre", "titre 3", 100)
+    assert len(pertinents) > 1
+    exacts = mediatheque.executer(Requete(Contient("titre", "titre 3")))
+    assert Session.classer_resultats(mediatheque, pertinents, exacts) == ["s3"]
+
+    canal = CanalScripte(["q"])
+    session = Session(mediatheque, None, canal)
+    asyncio.run(session.afficher_resultats_de_recherche(mediatheque, pertinents, exacts))
+    assert "1 résultats trouvés." in canal.texte and "Vouliez-vous dire" not in canal.texte
+
+    # Sans résultat exact, les résultats par pertinence sont proposés à part.
+    canal = CanalScripte(["q"])
+    session = Session(mediatheque, None, canal)
+    suggestions = mediatheque.rechercher_par_pertinence("titre", "titer", 100)
+    asyncio.run(session.afficher_resultats_de_recherche(mediatheque, suggestions, []))
+    assert "0 résultats trouvés.\nVouliez-vous dire:" in canal.texte
+    assert not session.historique
@@ -0,0 +1,8 @@
+from mediatheque import Mediatheque
+
+
+def test_limite_explicite_respectee(fichier_de_shows):
+    mediatheque = Mediatheque(fichier_de_shows, utiliser_instantane=False)
+    assert mediatheque.recommander(["s1"], limite=0) == []
+    assert len(mediatheque.recommander(["s1"], limite=3)) == 3
+    assert len(mediatheque.recommander(["s1"])) == min(Mediatheque.NOMBRE_DE_RECOMMANDATIONS, len(mediatheque) - 1)
@@ -0,0 +1,34 @@
+import pytest
+
+from mediatheque import Mediatheque
+from requete import AgePermis, Contient, ListeContient, Requete
+
+
+@pytest.fixture
+def mediatheque(fichier_de_shows):
+    return Mediatheque(fichier_de_shows, utiliser_instantane=False)
+
+
+def test_et_donne_l_intersection_des_filtres(mediatheque):
+    requete = Requete(AgePermis(15) & ListeContient("pays", "canada"))
+    attendus = set(mediatheque.filtrer_ids_sur_age(15)) & set(
+        mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string("pays", "canada")
+    )
+    resultats = mediatheque.executer(requete)
+    assert set(resultats) == attendus
+    assert resultats == [show_id for show_id in mediatheque.shows if show_id in attendus]
+
+
+def test_ou_et_non(mediatheque):
+    requete = Requete((ListeContient("acteurs", "ana") | Contient("titre", "titre 5")) & ~ListeContient("pays", "mexico"))
+    assert mediatheque.executer(requete) == ["s1", "s5", "s8"]
+
+
+def test_tri_limite_et_decalage(mediatheque):
+    tous = mediatheque.executer(Requete(tri="popularite"))
+    assert tous == mediatheque.trier_ids_par_attribut(list(mediatheque.shows), "popularite")
+    assert mediatheque.executer(Requete(tri="popularite", limite=3, decalage=2)) == tous[2:5]
+
+
+def test_requete_vide_renvoie_tous_les_shows(mediatheque):
+    assert mediatheque.executer(Requete()) == list(mediatheque.shows)
@@ -0,0 +1,49 @@
+import calendar
+import datetime
+
+import pytest
+
+from conftest import CHEMIN_ULFLIX
+from show import convertir_date_ajout
+
+DATES_VALIDES = [
+    f"{mois} {jour}, {annee}"
+    for mois in calendar.month_name[1:]
+    for jour, annee in [(1, 2020), (9, 1999), (28, 2021), ("05", 2019), (29, 2020), (31, 2016)]
+    if (mois, jour) not in {("February", 31), ("April", 31), ("June", 31), ("September", 31), ("November", 31)}
+] + ["january 7, 2020", "DECEMBER 25, 2019", "May 3, 0999"]
+
+# Dates impossibles ou hors du format habituel: strptime les refuse (ou en accepte
+# certaines, comme les espaces en trop), la conversion doit faire exactement de même.
+DATES_IRREGULIERES = [
+    "February 30, 2020", "February 29, 2019", "April 31, 2020", "January 0, 2020", "January 32, 2020",
+    "Foo 1, 2020", "Sept 1, 2020", "January 1 2020", "January 1,  2020", " January 1, 2020", "January 1, 20",
+    "January 1, 20200", "January 001, 2020", "January ١, ٢٠٢٠", "January +1, 2020", "January 1,, 2020",
+    "January, 1 2020", "1 January, 2020", "", "January", "January 1, 2020 ",
+]
+
+
+def resultat_de(conversion, texte):
+    try:
+        return conversion(texte)
+    except ValueError as erreur:
+        return type(erreur)
+
+
+@pytest.mark.parametrize("texte", DATES_VALIDES + DATES_IRREGULIERES)
+def test_conversion_identique_a_strptime(texte):
+    attendu = resultat_de(lambda texte: datetime.datetime.strptime(texte, "%B %d, %Y"), texte)
+    assert resultat_de(convertir_date_ajout.__wrapped__, texte) == attendu
+    # Le résultat mémorisé (ou l'erreur) est le même.
+    assert resultat_de(convertir_date_ajout, texte) == attendu
+    assert resultat_de(convertir_date_ajout, texte) == attendu
+
+
+def test_dates_du_fichier_identiques_a_strptime():
+    with open(CHEMIN_ULFLIX, encoding="utf-8") as fichier:
+        ligne_des_titres, *lignes = fichier.read().splitlines()
+    colonne = ligne_des_titres.split("|").index("date_ajout")
+    dates = {ligne.split("|")[colonne].strip() for ligne in lignes} - {""}
+    assert all(
+        convertir_date_ajout.__wrapped__(date) == datetime.datetime.strptime(date, "%B %d, %Y") for date in dates
+    )
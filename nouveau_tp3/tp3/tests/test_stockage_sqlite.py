@@ -0,0 +1,125 @@
+import itertools
+
+import pytest
+
+from conftest import CHEMIN_ULFLIX, attributs, shows_de_reference
+from mediatheque import FiltreDAcces, Mediatheque
+from requete import AgePermis, Contient, ListeContient, Requete
+from stockage_sqlite import MediathequeSqlite
+
+FILTRES_TEXTE = [
+    ("titre", "love"), ("titre", "THE "), ("titre", "é"), ("titre", "zzzz"), ("titre", ""),
+    ("description", "war"), ("description", "new york"), ("langue", "en"), ("type", "tv"), ("classement", "pg"),
+]
+FILTRES_LISTE = [
+    ("acteurs", "tom"), ("acteurs", "hanks"), ("directeurs", "martin"), ("pays", "canada"),
+    ("pays", "united"), ("categories", "drama"), ("categories", "TV"), ("acteurs", "zzzz"),
+]
+AGES = [0, 7, 13, 16, 17, 99]
+FILTRES_D_ACCES = [FiltreDAcces(13), FiltreDAcces(17, "canada"), FiltreDAcces(99, "france"), FiltreDAcces(5, "inventé")]
+RECHERCHES = [
+    ("titre", "love"), ("titre", "the irishman"), ("titre", "harry poter"), ("titre", "chrismas"),
+    ("acteurs", "tom hnaks"), ("acteurs", "ana"), ("directeurs", "scorsese"), ("directeurs", "zz"),
+]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return shows_de_reference(CHEMIN_ULFLIX)
+
+
+@pytest.fixture(scope="module")
+def paires(tmp_path_factory):
+    """
+    La médiathèque et la MediathequeSqlite du fichier complet, puis leurs vues.
+    """
+    mediatheque = Mediatheque(CHEMIN_ULFLIX, utiliser_instantane=False)
+    mediatheque_sqlite = MediathequeSqlite(str(tmp_path_factory.mktemp("sqlite") / "shows.db"), CHEMIN_ULFLIX)
+    return [(mediatheque, mediatheque_sqlite)] + [
+        (mediatheque.vue(filtre), mediatheque_sqlite.vue(filtre)) for filtre in FILTRES_D_ACCES
+    ]
+
+
+def accepte(filtre, show):
+    return show.age_minimum_requis <= filtre.age_utilisateur and filtre.accepte_pays(show.pays)
+
+
+def test_memes_shows(reference, paires):
+    (mediatheque, mediatheque_sqlite), *vues = paires
+    assert list(mediatheque_sqlite.shows) == list(reference)
+    assert all(attributs(mediatheque_sqlite.shows[show_id]) == attributs(show) for show_id, show in reference.items())
+    for filtre, (vue, vue_sqlite) in zip(FILTRES_D_ACCES, vues):
+        attendus = [show_id for show_id, show in reference.items() if accepte(filtre, show)]
+        assert list(vue.shows) == list(vue_sqlite.shows) == attendus
+
+
+def test_filtres_identiques_a_l_origine(reference, paires):
+    for mediatheque, mediatheque_sqlite in paires:
+        shows = {show_id: reference[show_id] for show_id in mediatheque.shows}
+        for attribut, valeur in FILTRES_TEXTE:
+            attendus = [show_id for show_id, show in shows.items() if valeur.lower() in getattr(show, attribut).lower()]
+            assert mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_string(attribut, valeur) == attendus
+            assert mediatheque_sqlite.filtrer_ids_sur_attribut_par_inclusion_de_string(attribut, valeur) == attendus
+        for attribut, valeur in FILTRES_LISTE:
+            attendus = [
+                show_id for show_id, show in shows.items()
+                if any(valeur.lower() in element.lower() for element in getattr(show, attribut))
+            ]
+            assert mediatheque.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string(attribut, valeur) == attendus
+            assert (
+                mediatheque_sqlite.filtrer_ids_sur_attribut_par_inclusion_de_liste_de_string(attribut, valeur)
+                == attendus
+            )
+        for age in AGES:
+            attendus = [show_id for show_id, show in shows.items() if show.age_minimum_requis <= age]
+            assert mediatheque.filtrer_ids_sur_age(age) == mediatheque_sqlite.filtrer_ids_sur_age(age) == attendus
+
+
+def test_requetes_identiques(paires):
+    predicats = [
+        None,
+        Contient("titre", "love") | ListeContient("acteurs", "tom"),
+        AgePermis(13) & ~ListeContient("pays", "united states"),
+        ListeContient("categories", "comed") & Contient("description", "family"),
+    ]
+    fenetres = [(None, 0), (10, 0), (10, 25), (0, 5)]
+    for (mediatheque, mediatheque_sqlite), predicat in itertools.product(paires, predicats):
+        for tri, (limite, decalage) in itertools.product([None, "popularite", "date_ajout", "titre"], fenetres):
+            requete = Requete(predicat, tri, limite, decalage)
+            assert mediatheque_sqlite.executer(requete) == mediatheque.executer(requete), requete
+
+
+def test_tris_identiques_a_sorted(reference, paires):
+    for mediatheque, mediatheque_sqlite in paires:
+        show_ids = list(mediatheque.shows)
+        attributs_de_tri = ["popularite", "note", "annee_sortie", "titre", "type"]
+        for attribut, selection, limite in itertools.product(attributs_de_tri, [None, show_ids[::-1]], [None, 7]):
+            attendus = sorted(
+                show_ids if selection is None else selection,
+                key=lambda show_id: getattr(reference[show_id], attribut),
+                reverse=True,
+            )[:limite]
+            assert mediatheque.trier_ids_par_attribut(selection, attribut, limite) == attendus
+            assert mediatheque_sqlite.trier_ids_par_attribut(selection, attribut, limite) == attendus
+        for attribut in ("acteurs", "pays", "categories"):
+            attendus = sorted({element for show_id in show_ids for element in getattr(reference[show_id], attribut)})
+            assert mediatheque.lister_valeurs_uniques_par_attribut(attribut) == attendus
+            assert mediatheque_sqlite.lister_valeurs_uniques_par_attribut(attribut) == attendus
+
+
+def test_recherche_floue_identique(paires):
+    for (mediatheque, mediatheque_sqlite), (attribut, recherche) in itertools.product(paires, RECHERCHES):
+        for limite in (None, 1, 10):
+            assert mediatheque_sqlite.rechercher_par_pertinence(
+                attribut, recherche, limite
+            ) == mediatheque.rechercher_par_pertinence(attribut, recherche, limite)
+
+
+def test_recommandations_identiques(paires):
+    (mediatheque, _), *_ = paires
+    references = [list(mediatheque.shows)[rang:rang + taille] for rang, taille in [(0, 1), (100, 1), (2000, 3), (7000, 5)]]
+    for (mediatheque, mediatheque_sqlite), show_ids in itertools.product(paires, references):
+        for limite in (None, 0, 3, 25):
+            recommandations = mediatheque.recommander(show_ids, limite)
+            assert mediatheque_sqlite.recommander(show_ids, limite) == recommandations
+            assert set(recommandations) <= set(mediatheque.shows) and not set(recommandations) & set(show_ids)
@@ -0,0 +1,80 @@
+import itertools
+import random
+
+import pytest
+
+from conftest import CHEMIN_ULFLIX, shows_de_reference
+from mediatheque import FiltreDAcces, Mediatheque
+from stockage_sqlite import MediathequeSqlite
+
+ATTRIBUTS = ["popularite", "note", "date_ajout", "annee_sortie", "age_minimum_requis"]
+LIMITES = [None, 0, 1, 25]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return shows_de_reference(CHEMIN_ULFLIX)
+
+
+@pytest.fixture(scope="module")
+def mediatheques(tmp_path_factory):
+    mediatheque = Mediatheque(CHEMIN_ULFLIX, utiliser_instantane=False)
+    mediatheque_sqlite = MediathequeSqlite(str(tmp_path_factory.mktemp("tri") / "shows.db"), CHEMIN_ULFLIX)
+    return [mediatheque, mediatheque.vue(FiltreDAcces(13)), mediatheque_sqlite]
+
+
+def selections(show_ids):
+    """
+    Fonction retournant des listes de show_ids variées à trier: dans l'ordre de
+    la médiathèque ou non, petites ou grandes, avec ou sans doublons.
+    """
+    hasard = random.Random(3)
+    melanges = hasard.sample(show_ids, len(show_ids))
+    return [
+        show_ids,
+        melanges,
+        show_ids[::3],
+        sorted(hasard.sample(show_ids, 40), key=show_ids.index),
+        melanges[:40],
+        show_ids[::-1],
+        show_ids[:30] + show_ids[10:20],
+        show_ids[: len(show_ids) // 2] * 2,
+        [],
+    ]
+
+
+def trier_comme_l_origine(reference, show_ids, attribut):
+    return sorted(show_ids, key=lambda show_id: getattr(reference[show_id], attribut), reverse=True)
+
+
+def test_egalites_nombreuses(reference):
+    # Sans égalités, l'ordre des shows de même valeur ne serait pas vérifié.
+    for attribut in ATTRIBUTS:
+        valeurs = [getattr(show, attribut) for show in reference.values()]
+        assert len(set(valeurs)) < len(valeurs)
+
+
+@pytest.mark.parametrize("attribut", ATTRIBUTS)
+def test_tri_identique_a_sorted(reference, mediatheques, attribut):
+    for mediatheque in mediatheques:
+        show_ids = list(mediatheque.shows)
+        assert show_ids == [show_id for show_id in reference if show_id in mediatheque.shows]
+        for selection, limite in itertools.product([None, *selections(show_ids)], LIMITES):
+            attendu = trier_comme_l_origine(reference, show_ids if selection is None else selection, attribut)
+            attendu = attendu if limite is None else attendu[:limite]
+            assert mediatheque.trier_ids_par_attribut(selection, attribut, limite) == attendu
+            if limite is None:
+                assert list(mediatheque.iterer_ids_tries_par_attribut(selection, attribut)) == attendu
+
+
+def test_tri_apres_reduction_identique_a_sorted(reference):
+    mediatheque = Mediatheque(CHEMIN_ULFLIX, utiliser_instantane=False)
+    for attribut in ATTRIBUTS:
+        mediatheque.obtenir_ordre_de_tri(attribut)
+    gardes = list(mediatheque.shows)[1::2]
+    mediatheque.reduire_liste_des_shows(random.Random(5).sample(gardes, len(gardes)))
+    show_ids = list(mediatheque.shows)
+    for attribut in ATTRIBUTS:
+        for selection in [None, *selections(show_ids)]:
+            attendu = trier_comme_l_origine(reference, show_ids if selection is None else selection, attribut)
+            assert mediatheque.trier_ids_par_attribut(selection, attribut) == attendu
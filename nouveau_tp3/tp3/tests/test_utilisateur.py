@@ -0,0 +1,135 @@
+import logging
+
+from journal_utilisateurs import encoder_rangee
+from utilisateur import AnnuaireUtilisateur, Utilisateur, rangees_valides_et_uniques
+
+
+def rangee(email, age="30", abonnement="1"):
+    return ["Nom", email, age, "Canada", abonnement, "hash"]
+
+
+def test_age_non_ascii_ignore_sans_erreur():
+    rangees = [rangee("un@exemple.com", age="²"), rangee("deux@exemple.com", age="٣"), rangee("trois@exemple.com")]
+    assert [r[1] for r in rangees_valides_et_uniques(rangees)] == ["trois@exemple.com"]
+
+
+def test_rangees_ignorees_journalisees(caplog):
+    rangees = [
+        rangee("un@exemple.com"),
+        rangee("UN@exemple.com"),
+        rangee("deux@exemple.com", abonnement="3"),
+        rangee("pas une adresse"),
+        ["trop", "court"],
+    ]
+    with caplog.at_level(logging.WARNING, logger="utilisateur"):
+        assert len(list(rangees_valides_et_uniques(rangees))) == 1
+    assert "4 rangée(s)" in caplog.text
+
+
+def test_chargement_d_un_fichier_avec_age_invalide(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(encoder_rangee(rangee("un@exemple.com", age="²")) + encoder_rangee(rangee("deux@exemple.com")))
+    annuaire = AnnuaireUtilisateur(str(chemin))
+    assert [utilisateur.email for utilisateur in annuaire.utilisateurs] == ["deux@exemple.com"]
+
+
+def test_position_perimee_au_milieu_d_un_caractere(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(encoder_rangee(rangee("un@exemple.com")) + encoder_rangee(rangee("deux@exemple.com")))
+    annuaire = AnnuaireUtilisateur(str(chemin), chargement_paresseux=True)
+    position = annuaire.index.chercher("deux@exemple.com")
+
+    # Un autre processus compacte le fichier: l'ancienne position tombe dans un caractère de deux octets.
+    premiere = encoder_rangee(["é" * 40, "un@exemple.com", "30", "Canada", "1", "hash"])
+    if premiere[position - 1:position + 1] != "é".encode("utf-8"):
+        premiere = b"x" + premiere
+    assert premiere[position - 1:position + 1] == "é".encode("utf-8")
+    autre = tmp_path / "compacte.txt"
+    autre.write_bytes(premiere + encoder_rangee(rangee("deux@exemple.com")))
+    autre.replace(chemin)
+
+    assert annuaire.index.lire_ligne(position) is None
+    assert annuaire.contient_email("deux@exemple.com")
+    assert annuaire.trouver_par_email("deux@exemple.com").email == "deux@exemple.com"
+
+
+def test_contient_email_verifie_la_ligne_indexee(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(encoder_rangee(rangee("un@exemple.com")) + encoder_rangee(rangee("deux@exemple.com")))
+    annuaire = AnnuaireUtilisateur(str(chemin), chargement_paresseux=True)
+
+    autre = tmp_path / "remplacement.txt"
+    autre.write_bytes(encoder_rangee(rangee("un@exemple.com")) + encoder_rangee(rangee("trois@exemple.com")))
+    autre.replace(chemin)
+    assert not annuaire.contient_email("deux@exemple.com")
+    assert annuaire.contient_email("trois@exemple.com")
+
+
+def test_compactage_ignore_un_fichier_deja_compact(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(b"".join(encoder_rangee(rangee(email)) for email in ("bbb@exemple.com", "aaa@exemple.com")))
+    annuaire = AnnuaireUtilisateur(str(chemin), chargement_paresseux=True)
+    assert annuaire.compacter() == 2
+    etat = chemin.stat()
+
+    assert annuaire.compacter() == 2
+    annuaire.enregistrer_utilisateur(Utilisateur(*rangee("ccc@exemple.com")))
+    assert annuaire.compacter() == 3
+    ajout = len(encoder_rangee(rangee("ccc@exemple.com")))
+    assert (chemin.stat().st_ino, chemin.stat().st_size) == (etat.st_ino, etat.st_size + ajout)
+
+    # Une ligne en double doit être retirée: le fichier est réécrit.
+    with open(chemin, "ab") as fichier:
+        fichier.write(encoder_rangee(rangee("aaa@exemple.com", age="40")))
+    assert annuaire.compacter() == 3
+    assert chemin.stat().st_ino != etat.st_ino
+    assert annuaire.trouver_par_email("aaa@exemple.com").age == 30
+
+
+def test_fichier_sans_retour_de_ligne_final(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(encoder_rangee(rangee("alice@exemple.com")) + encoder_rangee(rangee("bob@exemple.com"))[:-1])
+    assert [u.email for u in AnnuaireUtilisateur(str(chemin)).utilisateurs] == ["alice@exemple.com", "bob@exemple.com"]
+
+    annuaire = AnnuaireUtilisateur(str(chemin), chargement_paresseux=True)
+    assert annuaire.trouver_par_email("bob@exemple.com").email == "bob@exemple.com"
+    annuaire.enregistrer_utilisateur(Utilisateur(*rangee("carl@exemple.com")))
+    emails = [u.email for u in AnnuaireUtilisateur(str(chemin)).utilisateurs]
+    assert emails == ["alice@exemple.com", "bob@exemple.com", "carl@exemple.com"]
+
+
+def test_ligne_tronquee_effacee_et_journalisee(tmp_path, caplog):
+    chemin = tmp_path / "utilisateurs.txt"
+    chemin.write_bytes(encoder_rangee(rangee("alice@exemple.com")) + b"Nom,bob@exemple.com,3")
+    annuaire = AnnuaireUtilisateur(str(chemin))
+    assert [u.email for u in annuaire.utilisateurs] == ["alice@exemple.com"]
+    with caplog.at_level(logging.WARNING, logger="journal_utilisateurs"):
+        annuaire.enregistrer_utilisateur(Utilisateur(*rangee("carl@exemple.com")))
+    assert "Ligne incomplète" in caplog.text
+    assert chemin.read_bytes() == encoder_rangee(rangee("alice@exemple.com")) + encoder_rangee(rangee("carl@exemple.com"))
+
+
+def test_chargements_complet_et_paresseux_equivalents(tmp_path):
+    chemin = tmp_path / "utilisateurs.txt"
+    rangees = [
+        rangee("Alice@Exemple.com"),
+        rangee("bob@exemple.com", age="trente"),
+        rangee("bob@exemple.com", age="31"),
+        rangee("carl@exemple.com", abonnement="3"),
+        rangee("pas une adresse"),
+        ["Nom", "dan@exemple.com", "30"],
+        rangee("ALICE@exemple.com", age="40"),
+    ]
+    chemin.write_bytes(b"".join(encoder_rangee(r) for r in rangees))
+    complet = AnnuaireUtilisateur(str(chemin))
+    paresseux = AnnuaireUtilisateur(str(chemin), chargement_paresseux=True)
+
+    for email in ("alice@exemple.com", "ALICE@EXEMPLE.COM", "bob@exemple.com", "carl@exemple.com", "dan@exemple.com"):
+        attendu = complet.trouver_par_email(email)
+        trouve = paresseux.trouver_par_email(email)
+        assert paresseux.contient_email(email) == complet.contient_email(email) == (attendu is not None)
+        if attendu is None:
+            assert trouve is None
+        else:
+            assert trouve.rangee() == attendu.rangee()
+    assert complet.trouver_par_email("bob@exemple.com").age == 31
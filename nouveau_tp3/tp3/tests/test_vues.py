@@ -0,0 +1,25 @@
+from mediatheque import FiltreDAcces, Mediatheque
+from stockage_sqlite import MediathequeSqlite
+
+
+def test_cache_des_vues_borne(fichier_de_shows, monkeypatch):
+    monkeypatch.setattr(Mediatheque, "TAILLE_DU_CACHE_DE_VUES", 2)
+    mediatheque = Mediatheque(fichier_de_shows, utiliser_instantane=False)
+    premiere = mediatheque.vue(FiltreDAcces(20, "canada"))
+    mediatheque.vue(FiltreDAcces(20, "france"))
+    # La première vue redevient la plus récemment utilisée: c'est la deuxième qui est retirée.
+    assert mediatheque.vue(FiltreDAcces(20, "canada")) is premiere
+    mediatheque.vue(FiltreDAcces(20, "pays inventé"))
+    assert list(mediatheque.vues) == [FiltreDAcces(20, "canada").cle(), FiltreDAcces(20, "pays inventé").cle()]
+
+
+def test_vues_sqlite_partagent_la_connexion(fichier_de_shows, tmp_path):
+    reference = Mediatheque(fichier_de_shows, utiliser_instantane=False)
+    mediatheque = MediathequeSqlite(str(tmp_path / "shows.db"), fichier_de_shows)
+    for filtre in (FiltreDAcces(10), FiltreDAcces(20, "canada"), FiltreDAcces(15, "france")):
+        vue = mediatheque.vue(filtre)
+        assert vue.connexion is mediatheque.connexion
+        assert list(vue.shows) == list(reference.vue(filtre).shows)
+    vue.fermer()
+    assert list(mediatheque.shows) == list(reference.shows)
+    mediatheque.fermer()
@@ -1,6 +1,94 @@
+import asyncio
+import csv
+import itertools
+import logging
 import os
+import threading
 
-from utils import HacheurDeMotDePasse, est_une_adresse_email_valide
+from index_utilisateurs import EXTENSION, IndexDesUtilisateurs, empreinte_du_fichier
+from journal_utilisateurs import (
+    TAILLE_DU_TAMPON,
+    JournalDesUtilisateurs,
+    decoder_ligne,
+    encoder_rangee,
+    est_une_rangee_valide,
+    lire_lignes,
+    synchroniser_dossier,
+)
+from utils import HacheurDeMotDePasse, est_une_adresse_email_valide, valider_emails
+
+# Nombre de rangées validées (et de mots de passe hachés) à la fois lors d'un import.
+TAILLE_DES_LOTS = 10_000
+# Extension du fichier décrivant le dernier compactage du fichier des utilisateurs (voir compacter).
+EXTENSION_DU_COMPACTAGE = ".compacte"
+# Colonnes d'un export CSV.
+COLONNES_CSV = ("nom", "email", "age", "pays", "abonnement", "hash_mot_de_passe")
+
+journalisation = logging.getLogger(__name__)
+
+
+def rangees_valides_et_uniques(rangees, est_connu=None):
+    """
+    Générateur filtrant en un seul passage des rangées d'utilisateurs
+    (nom, email, age, pays, abonnement, mot_de_passe), sans les garder en
+    mémoire: l'adresse email est mise en minuscules et seules les rangées
+    complètes (âge entier positif, abonnement 1 ou 2) dont l'adresse est
+    valide, inconnue et pas encore vue dans le flux sont conservées. Les
+    adresses sont validées par lots de TAILLE_DES_LOTS avec valider_emails.
+    Le nombre de rangées ignorées est journalisé (logging) à la fin du flux.
+
+    Args:
+        rangees (iterable): Les rangées (listes de 6 str).
+        est_connu (callable, optional): Fonction indiquant si une adresse
+        email fait déjà partie de l'annuaire.
+
+    Yields:
+        list: Les rangées conservées, dans l'ordre.
+    """
+    emails_vus = set()
+    ignorees = 0
+    rangees = iter(rangees)
+    while True:
+        lot = list(itertools.islice(rangees, TAILLE_DES_LOTS))
+        if not lot:
+            break
+        emails = [rangee[1].lower() if len(rangee) == 6 else "" for rangee in lot]
+        for rangee, email, valide in zip(lot, emails, valider_emails(emails)):
+            if (
+                valide
+                and email not in emails_vus
+                # isdigit seul accepte aussi des chiffres que int refuse (par exemple "²").
+                and rangee[2].isascii()
+                and rangee[2].isdigit()
+                and rangee[4] in ("1", "2")
+                and not (est_connu is not None and est_connu(email))
+            ):
+                emails_vus.add(email)
+                yield [rangee[0], email, *rangee[2:]]
+            else:
+                ignorees += 1
+    if ignorees:
+        journalisation.warning(
+            "%d rangée(s) d'utilisateur invalide(s), en double ou déjà connue(s) ignorée(s).", ignorees
+        )
+
+
+def lire_rangees(chemin_fichier):
+    """
+    Générateur parcourant les lignes complètes d'un fichier d'utilisateurs
+    (voir journal_utilisateurs), sans construire d'objet Utilisateur.
+
+    Args:
+        chemin_fichier (str): Le chemin du fichier d'utilisateurs.
+
+    Yields:
+        list: Les champs (str) de chaque ligne.
+    """
+    if not os.path.exists(chemin_fichier):
+        return
+    with open(chemin_fichier, "rb") as fichier:
+        for _, ligne in lire_lignes(fichier):
+            yield decoder_ligne(ligne.decode("utf-8"))
 
 
 class Utilisateur:
@@ -25,6 +113,16 @@ class Utilisateur:
         self.pays = pays
         self.abonnement = int(abonnement)
 
+    def rangee(self):
+        """
+        Méthode permettant de récupérer les champs de l'utilisateur, dans
+        l'ordre du fichier des utilisateurs.
+
+        Returns:
+            list: Les champs (str) nom, email, age, pays, abonnement et mot_de_passe.
+        """
+        return [self.nom, self.email, str(self.age), self.pays, str(self.abonnement), self.mot_de_passe]
+
 
 class AnnuaireUtilisateur:
     """
@@ -33,97 +131,560 @@ class AnnuaireUtilisateur:
     Un AnnuaireUtilisateur est composé des attributs suivants:
         - chemin_base_de_donnees (str): le chemin menant au fichier dans lequel les informations des utilisateurs sont sauvegardées.
         - utilisateurs (list): la liste des utilisateurs faisant partie de l'annuaire.
+          En chargement paresseux, seuls les utilisateurs déjà recherchés en font partie.
+        - utilisateurs_par_email (dict): les mêmes utilisateurs, indexés par adresse email.
+        - index (IndexDesUtilisateurs): l'index sur disque du fichier, ou None
+          si tous les utilisateurs sont chargés au démarrage.
+        - journal (JournalDesUtilisateurs): les écritures à la fin du fichier.
     """
-    def __init__(self, chemin_base_de_donnees):
+    def __init__(self, chemin_base_de_donnees, chargement_paresseux=False):
+        """
+        Args:
+            chemin_base_de_donnees (str): Le chemin du fichier des utilisateurs.
+            chargement_paresseux (bool, optional): Si True, les utilisateurs ne
+            sont pas chargés au démarrage: chacun est lu dans le fichier au besoin,
+            grâce à un index sur disque des adresses email.
+        """
         self.chemin_base_de_donnees = chemin_base_de_donnees
-        
-        if os.path.exists(self.chemin_base_de_donnees):
-            with open(self.chemin_base_de_donnees, encoding="utf-8") as fichier:
-                lignes = [ligne.strip() for ligne in fichier if ligne != '\n']
-        else:
-            lignes = []
+        self.utilisateurs = []
+        self.utilisateurs_par_email = {}
+        self.journal = JournalDesUtilisateurs(self.chemin_base_de_donnees)
 
-        self.utilisateurs = [Utilisateur(*ligne.split(",")) for ligne in lignes]
+        if chargement_paresseux:
+            self.index = IndexDesUtilisateurs(self.chemin_base_de_donnees)
+            return
+        self.index = None
 
-    def inscrire(self):
+        # Un utilisateur dont l'adresse email est invalide ne pourrait pas s'authentifier.
+        for rangee in rangees_valides_et_uniques(lire_rangees(self.chemin_base_de_donnees)):
+            self.ajouter_utilisateur(Utilisateur(*rangee))
+
+    def ajouter_utilisateur(self, utilisateur):
         """
-        Méthode permettant de récupérer les informations de l'utilisateur
-        afin de lui créer un compte ULFlix.
+        Méthode permettant d'ajouter un utilisateur à l'annuaire en mémoire.
+        Si plusieurs utilisateurs ont la même adresse email, le premier l'emporte.
+
+        Args:
+            utilisateur (Utilisateur): L'utilisateur à ajouter.
+        """
+        self.utilisateurs.append(utilisateur)
+        self.utilisateurs_par_email.setdefault(utilisateur.email, utilisateur)
+
+    def contient_email(self, email):
+        """
+        Méthode permettant de savoir si un utilisateur a une adresse email,
+        sans le charger.
+
+        Args:
+            email (str): L'adresse email.
 
         Returns:
-            Utilisateur: Un objet de la classe Utilisateur avec les attributs
-            (nom, email, age, pays, abonnement, mot_de_passe) remplis.
+            bool: True si un utilisateur de l'annuaire a cette adresse.
         """
-        nom = None
-        while nom is None:
-            nom = input("Veuillez entrer votre nom: ").lower()
-            if len(nom) == 0 or nom.isspace():
-                print("Le nom ne peut pas être vide.")
-                nom = None
+        # Les adresses de l'annuaire sont en minuscules (voir rangees_valides_et_uniques).
+        email = email.lower()
+        if email in self.utilisateurs_par_email:
+            return True
+        return self.index is not None and self.lire_rangee_indexee(email) is not None
 
-        adresses_emails_existantes = set([u.email for u in self.utilisateurs])
-        email = None
-        while email is None:
-            email = input("Veuillez entrer votre email: ").lower()
+    def lire_rangee_indexee(self, email):
+        """
+        Méthode permettant de lire dans le fichier la rangée d'un utilisateur,
+        à la position donnée par l'index. Si cette position ne désigne pas la
+        ligne d'un utilisateur ayant cette adresse (le fichier a été compacté
+        depuis l'ouverture de l'index, par un autre processus ou en arrière-plan),
+        l'index est reconstruit et la lecture est faite une seconde fois.
 
-            if not est_une_adresse_email_valide(email):
-                print("L'adresse email entrée est invalide.")
-                email = None
+        Args:
+            email (str): L'adresse email.
+
+        Returns:
+            list: Les champs (str) de l'utilisateur, adresse en minuscules, ou
+            None si l'adresse est inconnue.
+        """
+        email = email.lower()
+        for _ in range(2):
+            position = self.index.chercher(email)
+            if position is None:
+                return None
+            ligne = self.index.lire_ligne(position)
+            if ligne is not None:
+                rangee = decoder_ligne(ligne)
+                # Comme au chargement complet, une ligne invalide ne décrit aucun utilisateur.
+                if est_une_rangee_valide(rangee) and rangee[1].lower() == email:
+                    return [rangee[0], email, *rangee[2:]]
+            self.index.construire()
+        return None
+
+    def trouver_par_email(self, email):
+        """
+        Méthode permettant de retrouver un utilisateur à partir de son adresse email.
+
+        Args:
+            email (str): L'adresse email de l'utilisateur.
 
-            if email in adresses_emails_existantes:
-                print(
+        Returns:
+            Utilisateur: L'utilisateur, ou None si aucun utilisateur n'a cette adresse.
+        """
+        email = email.lower()
+        utilisateur = self.utilisateurs_par_email.get(email)
+        if utilisateur is None and self.index is not None:
+            rangee = self.lire_rangee_indexee(email)
+            if rangee is not None:
+                utilisateur = Utilisateur(*rangee)
+                self.ajouter_utilisateur(utilisateur)
+        return utilisateur
+
+    # Questions posées lors d'une inscription, dans l'ordre, avec l'attribut qu'elles remplissent.
+    QUESTIONS_D_INSCRIPTION = (
+        ("nom", "Veuillez entrer votre nom: "),
+        ("email", "Veuillez entrer votre email: "),
+        ("age", "Veuillez entrer votre âge: "),
+        ("pays", "Veuillez entrer votre pays: "),
+        ("abonnement", "Veuillez entrer votre type d'abonnement - 1 [régional] ou 2 [international]: "),
+        ("mot_de_passe", "Veuillez entrer votre mot de passe (min 6 caractères): "),
+    )
+
+    def valider_reponse_d_inscription(self, attribut, reponse):
+        """
+        Méthode permettant de valider la réponse d'un utilisateur à l'une des
+        QUESTIONS_D_INSCRIPTION.
+
+        Args:
+            attribut (str): L'attribut de l'Utilisateur rempli par la question.
+            reponse (str): La réponse saisie par l'utilisateur.
+
+        Returns:
+            tuple: La valeur de l'attribut et None si la réponse est valide,
+            sinon None et le message d'erreur à afficher.
+        """
+        if attribut == "nom":
+            nom = reponse.lower()
+            if len(nom) == 0 or nom.isspace():
+                return None, "Le nom ne peut pas être vide."
+            return nom, None
+
+        if attribut == "email":
+            email = reponse.lower()
+            if not est_une_adresse_email_valide(email):
+                return None, "L'adresse email entrée est invalide."
+            if self.trouver_par_email(email) is not None:
+                return None, (
                     "Un utilisateur est déjà inscrit avec cette adresse email. "
                     "Veuillez vous connecter si vous êtes cet utilisateur ou utilisez une autre adresse email."
                 )
-                email = None
+            return email, None
 
-        age = None
-        while age is None:
+        if attribut == "age":
             try:
-                age = int(input("Veuillez entrer votre âge: "))
+                age = int(reponse)
                 assert age >= 0
             except (ValueError, AssertionError):
-                print("L'âge doit être un entier positif.")
-                age = None
+                return None, "L'âge doit être un entier positif."
+            return age, None
 
-        pays = None
-        while pays is None:
-            pays = input("Veuillez entrer votre pays: ").lower()
+        if attribut == "pays":
+            pays = reponse.lower()
             if len(pays) == 0 or pays.isspace():
-                print("Vous devez entrer un pays valide.")
-                pays = None
-                
-        abonnement = None
-        while abonnement is None:
+                return None, "Vous devez entrer un pays valide."
+            return pays, None
+
+        if attribut == "abonnement":
             try:
-                abonnement = int(input("Veuillez entrer votre type d'abonnement - 1 [régional] ou 2 [international]: "))
+                abonnement = int(reponse)
                 assert abonnement in [1, 2]
             except (ValueError, AssertionError):
-                print("Le type d'abonement doit être 1 pour régional ou 2 pour international.")
-                abonnement = None
-
-        mot_de_passe = None
-        while mot_de_passe is None:
-            mot_de_passe = input("Veuillez entrer votre mot de passe (min 6 caractères): ")
-            if len(mot_de_passe) < 6 or mot_de_passe.isspace():
-                print("Le mot de passe doit faire au minimum 6 caractères.")
-                mot_de_passe = None
-
-        hash_mot_de_passe = HacheurDeMotDePasse.hacher(mot_de_passe)
-
-        utilisateur = Utilisateur(
-            nom=nom,
-            email=email,
-            age=age,
-            pays=pays,
-            abonnement=abonnement,
+                return None, "Le type d'abonement doit être 1 pour régional ou 2 pour international."
+            return abonnement, None
+
+        if len(reponse) < 6 or reponse.isspace():
+            return None, "Le mot de passe doit faire au minimum 6 caractères."
+        return reponse, None
+
+    def creer_utilisateur(self, reponses, hash_mot_de_passe=None):
+        """
+        Méthode permettant de créer et d'enregistrer le compte d'un utilisateur
+        à partir de ses réponses validées aux QUESTIONS_D_INSCRIPTION.
+
+        Args:
+            reponses (dict): La valeur de chaque attribut, le mot de passe étant en clair.
+            hash_mot_de_passe (str, optional): Le mot de passe déjà haché. Si None,
+            le mot de passe en clair des réponses est haché.
+
+        Returns:
+            Utilisateur: L'utilisateur inscrit.
+        """
+        utilisateur = self.nouvel_utilisateur(reponses, hash_mot_de_passe)
+        self.enregistrer_utilisateur(utilisateur)
+        return utilisateur
+
+    @staticmethod
+    def nouvel_utilisateur(reponses, hash_mot_de_passe=None):
+        """
+        Méthode permettant de construire (sans l'enregistrer) l'utilisateur
+        correspondant à des réponses validées aux QUESTIONS_D_INSCRIPTION.
+
+        Args:
+            reponses (dict): La valeur de chaque attribut, le mot de passe étant en clair.
+            hash_mot_de_passe (str, optional): Le mot de passe déjà haché. Si None,
+            le mot de passe en clair des réponses est haché.
+
+        Returns:
+            Utilisateur: Le nouvel utilisateur.
+        """
+        if hash_mot_de_passe is None:
+            hash_mot_de_passe = HacheurDeMotDePasse.hacher(reponses["mot_de_passe"])
+
+        return Utilisateur(
+            nom=reponses["nom"],
+            email=reponses["email"],
+            age=reponses["age"],
+            pays=reponses["pays"],
+            abonnement=reponses["abonnement"],
             mot_de_passe=hash_mot_de_passe,
         )
 
-        with open(self.chemin_base_de_donnees, mode="a", encoding="utf-8") as fichier:
-            fichier.write(",".join([nom, email, str(age), pays, str(abonnement), hash_mot_de_passe]) + "\n")
+    def inscrire(self):
+        """
+        Méthode permettant de récupérer les informations de l'utilisateur
+        afin de lui créer un compte ULFlix.
 
-        return utilisateur
+        Returns:
+            Utilisateur: Un objet de la classe Utilisateur avec les attributs
+            (nom, email, age, pays, abonnement, mot_de_passe) remplis.
+        """
+        reponses = {}
+        for attribut, question in self.QUESTIONS_D_INSCRIPTION:
+            valeur = None
+            while valeur is None:
+                valeur, erreur = self.valider_reponse_d_inscription(attribut, input(question))
+                if erreur is not None:
+                    print(erreur)
+            reponses[attribut] = valeur
+
+        return self.creer_utilisateur(reponses)
+
+    def enregistrer_utilisateur(self, utilisateur):
+        """
+        Méthode permettant d'enregistrer un nouvel utilisateur: sa ligne est
+        ajoutée à la fin du fichier par le journal (elle est sur le disque
+        quand la méthode retourne), puis il est ajouté à l'annuaire (et à l'index).
+
+        Args:
+            utilisateur (Utilisateur): L'utilisateur à enregistrer.
+        """
+        position, = self.journal.ajouter([utilisateur.rangee()])
+
+        self.ajouter_utilisateur(utilisateur)
+        if self.index is not None:
+            self.index.ajouter(utilisateur.email, position)
+
+    async def enregistrer_utilisateur_async(self, utilisateur):
+        """
+        Coroutine permettant d'enregistrer un nouvel utilisateur sans bloquer la
+        boucle asyncio pendant l'écriture. L'utilisateur est ajouté à l'annuaire
+        avant d'être écrit (son adresse email est donc réservée aussitôt); sa
+        ligne est écrite par un autre fil d'exécution, où les inscriptions
+        simultanées sont regroupées (voir JournalDesUtilisateurs.ajouter).
+
+        Args:
+            utilisateur (Utilisateur): L'utilisateur à enregistrer.
+        """
+        self.ajouter_utilisateur(utilisateur)
+        try:
+            position, = await asyncio.to_thread(self.journal.ajouter, [utilisateur.rangee()])
+        except BaseException:
+            self.utilisateurs.remove(utilisateur)
+            if self.utilisateurs_par_email.get(utilisateur.email) is utilisateur:
+                del self.utilisateurs_par_email[utilisateur.email]
+            raise
+
+        if self.index is not None:
+            self.index.ajouter(utilisateur.email, position)
+
+    def importer_rangees(self, rangees):
+        """
+        Méthode permettant d'importer en un seul passage un grand nombre
+        d'utilisateurs dont le mot de passe est déjà haché. Les rangées
+        invalides ou dont l'adresse email est déjà connue sont ignorées (voir
+        rangees_valides_et_uniques), et les autres sont écrites par ecrire_rangees.
+
+        Args:
+            rangees (iterable): Les rangées (nom, email, age, pays, abonnement, mot_de_passe).
+
+        Returns:
+            int: Le nombre d'utilisateurs importés.
+        """
+        return self.ecrire_rangees(rangees_valides_et_uniques(rangees, self.contient_email))
+
+    def ecrire_rangees(self, rangees):
+        """
+        Méthode permettant d'ajouter à la fin du fichier des utilisateurs déjà
+        validés (voir rangees_valides_et_uniques), en une seule écriture du
+        journal: les lignes passent par un tampon de TAILLE_DU_TAMPON octets,
+        et le fichier n'est synchronisé sur le disque (fsync) qu'une fois, à la fin.
+
+        En chargement paresseux, les utilisateurs écrits ne sont pas gardés
+        en mémoire: seul l'index est mis à jour (reconstruit s'ils sont nombreux).
+
+        Args:
+            rangees (iterable): Les rangées (nom, email, age, pays, abonnement, mot_de_passe).
+
+        Returns:
+            int: Le nombre d'utilisateurs écrits.
+        """
+        nombre = 0
+        positions = []
+        with self.journal.ouvrir_en_ecriture() as ecrivain:
+            for rangee in rangees:
+                position = ecrivain.ecrire(rangee)
+                if self.index is None:
+                    self.ajouter_utilisateur(Utilisateur(*rangee))
+                elif positions is not None:
+                    positions.append((rangee[1], position))
+                    if len(positions) > TAILLE_DES_LOTS:
+                        positions = None
+                nombre += 1
+
+        if self.index is not None:
+            if positions is None:
+                self.index.construire()
+            else:
+                for email, position in positions:
+                    self.index.ajouter(email, position)
+        return nombre
+
+    def rangees_du_csv(self, lecteur):
+        """
+        Générateur préparant les lignes d'un fichier CSV d'utilisateurs à
+        l'import. Chaque champ est validé comme lors d'une inscription (voir
+        valider_reponse_d_inscription) et les rangées invalides, en double ou
+        déjà connues sont ignorées (voir rangees_valides_et_uniques). Les mots
+        de passe en clair sont ensuite hachés par lots de TAILLE_DES_LOTS,
+        en parallèle (voir HacheurDeMotDePasse.hacher_plusieurs).
+
+        Args:
+            lecteur (csv.DictReader): Les lignes du fichier CSV, avec les colonnes
+            nom, email, age, pays, abonnement et soit mot_de_passe (en clair),
+            soit hash_mot_de_passe (déjà haché, comme dans un export).
+
+        Yields:
+            list: Les rangées (nom, email, age, pays, abonnement, mot_de_passe haché).
+        """
+        en_clair = "hash_mot_de_passe" not in (lecteur.fieldnames or ())
+        colonne_du_mot_de_passe = "mot_de_passe" if en_clair else "hash_mot_de_passe"
+
+        def preparer(ligne):
+            rangee = [ligne.get("nom"), ligne.get("email"), ligne.get("age"), ligne.get("pays"), ligne.get("abonnement"), ligne.get(colonne_du_mot_de_passe)]
+            if None in rangee:
+                return None
+            for position, attribut in ((0, "nom"), (2, "age"), (3, "pays"), (4, "abonnement")):
+                valeur, erreur = self.valider_reponse_d_inscription(attribut, rangee[position].strip())
+                if erreur is not None:
+                    return None
+                rangee[position] = str(valeur)
+            rangee[1] = rangee[1].strip()
+            if en_clair:
+                erreur = self.valider_reponse_d_inscription("mot_de_passe", rangee[5])[1]
+            else:
+                erreur = None if rangee[5] else "Le mot de passe haché est vide."
+            return None if erreur is not None else rangee
+
+        rangees = rangees_valides_et_uniques(
+            (rangee for rangee in map(preparer, lecteur) if rangee is not None), self.contient_email
+        )
+        if not en_clair:
+            yield from rangees
+            return
+        while True:
+            lot = list(itertools.islice(rangees, TAILLE_DES_LOTS))
+            if not lot:
+                return
+            for rangee, hash_mot_de_passe in zip(lot, HacheurDeMotDePasse.hacher_plusieurs([rangee[5] for rangee in lot])):
+                rangee[5] = hash_mot_de_passe
+                yield rangee
+
+    def importer_csv(self, chemin_csv):
+        """
+        Méthode permettant d'importer les utilisateurs d'un fichier CSV en un
+        seul passage (voir rangees_du_csv et ecrire_rangees).
+
+        Args:
+            chemin_csv (str): Le chemin du fichier CSV.
+
+        Returns:
+            int: Le nombre d'utilisateurs importés.
+        """
+        with open(chemin_csv, newline="", encoding="utf-8") as fichier:
+            return self.ecrire_rangees(self.rangees_du_csv(csv.DictReader(fichier)))
+
+    def iterer_rangees(self):
+        """
+        Générateur parcourant les utilisateurs de l'annuaire dans l'ordre du
+        fichier, sans les charger en mémoire (le premier utilisateur d'une
+        adresse email l'emporte, comme au chargement).
+
+        Yields:
+            list: Les rangées (nom, email, age, pays, abonnement, mot_de_passe).
+        """
+        yield from rangees_valides_et_uniques(lire_rangees(self.chemin_base_de_donnees))
+
+    def exporter_csv(self, chemin_csv):
+        """
+        Méthode permettant d'exporter tous les utilisateurs dans un fichier CSV
+        (colonnes nom, email, age, pays, abonnement et hash_mot_de_passe), en
+        un seul passage. Le fichier exporté peut être réimporté par importer_csv.
+
+        Args:
+            chemin_csv (str): Le chemin du fichier CSV à écrire.
+
+        Returns:
+            int: Le nombre d'utilisateurs exportés.
+        """
+        nombre = 0
+        with open(chemin_csv, "w", newline="", encoding="utf-8", buffering=TAILLE_DU_TAMPON) as fichier:
+            ecrivain = csv.writer(fichier)
+            ecrivain.writerow(COLONNES_CSV)
+            for rangee in self.iterer_rangees():
+                ecrivain.writerow(rangee)
+                nombre += 1
+        return nombre
+
+    def fusionner_fichier(self, chemin_fichier):
+        """
+        Méthode permettant d'importer les utilisateurs d'un autre fichier
+        d'utilisateurs (même format), en le lisant ligne par ligne.
+
+        Args:
+            chemin_fichier (str): Le chemin du fichier à importer.
+
+        Returns:
+            int: Le nombre d'utilisateurs importés.
+        """
+        return self.importer_rangees(lire_rangees(chemin_fichier))
+
+    def compacter(self):
+        """
+        Méthode permettant de réécrire le fichier des utilisateurs sous forme
+        compacte, avec son index: un seul utilisateur par adresse email (le
+        premier l'emporte, comme au chargement), sans ligne invalide, dans
+        l'ordre des adresses email.
+
+        La lecture et le tri se font sans bloquer les inscriptions: seules les
+        lignes ajoutées pendant ce temps sont recopiées, à la fin du nouveau
+        fichier, pendant que les écritures sont verrouillées. Le nouveau fichier
+        remplace ensuite l'ancien d'un seul coup (os.replace): après un arrêt
+        brutal, le fichier est l'un ou l'autre, complet.
+
+        Le fichier n'est pas réécrit s'il n'a pas changé depuis le dernier
+        compactage, ou si seuls des utilisateurs valides et nouveaux y ont été
+        ajoutés depuis (voir deja_compacte).
+
+        Returns:
+            int: Le nombre d'utilisateurs du fichier compacté.
+        """
+        chemin = self.chemin_base_de_donnees
+        if not os.path.exists(chemin):
+            return 0
+        nombre = self.deja_compacte()
+        if nombre is not None:
+            return nombre
+        chemin_index = chemin + EXTENSION
+        chemin_temporaire = f"{chemin}.{os.getpid()}.compactage"
+
+        lues, fin_lue = [], 0
+        with open(chemin, "rb") as fichier:
+            for position, ligne in lire_lignes(fichier):
+                lues.append(decoder_ligne(ligne.decode("utf-8")))
+                fin_lue = position + len(ligne)
+        rangees = sorted(rangees_valides_et_uniques(lues), key=lambda rangee: rangee[1])
+        del lues
+
+        positions, taille_triee = {}, 0
+        with open(chemin_temporaire, "wb", buffering=TAILLE_DU_TAMPON) as nouveau:
+            for rangee in rangees:
+                ligne = encoder_rangee(rangee)
+                nouveau.write(ligne)
+                positions[rangee[1].encode("utf-8")] = taille_triee
+                taille_triee += len(ligne)
+
+        with self.journal.verrouiller():
+            with open(chemin, "rb") as fichier:
+                fichier.seek(fin_lue)
+                suite = fichier.read()
+            with open(chemin_temporaire, "ab") as nouveau:
+                nouveau.write(suite[:suite.rfind(b"\n") + 1])
+                nouveau.flush()
+                os.fsync(nouveau.fileno())
+            # Sans index, le prochain à ouvrir le fichier le reconstruit: un arrêt entre ces
+            # étapes ne peut pas laisser un index qui ne correspond pas au fichier.
+            if os.path.exists(chemin_index):
+                os.remove(chemin_index)
+            os.replace(chemin_temporaire, chemin)
+            synchroniser_dossier(chemin)
+            empreinte = empreinte_du_fichier(chemin, taille_triee)
+            IndexDesUtilisateurs.ecrire(chemin_index, empreinte, positions)
+            if self.index is not None:
+                self.index = IndexDesUtilisateurs(chemin)
+            # Seule la partie triée est décrite: les lignes recopiées seront vérifiées au prochain compactage.
+            with open(chemin + EXTENSION_DU_COMPACTAGE, "wb") as fichier:
+                fichier.write(b"%d %d %d %d %d\n" % (*empreinte, len(rangees)))
+        return len(rangees)
+
+    def deja_compacte(self):
+        """
+        Méthode permettant de savoir si le fichier des utilisateurs est encore
+        compact: c'est le fichier écrit par le dernier compactage (même inode
+        et même début, voir empreinte_du_fichier), et les lignes ajoutées
+        depuis, s'il y en a, sont complètes et décrivent des utilisateurs
+        valides dont l'adresse email n'apparaît qu'une fois.
+
+        Returns:
+            int: Le nombre d'utilisateurs du fichier s'il est encore compact, None sinon.
+        """
+        chemin = self.chemin_base_de_donnees
+        try:
+            with open(chemin + EXTENSION_DU_COMPACTAGE, "rb") as fichier:
+                taille, date_modification, inode, controle, nombre = map(int, fichier.read().split())
+            etat = os.stat(chemin)
+        except (OSError, ValueError):
+            return None
+        if etat.st_ino != inode or etat.st_size < taille:
+            return None
+        if etat.st_size == taille:
+            return nombre if etat.st_mtime_ns == date_modification else None
+        if empreinte_du_fichier(chemin, taille)[3] != controle:
+            return None
+
+        ajoutees, fin = [], taille
+        with open(chemin, "rb") as fichier:
+            for position, ligne in lire_lignes(fichier, taille):
+                ajoutees.append(decoder_ligne(ligne.decode("utf-8", errors="replace")))
+                fin = position + len(ligne)
+        if fin != etat.st_size:
+            return None
+        index = self.index if self.index is not None else IndexDesUtilisateurs(chemin)
+
+        def est_dans_la_partie_compactee(email):
+            position = index.chercher(email)
+            return position is not None and position < taille
+
+        valides = sum(1 for _ in rangees_valides_et_uniques(ajoutees, est_dans_la_partie_compactee))
+        if index is not self.index:
+            index.fermer()
+        return nombre + valides if valides == len(ajoutees) else None
+
+    def compacter_en_arriere_plan(self):
+        """
+        Méthode permettant de lancer le compactage du fichier des utilisateurs
+        (voir compacter) dans un autre fil d'exécution.
+
+        Returns:
+            threading.Thread: Le fil d'exécution du compactage, déjà démarré.
+        """
+        fil = threading.Thread(target=self.compacter, name="compactage", daemon=True)
+        fil.start()
+        return fil
 
     def authentifier(self):
         """
@@ -165,29 +726,40 @@ class AnnuaireUtilisateur:
             Utilisateur: Un objet de la classe Utilisateur représentant
             l'utilisateur venant d'être authentifié.
         """
-        adresses_emails_existantes = set([u.email for u in self.utilisateurs])
-
-        email_saisi = None
-        while email_saisi is None:
-            email_saisi = input("Veuillez entrer l'adresse email associée à votre compte: ").lower()
-
-            if not est_une_adresse_email_valide(email_saisi):
-                print("L'adresse email entrée est invalide.")
-                email_saisi = None
-
-            elif email_saisi not in adresses_emails_existantes:
-                print("Nous n'avons trouvé aucun utilisateur avec cette adresse email au niveau de notre système.")
-                email_saisi = None
+        user = None
+        while user is None:
+            email_saisi = input("Veuillez entrer l'adresse email associée à votre compte: ")
+            user, erreur = self.valider_email_de_connexion(email_saisi)
+            if erreur is not None:
+                print(erreur)
 
         mot_de_passe_en_clair = None
         while mot_de_passe_en_clair is None:
             mot_de_passe_en_clair = input("Veuillez entrer votre mot de passe: ")
 
-            for user in self.utilisateurs:
-                if user.email == email_saisi:
-                    if HacheurDeMotDePasse.verifier(user.mot_de_passe, mot_de_passe_en_clair):
-                        return user
-                    else:
-                        print("Mot de passe incorrect.")
-                        mot_de_passe_en_clair = None
-                        break
+            if HacheurDeMotDePasse.verifier(user.mot_de_passe, mot_de_passe_en_clair):
+                return user
+            else:
+                print("Mot de passe incorrect.")
+                mot_de_passe_en_clair = None
+
+    def valider_email_de_connexion(self, reponse):
+        """
+        Méthode permettant de valider l'adresse email saisie par un utilisateur
+        qui veut s'authentifier.
+
+        Args:
+            reponse (str): L'adresse email saisie.
+
+        Returns:
+            tuple: L'utilisateur ayant cette adresse et None, sinon None et
+            le message d'erreur à afficher.
+        """
+        email = reponse.lower()
+        if not est_une_adresse_email_valide(email):
+            return None, "L'adresse email entrée est invalide."
+
+        utilisateur = self.trouver_par_email(email)
+        if utilisateur is None:
+            return None, "Nous n'avons trouvé aucun utilisateur avec cette adresse email au niveau de notre système."
+        return utilisateur, None
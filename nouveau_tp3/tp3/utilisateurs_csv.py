@@ -0,0 +1,28 @@
+import sys
+import time
+
+from serveur import charger_annuaire
+
+# Import et export en lot des utilisateurs, à lancer depuis le dossier tp3:
+#
+#   python utilisateurs_csv.py importer utilisateurs.csv
+#   python utilisateurs_csv.py exporter utilisateurs.csv
+#
+# Le fichier CSV a une ligne d'en-tête avec les colonnes nom, email, age, pays, abonnement
+# et mot_de_passe (en clair, haché pendant l'import) ou hash_mot_de_passe (déjà haché, comme
+# dans un export). Les utilisateurs invalides ou déjà inscrits sont ignorés. Les variables
+# d'environnement ULFLIX_BASE_SQLITE et ULFLIX_HACHAGE s'appliquent comme pour l'application.
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("importer", "exporter"):
+        sys.exit("Usage: python utilisateurs_csv.py importer|exporter fichier.csv")
+    action, chemin_csv = sys.argv[1:]
+
+    annuaire_utilisateur = charger_annuaire("ulflix-utilisateurs.txt")
+    debut = time.perf_counter()
+    if action == "importer":
+        nombre = annuaire_utilisateur.importer_csv(chemin_csv)
+        print(f"{nombre} utilisateurs importés en {time.perf_counter() - debut:.2f} s.")
+    else:
+        nombre = annuaire_utilisateur.exporter_csv(chemin_csv)
+        print(f"{nombre} utilisateurs exportés en {time.perf_counter() - debut:.2f} s.")
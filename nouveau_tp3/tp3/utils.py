@@ -1,5 +1,17 @@
+import asyncio
+import concurrent.futures
 import hashlib
+import hmac
+import collections
+import os
 import re
+import time
+
+from instrumentation import chronometrer, compter
+
+# Expression des adresses email valides, compilée une seule fois au chargement du module.
+# https://www.c-sharpcorner.com/article/how-to-validate-an-email-address-in-python/
+EXPRESSION_EMAIL = re.compile(r"^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w{2,3}$")
 
 
 def est_une_adresse_email_valide(email):
@@ -13,8 +25,22 @@ def est_une_adresse_email_valide(email):
     Returns:
         bool: True si l'adresse email passée en argument est valide, False sinon.
     """
-    # https://www.c-sharpcorner.com/article/how-to-validate-an-email-address-in-python/
-    return bool(re.search("^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w{2,3}$", email))
+    return EXPRESSION_EMAIL.match(email) is not None
+
+
+def valider_emails(emails):
+    """
+    Fonction permettant de valider un grand nombre d'adresses email: la
+    boucle est faite en C par map, sans appel de fonction Python par adresse.
+
+    Args:
+        emails (iterable): Adresses email à valider.
+
+    Returns:
+        iterator: True ou False pour chaque adresse, dans l'ordre. Les adresses
+        sont validées au fil du parcours, sans être toutes gardées en mémoire.
+    """
+    return map(bool, map(EXPRESSION_EMAIL.match, emails))
 
 
 class HacheurDeMotDePasse:
@@ -25,8 +51,50 @@ class HacheurDeMotDePasse:
     Si vous êtes curieux, vous pouvez jeter un coup d'oeil sur
     https://fr.wikipedia.org/wiki/Fonction_de_hachage 
     afin d'en apprendre davantage sur l'utilité du hachage de mot de passe.
+
+    L'ALGORITHME des nouveaux hachages est configurable:
+        - "sha512": le hachage historique, un SHA-512 avec un sel commun
+          (128 caractères hexadécimaux);
+        - "pbkdf2_sha256": PBKDF2-HMAC-SHA256 avec ITERATIONS_PBKDF2 itérations,
+          noté "pbkdf2_sha256$iterations$sel$hachage";
+        - "scrypt": scrypt avec les coûts COUTS_SCRYPT (n, r, p),
+          noté "scrypt$n$r$p$sel$hachage".
+    Les deux derniers utilisent un sel aléatoire par mot de passe. La vérification
+    reconnaît le format de chaque hachage: les hachages historiques déjà
+    enregistrés restent donc valides quel que soit l'ALGORITHME choisi. Aucun
+    de ces formats ne contient de virgule (le séparateur du fichier des utilisateurs).
+
+    PBKDF2 et scrypt libèrent le GIL pendant le calcul: les méthodes
+    hacher_plusieurs, verifier_plusieurs, hacher_async et verifier_async
+    les exécutent dans un groupe de NOMBRE_DE_FILS fils d'exécution.
     """
     SEL_CRYPTO = "7f99fb781a504bb69b12fc4b58ce3414"
+    ALGORITHME = "sha512"
+    ITERATIONS_PBKDF2 = 600_000
+    COUTS_SCRYPT = (2 ** 14, 8, 1)
+    NOMBRE_DE_FILS = os.cpu_count() or 1
+    _executeur = None
+
+    @classmethod
+    def configurer(cls, algorithme, iterations_pbkdf2=None, couts_scrypt=None):
+        """
+        Méthode permettant de choisir l'algorithme et les coûts des nouveaux hachages.
+
+        Args:
+            algorithme (str): "sha512", "pbkdf2_sha256" ou "scrypt".
+            iterations_pbkdf2 (int, optional): Nombre d'itérations de PBKDF2.
+            couts_scrypt (tuple, optional): Les coûts (n, r, p) de scrypt.
+
+        Raises:
+            ValueError: Si l'algorithme est inconnu.
+        """
+        if algorithme not in ("sha512", "pbkdf2_sha256", "scrypt"):
+            raise ValueError(f"Algorithme de hachage inconnu: {algorithme}")
+        cls.ALGORITHME = algorithme
+        if iterations_pbkdf2 is not None:
+            cls.ITERATIONS_PBKDF2 = iterations_pbkdf2
+        if couts_scrypt is not None:
+            cls.COUTS_SCRYPT = tuple(couts_scrypt)
 
     @classmethod
     def hacher(cls, mot_de_passe_en_clair):
@@ -39,9 +107,17 @@ class HacheurDeMotDePasse:
         Returns:
             str: Mot de passe haché 
         """
-        return hashlib.sha512(mot_de_passe_en_clair.encode("utf-8") + cls.SEL_CRYPTO.encode("utf-8")).hexdigest()
+        if cls.ALGORITHME == "sha512":
+            return cls._hacher_sha512(mot_de_passe_en_clair)
+        sel = os.urandom(16).hex()
+        if cls.ALGORITHME == "pbkdf2_sha256":
+            parametres = (str(cls.ITERATIONS_PBKDF2), sel)
+        else:
+            parametres = tuple(str(cout) for cout in cls.COUTS_SCRYPT) + (sel,)
+        return "$".join((cls.ALGORITHME,) + parametres + (cls._deriver(cls.ALGORITHME, parametres, mot_de_passe_en_clair),))
 
     @classmethod
+    @chronometrer()
     def verifier(cls, hash_mot_de_passe, mot_de_passe_en_clair):
         """
         Méthode permettant de vérifier que le hachage fourni correspond 
@@ -54,4 +130,211 @@ class HacheurDeMotDePasse:
         Returns:
             bool: True si le mot de passe est valide, False sinon. 
         """
-        return cls.hacher(mot_de_passe_en_clair) == hash_mot_de_passe
+        if "$" not in hash_mot_de_passe:
+            attendu = cls._hacher_sha512(mot_de_passe_en_clair)
+        else:
+            algorithme, *parametres, hachage = hash_mot_de_passe.split("$")
+            try:
+                attendu = cls._deriver(algorithme, parametres, mot_de_passe_en_clair)
+            except (ValueError, OverflowError):
+                # Hachage enregistré corrompu (paramètres illisibles ou hors limites).
+                attendu = None
+            hash_mot_de_passe = hachage
+        # compare_digest refuse les str non ASCII: un hachage corrompu ou modifié à la
+        # main ferait échouer l'authentification par une exception.
+        valide = attendu is not None and hmac.compare_digest(
+            attendu.encode("utf-8"), hash_mot_de_passe.encode("utf-8", errors="replace")
+        )
+        compter("verifications_de_mot_de_passe_total", resultat="succes" if valide else "echec")
+        return valide
+
+    @classmethod
+    def est_couteux(cls, hash_mot_de_passe):
+        """
+        Méthode permettant de savoir si la vérification d'un hachage vaut la
+        peine d'être confiée à un autre fil d'exécution: c'est le cas de PBKDF2
+        et de scrypt, mais pas du SHA-512 historique, plus rapide à calculer
+        qu'à transmettre.
+
+        Args:
+            hash_mot_de_passe (str): Version hachée du mot de passe.
+
+        Returns:
+            bool: True si le hachage utilise une dérivation de clé coûteuse.
+        """
+        return "$" in hash_mot_de_passe
+
+    @classmethod
+    def executeur(cls):
+        """
+        Méthode permettant de récupérer le groupe de fils d'exécution du
+        hachage (créé au premier appel).
+
+        Returns:
+            concurrent.futures.ThreadPoolExecutor: Le groupe de fils.
+        """
+        if HacheurDeMotDePasse._executeur is None:
+            HacheurDeMotDePasse._executeur = concurrent.futures.ThreadPoolExecutor(
+                max_workers=cls.NOMBRE_DE_FILS, thread_name_prefix="hachage"
+            )
+        return HacheurDeMotDePasse._executeur
+
+    @classmethod
+    def hacher_plusieurs(cls, mots_de_passe_en_clair):
+        """
+        Méthode permettant de hacher un lot de mots de passe. Avec PBKDF2 ou
+        scrypt, les hachages sont répartis entre les fils d'exécution.
+
+        Args:
+            mots_de_passe_en_clair (list): Les mots de passe en clair.
+
+        Returns:
+            list: Les mots de passe hachés, dans l'ordre.
+        """
+        if cls.ALGORITHME == "sha512":
+            return [cls.hacher(mot_de_passe_en_clair) for mot_de_passe_en_clair in mots_de_passe_en_clair]
+        return list(cls.executeur().map(cls.hacher, mots_de_passe_en_clair))
+
+    @classmethod
+    def verifier_plusieurs(cls, paires):
+        """
+        Méthode permettant de vérifier un lot de mots de passe. Les vérifications
+        coûteuses sont réparties entre les fils d'exécution (au plus NOMBRE_DE_FILS
+        à la fois), les autres sont faites directement.
+
+        Args:
+            paires (iterable): Des paires (hash_mot_de_passe, mot_de_passe_en_clair).
+
+        Returns:
+            list: Le résultat (bool) de chaque vérification, dans l'ordre.
+        """
+        resultats = []
+        for hash_mot_de_passe, mot_de_passe_en_clair in paires:
+            if cls.est_couteux(hash_mot_de_passe):
+                resultats.append(cls.executeur().submit(cls.verifier, hash_mot_de_passe, mot_de_passe_en_clair))
+            else:
+                resultats.append(cls.verifier(hash_mot_de_passe, mot_de_passe_en_clair))
+        return [resultat if isinstance(resultat, bool) else resultat.result() for resultat in resultats]
+
+    @classmethod
+    async def hacher_async(cls, mot_de_passe_en_clair):
+        """
+        Coroutine permettant de hacher un mot de passe sans bloquer la boucle
+        asyncio (voir hacher).
+
+        Args:
+            mot_de_passe_en_clair (str): Mot de passe en clair à hacher.
+
+        Returns:
+            str: Mot de passe haché
+        """
+        if cls.ALGORITHME == "sha512":
+            return cls.hacher(mot_de_passe_en_clair)
+        return await asyncio.get_running_loop().run_in_executor(cls.executeur(), cls.hacher, mot_de_passe_en_clair)
+
+    @classmethod
+    async def verifier_async(cls, hash_mot_de_passe, mot_de_passe_en_clair):
+        """
+        Coroutine permettant de vérifier un mot de passe sans bloquer la boucle
+        asyncio (voir verifier).
+
+        Args:
+            hash_mot_de_passe (str): Version hachée du mot de passe.
+            mot_de_passe_en_clair (str): Mot de passe en clair.
+
+        Returns:
+            bool: True si le mot de passe est valide, False sinon.
+        """
+        if not cls.est_couteux(hash_mot_de_passe):
+            return cls.verifier(hash_mot_de_passe, mot_de_passe_en_clair)
+        return await asyncio.get_running_loop().run_in_executor(
+            cls.executeur(), cls.verifier, hash_mot_de_passe, mot_de_passe_en_clair
+        )
+
+    @classmethod
+    def _hacher_sha512(cls, mot_de_passe_en_clair):
+        return hashlib.sha512(mot_de_passe_en_clair.encode("utf-8") + cls.SEL_CRYPTO.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _deriver(algorithme, parametres, mot_de_passe_en_clair):
+        # Les paramètres sont ceux notés dans le hachage, le sel (hexadécimal) en dernier.
+        mot_de_passe = mot_de_passe_en_clair.encode("utf-8")
+        if algorithme == "pbkdf2_sha256" and len(parametres) == 2:
+            iterations, sel = parametres
+            return hashlib.pbkdf2_hmac("sha256", mot_de_passe, bytes.fromhex(sel), int(iterations)).hex()
+        if algorithme == "scrypt" and len(parametres) == 4:
+            n, r, p, sel = parametres
+            n, r, p = int(n), int(r), int(p)
+            return hashlib.scrypt(
+                mot_de_passe, salt=bytes.fromhex(sel), n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + 2 ** 20
+            ).hex()
+        raise ValueError(f"Hachage inconnu: {algorithme}")
+
+
+class LimiteurDeTentatives:
+    """
+    Classe permettant de limiter les tentatives d'authentification: après
+    NOMBRE_D_ECHECS échecs pour une même clé (l'adresse email d'un compte)
+    pendant les FENETRE dernières secondes, les tentatives suivantes doivent
+    attendre que le plus ancien de ces échecs sorte de la fenêtre.
+
+    Un LimiteurDeTentatives est composé des attributs suivants:
+        - nombre_d_echecs (int): le nombre d'échecs permis dans la fenêtre.
+        - fenetre (float): la durée de la fenêtre, en secondes.
+        - echecs (dict): les dates des derniers échecs de chaque clé.
+    """
+    NOMBRE_D_ECHECS = 5
+    FENETRE = 60.0
+
+    def __init__(self, nombre_d_echecs=NOMBRE_D_ECHECS, fenetre=FENETRE, horloge=time.monotonic):
+        """
+        Args:
+            nombre_d_echecs (int, optional): Le nombre d'échecs permis dans la fenêtre.
+            fenetre (float, optional): La durée de la fenêtre, en secondes.
+            horloge (callable, optional): La fonction donnant l'heure, en secondes.
+        """
+        self.nombre_d_echecs = nombre_d_echecs
+        self.fenetre = fenetre
+        self.horloge = horloge
+        self.echecs = {}
+
+    def attente(self, cle):
+        """
+        Méthode permettant de savoir combien de temps attendre avant une
+        nouvelle tentative.
+
+        Args:
+            cle (str): La clé des tentatives.
+
+        Returns:
+            float: Le nombre de secondes à attendre, 0 si la tentative est permise.
+        """
+        echecs = self.echecs.get(cle)
+        if echecs is None or len(echecs) < self.nombre_d_echecs:
+            return 0.0
+        return max(0.0, echecs[0] + self.fenetre - self.horloge())
+
+    def noter_echec(self, cle):
+        """
+        Méthode permettant de noter l'échec d'une tentative. Les échecs sortis
+        de la fenêtre sont oubliés.
+
+        Args:
+            cle (str): La clé des tentatives.
+        """
+        maintenant = self.horloge()
+        echecs = self.echecs.setdefault(cle, collections.deque(maxlen=self.nombre_d_echecs))
+        echecs.append(maintenant)
+        # Les clés dont tous les échecs sont anciens sont retirées de temps en temps.
+        if len(self.echecs) > 1024:
+            for autre in [autre for autre, dates in self.echecs.items() if dates[-1] + self.fenetre < maintenant]:
+                del self.echecs[autre]
+
+    def oublier(self, cle):
+        """
+        Méthode permettant d'oublier les échecs d'une clé, après une tentative réussie.
+
+        Args:
+            cle (str): La clé des tentatives.
+        """
+        self.echecs.pop(cle, None)